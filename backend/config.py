@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
 from urllib.parse import quote_plus
 
 from pydantic import Field
@@ -29,10 +29,27 @@ class Settings(BaseSettings):
     REDIS_HOST: str = Field(default="localhost")
     REDIS_PORT: str = Field(default="6379")
     REDIS_DB: str = Field(default="0")
+    REDIS_MAX_CONNECTIONS: int = Field(default=50)
 
+    VECTOR_STORE_BACKEND: Literal["qdrant", "numpy"] = Field(default="qdrant")
+    VECTOR_STORE_PATH: str = Field(default="storage/vector_store")
     QDRANT_HOST: str = Field(default="localhost")
     QDRANT_PORT: int = Field(default=6333)
     QDRANT_COLLECTION_NAME: str = Field(default="context_items")
+    QDRANT_ASYNC_SEARCH: bool = Field(default=True)
+    QDRANT_PREFER_GRPC: bool = Field(default=True)
+    QDRANT_GRPC_PORT: int = Field(default=6334)
+    QDRANT_CLIENT_POOL_SIZE: int = Field(default=4)
+    QDRANT_GRPC_KEEPALIVE_MS: int = Field(default=30000)
+    QDRANT_TOPIC_PAYLOAD_FILTER: bool = Field(default=False)
+    QDRANT_RESCORE_FULL_DIM: bool = Field(default=True)
+    QDRANT_RESCORE_OVERSAMPLING: float = Field(default=4.0)
+    QDRANT_QUANTIZATION: Literal["none", "scalar", "binary"] = Field(default="none")
+    QDRANT_QUANTIZATION_ALWAYS_RAM: bool = Field(default=True)
+    QDRANT_QUANTIZATION_OVERSAMPLING: float = Field(default=2.0)
+    QDRANT_QUANTIZATION_RESCORE: bool = Field(default=True)
+    QDRANT_VECTOR_DATATYPE: Literal["float32", "float16"] = Field(default="float32")
+    QDRANT_VECTORS_ON_DISK: bool = Field(default=False)
 
     FASTAPI_ALLOWED_ORIGINS: str = Field(
         default="http://localhost:8000,http://localhost:3000,http://localhost:5173"
@@ -41,16 +58,75 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str | None = Field(default=None)
     OPENAI_EMBEDDING_MODEL: str = Field(default="text-embedding-3-large")
     OPENAI_EMBEDDING_DIM: int = Field(default=3072)
+    OPENAI_EMBEDDING_REDUCED_DIM: int = Field(default=0)
     OPENAI_CHAT_MODEL: str = Field(default="gpt-4o-mini")
     OPENAI_CHAT_TEMPERATURE: float = Field(default=0.3)
     OPENAI_CHAT_MAX_TOKENS: int = Field(default=1000)
+    OPENAI_HTTP_MAX_CONNECTIONS: int = Field(default=100)
+    OPENAI_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = Field(default=20)
+    OPENAI_HTTP_KEEPALIVE_EXPIRY_SECONDS: float = Field(default=30.0)
+    OPENAI_HTTP_TIMEOUT_SECONDS: float = Field(default=30.0)
+    OPENAI_HTTP_CONNECT_TIMEOUT_SECONDS: float = Field(default=5.0)
+    OPENAI_MAX_RETRIES: int = Field(default=2)
+    OPENAI_EMBEDDING_BATCH_MAX_TOKENS: int = Field(default=100000)
+    OPENAI_EMBEDDING_BATCH_MAX_INPUTS: int = Field(default=2048)
+    OPENAI_EMBEDDING_BATCH_CONCURRENCY: int = Field(default=4)
+    OPENAI_EMBEDDING_BATCH_MAX_RETRIES: int = Field(default=3)
+    OPENAI_EMBEDDING_BATCH_RETRY_BACKOFF_SECONDS: float = Field(default=1.0)
 
     RAG_SEARCH_LIMIT: int = Field(default=10)
+    RAG_HYBRID_SEARCH: bool = Field(default=False)
+    RAG_HYBRID_RRF_K: int = Field(default=60)
+    RAG_LEXICAL_BM25_K1: float = Field(default=1.2)
+    RAG_LEXICAL_BM25_B: float = Field(default=0.75)
+    RAG_LEXICAL_AVG_DOC_TERMS: float = Field(default=400.0)
     RAG_RERANK_TOP_K: int = Field(default=5)
+    RERANKER_MODEL: str = Field(default="BAAI/bge-reranker-base")
+    RERANKER_BACKEND: Literal["torch", "onnx"] = Field(default="torch")
+    RERANKER_MAX_LENGTH: int = Field(default=512)
+    RERANKER_BATCH_SIZE: int = Field(default=16)
+    RERANKER_ONNX_DIR: str = Field(default="storage/reranker_onnx")
+    RERANKER_ONNX_THREADS: int = Field(default=0)
+    RERANKER_MICROBATCH_ENABLED: bool = Field(default=False)
+    RERANKER_MICROBATCH_MAX_PAIRS: int = Field(default=64)
+    RERANKER_MICROBATCH_WAIT_MS: float = Field(default=5.0)
+    RERANKER_SCORE_CACHE_ENABLED: bool = Field(default=True)
+    RERANKER_SCORE_CACHE_TTL_SECONDS: int = Field(default=604800)
+    RERANKER_SCORE_CACHE_LOCAL_MAX_ENTRIES: int = Field(default=10000)
+    RAG_WARMUP_ON_STARTUP: bool = Field(default=True)
+    RAG_CACHE_TTL_SECONDS: int = Field(default=21600)
+    RAG_CACHE_EMPTY_TTL_SECONDS: int = Field(default=300)
+    RAG_CACHE_STALE_TTL_SECONDS: int = Field(default=3600)
+    RAG_SINGLEFLIGHT_LEASE_SECONDS: float = Field(default=30.0)
+    RAG_STREAM_REPLAY_CHUNK_SIZE: int = Field(default=200)
+    RAG_PROMPT_TOKEN_BUDGET: int = Field(default=6000)
+    RAG_BATCH_LLM_CONCURRENCY: int = Field(default=8)
+    RAG_ADAPTIVE_RERANK_ENABLED: bool = Field(default=True)
+    RAG_RERANK_SCORE_FLOOR: float = Field(default=0.15)
+    RAG_RERANK_GAP_THRESHOLD: float = Field(default=0.1)
+    RAG_RERANK_DOMINANCE_MARGIN: float = Field(default=0.2)
+    RAG_REQUEST_TIMEOUT_SECONDS: float = Field(default=15.0)
+    RAG_DEADLINE_RERANK_MIN_SECONDS: float = Field(default=1.5)
+    RAG_DEADLINE_GENERATION_RESERVE_SECONDS: float = Field(default=4.0)
+    RAG_DEADLINE_GENERATION_TOKENS_PER_SECOND: float = Field(default=100.0)
+    RAG_DEADLINE_MIN_COMPLETION_TOKENS: int = Field(default=128)
+    RAG_SESSION_HISTORY_TURNS: int = Field(default=6)
+    RAG_SESSION_MEMORY_TTL_SECONDS: int = Field(default=86400)
+    RAG_SESSION_SUMMARY_MAX_TOKENS: int = Field(default=256)
+    RAG_SEMANTIC_CACHE_ENABLED: bool = Field(default=True)
+    RAG_SEMANTIC_CACHE_THRESHOLD: float = Field(default=0.95)
+    RAG_SEMANTIC_CACHE_MAX_ENTRIES: int = Field(default=500)
+    RAG_SEMANTIC_CACHE_TTL_SECONDS: int = Field(default=86400)
+    RAG_TOPIC_CONTEXT_CACHE_TTL_SECONDS: int = Field(default=3600)
+    RAG_TOPIC_CONTEXT_LOCAL_TTL_SECONDS: float = Field(default=5.0)
+    RAG_TOPIC_CONTEXT_LOCAL_MAX_ENTRIES: int = Field(default=1024)
 
     REDIS_EMBEDDING_CACHE_ENABLED: bool = Field(default=True)
     REDIS_EMBEDDING_CACHE_TTL_DAYS: int = Field(default=30)
     REDIS_EMBEDDING_CACHE_PREFIX: str = Field(default="embedding_cache")
+    REDIS_EMBEDDING_CACHE_DTYPE: Literal["float32", "float16"] = Field(
+        default="float32"
+    )
 
     LLAMAINDEX_CACHE_ENABLED: bool = Field(default=False)
     LLAMAINDEX_CACHE_DIR: str = Field(default="storage/llamaindex_cache")
@@ -0,0 +1,67 @@
+"""
+Shared HTTP connection pool for OpenAI clients.
+
+Every async OpenAI client in a worker borrows connections from one tuned
+httpx pool, so chat and embedding calls reuse warm keep-alive connections
+instead of each client opening its own.
+"""
+
+from __future__ import annotations
+
+import httpx
+import openai
+
+from backend.config import settings
+
+_http_client: httpx.AsyncClient | None = None
+
+
+def get_openai_http_client() -> httpx.AsyncClient:
+    """Return the process-wide httpx client for OpenAI, creating it lazily."""
+    global _http_client
+
+    if _http_client is None or _http_client.is_closed:
+        _http_client = openai.DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=settings.OPENAI_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.OPENAI_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.OPENAI_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            timeout=httpx.Timeout(
+                settings.OPENAI_HTTP_TIMEOUT_SECONDS,
+                connect=settings.OPENAI_HTTP_CONNECT_TIMEOUT_SECONDS,
+            ),
+        )
+    return _http_client
+
+
+def create_async_openai_client(
+    api_key: str | None = None, max_retries: int | None = None
+) -> openai.AsyncOpenAI:
+    """
+    Build an AsyncOpenAI client on the shared connection pool.
+
+    Args:
+        api_key: OpenAI API key; defaults to the configured key
+        max_retries: SDK retries per request; defaults to
+            ``OPENAI_MAX_RETRIES``. Pass 0 when the caller retries itself.
+
+    Returns:
+        Async OpenAI client with the configured timeouts and retry budget
+    """
+    return openai.AsyncOpenAI(
+        api_key=api_key or settings.OPENAI_API_KEY,
+        http_client=get_openai_http_client(),
+        max_retries=(
+            settings.OPENAI_MAX_RETRIES if max_retries is None else max_retries
+        ),
+    )
+
+
+async def close_openai_http_client() -> None:
+    """Close the shared pool's connections (called on application shutdown)."""
+    global _http_client
+
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
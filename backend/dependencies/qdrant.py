@@ -0,0 +1,44 @@
+"""
+Shared async Qdrant client.
+
+Searches on the async RAG path go through one AsyncQdrantClient per worker.
+With ``QDRANT_PREFER_GRPC`` it sends protobuf over a pool of long-lived gRPC
+channels, used round-robin, so query vectors are not JSON-encoded and no
+executor thread is held while Qdrant works.
+"""
+
+from __future__ import annotations
+
+from qdrant_client import AsyncQdrantClient
+
+from backend.config import settings
+
+_client: AsyncQdrantClient | None = None
+
+
+def get_async_qdrant_client() -> AsyncQdrantClient:
+    """Return the process-wide async Qdrant client, creating it lazily."""
+    global _client
+
+    if _client is None:
+        _client = AsyncQdrantClient(
+            host=settings.QDRANT_HOST,
+            port=settings.QDRANT_PORT,
+            grpc_port=settings.QDRANT_GRPC_PORT,
+            prefer_grpc=settings.QDRANT_PREFER_GRPC,
+            pool_size=settings.QDRANT_CLIENT_POOL_SIZE,
+            grpc_options={
+                "grpc.keepalive_time_ms": settings.QDRANT_GRPC_KEEPALIVE_MS,
+                "grpc.keepalive_permit_without_calls": 1,
+            },
+        )
+    return _client
+
+
+async def close_async_qdrant_client() -> None:
+    """Close the shared client's channels (called on application shutdown)."""
+    global _client
+
+    if _client is not None:
+        await _client.close()
+        _client = None
@@ -0,0 +1,20 @@
+"""RAG service dependency for FastAPI endpoints."""
+
+from __future__ import annotations
+
+from fastapi import HTTPException, status
+
+from backend.config import settings
+from backend.services.rag_service import AsyncRAGService
+from backend.services.registry import registry
+
+
+async def get_rag_service() -> AsyncRAGService:
+    """Return the process-wide RAG service singleton."""
+    if not settings.OPENAI_API_KEY:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="OpenAI API key not configured",
+        )
+
+    return await registry.get_rag_service()
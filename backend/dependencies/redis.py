@@ -1,28 +1,102 @@
 """
 Redis dependency for FastAPI.
 
-Provides async Redis client for caching.
+Provides async Redis clients backed by a single per-process connection pool.
 """
 
 from collections.abc import AsyncGenerator
+from typing import Any
 
 import redis.asyncio as redis
 
 from backend.config import settings
 
+_pool: redis.ConnectionPool | None = None
+_binary_pool: redis.ConnectionPool | None = None
+_sync_client: Any = None
+
+
+def get_redis_pool() -> redis.ConnectionPool:
+    """Return the process-wide async Redis connection pool, creating it lazily."""
+    global _pool
+
+    if _pool is None:
+        _pool = redis.ConnectionPool.from_url(
+            settings.redis_url,
+            encoding="utf-8",
+            decode_responses=True,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+        )
+    return _pool
+
+
+def get_redis_client() -> redis.Redis:
+    """Return an async Redis client that borrows connections from the shared pool."""
+    return redis.Redis(connection_pool=get_redis_pool())
+
+
+def get_binary_redis_client() -> redis.Redis:
+    """
+    Return an async Redis client whose responses are raw bytes.
+
+    Used for binary-encoded values such as packed embeddings. It has its own
+    pool because ``decode_responses`` is a per-connection setting.
+    """
+    global _binary_pool
+
+    if _binary_pool is None:
+        _binary_pool = redis.ConnectionPool.from_url(
+            settings.redis_url,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+        )
+    return redis.Redis(connection_pool=_binary_pool)
+
+
+def get_sync_redis_client() -> Any:
+    """
+    Return a short-timeout synchronous Redis client.
+
+    Used by synchronous endpoints and ingestion tasks for best-effort cache
+    maintenance; the short timeouts keep a Redis outage from stalling them.
+    """
+    global _sync_client
+
+    if _sync_client is None:
+        import redis as sync_redis
+
+        _sync_client = sync_redis.from_url(
+            settings.redis_url,
+            encoding="utf-8",
+            decode_responses=True,
+            socket_connect_timeout=2,
+            socket_timeout=2,
+        )
+    return _sync_client
+
+
+async def close_redis_pool() -> None:
+    """Disconnect every pooled connection (called on application shutdown)."""
+    global _pool, _binary_pool
+
+    if _pool is not None:
+        await _pool.disconnect()
+        _pool = None
+    if _binary_pool is not None:
+        await _binary_pool.disconnect()
+        _binary_pool = None
+
 
 async def get_redis() -> AsyncGenerator[redis.Redis]:
     """
     Get async Redis client.
 
+    The client shares the process-wide pool, so closing it releases connections
+    back to the pool instead of tearing down sockets.
+
     Yields:
         Redis client instance
     """
-    client = redis.from_url(
-        settings.redis_url,
-        encoding="utf-8",
-        decode_responses=True,
-    )
+    client = get_redis_client()
     try:
         yield client
     finally:
@@ -4,6 +4,9 @@ FastAPI application entry point.
 Pure FastAPI implementation (Django removed).
 """
 
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import PlainTextResponse
@@ -15,12 +18,25 @@ from backend.routers.admin import analytics_router as admin_analytics
 from backend.routers.admin import bulk_operations
 from backend.routers.admin import contexts_router as admin_contexts
 from backend.routers.admin import topics_router as admin_topics
+from backend.services.registry import registry
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Build shared RAG services on startup and release them on shutdown."""
+    await registry.startup()
+    try:
+        yield
+    finally:
+        await registry.shutdown()
+
 
 app = FastAPI(
     title="Scholaria RAG API",
     description="FastAPI implementation of Scholaria RAG System",
     version="0.1.0",
     redirect_slashes=False,
+    lifespan=lifespan,
 )
 
 app.add_middleware(
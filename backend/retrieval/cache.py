@@ -3,11 +3,26 @@
 from __future__ import annotations
 
 import hashlib
-import json
+import logging
 from typing import Any
 
+import redis.asyncio as aioredis
+
 from backend.config import settings
 
+from .codec import decode_vector, encode_vector
+
+logger = logging.getLogger(__name__)
+
+
+def embedding_cache_key(text: str, model: str) -> str:
+    """Redis key for the embedding of ``text`` under ``model``."""
+    digest_source = f"{model}::{text}".encode()
+    hash_digest = hashlib.sha256(digest_source).hexdigest()
+    namespace = settings.LLAMAINDEX_CACHE_NAMESPACE
+    prefix = settings.REDIS_EMBEDDING_CACHE_PREFIX
+    return f"{prefix}:{namespace}:{hash_digest}"
+
 
 class EmbeddingCache:
     """Redis-backed cache for embeddings with graceful fallback."""
@@ -32,10 +47,9 @@ class EmbeddingCache:
             try:
                 import redis
 
+                # Vectors are stored as packed bytes, so responses stay binary
                 self._client = redis.from_url(
                     settings.redis_url,
-                    encoding="utf-8",
-                    decode_responses=True,
                     socket_connect_timeout=2,
                     socket_timeout=2,
                 )
@@ -49,11 +63,7 @@ class EmbeddingCache:
                 self._client = None
 
     def _make_key(self, text: str, model: str) -> str:
-        digest_source = f"{model}::{text}".encode()
-        hash_digest = hashlib.sha256(digest_source).hexdigest()
-        namespace = settings.LLAMAINDEX_CACHE_NAMESPACE
-        prefix = settings.REDIS_EMBEDDING_CACHE_PREFIX
-        return f"{prefix}:{namespace}:{hash_digest}"
+        return embedding_cache_key(text, model)
 
     def get(self, text: str, model: str) -> list[float] | None:
         if not self._enabled or not self._client:
@@ -65,7 +75,7 @@ class EmbeddingCache:
             if not cached:
                 return None
 
-            return json.loads(cached)
+            return decode_vector(cached)
         except Exception:
             # Graceful degradation on any error
             return None
@@ -76,11 +86,132 @@ class EmbeddingCache:
 
         try:
             key = self._make_key(text, model)
-            value = json.dumps(embedding)
+            value = encode_vector(embedding, settings.REDIS_EMBEDDING_CACHE_DTYPE)
             self._client.setex(key, self._ttl_seconds, value)
         except Exception:
             # Graceful degradation - don't raise on cache write failure
             pass
 
+    def get_many(self, texts: list[str], model: str) -> list[list[float] | None]:
+        """Look up embeddings for ``texts`` in one MGET; misses are None."""
+        if not self._enabled or not self._client or not texts:
+            return [None] * len(texts)
+
+        try:
+            values = self._client.mget([self._make_key(text, model) for text in texts])
+            return [decode_vector(value) if value else None for value in values]
+        except Exception:
+            # Graceful degradation on any error
+            return [None] * len(texts)
+
+    def set_many(
+        self, texts: list[str], model: str, embeddings: list[list[float]]
+    ) -> None:
+        """Store embeddings for ``texts`` with one pipelined round-trip."""
+        if not self._enabled or not self._client or not texts:
+            return
+
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            for text, embedding in zip(texts, embeddings, strict=True):
+                pipe.setex(
+                    self._make_key(text, model),
+                    self._ttl_seconds,
+                    encode_vector(embedding, settings.REDIS_EMBEDDING_CACHE_DTYPE),
+                )
+            pipe.execute()
+        except Exception:
+            # Graceful degradation - don't raise on cache write failure
+            pass
+
+    def enabled(self) -> bool:
+        return self._enabled
+
+
+class AsyncEmbeddingCache:
+    """
+    Embedding cache on the shared async Redis pool.
+
+    Reads and writes the same keys and encoding as ``EmbeddingCache``, so
+    entries written during ingestion serve query-time lookups and vice versa.
+    The client must return raw bytes (see ``get_binary_redis_client``). Redis
+    errors are logged and treated as misses.
+    """
+
+    def __init__(
+        self,
+        redis_client: aioredis.Redis,
+        ttl_seconds: int | None = None,
+        enabled: bool | None = None,
+    ) -> None:
+        self._client = redis_client
+        self._ttl_seconds = (
+            ttl_seconds
+            if ttl_seconds is not None
+            else settings.REDIS_EMBEDDING_CACHE_TTL_DAYS * 86400
+        )
+        self._enabled = (
+            enabled if enabled is not None else settings.REDIS_EMBEDDING_CACHE_ENABLED
+        )
+
+    async def get(self, text: str, model: str) -> list[float] | None:
+        if not self._enabled:
+            return None
+
+        try:
+            cached = await self._client.get(embedding_cache_key(text, model))
+            if not cached:
+                return None
+            return decode_vector(cached)
+        except Exception as e:
+            logger.warning("Embedding cache read failed: %s", e)
+            return None
+
+    async def set(self, text: str, model: str, embedding: list[float]) -> None:
+        if not self._enabled:
+            return
+
+        try:
+            await self._client.setex(
+                embedding_cache_key(text, model),
+                self._ttl_seconds,
+                encode_vector(embedding, settings.REDIS_EMBEDDING_CACHE_DTYPE),
+            )
+        except Exception as e:
+            logger.warning("Embedding cache write failed: %s", e)
+
+    async def get_many(self, texts: list[str], model: str) -> list[list[float] | None]:
+        """Look up embeddings for ``texts`` in one MGET; misses are None."""
+        if not self._enabled or not texts:
+            return [None] * len(texts)
+
+        try:
+            values = await self._client.mget(
+                [embedding_cache_key(text, model) for text in texts]
+            )
+            return [decode_vector(value) if value else None for value in values]
+        except Exception as e:
+            logger.warning("Embedding cache read failed: %s", e)
+            return [None] * len(texts)
+
+    async def set_many(
+        self, texts: list[str], model: str, embeddings: list[list[float]]
+    ) -> None:
+        """Store embeddings for ``texts`` with one pipelined round-trip."""
+        if not self._enabled or not texts:
+            return
+
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            for text, embedding in zip(texts, embeddings, strict=True):
+                pipe.setex(
+                    embedding_cache_key(text, model),
+                    self._ttl_seconds,
+                    encode_vector(embedding, settings.REDIS_EMBEDDING_CACHE_DTYPE),
+                )
+            await pipe.execute()
+        except Exception as e:
+            logger.warning("Embedding cache write failed: %s", e)
+
     def enabled(self) -> bool:
         return self._enabled
@@ -0,0 +1,168 @@
+"""
+Compact Redis encodings for embeddings and cached answers.
+
+Embeddings are stored as packed little-endian floats behind a four-byte
+header (magic, format version, dtype). Cached answers are JSON with each
+source's title and content replaced by a reference to the matching context
+item, compressed with zlib and base64-encoded behind a text header, because
+the answer cache shares the text-decoding Redis pool.
+
+Both decoders still read the plain JSON written before this codec existed.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import struct
+import zlib
+from typing import Any
+
+import numpy as np
+
+VECTOR_MAGIC = b"EV"
+VECTOR_FORMAT_VERSION = 1
+_VECTOR_HEADER = struct.Struct("<2sBB")
+_VECTOR_DTYPES: dict[str, tuple[int, str]] = {
+    "float32": (1, "<f4"),
+    "float16": (2, "<f2"),
+}
+_VECTOR_DTYPE_CODES = dict(_VECTOR_DTYPES.values())
+
+ANSWER_HEADER = "ac1:"
+_ANSWER_COMPRESSION_LEVEL = 6
+_DEDUPED_FIELDS = ("title", "content")
+_ITEM_REF = "$item"
+
+
+def encode_vector(vector: list[float], dtype: str = "float32") -> bytes:
+    """
+    Pack an embedding into bytes.
+
+    Args:
+        vector: Embedding values
+        dtype: ``float32`` (lossless for OpenAI embeddings) or ``float16``
+
+    Returns:
+        Header followed by the packed values
+
+    Raises:
+        ValueError: If ``dtype`` is not supported
+    """
+    if dtype not in _VECTOR_DTYPES:
+        raise ValueError(f"Unsupported vector dtype: {dtype}")
+    code, layout = _VECTOR_DTYPES[dtype]
+
+    header = _VECTOR_HEADER.pack(VECTOR_MAGIC, VECTOR_FORMAT_VERSION, code)
+    return header + np.asarray(vector, dtype=layout).tobytes()
+
+
+def decode_vector(data: bytes | str) -> list[float] | None:
+    """
+    Unpack an embedding written by ``encode_vector`` or as legacy JSON.
+
+    Returns:
+        The embedding, or None when the entry uses an unknown format
+    """
+    if isinstance(data, str) or data[:1] == b"[":
+        return json.loads(data)
+
+    if len(data) < _VECTOR_HEADER.size:
+        return None
+    magic, version, code = _VECTOR_HEADER.unpack_from(data)
+    layout = _VECTOR_DTYPE_CODES.get(code)
+    if magic != VECTOR_MAGIC or version != VECTOR_FORMAT_VERSION or layout is None:
+        return None
+
+    values = np.frombuffer(data, dtype=layout, offset=_VECTOR_HEADER.size)
+    return values.tolist()
+
+
+def _dedupe_sources(result: dict[str, Any]) -> dict[str, Any]:
+    """Replace source text that repeats a context item with a reference to it."""
+    sources = result.get("sources")
+    items = result.get("context_items")
+    if not isinstance(sources, list) or not isinstance(items, list):
+        return result
+
+    positions = {
+        item.get("context_item_id"): index
+        for index, item in enumerate(items)
+        if isinstance(item, dict)
+    }
+    compact: list[Any] = []
+    for source in sources:
+        index = (
+            positions.get(source.get("context_item_id"))
+            if isinstance(source, dict)
+            else None
+        )
+        if index is None or any(
+            field not in source or source[field] != items[index].get(field)
+            for field in _DEDUPED_FIELDS
+        ):
+            compact.append(source)
+            continue
+        reference = {k: v for k, v in source.items() if k not in _DEDUPED_FIELDS}
+        reference[_ITEM_REF] = index
+        compact.append(reference)
+
+    return {**result, "sources": compact}
+
+
+def _restore_sources(result: dict[str, Any]) -> dict[str, Any]:
+    """Inverse of ``_dedupe_sources``."""
+    sources = result.get("sources")
+    items = result.get("context_items")
+    if not isinstance(sources, list) or not isinstance(items, list):
+        return result
+
+    restored: list[Any] = []
+    for source in sources:
+        if isinstance(source, dict) and _ITEM_REF in source:
+            source = dict(source)
+            item = items[source.pop(_ITEM_REF)]
+            for field in _DEDUPED_FIELDS:
+                source[field] = item[field]
+        restored.append(source)
+
+    return {**result, "sources": restored}
+
+
+def encode_answer(payload: dict[str, Any]) -> str:
+    """
+    Encode an answer cache entry.
+
+    ``payload`` is either a result dictionary or an envelope holding one under
+    ``result``; sources are deduplicated against the result's context items.
+    """
+    if isinstance(payload.get("result"), dict):
+        payload = {**payload, "result": _dedupe_sources(payload["result"])}
+    else:
+        payload = _dedupe_sources(payload)
+
+    raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode()
+    compressed = zlib.compress(raw, _ANSWER_COMPRESSION_LEVEL)
+    return ANSWER_HEADER + base64.b64encode(compressed).decode("ascii")
+
+
+def decode_answer(data: str | bytes) -> dict[str, Any] | None:
+    """
+    Decode an answer cache entry written by ``encode_answer`` or as plain JSON.
+
+    Returns:
+        The payload, or None when the entry uses an unknown format
+    """
+    if isinstance(data, bytes):
+        data = data.decode()
+
+    if data.startswith("{"):
+        return json.loads(data)
+    if not data.startswith(ANSWER_HEADER):
+        return None
+
+    raw = zlib.decompress(base64.b64decode(data[len(ANSWER_HEADER) :]))
+    payload = json.loads(raw)
+    if isinstance(payload.get("result"), dict):
+        return {**payload, "result": _restore_sources(payload["result"])}
+    return _restore_sources(payload)
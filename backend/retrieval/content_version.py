@@ -0,0 +1,71 @@
+"""
+Per-topic content version counters.
+
+Every write that can change a topic's answers (contexts, context items, topic
+associations, embeddings) increments the topic's counter. Answer cache keys
+embed the versions of the topics they were generated from, so a write makes
+older entries unreachable immediately and cache TTLs only bound memory use.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterable
+
+import redis
+import redis.asyncio as aioredis
+
+logger = logging.getLogger(__name__)
+
+CONTENT_VERSION_PREFIX = "rag_content_version"
+
+
+def content_version_key(topic_id: int) -> str:
+    """Redis counter for one topic's content version."""
+    return f"{CONTENT_VERSION_PREFIX}:{topic_id}"
+
+
+async def load_content_versions(
+    redis_client: aioredis.Redis, topic_ids: Iterable[int]
+) -> dict[int, int]:
+    """
+    Read the content versions of ``topic_ids`` in one round-trip.
+
+    Topics that were never written have version 0. When Redis is unavailable
+    every topic reports version 0 and a warning is logged.
+
+    Args:
+        redis_client: Async Redis client
+        topic_ids: Topics to look up
+
+    Returns:
+        Mapping of topic ID to content version
+    """
+    unique_ids = sorted(set(topic_ids))
+    if not unique_ids:
+        return {}
+
+    try:
+        values = await redis_client.mget(
+            [content_version_key(topic_id) for topic_id in unique_ids]
+        )
+        return {
+            topic_id: int(value or 0)
+            for topic_id, value in zip(unique_ids, values, strict=True)
+        }
+    except Exception as e:
+        logger.warning("Failed to load content versions for %s: %s", unique_ids, e)
+        return dict.fromkeys(unique_ids, 0)
+
+
+def bump_content_versions(redis_client: redis.Redis, topic_ids: Iterable[int]) -> None:
+    """
+    Increment the content version of every topic in ``topic_ids``.
+
+    Raises:
+        redis.RedisError: If the counters cannot be written
+    """
+    pipe = redis_client.pipeline(transaction=False)
+    for topic_id in sorted(set(topic_ids)):
+        pipe.incr(content_version_key(topic_id))
+    pipe.execute()
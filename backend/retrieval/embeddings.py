@@ -1,31 +1,146 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+import asyncio
+import contextvars
+import logging
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any
 
 import openai
 
 from backend.config import settings
 from backend.observability import get_meter, get_tracer
 
-from .cache import EmbeddingCache
+from .cache import AsyncEmbeddingCache, EmbeddingCache
 from .monitoring import OpenAIUsageMonitor
+from .tokens import count_tokens
 
 if TYPE_CHECKING:
-    pass
+    from opentelemetry.trace import Span
 
+logger = logging.getLogger(__name__)
 tracer = get_tracer(__name__)
 meter = get_meter(__name__)
 
+# Transient failures worth retrying a sub-batch for
+_RETRYABLE_ERRORS: tuple[type[Exception], ...] = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+def plan_sub_batches(
+    texts: list[str],
+    model: str,
+    max_tokens: int | None = None,
+    max_inputs: int | None = None,
+) -> list[list[int]]:
+    """
+    Split texts into request-sized sub-batches.
+
+    Texts are grouped in order until adding the next one would exceed
+    ``max_tokens`` or ``max_inputs``. A single text larger than ``max_tokens``
+    gets a sub-batch of its own.
+
+    Args:
+        texts: Texts to embed
+        model: Embedding model whose tokenizer counts the texts
+        max_tokens: Token limit per request
+        max_inputs: Input count limit per request
+
+    Returns:
+        Sub-batches as lists of indices into ``texts``
+    """
+    max_tokens = (
+        settings.OPENAI_EMBEDDING_BATCH_MAX_TOKENS if max_tokens is None else max_tokens
+    )
+    max_inputs = (
+        settings.OPENAI_EMBEDDING_BATCH_MAX_INPUTS if max_inputs is None else max_inputs
+    )
+
+    batches: list[list[int]] = []
+    current: list[int] = []
+    current_tokens = 0
+    for index, text in enumerate(texts):
+        tokens = count_tokens(text, model)
+        if current and (
+            current_tokens + tokens > max_tokens or len(current) >= max_inputs
+        ):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(index)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def reduce_embedding(embedding: list[float], dimensions: int) -> list[float]:
+    """
+    Shorten an embedding to its first ``dimensions`` values.
+
+    OpenAI's text-embedding-3 models are trained so that a prefix of the
+    vector is itself a usable embedding; truncating and L2-renormalizing gives
+    the same vector the API returns when called with ``dimensions=``. Deriving
+    it locally lets one cached full-size embedding serve both the reduced
+    index and full-dimension rescoring.
+
+    Args:
+        embedding: Full-size embedding
+        dimensions: Number of leading dimensions to keep
+
+    Returns:
+        Unit-length vector of length ``dimensions``
+
+    Raises:
+        ValueError: If ``dimensions`` is not between 1 and the embedding size
+    """
+    if not 0 < dimensions <= len(embedding):
+        raise ValueError(
+            f"Cannot reduce a {len(embedding)}-dimension embedding to {dimensions}"
+        )
 
-class EmbeddingService:
-    """Service for generating embeddings using OpenAI API."""
+    prefix = embedding[:dimensions]
+    norm = math.sqrt(sum(value * value for value in prefix))
+    if norm == 0:
+        return list(prefix)
+    return [value / norm for value in prefix]
+
+
+def _retry_delay(attempt: int) -> float:
+    return settings.OPENAI_EMBEDDING_BATCH_RETRY_BACKOFF_SECONDS * 2**attempt
+
+
+def _record_usage(
+    monitor: OpenAIUsageMonitor,
+    span: Span,
+    model: str,
+    response: Any,
+    texts: list[str],
+) -> None:
+    """Track token usage of an embeddings response, estimating when absent."""
+    if hasattr(response, "usage") and response.usage:
+        # Ensure we get integers rather than MagicMock objects in tests
+        total_tokens = (
+            int(response.usage.total_tokens)
+            if hasattr(response.usage, "total_tokens")
+            else 0
+        )
+    else:
+        # Count tokens locally if usage not available
+        total_tokens = sum(count_tokens(text, model) for text in texts)
 
-    def __init__(self) -> None:
-        self.client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
-        self.model = settings.OPENAI_EMBEDDING_MODEL
-        self.cache = EmbeddingCache()
-        self.monitor = OpenAIUsageMonitor()
+    span.set_attribute("tokens.total", total_tokens)
+    monitor.track_embedding_usage(total_tokens, model)
 
+
+class _EmbeddingCacheMetrics:
+    """Embedding cache counters shared by the sync and async services."""
+
+    def _init_cache_metrics(self) -> None:
         self._cache_hits_counter = meter.create_counter(
             name="rag.embedding.cache.hits",
             description="Total number of embedding cache hits",
@@ -34,6 +149,31 @@ class EmbeddingService:
             name="rag.embedding.cache.misses",
             description="Total number of embedding cache misses",
         )
+        self._batch_hit_ratio_histogram = meter.create_histogram(
+            name="rag.embedding.cache.batch_hit_ratio",
+            description="Fraction of each embedding batch served from the cache",
+        )
+
+    def _record_batch_cache(self, span: Span, total: int, misses: int) -> None:
+        hits = total - misses
+        span.set_attribute("cache.hits", hits)
+        span.set_attribute("cache.misses", misses)
+        span.set_attribute("cache.hit_ratio", hits / total)
+        self._cache_hits_counter.add(hits)
+        self._cache_misses_counter.add(misses)
+        self._batch_hit_ratio_histogram.record(hits / total)
+
+
+class EmbeddingService(_EmbeddingCacheMetrics):
+    """Service for generating embeddings using OpenAI API."""
+
+    def __init__(self) -> None:
+        # _create_embeddings owns retries; SDK retries would multiply them
+        self.client = openai.OpenAI(api_key=settings.OPENAI_API_KEY, max_retries=0)
+        self.model = settings.OPENAI_EMBEDDING_MODEL
+        self.cache = EmbeddingCache()
+        self.monitor = OpenAIUsageMonitor()
+        self._init_cache_metrics()
 
     def generate_embedding(self, text: str | None) -> list[float]:
         """
@@ -65,27 +205,10 @@ class EmbeddingService:
             span.set_attribute("cache.hit", False)
             self._cache_misses_counter.add(1)
 
-            # Track request timing for rate limiting
-            self.monitor.track_request_timestamp("embeddings")
-
-            response = self.client.embeddings.create(model=self.model, input=text)
+            response = self._create_embeddings(span, text)
             embedding = response.data[0].embedding
 
-            # Track usage metrics
-            if hasattr(response, "usage") and response.usage:
-                # Ensure we get integers rather than MagicMock objects in tests
-                total_tokens = (
-                    int(response.usage.total_tokens)
-                    if hasattr(response.usage, "total_tokens")
-                    else 0
-                )
-                span.set_attribute("tokens.total", total_tokens)
-                self.monitor.track_embedding_usage(total_tokens, self.model)
-            else:
-                # Estimate tokens if usage not available (approximate 4 chars per token)
-                estimated_tokens = len(text) // 4
-                span.set_attribute("tokens.total", estimated_tokens)
-                self.monitor.track_embedding_usage(estimated_tokens, self.model)
+            _record_usage(self.monitor, span, self.model, response, [text])
 
             if self.cache.enabled():
                 self.cache.set(text, self.model, embedding)
@@ -94,7 +217,12 @@ class EmbeddingService:
 
     def generate_embeddings_batch(self, texts: list[str]) -> list[list[float]]:
         """
-        Generate embeddings for multiple texts in a single API call.
+        Generate embeddings for multiple texts.
+
+        Cache misses are split into token-bounded sub-batches (see
+        ``plan_sub_batches``) that are sent concurrently, up to
+        ``OPENAI_EMBEDDING_BATCH_CONCURRENCY`` at a time, and reassembled in
+        input order.
 
         Args:
             texts: List of texts to generate embeddings for
@@ -112,60 +240,247 @@ class EmbeddingService:
             span.set_attribute("batch.size", len(texts))
             span.set_attribute("model.name", self.model)
 
-            cached_results: list[list[float] | None] = []
-            texts_to_fetch: list[str] = []
-
             if self.cache.enabled():
-                for text in texts:
-                    cached_results.append(self.cache.get(text, self.model))
-                    if cached_results[-1] is None:
-                        texts_to_fetch.append(text)
+                results = self.cache.get_many(texts, self.model)
             else:
-                cached_results = [None for _ in texts]
-                texts_to_fetch = texts
+                results = [None for _ in texts]
 
-            cache_hits = len(texts) - len(texts_to_fetch)
-            span.set_attribute("cache.hits", cache_hits)
-            span.set_attribute("cache.misses", len(texts_to_fetch))
+            missing = [index for index, cached in enumerate(results) if cached is None]
+            self._record_batch_cache(span, len(texts), len(missing))
+
+            if missing:
+                texts_to_fetch = [texts[index] for index in missing]
+                sub_batches = [
+                    [texts_to_fetch[i] for i in batch]
+                    for batch in plan_sub_batches(texts_to_fetch, self.model)
+                ]
+                span.set_attribute("batch.sub_batches", len(sub_batches))
+
+                workers = min(
+                    settings.OPENAI_EMBEDDING_BATCH_CONCURRENCY, len(sub_batches)
+                )
+                if workers <= 1:
+                    fetched = [self._embed_sub_batch(batch) for batch in sub_batches]
+                else:
+                    # Each thread runs in a copy of this context so its span
+                    # nests under rag.embedding.batch
+                    with ThreadPoolExecutor(max_workers=workers) as executor:
+                        futures = [
+                            executor.submit(
+                                contextvars.copy_context().run,
+                                self._embed_sub_batch,
+                                batch,
+                            )
+                            for batch in sub_batches
+                        ]
+                        fetched = [future.result() for future in futures]
+
+                fetched_embeddings = [e for batch in fetched for e in batch]
+                for index, embedding in zip(missing, fetched_embeddings, strict=True):
+                    results[index] = embedding
+
+            return [embedding for embedding in results if embedding is not None]
+
+    def _create_embeddings(self, span: Span, texts: str | list[str]) -> Any:
+        """
+        Call the embeddings API, retrying transient failures with backoff.
 
-            fetched_embeddings: list[list[float]] = []
-            if texts_to_fetch:
+        The client is built without SDK retries, so this loop is the whole
+        retry budget: ``OPENAI_EMBEDDING_BATCH_MAX_RETRIES`` retries.
+        """
+        count = 1 if isinstance(texts, str) else len(texts)
+        max_retries = settings.OPENAI_EMBEDDING_BATCH_MAX_RETRIES
+        for attempt in range(max_retries + 1):
+            try:
                 # Track request timing for rate limiting
                 self.monitor.track_request_timestamp("embeddings")
+                response = self.client.embeddings.create(model=self.model, input=texts)
+                break
+            except _RETRYABLE_ERRORS as e:
+                if attempt == max_retries:
+                    raise
+                logger.warning(
+                    "Embedding request of %d texts failed (attempt %d): %s",
+                    count,
+                    attempt + 1,
+                    e,
+                )
+                time.sleep(_retry_delay(attempt))
+
+        span.set_attribute("request.attempts", attempt + 1)
+        return response
+
+    def _embed_sub_batch(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embed one sub-batch, retrying transient API failures, and cache it.
+
+        Sub-batches are cached as soon as they succeed, so re-running a
+        document after a failure only re-embeds the sub-batches that failed.
+        """
+        with tracer.start_as_current_span("rag.embedding.sub_batch") as span:
+            span.set_attribute("batch.size", len(texts))
+            response = self._create_embeddings(span, texts)
+            _record_usage(self.monitor, span, self.model, response, texts)
+            embeddings = [item.embedding for item in response.data]
+            if self.cache.enabled():
+                self.cache.set_many(texts, self.model, embeddings)
+            return embeddings
+
+
+class AsyncEmbeddingService(_EmbeddingCacheMetrics):
+    """
+    Embedding service for the async query path.
+
+    Calls ``AsyncOpenAI`` on the shared OpenAI connection pool and caches
+    vectors through the async Redis pool, so embedding a question never
+    occupies a default-executor thread that reranking needs.
+    """
+
+    def __init__(
+        self,
+        client: openai.AsyncOpenAI | None = None,
+        cache: AsyncEmbeddingCache | None = None,
+    ) -> None:
+        if client is None:
+            from backend.dependencies.openai_client import create_async_openai_client
+
+            # _create_embeddings owns retries; SDK retries would multiply them
+            client = create_async_openai_client(max_retries=0)
+        if cache is None:
+            from backend.dependencies.redis import get_binary_redis_client
+
+            cache = AsyncEmbeddingCache(get_binary_redis_client())
+
+        self.client = client
+        self.model = settings.OPENAI_EMBEDDING_MODEL
+        self.cache = cache
+        self.monitor = OpenAIUsageMonitor()
+        self._init_cache_metrics()
+
+    async def generate_embedding(self, text: str | None) -> list[float]:
+        """
+        Generate embedding for a single text.
+
+        Args:
+            text: Text to generate embedding for
+
+        Returns:
+            List of float values representing the embedding
+
+        Raises:
+            ValueError: If text is None or empty
+        """
+        with tracer.start_as_current_span("rag.embedding") as span:
+            if text is None or not text.strip():
+                raise ValueError("Text cannot be None or empty")
+
+            span.set_attribute("text.length", len(text))
+            span.set_attribute("model.name", self.model)
+
+            cached = await self.cache.get(text, self.model)
+            if cached is not None:
+                span.set_attribute("cache.hit", True)
+                self._cache_hits_counter.add(1)
+                return cached
+
+            span.set_attribute("cache.hit", False)
+            self._cache_misses_counter.add(1)
+
+            response = await self._create_embeddings(span, text)
+            embedding = response.data[0].embedding
+            _record_usage(self.monitor, span, self.model, response, [text])
+
+            await self.cache.set(text, self.model, embedding)
+            return embedding
+
+    async def generate_embeddings_batch(self, texts: list[str]) -> list[list[float]]:
+        """
+        Generate embeddings for multiple texts.
+
+        Cache misses are split into token-bounded sub-batches (see
+        ``plan_sub_batches``) that are sent concurrently, up to
+        ``OPENAI_EMBEDDING_BATCH_CONCURRENCY`` at a time, and reassembled in
+        input order.
+
+        Args:
+            texts: List of texts to generate embeddings for
+
+        Returns:
+            List of embedding vectors
+
+        Raises:
+            ValueError: If texts list is empty
+        """
+        with tracer.start_as_current_span("rag.embedding.batch") as span:
+            if not texts:
+                raise ValueError("Texts list cannot be empty")
+
+            span.set_attribute("batch.size", len(texts))
+            span.set_attribute("model.name", self.model)
+
+            results = await self.cache.get_many(texts, self.model)
+            missing = [index for index, cached in enumerate(results) if cached is None]
+            self._record_batch_cache(span, len(texts), len(missing))
+
+            if missing:
+                texts_to_fetch = [texts[index] for index in missing]
+                sub_batches = [
+                    [texts_to_fetch[i] for i in batch]
+                    for batch in plan_sub_batches(texts_to_fetch, self.model)
+                ]
+                span.set_attribute("batch.sub_batches", len(sub_batches))
 
-                response = self.client.embeddings.create(
-                    model=self.model, input=texts_to_fetch
+                semaphore = asyncio.Semaphore(
+                    settings.OPENAI_EMBEDDING_BATCH_CONCURRENCY
                 )
-                fetched_embeddings = [item.embedding for item in response.data]
-
-                # Track usage metrics
-                if hasattr(response, "usage") and response.usage:
-                    # Ensure we get integers rather than MagicMock objects in tests
-                    total_tokens = (
-                        int(response.usage.total_tokens)
-                        if hasattr(response.usage, "total_tokens")
-                        else 0
-                    )
-                    span.set_attribute("tokens.total", total_tokens)
-                    self.monitor.track_embedding_usage(total_tokens, self.model)
-                else:
-                    # Estimate tokens if usage not available
-                    estimated_tokens = sum(len(text) // 4 for text in texts_to_fetch)
-                    span.set_attribute("tokens.total", estimated_tokens)
-                    self.monitor.track_embedding_usage(estimated_tokens, self.model)
-
-            # Merge cached and fetched results while persisting new entries
-            result: list[list[float]] = []
-            fetch_index = 0
-            for idx, cached in enumerate(cached_results):
-                if cached is not None:
-                    result.append(cached)
-                    continue
 
-                embedding = fetched_embeddings[fetch_index]
-                fetch_index += 1
-                if self.cache.enabled():
-                    self.cache.set(texts[idx], self.model, embedding)
-                result.append(embedding)
+                async def embed(batch: list[str]) -> list[list[float]]:
+                    async with semaphore:
+                        return await self._embed_sub_batch(batch)
+
+                fetched = await asyncio.gather(*(embed(b) for b in sub_batches))
+                fetched_embeddings = [e for batch in fetched for e in batch]
+                for index, embedding in zip(missing, fetched_embeddings, strict=True):
+                    results[index] = embedding
+
+            return [embedding for embedding in results if embedding is not None]
 
-            return result
+    async def _create_embeddings(self, span: Span, texts: str | list[str]) -> Any:
+        """
+        Call the embeddings API, retrying transient failures with backoff.
+
+        The client is built without SDK retries, so this loop is the whole
+        retry budget: ``OPENAI_EMBEDDING_BATCH_MAX_RETRIES`` retries.
+        """
+        count = 1 if isinstance(texts, str) else len(texts)
+        max_retries = settings.OPENAI_EMBEDDING_BATCH_MAX_RETRIES
+        for attempt in range(max_retries + 1):
+            try:
+                self.monitor.track_request_timestamp("embeddings")
+                response = await self.client.embeddings.create(
+                    model=self.model, input=texts
+                )
+                break
+            except _RETRYABLE_ERRORS as e:
+                if attempt == max_retries:
+                    raise
+                logger.warning(
+                    "Embedding request of %d texts failed (attempt %d): %s",
+                    count,
+                    attempt + 1,
+                    e,
+                )
+                await asyncio.sleep(_retry_delay(attempt))
+
+        span.set_attribute("request.attempts", attempt + 1)
+        return response
+
+    async def _embed_sub_batch(self, texts: list[str]) -> list[list[float]]:
+        """Embed one sub-batch, retrying transient API failures, and cache it."""
+        with tracer.start_as_current_span("rag.embedding.sub_batch") as span:
+            span.set_attribute("batch.size", len(texts))
+            response = await self._create_embeddings(span, texts)
+            _record_usage(self.monitor, span, self.model, response, texts)
+            embeddings = [item.embedding for item in response.data]
+            await self.cache.set_many(texts, self.model, embeddings)
+            return embeddings
@@ -0,0 +1,179 @@
+"""
+Lexical (BM25) side of hybrid retrieval.
+
+Dense embeddings blur exact terms such as course codes, form numbers and
+Korean proper nouns, so with ``RAG_HYBRID_SEARCH`` every point also stores a
+sparse BM25 vector of its title and content. Terms are hashed to 32-bit
+indices. The stored weights carry BM25's saturated term frequency and
+length normalisation, and the vector store applies IDF at query time.
+Dense and lexical rankings are merged with reciprocal rank fusion (RRF).
+
+Tokenisation needs no morphological analyser. Latin letters and digits form
+tokens that keep joined codes like ``cs-101`` or ``2024-13``, along with
+their parts. A run of Hangul has its trailing particle (josa) stripped and
+also yields overlapping character bigrams, which match compound nouns and
+names however they are spaced or inflected.
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+import zlib
+from collections import Counter
+from collections.abc import Hashable, Iterable, Sequence
+from typing import Any
+
+from backend.config import settings
+
+# Result key holding the RRF score hybrid search results are ordered by
+FUSED_SCORE = "fused_score"
+
+_TOKEN_PATTERN = re.compile(r"[0-9a-z]+(?:[-_./][0-9a-z]+)*|[가-힣]+")
+_CODE_SEPARATORS = re.compile(r"[-_./]")
+# Common particles, longest first so e.g. "에서" wins over "에"
+_JOSA = (
+    "에서는",
+    "에게서",
+    "으로는",
+    "에서",
+    "에게",
+    "으로",
+    "까지",
+    "부터",
+    "께서",
+    "한테",
+    "처럼",
+    "보다",
+    "은",
+    "는",
+    "이",
+    "가",
+    "을",
+    "를",
+    "의",
+    "에",
+    "로",
+    "와",
+    "과",
+    "도",
+    "만",
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Split ``text`` into lexical terms (see the module docstring)."""
+    tokens: list[str] = []
+    for match in _TOKEN_PATTERN.finditer(unicodedata.normalize("NFKC", text).lower()):
+        token = match.group()
+        if "가" <= token[0] <= "힣":
+            stem = _strip_josa(token)
+            if len(stem) >= 2:
+                tokens.append(stem)
+            if len(stem) > 2:
+                tokens.extend(stem[i : i + 2] for i in range(len(stem) - 1))
+        else:
+            tokens.append(token)
+            parts = _CODE_SEPARATORS.split(token)
+            if len(parts) > 1:
+                tokens.extend(parts)
+    return tokens
+
+
+def _strip_josa(word: str) -> str:
+    for josa in _JOSA:
+        if word.endswith(josa) and len(word) - len(josa) >= 2:
+            return word[: -len(josa)]
+    return word
+
+
+def term_id(term: str) -> int:
+    """Stable 32-bit index of ``term`` in sparse vectors."""
+    return zlib.crc32(term.encode("utf-8"))
+
+
+def document_vector(text: str) -> dict[int, float]:
+    """
+    BM25 term weights of a document, without IDF.
+
+    Each weight is ``tf * (k1 + 1) / (tf + k1 * (1 - b + b * len / avg_len))``
+    with ``k1``, ``b`` and ``avg_len`` from the ``RAG_LEXICAL_BM25_*``
+    settings.
+    """
+    counts = Counter(term_id(term) for term in tokenize(text))
+    length = sum(counts.values())
+    k1 = settings.RAG_LEXICAL_BM25_K1
+    b = settings.RAG_LEXICAL_BM25_B
+    norm = k1 * (1 - b + b * length / settings.RAG_LEXICAL_AVG_DOC_TERMS)
+    return {index: tf * (k1 + 1) / (tf + norm) for index, tf in counts.items()}
+
+
+def query_vector(text: str) -> dict[int, float]:
+    """Sparse query vector: weight 1 for each distinct term of ``text``."""
+    return dict.fromkeys(sorted({term_id(term) for term in tokenize(text)}), 1.0)
+
+
+def payload_text(payload: dict[str, Any]) -> str:
+    """The text of a point that is indexed lexically."""
+    return f"{payload.get('title') or ''}\n{payload.get('content') or ''}"
+
+
+def reciprocal_rank_fusion(
+    rankings: Iterable[Sequence[Hashable]], k: int | None = None
+) -> dict[Hashable, float]:
+    """
+    Fuse rankings by summing ``1 / (k + rank)`` over the lists each ID is in.
+
+    Args:
+        rankings: IDs ordered best first, one sequence per retriever
+        k: Damping constant; defaults to ``RAG_HYBRID_RRF_K``
+
+    Returns:
+        Fused score per ID, in first-seen order
+    """
+    k = settings.RAG_HYBRID_RRF_K if k is None else k
+    fused: dict[Hashable, float] = {}
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, start=1):
+            fused[item_id] = fused.get(item_id, 0.0) + 1.0 / (k + rank)
+    return fused
+
+
+def fuse_results(
+    dense_results: list[dict[str, Any]],
+    lexical_results: list[dict[str, Any]],
+    limit: int,
+) -> list[dict[str, Any]]:
+    """
+    Merge dense and lexical search results by reciprocal rank fusion.
+
+    Results keep their dense cosine ``score`` and gain a ``fused_score``, the
+    RRF score they are ordered by. A lexical-only hit can have a low cosine
+    score, so rerank policies and context packing rank fused results by
+    ``fused_score`` (see ``retrieval_score``).
+
+    Args:
+        dense_results: Results ordered by vector similarity
+        lexical_results: Results ordered by BM25 score, with cosine scores
+        limit: Maximum number of results to return
+
+    Returns:
+        Up to ``limit`` results, best fused rank first
+    """
+    by_id = {r["context_item_id"]: r for r in lexical_results}
+    by_id.update((r["context_item_id"], r) for r in dense_results)
+    fused = reciprocal_rank_fusion(
+        [
+            [r["context_item_id"] for r in dense_results],
+            [r["context_item_id"] for r in lexical_results],
+        ]
+    )
+    ranked = sorted(fused, key=lambda item_id: fused[item_id], reverse=True)
+    return [
+        {**by_id[item_id], FUSED_SCORE: fused[item_id]} for item_id in ranked[:limit]
+    ]
+
+
+def retrieval_score(result: dict[str, Any]) -> float:
+    """The score a search result is ranked by: fused if hybrid, else cosine."""
+    return float(result.get(FUSED_SCORE, result.get("score", 0.0)))
@@ -0,0 +1,517 @@
+"""
+In-process vector store on a memory-mapped NumPy matrix.
+
+For small installs, tests and benchmarks that should not need a Qdrant
+server. Each collection is two files under ``VECTOR_STORE_PATH``:
+
+- ``{collection}.npy``: a contiguous float32 matrix of L2-normalised
+  embeddings, one row per point, memory-mapped so the page cache rather than
+  every worker's heap holds it;
+- ``{collection}.json``: the point ID and payload of each row.
+
+A search is one matrix-vector product (matrix-matrix for batches) over all
+rows, masked by the topic or context filter, followed by a partial sort for
+the top ``limit``, so scores are exact cosine similarities. With
+``RAG_HYBRID_SEARCH`` an in-memory inverted index of each row's BM25 term
+weights, rebuilt from the payloads on load, supplies the lexical ranking,
+scored with the same IDF as Qdrant's sparse vectors.
+
+Rows are append-only: a deleted point only clears its row's ID until the
+matrix is compacted, and an updated point is written to a new row, so rows
+another process has loaded are never modified under it. Compaction and growth
+write a new matrix file and rename it into place. Writers serialise on an
+exclusive file lock and replace the sidecar atomically; when another process
+has replaced the sidecar, searches reload both files under a shared lock so
+they never pair a sidecar with another write's matrix. Each write rewrites
+the sidecar, so this backend suits collections of up to tens of thousands of
+points.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import logging
+import math
+import os
+import threading
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from backend.config import settings
+from backend.observability import get_tracer
+from backend.retrieval import lexical
+from backend.retrieval.vector_store import VectorStore
+
+logger = logging.getLogger(__name__)
+tracer = get_tracer(__name__)
+
+# Rows allocated for a new collection; capacity doubles when it fills up
+_INITIAL_CAPACITY = 1024
+
+
+class NumpyVectorStore(VectorStore):
+    """Exact, filter-aware vector search over a memory-mapped float32 matrix."""
+
+    def __init__(self, path: str | Path | None = None) -> None:
+        self.collection_name = settings.QDRANT_COLLECTION_NAME
+        self.vector_size = settings.OPENAI_EMBEDDING_DIM
+        self.directory = Path(path or settings.VECTOR_STORE_PATH)
+        self._matrix_path = self.directory / f"{self.collection_name}.npy"
+        self._sidecar_path = self.directory / f"{self.collection_name}.json"
+        self._lock_path = self.directory / f"{self.collection_name}.lock"
+
+        self._lock = threading.RLock()
+        self._loaded_stat: tuple[int, int, int] | None = None
+        self._matrix: np.ndarray = np.zeros((0, self.vector_size), np.float32)
+        self._ids: list[int | None] = []
+        self._payloads: list[dict[str, Any] | None] = []
+        self._rows: dict[int, int] = {}
+        self._context_column = np.zeros(0, np.int64)
+        self._topic_rows: dict[int, set[int]] = {}
+        self._live = np.zeros(0, bool)
+        self.hybrid = settings.RAG_HYBRID_SEARCH
+        # BM25 weight of each row per term, and the terms of each row
+        self._postings: dict[int, dict[int, float]] = {}
+        self._row_terms: dict[int, list[int]] = {}
+
+    def create_collection(self) -> bool:
+        """Create the collection files if they do not exist yet."""
+        with self._lock, self._write_lock():
+            if not self._sidecar_path.exists():
+                self._allocate(_INITIAL_CAPACITY)
+                self._save()
+            self._reload_if_stale()
+        return True
+
+    def reset_collection(self) -> bool:
+        """Drop every point."""
+        with self._lock, self._write_lock():
+            self._allocate(_INITIAL_CAPACITY)
+            self._save()
+        return True
+
+    def _upsert(
+        self, context_item_id: int, embedding: list[float], payload: dict[str, Any]
+    ) -> str:
+        """Write one point's row and return the collection's new point count."""
+        return self.upsert_points([(context_item_id, embedding, payload)])
+
+    def upsert_points(
+        self, points: list[tuple[int, list[float], dict[str, Any]]]
+    ) -> str:
+        """
+        Insert or replace several points with a single sidecar write.
+
+        Args:
+            points: ``(context_item_id, embedding, payload)`` per point
+
+        Returns:
+            The collection's point count after the write
+
+        Raises:
+            ValueError: If an embedding does not have the collection's dimension
+        """
+        for _, embedding, _ in points:
+            if len(embedding) != self.vector_size:
+                raise ValueError(
+                    f"Expected a {self.vector_size}-dimension embedding, "
+                    f"got {len(embedding)}"
+                )
+
+        with self._lock, self._write_lock():
+            self._reload_if_stale()
+            for context_item_id, embedding, payload in points:
+                old_row = self._rows.pop(context_item_id, None)
+                if old_row is not None:
+                    self._unindex(old_row)
+                    self._ids[old_row] = None
+                    self._payloads[old_row] = None
+
+                row = len(self._ids)
+                if row == len(self._matrix):
+                    self._grow()
+                self._matrix[row] = _normalize(np.asarray(embedding, np.float32))
+                self._ids.append(context_item_id)
+                self._payloads.append(payload)
+                self._rows[context_item_id] = row
+                self._index(row)
+            if len(self._rows) * 2 < len(self._ids):
+                self._compact()
+            self._save()
+            return str(len(self._rows))
+
+    def set_context_topics(
+        self, context_topics: dict[int, list[int]], batch_size: int = 256
+    ) -> None:
+        """Rewrite the ``topic_ids`` payload of every point of the given contexts."""
+        if not context_topics:
+            return
+
+        with self._lock, self._write_lock():
+            self._reload_if_stale()
+            for row in self._rows_of_contexts(list(context_topics)):
+                payload = self._payloads[row]
+                assert payload is not None
+                self._unindex(row, keep_terms=True)
+                payload["topic_ids"] = sorted(context_topics[payload["context_id"]])
+                self._index(row)
+            self._save()
+
+    def delete_embeddings(self, context_item_ids: list[int]) -> None:
+        """Delete the points of ``context_item_ids``; unknown IDs are ignored."""
+        with self._lock, self._write_lock():
+            self._reload_if_stale()
+            self._delete_rows(
+                [
+                    self._rows[item_id]
+                    for item_id in context_item_ids
+                    if item_id in self._rows
+                ]
+            )
+
+    def delete_context_embeddings(self, context_ids: list[int]) -> None:
+        """Delete every point belonging to ``context_ids``."""
+        with self._lock, self._write_lock():
+            self._reload_if_stale()
+            self._delete_rows(self._rows_of_contexts(context_ids))
+
+    def search_similar(
+        self,
+        query_embedding: list[float],
+        topic_ids: list[int],
+        limit: int = 5,
+        context_ids: list[int] | None = None,
+        query_text: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """Search for similar context items by embedding (see ``VectorStore``)."""
+        with tracer.start_as_current_span("rag.vector_search") as span:
+            if not query_embedding:
+                raise ValueError("Query embedding cannot be empty")
+
+            if not topic_ids:
+                raise ValueError("Topic IDs cannot be empty")
+
+            span.set_attribute("topic_ids.count", len(topic_ids))
+            span.set_attribute("search.limit", limit)
+            span.set_attribute("search.dimensions", self.vector_size)
+
+            context_ids = self._filter_context_ids(topic_ids, context_ids)
+            with self._lock:
+                self._reload_for_read()
+                mask = self._filter_mask(topic_ids, context_ids)
+                scores = self._matrix[: len(self._ids)] @ _normalize(
+                    np.asarray(query_embedding, np.float32)
+                )
+                results = self._top_k(scores, mask, limit)
+                if self.hybrid and query_text:
+                    results = lexical.fuse_results(
+                        results,
+                        self._lexical_top_k(query_text, scores, mask, limit),
+                        limit,
+                    )
+
+            span.set_attribute("search.hybrid", bool(self.hybrid and query_text))
+            span.set_attribute("results.count", len(results))
+            if results:
+                span.set_attribute("score.max", results[0]["score"])
+                span.set_attribute("score.min", results[-1]["score"])
+            return results
+
+    def search_similar_batch(
+        self,
+        query_embeddings: list[list[float]],
+        topic_ids_list: list[list[int]],
+        limit: int = 5,
+        query_texts: list[str] | None = None,
+    ) -> list[list[dict[str, Any]]]:
+        """Search for several query embeddings in one matrix product."""
+        with tracer.start_as_current_span("rag.vector_search.batch") as span:
+            if len(query_embeddings) != len(topic_ids_list) or (
+                query_texts is not None and len(query_texts) != len(query_embeddings)
+            ):
+                raise ValueError("Embeddings and topic IDs must have equal length")
+            for embedding, topic_ids in zip(
+                query_embeddings, topic_ids_list, strict=True
+            ):
+                if not embedding:
+                    raise ValueError("Query embedding cannot be empty")
+                if not topic_ids:
+                    raise ValueError("Topic IDs cannot be empty")
+
+            span.set_attribute("batch.size", len(query_embeddings))
+            span.set_attribute("search.limit", limit)
+            span.set_attribute("search.dimensions", self.vector_size)
+            if not query_embeddings:
+                return []
+
+            filters = [
+                (topic_ids, self._filter_context_ids(topic_ids, None))
+                for topic_ids in topic_ids_list
+            ]
+            queries = _normalize(np.asarray(query_embeddings, np.float32))
+            with self._lock:
+                self._reload_for_read()
+                scores = queries @ self._matrix[: len(self._ids)].T
+                results = []
+                for index, (row_scores, query_filter) in enumerate(
+                    zip(scores, filters, strict=True)
+                ):
+                    mask = self._filter_mask(*query_filter)
+                    query_results = self._top_k(row_scores, mask, limit)
+                    query_text = query_texts[index] if query_texts else None
+                    if self.hybrid and query_text:
+                        query_results = lexical.fuse_results(
+                            query_results,
+                            self._lexical_top_k(query_text, row_scores, mask, limit),
+                            limit,
+                        )
+                    results.append(query_results)
+
+            span.set_attribute("results.count", sum(len(r) for r in results))
+            return results
+
+    def _filter_mask(
+        self, topic_ids: list[int], context_ids: list[int] | None
+    ) -> np.ndarray:
+        """Boolean mask of the live rows a search may return."""
+        count = len(self._ids)
+        if context_ids is not None:
+            mask = np.isin(self._context_column[:count], context_ids)
+        else:
+            mask = np.zeros(count, bool)
+            rows = set().union(*(self._topic_rows.get(t, ()) for t in topic_ids))
+            mask[list(rows)] = True
+        return mask & self._live[:count]
+
+    def _top_k(
+        self, scores: np.ndarray, mask: np.ndarray, limit: int
+    ) -> list[dict[str, Any]]:
+        """Format the ``limit`` best-scoring rows allowed by ``mask``."""
+        candidates = np.flatnonzero(mask)
+        if limit <= 0 or not len(candidates):
+            return []
+        candidate_scores = scores[candidates]
+        if len(candidates) > limit:
+            best = np.argpartition(-candidate_scores, limit - 1)[:limit]
+            candidates, candidate_scores = candidates[best], candidate_scores[best]
+        order = np.argsort(-candidate_scores, kind="stable")
+        return self._format_rows(candidates[order], candidate_scores[order])
+
+    def _lexical_top_k(
+        self, query_text: str, scores: np.ndarray, mask: np.ndarray, limit: int
+    ) -> list[dict[str, Any]]:
+        """
+        Format the ``limit`` rows allowed by ``mask`` with the best BM25 scores.
+
+        Rows are ranked by BM25 but report their cosine ``scores``, as Qdrant
+        hybrid results do.
+        """
+        live = len(self._rows)
+        bm25: dict[int, float] = {}
+        for term in lexical.query_vector(query_text):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            df = len(postings)
+            idf = math.log(1 + (live - df + 0.5) / (df + 0.5))
+            for row, weight in postings.items():
+                if mask[row]:
+                    bm25[row] = bm25.get(row, 0.0) + weight * idf
+        if limit <= 0 or not bm25:
+            return []
+
+        rows = sorted(bm25, key=lambda row: (-bm25[row], row))[:limit]
+        return self._format_rows(np.asarray(rows), scores[rows])
+
+    def _format_rows(
+        self, rows: np.ndarray, scores: np.ndarray
+    ) -> list[dict[str, Any]]:
+        results = []
+        for row, score in zip(rows, scores, strict=True):
+            payload = self._payloads[row]
+            assert payload is not None
+            results.append(
+                {
+                    "context_item_id": payload["context_item_id"],
+                    "score": float(score),
+                    "title": payload.get("title", ""),
+                    "content": payload.get("content", ""),
+                    "context_id": payload.get("context_id"),
+                    "context_type": payload.get("context_type"),
+                    "token_count": payload.get("token_count"),
+                }
+            )
+        return results
+
+    def _rows_of_contexts(self, context_ids: list[int]) -> list[int]:
+        count = len(self._ids)
+        matches = np.isin(self._context_column[:count], context_ids)
+        return np.flatnonzero(matches & self._live[:count]).tolist()
+
+    def _delete_rows(self, rows: list[int]) -> None:
+        if not rows:
+            return
+        for row in rows:
+            self._unindex(row)
+            item_id = self._ids[row]
+            assert item_id is not None
+            del self._rows[item_id]
+            self._ids[row] = None
+            self._payloads[row] = None
+        if len(self._rows) * 2 < len(self._ids):
+            self._compact()
+        self._save()
+
+    def _index(self, row: int) -> None:
+        """Add ``row`` to the filter columns from its payload."""
+        payload = self._payloads[row]
+        assert payload is not None
+        self._context_column[row] = payload.get("context_id") or 0
+        self._live[row] = True
+        for topic_id in payload.get("topic_ids", ()):
+            self._topic_rows.setdefault(topic_id, set()).add(row)
+        if self.hybrid and row not in self._row_terms:
+            weights = lexical.document_vector(lexical.payload_text(payload))
+            for term, weight in weights.items():
+                self._postings.setdefault(term, {})[row] = weight
+            self._row_terms[row] = list(weights)
+
+    def _unindex(self, row: int, keep_terms: bool = False) -> None:
+        payload = self._payloads[row]
+        if payload is not None:
+            for topic_id in payload.get("topic_ids", ()):
+                self._topic_rows.get(topic_id, set()).discard(row)
+        if not keep_terms:
+            for term in self._row_terms.pop(row, ()):
+                self._postings[term].pop(row, None)
+        self._live[row] = False
+
+    def _allocate(self, capacity: int) -> None:
+        """Start an empty collection with room for ``capacity`` rows."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._ids, self._payloads, self._rows, self._topic_rows = [], [], {}, {}
+        self._postings, self._row_terms = {}, {}
+        self._replace_matrix(np.zeros((0, self.vector_size), np.float32), capacity)
+
+    def _grow(self) -> None:
+        self._replace_matrix(self._matrix[: len(self._ids)], 2 * len(self._matrix))
+
+    def _compact(self) -> None:
+        """Rewrite the matrix without deleted rows."""
+        keep = [row for row, item_id in enumerate(self._ids) if item_id is not None]
+        vectors = self._matrix[keep]
+        self._ids = [self._ids[row] for row in keep]
+        self._payloads = [self._payloads[row] for row in keep]
+        self._replace_matrix(vectors, max(_INITIAL_CAPACITY, 2 * len(keep)))
+
+    def _replace_matrix(self, vectors: np.ndarray, capacity: int) -> None:
+        """
+        Write ``vectors`` into a new matrix file of ``capacity`` rows.
+
+        The file is swapped in with a rename, so other processes keep their
+        mapping of the old file, consistent with their sidecar, until they
+        reload.
+        """
+        tmp_path = self._matrix_path.with_suffix(".npy.tmp")
+        matrix = open_memmap(
+            tmp_path, mode="w+", dtype=np.float32, shape=(capacity, self.vector_size)
+        )
+        matrix[: len(vectors)] = vectors
+        matrix.flush()
+        os.replace(tmp_path, self._matrix_path)
+        self._matrix = matrix
+        self._rebuild_index()
+
+    def _rebuild_index(self) -> None:
+        """Recompute the row lookup and filter columns from the sidecar data."""
+        self._rows, self._topic_rows = {}, {}
+        self._postings, self._row_terms = {}, {}
+        self._context_column = np.zeros(len(self._matrix), np.int64)
+        self._live = np.zeros(len(self._matrix), bool)
+        for row, item_id in enumerate(self._ids):
+            if item_id is not None:
+                self._rows[item_id] = row
+                self._index(row)
+
+    def _save(self) -> None:
+        """Flush the matrix and atomically replace the sidecar."""
+        if isinstance(self._matrix, np.memmap):
+            self._matrix.flush()
+        tmp_path = self._sidecar_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "dimension": self.vector_size,
+                    "ids": self._ids,
+                    "payloads": self._payloads,
+                },
+                f,
+            )
+        os.replace(tmp_path, self._sidecar_path)
+        self._loaded_stat = self._sidecar_stat()
+
+    def _reload_if_stale(self) -> None:
+        """Load the files unless this process already holds the latest sidecar."""
+        stat = self._sidecar_stat()
+        if stat is None or stat == self._loaded_stat:
+            return
+
+        with open(self._sidecar_path) as f:
+            sidecar = json.load(f)
+        if sidecar["dimension"] != self.vector_size:
+            raise ValueError(
+                f"Collection {self.collection_name} stores "
+                f"{sidecar['dimension']}-dimension vectors, "
+                f"expected {self.vector_size}; reset it to re-index"
+            )
+
+        self._matrix = np.load(self._matrix_path, mmap_mode="r+")
+        self._ids = sidecar["ids"]
+        self._payloads = sidecar["payloads"]
+        self._rebuild_index()
+        self._loaded_stat = stat
+        logger.debug(
+            "Loaded %d vectors of collection %s", len(self._rows), self.collection_name
+        )
+
+    def _reload_for_read(self) -> None:
+        """Reload stale files under a shared lock, so no writer swaps them midway."""
+        stat = self._sidecar_stat()
+        if stat is None or stat == self._loaded_stat:
+            return
+        with self._file_lock(fcntl.LOCK_SH):
+            self._reload_if_stale()
+
+    def _sidecar_stat(self) -> tuple[int, int, int] | None:
+        try:
+            stat = self._sidecar_path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _write_lock(self) -> AbstractContextManager[None]:
+        """Serialise writers across processes sharing the collection files."""
+        return self._file_lock(fcntl.LOCK_EX)
+
+    @contextmanager
+    def _file_lock(self, operation: int) -> Iterator[None]:
+        """Hold ``flock(operation)`` on the collection's lock file."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, operation)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalise a vector or each row of a matrix, so dot product is cosine."""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
@@ -1,25 +1,77 @@
 from __future__ import annotations
 
+import asyncio
+import functools
+import logging
+import math
 import time
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, TypeGuard
 
 import qdrant_client
-from qdrant_client.models import Distance, PointStruct, VectorParams
-from sqlalchemy import select
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import (
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    CreateAlias,
+    CreateAliasOperation,
+    Datatype,
+    DeleteAlias,
+    DeleteAliasOperation,
+    Disabled,
+    Distance,
+    FieldCondition,
+    Filter,
+    FilterSelector,
+    HnswConfigDiff,
+    IntegerIndexParams,
+    IntegerIndexType,
+    MatchAny,
+    MatchValue,
+    Modifier,
+    PointIdsList,
+    PointStruct,
+    Prefetch,
+    QuantizationConfig,
+    QuantizationSearchParams,
+    QueryRequest,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+    SetPayload,
+    SetPayloadOperation,
+    SparseVector,
+    SparseVectorParams,
+    Vector,
+    VectorParams,
+    VectorParamsDiff,
+)
 
 from backend.config import settings
-from backend.models import ContextItem
-from backend.models.associations import topic_context_association
-from backend.models.base import SessionLocal
+from backend.dependencies.qdrant import get_async_qdrant_client
 from backend.observability import get_tracer
+from backend.retrieval import lexical
+from backend.retrieval.embeddings import reduce_embedding
+from backend.retrieval.vector_store import VectorStore
 
 if TYPE_CHECKING:
-    pass
+    from opentelemetry.trace import Span
 
+logger = logging.getLogger(__name__)
 tracer = get_tracer(__name__)
 
+# Named vectors used when OPENAI_EMBEDDING_REDUCED_DIM is set
+REDUCED_VECTOR = "reduced"
+FULL_VECTOR = "full"
+# Qdrant's name for the vector of a collection without named vectors
+DEFAULT_VECTOR = ""
+# Sparse BM25 vector stored alongside the dense ones when RAG_HYBRID_SEARCH is on
+LEXICAL_VECTOR = "lexical"
+# Integer payload fields searches filter on; indexed for exact-match lookups
+INDEXED_PAYLOAD_FIELDS = ("topic_ids", "context_id")
 
-class QdrantService:
+
+class QdrantService(VectorStore):
     """Service for vector storage and similarity search using Qdrant."""
 
     def __init__(self) -> None:
@@ -34,13 +86,27 @@ class QdrantService:
         self.vector_size = getattr(
             settings, "OPENAI_EMBEDDING_DIM", 1536
         )  # OpenAI text-embedding-3-small dimension
-        self._context_cache: dict[str, tuple[float, list[int]]] = {}
-        self._context_cache_ttl = 300  # seconds
+        self.reduced_vector_size = settings.OPENAI_EMBEDDING_REDUCED_DIM
+        if self.reduced_vector_size and not (
+            0 < self.reduced_vector_size < self.vector_size
+        ):
+            logger.warning(
+                "Ignoring OPENAI_EMBEDDING_REDUCED_DIM=%d for %d-dimension embeddings",
+                self.reduced_vector_size,
+                self.vector_size,
+            )
+            self.reduced_vector_size = 0
+        self.rescore_full_dim = settings.QDRANT_RESCORE_FULL_DIM
+        self.quantization = settings.QDRANT_QUANTIZATION
+        self.vector_datatype = Datatype(settings.QDRANT_VECTOR_DATATYPE)
+        self.hybrid = settings.RAG_HYBRID_SEARCH
 
     def create_collection(self) -> bool:
         """
         Create the collection for storing context item embeddings.
-        If collection already exists, returns True without error.
+        If collection already exists, returns True without error after
+        creating any missing payload indexes when ``QDRANT_TOPIC_PAYLOAD_FILTER``
+        is on.
 
         Returns:
             True if successful or already exists
@@ -48,14 +114,16 @@ class QdrantService:
         try:
             self.client.create_collection(
                 collection_name=self.collection_name,
-                vectors_config=VectorParams(
-                    size=self.vector_size, distance=Distance.COSINE
-                ),
+                vectors_config=self._vectors_config(),
+                sparse_vectors_config=self._sparse_vectors_config(),
             )
+            self._create_payload_indexes(self.collection_name)
             return True
         except Exception as e:
             # Check if the error is about collection already existing
             if "already exists" in str(e):
+                if settings.QDRANT_TOPIC_PAYLOAD_FILTER:
+                    self._create_payload_indexes(self.collection_name)
                 return True
             raise
 
@@ -63,99 +131,457 @@ class QdrantService:
         """Recreate the collection with the configured vector size."""
         self.client.recreate_collection(
             collection_name=self.collection_name,
-            vectors_config=VectorParams(
-                size=self.vector_size, distance=Distance.COSINE
-            ),
+            vectors_config=self._vectors_config(),
+            sparse_vectors_config=self._sparse_vectors_config(),
         )
+        self._create_payload_indexes(self.collection_name)
         return True
 
-    def store_embedding(
-        self,
-        context_item_id: int,
-        embedding: list[float],
-        metadata: dict[str, Any] | None = None,
-    ) -> str:
+    def _create_payload_indexes(self, collection_name: str) -> None:
+        """
+        Index the payload fields searches filter on (idempotent).
+
+        The indexes only speed up filtering, so a server that refuses one
+        (e.g. Qdrant older than 1.8 rejects ``lookup``/``range`` options) is
+        logged and skipped rather than failing startup.
+        """
+        for field_name in INDEXED_PAYLOAD_FIELDS:
+            try:
+                self.client.create_payload_index(
+                    collection_name=collection_name,
+                    field_name=field_name,
+                    field_schema=IntegerIndexParams(
+                        type=IntegerIndexType.INTEGER, lookup=True, range=False
+                    ),
+                )
+            except Exception as e:
+                logger.warning(
+                    "Could not index payload field %s on %s: %s",
+                    field_name,
+                    collection_name,
+                    e,
+                )
+
+    def _quantization_config(self) -> QuantizationConfig | None:
+        """Quantization for the searched vector, per ``QDRANT_QUANTIZATION``."""
+        always_ram = settings.QDRANT_QUANTIZATION_ALWAYS_RAM
+        if self.quantization == "scalar":
+            return ScalarQuantization(
+                scalar=ScalarQuantizationConfig(
+                    type=ScalarType.INT8, quantile=0.99, always_ram=always_ram
+                )
+            )
+        if self.quantization == "binary":
+            return BinaryQuantization(
+                binary=BinaryQuantizationConfig(always_ram=always_ram)
+            )
+        return None
+
+    def _vectors_config(self) -> VectorParams | dict[str, VectorParams]:
+        """
+        Build the collection's vector configuration.
+
+        Without a reduced dimension the collection holds one unnamed,
+        full-size vector per point. With one, points carry a ``reduced``
+        vector that is HNSW-indexed and searched, plus (when rescoring is
+        enabled) the ``full`` vector kept on disk without an index, since it is
+        only compared against the reduced search's candidates.
+
+        The searched vector follows the collection profile: its datatype,
+        whether the originals live on disk, and its quantization.
+        """
+        searched = VectorParams(
+            size=self.reduced_vector_size or self.vector_size,
+            distance=Distance.COSINE,
+            datatype=self.vector_datatype,
+            on_disk=settings.QDRANT_VECTORS_ON_DISK,
+            quantization_config=self._quantization_config(),
+        )
+        if not self.reduced_vector_size:
+            return searched
+
+        config = {REDUCED_VECTOR: searched}
+        if self.rescore_full_dim:
+            config[FULL_VECTOR] = VectorParams(
+                size=self.vector_size,
+                distance=Distance.COSINE,
+                datatype=self.vector_datatype,
+                on_disk=True,
+                hnsw_config=HnswConfigDiff(m=0),
+            )
+        return config
+
+    def _sparse_vectors_config(self) -> dict[str, SparseVectorParams] | None:
+        """
+        Sparse vectors of a collection: the BM25 vector with hybrid search.
+
+        Qdrant applies IDF to it at query time from its own document counts.
+        """
+        if not self.hybrid:
+            return None
+        return {LEXICAL_VECTOR: SparseVectorParams(modifier=Modifier.IDF)}
+
+    def _search_params(self) -> SearchParams | None:
+        """
+        Search-time quantization parameters.
+
+        Quantized candidates are fetched ``QDRANT_QUANTIZATION_OVERSAMPLING``
+        times over and, with ``QDRANT_QUANTIZATION_RESCORE``, re-scored with
+        the original vectors before the top ``limit`` are returned.
+        """
+        if self.quantization == "none":
+            return None
+        return SearchParams(
+            quantization=QuantizationSearchParams(
+                rescore=settings.QDRANT_QUANTIZATION_RESCORE,
+                oversampling=settings.QDRANT_QUANTIZATION_OVERSAMPLING,
+            )
+        )
+
+    def migrate_collection(self, batch_size: int = 256) -> str:
         """
-        Store an embedding for a context item.
+        Bring an existing collection in line with the configured profile.
+
+        Missing payload indexes are created. Quantization, on-disk and HNSW
+        changes are applied in place; Qdrant
+        rebuilds the affected structures in the background. Changing vector
+        names, sizes or datatype, or adding the hybrid search BM25 vector,
+        needs new storage, so points are copied,
+        with their vectors re-derived from the stored full-size embeddings,
+        into a new collection that ``collection_name`` then becomes an alias
+        for. Content writes should be paused while a copy runs, and the first
+        copy of a plain collection leaves the name briefly unresolvable
+        between dropping the old collection and creating the alias.
 
         Args:
-            context_item_id: ID of the ContextItem
-            embedding: Vector embedding to store
-            metadata: Additional metadata to store with the vector
+            batch_size: Points read and written per request while copying
 
         Returns:
-            Operation ID from Qdrant
+            ``"created"``, ``"unchanged"``, ``"updated"`` or ``"copied"``
 
         Raises:
-            ValueError: If context item doesn't exist or embedding is empty
+            ValueError: If the collection has no dense vectors, or a copy is
+                needed but it does not store full-size vectors to derive the
+                new ones from
         """
-        if not embedding:
-            raise ValueError("Embedding cannot be empty")
+        if not self.client.collection_exists(self.collection_name):
+            self.create_collection()
+            return "created"
+
+        self._create_payload_indexes(self.collection_name)
+        params = self.client.get_collection(self.collection_name).config.params
+        if params.vectors is None:
+            raise ValueError(
+                f"Collection {self.collection_name} has no dense vectors; "
+                "reset it and re-index to apply the collection profile"
+            )
+        current = self._named_params(params.vectors)
+        desired = self._named_params(self._vectors_config())
+        missing_sparse = set(self._sparse_vectors_config() or {}) - set(
+            params.sparse_vectors or {}
+        )
 
-        # Verify context item exists
-        with SessionLocal() as session:
-            context_item = session.get(ContextItem, context_item_id)
-            if context_item is None:
-                raise ValueError(
-                    f"ContextItem with ID {context_item_id} does not exist"
-                )
+        if missing_sparse or not self._same_storage(current, desired):
+            self._copy_to_new_collection(current, batch_size)
+            return "copied"
 
-            context = context_item.context
-            payload = {
-                "context_item_id": context_item_id,
-                "title": context_item.title,
-                "content": context_item.content,
-                "context_id": context_item.context_id,
-                "context_type": context.context_type if context else "",
-            }
+        updates = {
+            name: VectorParamsDiff(
+                on_disk=params.on_disk,
+                hnsw_config=params.hnsw_config,
+                quantization_config=params.quantization_config or Disabled.DISABLED,
+            )
+            for name, params in desired.items()
+            if (
+                bool(params.on_disk) != bool(current[name].on_disk)
+                or params.quantization_config != current[name].quantization_config
+                or params.hnsw_config != current[name].hnsw_config
+            )
+        }
+        if not updates:
+            return "unchanged"
 
-        if metadata:
-            payload.update(metadata)
+        self.client.update_collection(
+            collection_name=self.collection_name, vectors_config=updates
+        )
+        logger.info(
+            "Updated Qdrant collection %s vectors %s in place",
+            self.collection_name,
+            sorted(updates),
+        )
+        return "updated"
+
+    @staticmethod
+    def _named_params(
+        vectors: VectorParams | dict[str, VectorParams],
+    ) -> dict[str, VectorParams]:
+        if isinstance(vectors, VectorParams):
+            return {DEFAULT_VECTOR: vectors}
+        return dict(vectors)
+
+    @staticmethod
+    def _is_dense(vector: object) -> TypeGuard[list[float]]:
+        """Whether ``vector`` is a single dense vector, not sparse or multi."""
+        return isinstance(vector, list) and all(isinstance(v, float) for v in vector)
+
+    @staticmethod
+    def _same_storage(
+        current: dict[str, VectorParams], desired: dict[str, VectorParams]
+    ) -> bool:
+        """Whether two vector configurations differ only in-place-updatable ways."""
+        if current.keys() != desired.keys():
+            return False
+        return all(
+            current[name].size == params.size
+            and current[name].distance == params.distance
+            and (current[name].datatype or Datatype.FLOAT32)
+            == (params.datatype or Datatype.FLOAT32)
+            for name, params in desired.items()
+        )
 
-        # Create point and upsert
-        point = PointStruct(id=context_item_id, vector=embedding, payload=payload)
+    def _copy_to_new_collection(
+        self, current: dict[str, VectorParams], batch_size: int
+    ) -> None:
+        source_vector = next(
+            (
+                name
+                for name in (DEFAULT_VECTOR, FULL_VECTOR)
+                if name in current and current[name].size == self.vector_size
+            ),
+            None,
+        )
+        if source_vector is None:
+            raise ValueError(
+                f"Collection {self.collection_name} has no full-size vectors; "
+                "reset it and re-index to change its vector layout"
+            )
 
-        response = self.client.upsert(
-            collection_name=self.collection_name, points=[point]
+        aliases = self.client.get_aliases().aliases
+        old_target = next(
+            (
+                a.collection_name
+                for a in aliases
+                if a.alias_name == self.collection_name
+            ),
+            None,
+        )
+        target = f"{self.collection_name}_{int(time.time())}"
+        self.client.create_collection(
+            collection_name=target,
+            vectors_config=self._vectors_config(),
+            sparse_vectors_config=self._sparse_vectors_config(),
         )
+        self._create_payload_indexes(target)
 
-        return str(response.operation_id)
+        copied = 0
+        offset = None
+        while True:
+            records, offset = self.client.scroll(
+                collection_name=self.collection_name,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True,
+            )
+            points = []
+            for record in records:
+                stored = record.vector
+                vector = (
+                    stored.get(source_vector) if isinstance(stored, dict) else stored
+                )
+                if not self._is_dense(vector):
+                    raise ValueError(
+                        f"Point {record.id} has no {source_vector!r} vector to copy"
+                    )
+                points.append(
+                    PointStruct(
+                        id=record.id,
+                        vector=self._point_vector(
+                            vector, lexical.payload_text(record.payload or {})
+                        ),
+                        payload=record.payload,
+                    )
+                )
+            if points:
+                self.client.upsert(collection_name=target, points=points)
+                copied += len(points)
+            if offset is None:
+                break
+
+        operations: list[CreateAliasOperation | DeleteAliasOperation] = []
+        if old_target is None:
+            self.client.delete_collection(self.collection_name)
+        else:
+            operations.append(
+                DeleteAliasOperation(
+                    delete_alias=DeleteAlias(alias_name=self.collection_name)
+                )
+            )
+        operations.append(
+            CreateAliasOperation(
+                create_alias=CreateAlias(
+                    collection_name=target, alias_name=self.collection_name
+                )
+            )
+        )
+        self.client.update_collection_aliases(change_aliases_operations=operations)
+        if old_target is not None:
+            self.client.delete_collection(old_target)
+
+        logger.info(
+            "Copied %d points into Qdrant collection %s, now aliased as %s",
+            copied,
+            target,
+            self.collection_name,
+        )
 
-    def _get_context_ids_for_topics(self, topic_ids: list[int]) -> list[int]:
+    def _point_vector(
+        self, embedding: list[float], text: str | None = None
+    ) -> list[float] | dict[str, Vector]:
         """
-        Get context IDs for given topics with caching optimization.
+        Map a full-size embedding to the vectors stored for a point.
 
-        Args:
-            topic_ids: List of topic IDs
+        With hybrid search, ``text`` is also stored as a BM25 sparse vector.
+        """
+        vectors: dict[str, Vector] = {}
+        if not self.reduced_vector_size:
+            vectors[DEFAULT_VECTOR] = embedding
+        else:
+            vectors[REDUCED_VECTOR] = reduce_embedding(
+                embedding, self.reduced_vector_size
+            )
+            if self.rescore_full_dim:
+                vectors[FULL_VECTOR] = embedding
 
-        Returns:
-            List of context IDs
+        if self.hybrid and text is not None:
+            weights = lexical.document_vector(text)
+            vectors[LEXICAL_VECTOR] = SparseVector(
+                indices=list(weights), values=list(weights.values())
+            )
+        elif not self.reduced_vector_size:
+            return embedding
+        return vectors
+
+    def _search_request(
+        self, query_embedding: list[float], query_filter: Filter, limit: int
+    ) -> QueryRequest:
+        """
+        Build the search for ``query_embedding`` restricted by ``query_filter``.
+
+        With a reduced dimension the query runs against the reduced vectors;
+        when rescoring is enabled that search fetches
+        ``limit * QDRANT_RESCORE_OVERSAMPLING`` candidates, which Qdrant then
+        re-ranks by full-dimension similarity in the same request.
         """
-        # Create cache key from sorted topic IDs for consistent caching
-        cache_key = f"topic_contexts:{'_'.join(map(str, sorted(topic_ids)))}"
-        now = time.time()
+        search_params = self._search_params()
+        if not self.reduced_vector_size:
+            return QueryRequest(
+                query=query_embedding,
+                filter=query_filter,
+                params=search_params,
+                limit=limit,
+                with_payload=True,
+            )
 
-        cached = self._context_cache.get(cache_key)
-        if cached and now - cached[0] < self._context_cache_ttl:
-            return cached[1]
+        reduced_query = reduce_embedding(query_embedding, self.reduced_vector_size)
+        if not self.rescore_full_dim:
+            return QueryRequest(
+                query=reduced_query,
+                using=REDUCED_VECTOR,
+                filter=query_filter,
+                params=search_params,
+                limit=limit,
+                with_payload=True,
+            )
 
-        stmt = (
-            select(topic_context_association.c.context_id)
-            .where(topic_context_association.c.topic_id.in_(topic_ids))
-            .distinct()
+        candidates = max(limit, math.ceil(limit * settings.QDRANT_RESCORE_OVERSAMPLING))
+        return QueryRequest(
+            prefetch=Prefetch(
+                query=reduced_query,
+                using=REDUCED_VECTOR,
+                filter=query_filter,
+                params=search_params,
+                limit=candidates,
+            ),
+            query=query_embedding,
+            using=FULL_VECTOR,
+            limit=limit,
+            with_payload=True,
         )
 
-        with SessionLocal() as session:
-            context_ids = [
-                ctx_id for ctx_id in session.execute(stmt).scalars() if ctx_id
-            ]
+    def _upsert(
+        self, context_item_id: int, embedding: list[float], payload: dict[str, Any]
+    ) -> str:
+        """Upsert one point and return Qdrant's operation ID."""
+        point = PointStruct(
+            id=context_item_id,
+            vector=self._point_vector(embedding, lexical.payload_text(payload)),
+            payload=payload,
+        )
+
+        response = self.client.upsert(
+            collection_name=self.collection_name, points=[point]
+        )
 
-        self._context_cache[cache_key] = (now, context_ids)
+        return str(response.operation_id)
 
-        return context_ids
+    def set_context_topics(
+        self, context_topics: dict[int, list[int]], batch_size: int = 256
+    ) -> None:
+        """
+        Rewrite the ``topic_ids`` payload of every point of the given contexts.
+
+        Args:
+            context_topics: Topic IDs for each context ID; an empty list hides
+                the context's points from every topic search
+            batch_size: Contexts updated per Qdrant request
+        """
+        operations = [
+            SetPayloadOperation(
+                set_payload=SetPayload(
+                    payload={"topic_ids": sorted(topic_ids)},
+                    filter=Filter(
+                        must=[
+                            FieldCondition(
+                                key="context_id", match=MatchValue(value=context_id)
+                            )
+                        ]
+                    ),
+                )
+            )
+            for context_id, topic_ids in context_topics.items()
+        ]
+        for start in range(0, len(operations), batch_size):
+            self.client.batch_update_points(
+                collection_name=self.collection_name,
+                update_operations=operations[start : start + batch_size],
+            )
+
+    def delete_embeddings(self, context_item_ids: list[int]) -> None:
+        """Delete the points of ``context_item_ids``; unknown IDs are ignored."""
+        if context_item_ids:
+            self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=PointIdsList(points=list(context_item_ids)),
+            )
+
+    def delete_context_embeddings(self, context_ids: list[int]) -> None:
+        """Delete every point belonging to ``context_ids``."""
+        if context_ids:
+            self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=FilterSelector(
+                    filter=self._context_filter(list(context_ids))
+                ),
+            )
 
     def search_similar(
-        self, query_embedding: list[float], topic_ids: list[int], limit: int = 5
+        self,
+        query_embedding: list[float],
+        topic_ids: list[int],
+        limit: int = 5,
+        context_ids: list[int] | None = None,
+        query_text: str | None = None,
     ) -> list[dict[str, Any]]:
         """
         Search for similar context items by embedding.
@@ -164,6 +590,12 @@ class QdrantService:
             query_embedding: Query vector
             topic_ids: List of topic IDs to filter by
             limit: Maximum number of results to return
+            context_ids: Context IDs already resolved for ``topic_ids``. When
+                given, or when ``QDRANT_TOPIC_PAYLOAD_FILTER`` is off, the
+                search filters on these (looked up when omitted) instead of
+                the points' ``topic_ids`` payload
+            query_text: Query text; with ``RAG_HYBRID_SEARCH`` its BM25
+                matches are fused with the vector matches
 
         Returns:
             List of search results with scores and metadata
@@ -172,59 +604,411 @@ class QdrantService:
             ValueError: If query_embedding is empty or topic_ids is empty
         """
         with tracer.start_as_current_span("rag.vector_search") as span:
-            if not query_embedding:
-                raise ValueError("Query embedding cannot be empty")
+            requests = self._single_search_requests(
+                query_embedding, topic_ids, limit, context_ids, query_text, span
+            )
+            if requests is None:
+                return []
+
+            # Perform vector search
+            responses = self.client.query_batch_points(
+                collection_name=self.collection_name, requests=requests
+            )
+
+            results = self._merge_responses(responses, limit)
+            _record_results(span, results)
+            return results
+
+    def search_similar_batch(
+        self,
+        query_embeddings: list[list[float]],
+        topic_ids_list: list[list[int]],
+        limit: int = 5,
+        query_texts: list[str] | None = None,
+    ) -> list[list[dict[str, Any]]]:
+        """
+        Search for several query embeddings in one Qdrant round-trip.
+
+        Args:
+            query_embeddings: Query vectors
+            topic_ids_list: Topic IDs to filter by, one list per query vector
+            limit: Maximum number of results to return per query
+            query_texts: Query texts for hybrid search, one per query vector
+
+        Returns:
+            Search results for each query, in input order
+
+        Raises:
+            ValueError: If the inputs differ in length, or any embedding or
+                topic ID list is empty
+        """
+        with tracer.start_as_current_span("rag.vector_search.batch") as span:
+            requests, groups = self._batch_search_requests(
+                query_embeddings, topic_ids_list, limit, query_texts, span
+            )
+
+            responses = []
+            if requests:
+                responses = self.client.query_batch_points(
+                    collection_name=self.collection_name, requests=requests
+                )
+            results = self._group_results(
+                len(query_embeddings), groups, responses, limit
+            )
+
+            span.set_attribute("results.count", sum(len(r) for r in results))
+            return results
 
+    def _single_search_requests(
+        self,
+        query_embedding: list[float],
+        topic_ids: list[int],
+        limit: int,
+        context_ids: list[int] | None,
+        query_text: str | None,
+        span: Span,
+    ) -> list[QueryRequest] | None:
+        """
+        Validate one search and build its requests.
+
+        Returns:
+            The requests, or None when the topics have no contexts to search
+
+        Raises:
+            ValueError: If query_embedding is empty or topic_ids is empty
+        """
+        if not query_embedding:
+            raise ValueError("Query embedding cannot be empty")
+
+        if not topic_ids:
+            raise ValueError("Topic IDs cannot be empty")
+
+        span.set_attribute("topic_ids.count", len(topic_ids))
+        span.set_attribute("search.limit", limit)
+
+        query_filter = self._search_filter(topic_ids, context_ids, span)
+        if query_filter is None:
+            span.set_attribute("results.count", 0)
+            return None
+
+        span.set_attribute("search.dimensions", self._search_dimensions)
+        requests = self._search_requests(
+            query_embedding, query_filter, limit, query_text
+        )
+        span.set_attribute("search.hybrid", len(requests) > 1)
+        return requests
+
+    def _batch_search_requests(
+        self,
+        query_embeddings: list[list[float]],
+        topic_ids_list: list[list[int]],
+        limit: int,
+        query_texts: list[str] | None,
+        span: Span,
+    ) -> tuple[list[QueryRequest], list[tuple[int, int]]]:
+        """
+        Validate a batch search and build the requests of each searchable query.
+
+        Returns:
+            The requests and, per searchable query, its index in the input
+            and how many consecutive requests it contributed
+
+        Raises:
+            ValueError: If the inputs differ in length, or any embedding or
+                topic ID list is empty
+        """
+        if len(query_embeddings) != len(topic_ids_list) or (
+            query_texts is not None and len(query_texts) != len(query_embeddings)
+        ):
+            raise ValueError("Embeddings and topic IDs must have equal length")
+
+        span.set_attribute("batch.size", len(query_embeddings))
+        span.set_attribute("search.limit", limit)
+        span.set_attribute("search.dimensions", self._search_dimensions)
+
+        requests: list[QueryRequest] = []
+        groups: list[tuple[int, int]] = []
+        for index, (embedding, topic_ids) in enumerate(
+            zip(query_embeddings, topic_ids_list, strict=True)
+        ):
+            if not embedding:
+                raise ValueError("Query embedding cannot be empty")
             if not topic_ids:
                 raise ValueError("Topic IDs cannot be empty")
 
-            span.set_attribute("topic_ids.count", len(topic_ids))
-            span.set_attribute("search.limit", limit)
+            query_filter = self._search_filter(topic_ids)
+            if query_filter is None:
+                continue
 
-            # Get context IDs with caching optimization
-            context_ids = self._get_context_ids_for_topics(topic_ids)
+            query_requests = self._search_requests(
+                embedding,
+                query_filter,
+                limit,
+                query_texts[index] if query_texts is not None else None,
+            )
+            requests.extend(query_requests)
+            groups.append((index, len(query_requests)))
 
-            if not context_ids:
-                span.set_attribute("results.count", 0)
-                return []
+        span.set_attribute("requests.count", len(requests))
+        return requests, groups
 
+    def _search_requests(
+        self,
+        query_embedding: list[float],
+        query_filter: Filter,
+        limit: int,
+        query_text: str | None,
+    ) -> list[QueryRequest]:
+        """
+        Build the requests answering one search.
+
+        Without hybrid search (or query terms) that is the vector search
+        alone. With it, two lexical requests follow: the BM25 top ``limit``
+        IDs, and the same candidates scored by vector similarity, so fused
+        results all carry a cosine score.
+        """
+        dense = self._search_request(query_embedding, query_filter, limit)
+        if not (self.hybrid and query_text):
+            return [dense]
+        terms = lexical.query_vector(query_text)
+        if not terms:
+            return [dense]
+
+        sparse_query = SparseVector(indices=list(terms), values=list(terms.values()))
+        rescore_query, rescore_using = self._rescore_target(query_embedding)
+        return [
+            dense,
+            QueryRequest(
+                prefetch=Prefetch(
+                    query=sparse_query,
+                    using=LEXICAL_VECTOR,
+                    filter=query_filter,
+                    limit=limit,
+                ),
+                query=rescore_query,
+                using=rescore_using,
+                limit=limit,
+                with_payload=True,
+            ),
+            QueryRequest(
+                query=sparse_query,
+                using=LEXICAL_VECTOR,
+                filter=query_filter,
+                limit=limit,
+                with_payload=False,
+            ),
+        ]
+
+    def _rescore_target(
+        self, query_embedding: list[float]
+    ) -> tuple[list[float], str | None]:
+        """The query and vector name that give exact vector scores."""
+        if not self.reduced_vector_size:
+            return query_embedding, None
+        if self.rescore_full_dim:
+            return query_embedding, FULL_VECTOR
+        return (
+            reduce_embedding(query_embedding, self.reduced_vector_size),
+            REDUCED_VECTOR,
+        )
+
+    def _merge_responses(
+        self, responses: list[Any], limit: int
+    ) -> list[dict[str, Any]]:
+        """Turn the responses of one search's requests into its results."""
+        dense = self._format_points(responses[0].points)
+        if len(responses) == 1:
+            return dense
+
+        rescored = {
+            r["context_item_id"]: r for r in self._format_points(responses[1].points)
+        }
+        ranked = [
+            rescored[point.id] for point in responses[2].points if point.id in rescored
+        ]
+        return lexical.fuse_results(dense, ranked, limit)
+
+    def _group_results(
+        self,
+        query_count: int,
+        groups: list[tuple[int, int]],
+        responses: list[Any],
+        limit: int,
+    ) -> list[list[dict[str, Any]]]:
+        """Split a batch's responses back into per-query results."""
+        results: list[list[dict[str, Any]]] = [[] for _ in range(query_count)]
+        position = 0
+        for index, count in groups:
+            results[index] = self._merge_responses(
+                responses[position : position + count], limit
+            )
+            position += count
+        return results
+
+    @property
+    def _search_dimensions(self) -> int:
+        """Dimension of the vectors the HNSW search runs against."""
+        return self.reduced_vector_size or self.vector_size
+
+    def _search_filter(
+        self,
+        topic_ids: list[int],
+        context_ids: list[int] | None = None,
+        span: Span | None = None,
+    ) -> Filter | None:
+        """
+        Build the filter restricting a search to ``topic_ids``.
+
+        Filters on the indexed ``topic_ids`` payload unless context IDs were
+        supplied or ``QDRANT_TOPIC_PAYLOAD_FILTER`` is off, in which case the
+        topics are resolved to context IDs in SQL first.
+
+        Returns:
+            The filter, or None when the topics have no contexts
+        """
+        context_ids = self._filter_context_ids(topic_ids, context_ids)
+        if context_ids is None:
+            return self._topic_filter(topic_ids)
+
+        if span is not None:
             span.set_attribute("context_ids.count", len(context_ids))
+        if not context_ids:
+            return None
+        return self._context_filter(context_ids)
+
+    @staticmethod
+    def _topic_filter(topic_ids: list[int]) -> Filter:
+        """Build the Qdrant filter restricting a search to ``topic_ids``."""
+        return Filter(
+            must=[FieldCondition(key="topic_ids", match=MatchAny(any=topic_ids))]
+        )
 
-            # Build optimized filter for Qdrant
-            query_filter = {
-                "must": [
-                    {
-                        "key": "context_id",
-                        "match": {"any": context_ids},
-                    }
-                ]
-            }
+    @staticmethod
+    def _context_filter(context_ids: list[int]) -> Filter:
+        """Build the Qdrant filter restricting a search to ``context_ids``."""
+        return Filter(
+            must=[FieldCondition(key="context_id", match=MatchAny(any=context_ids))]
+        )
 
-            # Perform vector search
-            search_results = self.client.search(
-                collection_name=self.collection_name,
-                query_vector=query_embedding,
-                query_filter=query_filter,
-                limit=limit,
+    @staticmethod
+    def _format_points(scored_points: list[Any]) -> list[dict[str, Any]]:
+        """Convert scored Qdrant points into search result dictionaries."""
+        results = []
+        for scored_point in scored_points:
+            if scored_point.payload:
+                result = {
+                    "context_item_id": scored_point.payload["context_item_id"],
+                    "score": scored_point.score,
+                    "title": scored_point.payload.get("title", ""),
+                    "content": scored_point.payload.get("content", ""),
+                    "context_id": scored_point.payload.get("context_id"),
+                    "context_type": scored_point.payload.get("context_type"),
+                    "token_count": scored_point.payload.get("token_count"),
+                }
+                results.append(result)
+        return results
+
+
+def _record_results(span: Span, results: list[dict[str, Any]]) -> None:
+    """Record the result count and score range of a single search."""
+    span.set_attribute("results.count", len(results))
+    if results:
+        span.set_attribute("score.max", max(r["score"] for r in results))
+        span.set_attribute("score.min", min(r["score"] for r in results))
+
+
+class AsyncQdrantService:
+    """
+    Similarity search on the shared AsyncQdrantClient.
+
+    Builds the same requests and returns the same result dictionaries as
+    ``QdrantService``, but awaits Qdrant on the event loop instead of holding
+    an executor thread. Collection management and writes stay on the wrapped
+    ``QdrantService``.
+    """
+
+    def __init__(
+        self,
+        client: AsyncQdrantClient | None = None,
+        sync_service: QdrantService | None = None,
+    ) -> None:
+        self.client = client if client is not None else get_async_qdrant_client()
+        self.sync_service = sync_service or QdrantService()
+        self.collection_name = self.sync_service.collection_name
+
+    def get_context_ids_for_topics(self, topic_ids: list[int]) -> list[int]:
+        """Resolve topics to context IDs (blocking; see ``QdrantService``)."""
+        return self.sync_service.get_context_ids_for_topics(topic_ids)
+
+    async def search_similar(
+        self,
+        query_embedding: list[float],
+        topic_ids: list[int],
+        limit: int = 5,
+        context_ids: list[int] | None = None,
+        query_text: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Search for similar context items by embedding.
+
+        See ``QdrantService.search_similar``; when topics must be resolved in
+        SQL, that lookup runs in a thread.
+        """
+        with tracer.start_as_current_span("rag.vector_search") as span:
+            if (
+                topic_ids
+                and context_ids is None
+                and not settings.QDRANT_TOPIC_PAYLOAD_FILTER
+            ):
+                context_ids = await asyncio.to_thread(
+                    self.get_context_ids_for_topics, topic_ids
+                )
+
+            requests = self.sync_service._single_search_requests(
+                query_embedding, topic_ids, limit, context_ids, query_text, span
+            )
+            if requests is None:
+                return []
+
+            responses = await self.client.query_batch_points(
+                collection_name=self.collection_name, requests=requests
             )
 
-            # Format results efficiently
-            results = []
-            for scored_point in search_results:
-                if scored_point.payload:
-                    result = {
-                        "context_item_id": scored_point.payload["context_item_id"],
-                        "score": scored_point.score,
-                        "title": scored_point.payload.get("title", ""),
-                        "content": scored_point.payload.get("content", ""),
-                        "context_id": scored_point.payload.get("context_id"),
-                        "context_type": scored_point.payload.get("context_type"),
-                    }
-                    results.append(result)
-
-            span.set_attribute("results.count", len(results))
-            if results:
-                span.set_attribute("score.max", max(r["score"] for r in results))
-                span.set_attribute("score.min", min(r["score"] for r in results))
+            results = self.sync_service._merge_responses(responses, limit)
+            _record_results(span, results)
+            return results
+
+    async def search_similar_batch(
+        self,
+        query_embeddings: list[list[float]],
+        topic_ids_list: list[list[int]],
+        limit: int = 5,
+        query_texts: list[str] | None = None,
+    ) -> list[list[dict[str, Any]]]:
+        """Search for several query embeddings in one Qdrant round-trip."""
+        with tracer.start_as_current_span("rag.vector_search.batch") as span:
+            build = functools.partial(
+                self.sync_service._batch_search_requests,
+                query_embeddings,
+                topic_ids_list,
+                limit,
+                query_texts,
+                span,
+            )
+            if settings.QDRANT_TOPIC_PAYLOAD_FILTER:
+                requests, groups = build()
+            else:
+                # Resolving topics to context IDs may query the database
+                requests, groups = await asyncio.to_thread(build)
+
+            responses = []
+            if requests:
+                responses = await self.client.query_batch_points(
+                    collection_name=self.collection_name, requests=requests
+                )
+            results = self.sync_service._group_results(
+                len(query_embeddings), groups, responses, limit
+            )
 
+            span.set_attribute("results.count", sum(len(r) for r in results))
             return results
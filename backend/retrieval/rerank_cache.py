@@ -0,0 +1,189 @@
+"""
+Cache of cross-encoder scores per (question, chunk).
+
+The same pairs are scored again and again: popular questions, follow-ups
+within a session, and answer-cache misses that differ only in ``limit``. A
+score depends only on the model, its truncation length, the question and the
+chunk text. Entries are therefore keyed by the reranker model and
+``RERANKER_MAX_LENGTH``, a hash of the normalised question,
+the context item ID and a hash of the chunk content. An edited chunk gets a
+new key, so nothing needs invalidating; unused entries expire.
+
+Scores are cached in two tiers:
+
+- Redis strings shared by every worker, kept for
+  ``RERANKER_SCORE_CACHE_TTL_SECONDS``;
+- an in-process LRU of ``RERANKER_SCORE_CACHE_LOCAL_MAX_ENTRIES`` scores in
+  front of it.
+
+Redis errors degrade to scoring with the model and are never raised.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Sequence
+from typing import Any
+
+from backend.config import settings
+from backend.observability import get_meter
+
+logger = logging.getLogger(__name__)
+meter = get_meter(__name__)
+
+RERANK_SCORE_PREFIX = "rag_rerank_score"
+_WHITESPACE = re.compile(r"\s+")
+
+# (query, context_item_id, content) of one scored pair
+ScoreEntry = tuple[str, Any, str]
+
+
+def normalize_query(query: str) -> str:
+    """Fold case, Unicode forms and whitespace, which do not change intent."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", query)).strip().casefold()
+
+
+def rerank_score_key(query: str, context_item_id: Any, content: str) -> str:
+    """Redis key of the score of one (question, chunk) pair."""
+    query_hash = hashlib.sha256(normalize_query(query).encode()).hexdigest()[:32]
+    content_hash = hashlib.sha256(content.encode()).hexdigest()[:32]
+    model = (
+        f"{settings.RERANKER_BACKEND}:{settings.RERANKER_MODEL}"
+        f":{settings.RERANKER_MAX_LENGTH}"
+    )
+    return (
+        f"{RERANK_SCORE_PREFIX}:{model}:{query_hash}:{context_item_id}:{content_hash}"
+    )
+
+
+class RerankScoreCache:
+    """Two-tier (in-process LRU over Redis) cache of reranker scores."""
+
+    def __init__(
+        self,
+        redis_client: Any | None = None,
+        ttl_seconds: int | None = None,
+        max_local_entries: int | None = None,
+    ) -> None:
+        self._redis_client = redis_client
+        self.ttl_seconds = (
+            settings.RERANKER_SCORE_CACHE_TTL_SECONDS
+            if ttl_seconds is None
+            else ttl_seconds
+        )
+        self.max_local_entries = (
+            settings.RERANKER_SCORE_CACHE_LOCAL_MAX_ENTRIES
+            if max_local_entries is None
+            else max_local_entries
+        )
+        self._local: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._hits_counter = meter.create_counter(
+            name="rag.rerank.score_cache.hits",
+            description="Rerank scores served from cache, by tier",
+        )
+        self._misses_counter = meter.create_counter(
+            name="rag.rerank.score_cache.misses",
+            description="Rerank scores that had to be computed by the model",
+        )
+
+    @property
+    def redis_client(self) -> Any:
+        if self._redis_client is None:
+            from backend.dependencies.redis import get_sync_redis_client
+
+            self._redis_client = get_sync_redis_client()
+        return self._redis_client
+
+    def get_many(self, entries: Sequence[ScoreEntry]) -> list[float | None]:
+        """
+        Look up the cached score of each pair.
+
+        Args:
+            entries: ``(query, context_item_id, content)`` per pair
+
+        Returns:
+            The score of each pair, or None where it is not cached
+        """
+        keys = [rerank_score_key(*entry) for entry in entries]
+        scores = self._get_local(keys)
+        local_hits = sum(score is not None for score in scores)
+        self._hits_counter.add(local_hits, {"tier": "local"})
+
+        missing = [index for index, score in enumerate(scores) if score is None]
+        if missing:
+            remote = self._get_remote([keys[index] for index in missing])
+            found = {
+                keys[index]: score
+                for index, score in zip(missing, remote, strict=True)
+                if score is not None
+            }
+            self._set_local(found)
+            for index, score in zip(missing, remote, strict=True):
+                scores[index] = score
+            self._hits_counter.add(len(found), {"tier": "redis"})
+            self._misses_counter.add(len(missing) - len(found))
+        return scores
+
+    def set_many(self, entries: Sequence[ScoreEntry], scores: Sequence[float]) -> None:
+        """Cache the scores of freshly scored pairs in both tiers."""
+        values = {
+            rerank_score_key(*entry): float(score)
+            for entry, score in zip(entries, scores, strict=True)
+        }
+        if not values:
+            return
+        self._set_local(values)
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key, score in values.items():
+                pipe.set(key, repr(score), ex=self.ttl_seconds)
+            pipe.execute()
+        except Exception as e:
+            logger.warning("Rerank score cache write failed: %s", e)
+
+    def _get_local(self, keys: list[str]) -> list[float | None]:
+        with self._lock:
+            scores: list[float | None] = []
+            for key in keys:
+                score = self._local.get(key)
+                if score is not None:
+                    self._local.move_to_end(key)
+                scores.append(score)
+            return scores
+
+    def _set_local(self, values: dict[str, float]) -> None:
+        if self.max_local_entries <= 0:
+            return
+        with self._lock:
+            for key, score in values.items():
+                self._local[key] = score
+                self._local.move_to_end(key)
+            while len(self._local) > self.max_local_entries:
+                self._local.popitem(last=False)
+
+    def _get_remote(self, keys: list[str]) -> list[float | None]:
+        try:
+            values = self.redis_client.mget(keys)
+        except Exception as e:
+            logger.warning("Rerank score cache read failed: %s", e)
+            return [None] * len(keys)
+        return [float(value) if value is not None else None for value in values]
+
+
+_cache: RerankScoreCache | None = None
+
+
+def get_rerank_score_cache() -> RerankScoreCache:
+    """Return the process-wide rerank score cache, creating it lazily."""
+    global _cache
+
+    if _cache is None:
+        _cache = RerankScoreCache()
+    return _cache
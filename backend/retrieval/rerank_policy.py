@@ -0,0 +1,93 @@
+"""Adaptive rerank policy driven by the vector-score distribution."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+from backend.config import settings
+from backend.retrieval.lexical import FUSED_SCORE, retrieval_score
+
+
+@dataclass
+class RerankPlan:
+    """Candidates to send to the cross-encoder, or the reason to skip it."""
+
+    candidates: list[dict[str, Any]]
+    skip_reason: str | None = None
+    pruned: int = 0
+
+    @property
+    def skip(self) -> bool:
+        return self.skip_reason is not None
+
+
+def apply_score_floor(
+    search_results: list[dict[str, Any]], floor: float | None = None
+) -> list[dict[str, Any]]:
+    """
+    Drop candidates whose vector score is below ``floor``.
+
+    Hybrid search results (with a ``fused_score``) are all kept, since an
+    exact-term match can be the answer despite a low cosine score.
+    """
+    floor = settings.RAG_RERANK_SCORE_FLOOR if floor is None else floor
+    return [
+        r for r in search_results if FUSED_SCORE in r or r.get("score", 0.0) >= floor
+    ]
+
+
+def plan_rerank(
+    search_results: list[dict[str, Any]],
+    gap_threshold: float | None = None,
+    dominance_margin: float | None = None,
+) -> RerankPlan:
+    """
+    Decide how much cross-encoder work a result set needs.
+
+    Candidates are ordered by vector score. Reranking is skipped when a single
+    candidate remains or the top score leads the runner-up by at least
+    ``dominance_margin``. Otherwise the set is cut at the first score drop larger
+    than ``gap_threshold``, since candidates below a large gap rarely rerank
+    into the answer.
+
+    Hybrid search results keep their fused order and are reranked in full:
+    both thresholds are in cosine units, and cosine scores say little about
+    lexical hits.
+
+    Args:
+        search_results: Vector search results with ``score``
+        gap_threshold: Score drop between neighbours that ends the rerank set
+        dominance_margin: Lead of the top score that makes reranking pointless
+
+    Returns:
+        The rerank plan
+    """
+    gap_threshold = (
+        settings.RAG_RERANK_GAP_THRESHOLD if gap_threshold is None else gap_threshold
+    )
+    dominance_margin = (
+        settings.RAG_RERANK_DOMINANCE_MARGIN
+        if dominance_margin is None
+        else dominance_margin
+    )
+
+    ranked = sorted(search_results, key=retrieval_score, reverse=True)
+    if len(ranked) <= 1:
+        return RerankPlan(candidates=ranked, skip_reason="single")
+    if any(FUSED_SCORE in r for r in ranked):
+        return RerankPlan(candidates=ranked)
+
+    scores = [r.get("score", 0.0) for r in ranked]
+    if scores[0] - scores[1] >= dominance_margin:
+        return RerankPlan(candidates=ranked, skip_reason="dominant")
+
+    for index in range(1, len(scores)):
+        if scores[index - 1] - scores[index] > gap_threshold:
+            return RerankPlan(
+                candidates=ranked[:index],
+                skip_reason="single" if index == 1 else None,
+                pruned=len(ranked) - index,
+            )
+
+    return RerankPlan(candidates=ranked)
@@ -0,0 +1,194 @@
+"""
+Cross-request micro-batching for the cross-encoder.
+
+Without this scheduler, concurrent RAG requests each run their own small
+``predict`` call in a worker thread, and those calls compete for the same CPU
+cores. With ``RERANKER_MICROBATCH_ENABLED``, requests queue their
+(query, passage) pairs instead. The first queued request opens a window of
+``RERANKER_MICROBATCH_WAIT_MS``. The batch is sent to the model when the
+window closes or when ``RERANKER_MICROBATCH_MAX_PAIRS`` pairs are waiting,
+whichever comes first, and each request gets its own slice of the scores
+back. One forward pass runs at a time, and pairs that arrive during it form
+the next batch.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+from backend.config import settings
+from backend.observability import get_meter, get_tracer
+from backend.retrieval.reranking import RerankingService
+
+tracer = get_tracer(__name__)
+meter = get_meter(__name__)
+
+
+@dataclass
+class _Job:
+    """Pairs of one request waiting to be scored."""
+
+    pairs: Sequence[tuple[str, str]]
+    future: asyncio.Future[list[float]]
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class RerankScheduler:
+    """Coalesces concurrent rerank requests into shared model calls."""
+
+    def __init__(
+        self,
+        reranking_service: RerankingService,
+        max_pairs: int | None = None,
+        max_wait_ms: float | None = None,
+    ) -> None:
+        self.reranking_service = reranking_service
+        self.max_pairs = max_pairs or settings.RERANKER_MICROBATCH_MAX_PAIRS
+        self.max_wait = (
+            settings.RERANKER_MICROBATCH_WAIT_MS if max_wait_ms is None else max_wait_ms
+        ) / 1000
+        self._pending: list[_Job] = []
+        self._pending_pairs = 0
+        self._worker: asyncio.Task[None] | None = None
+        self._filled: asyncio.Event | None = None
+
+        self._queue_depth = meter.create_up_down_counter(
+            name="rag.rerank.queue.depth",
+            description="Pairs waiting for a reranker forward pass",
+        )
+        self._batch_pairs_histogram = meter.create_histogram(
+            name="rag.rerank.batch.size",
+            description="Pairs scored per reranker forward pass",
+        )
+        self._batch_requests_histogram = meter.create_histogram(
+            name="rag.rerank.batch.requests",
+            description="Requests sharing a reranker forward pass",
+        )
+        self._queue_wait_histogram = meter.create_histogram(
+            name="rag.rerank.queue.wait",
+            description="Time a rerank request waited for its forward pass",
+            unit="s",
+        )
+
+    async def rerank_results(
+        self,
+        query: str | None,
+        search_results: list[dict[str, Any]],
+        top_k: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Rerank search results in a forward pass shared with other requests.
+
+        Same contract as ``RerankingService.rerank_results``.
+        """
+        with tracer.start_as_current_span("rag.rerank") as span:
+            service = self.reranking_service
+            input_pairs = service._input_pairs(span, query, search_results, top_k)
+
+            # Score cache lookups and writes may reach Redis, so run off-loop
+            cache = service.score_cache
+            cached: list[float | None] = [None] * len(input_pairs)
+            if cache is not None:
+                cached = await asyncio.to_thread(
+                    service._cached_scores, span, input_pairs, search_results
+                )
+            missing = [index for index, score in enumerate(cached) if score is None]
+            fresh = await self.score([input_pairs[index] for index in missing])
+            merge = functools.partial(
+                service._merge_scores, input_pairs, search_results, cached, fresh
+            )
+            rerank_scores = await asyncio.to_thread(merge) if cache else merge()
+
+            return service._ranked(span, search_results, rerank_scores, top_k)
+
+    async def score(self, pairs: Sequence[tuple[str, str]]) -> list[float]:
+        """
+        Queue ``pairs`` for the next forward pass and wait for their scores.
+
+        Returns:
+            One score per pair, in input order
+
+        Raises:
+            Exception: Whatever the model raised for the batch
+        """
+        if not pairs:
+            return []
+
+        loop = asyncio.get_running_loop()
+        job = _Job(pairs, loop.create_future())
+        self._pending.append(job)
+        self._pending_pairs += len(pairs)
+        self._queue_depth.add(len(pairs))
+
+        if self._worker is None or self._worker.done():
+            self._filled = asyncio.Event()
+            self._worker = loop.create_task(self._run())
+        elif self._pending_pairs >= self.max_pairs and self._filled is not None:
+            self._filled.set()
+        return await job.future
+
+    async def _run(self) -> None:
+        """Dispatch batches until nothing is queued."""
+        assert self._filled is not None
+        while self._pending:
+            remaining = (
+                self._pending[0].enqueued_at + self.max_wait - time.perf_counter()
+            )
+            if remaining > 0 and self._pending_pairs < self.max_pairs:
+                try:
+                    await asyncio.wait_for(self._filled.wait(), remaining)
+                except TimeoutError:
+                    pass
+            self._filled.clear()
+
+            batch = self._take_batch()
+            if batch:
+                await self._dispatch(batch)
+
+    def _take_batch(self) -> list[_Job]:
+        """Dequeue up to ``max_pairs`` pairs of live jobs, at least one job."""
+        batch: list[_Job] = []
+        batch_pairs = 0
+        while self._pending:
+            job = self._pending[0]
+            if batch and batch_pairs + len(job.pairs) > self.max_pairs:
+                break
+            self._pending.pop(0)
+            self._pending_pairs -= len(job.pairs)
+            self._queue_depth.add(-len(job.pairs))
+            # Requests cancelled while queued (e.g. on a deadline) are dropped
+            if not job.future.done():
+                batch.append(job)
+                batch_pairs += len(job.pairs)
+        return batch
+
+    async def _dispatch(self, batch: list[_Job]) -> None:
+        """Score one batch in a worker thread and route the scores back."""
+        now = time.perf_counter()
+        pairs = [pair for job in batch for pair in job.pairs]
+        for job in batch:
+            self._queue_wait_histogram.record(now - job.enqueued_at)
+        self._batch_pairs_histogram.record(len(pairs))
+        self._batch_requests_histogram.record(len(batch))
+
+        try:
+            scores = await asyncio.to_thread(
+                self.reranking_service.model.predict, pairs
+            )
+        except Exception as exc:
+            for job in batch:
+                if not job.future.done():
+                    job.future.set_exception(exc)
+            return
+
+        offset = 0
+        for job in batch:
+            job_scores = [float(s) for s in scores[offset : offset + len(job.pairs)]]
+            offset += len(job.pairs)
+            if not job.future.done():
+                job.future.set_result(job_scores)
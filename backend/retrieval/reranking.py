@@ -1,13 +1,16 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Any, cast
 
 import sentence_transformers
 
+from backend.config import settings
 from backend.observability import get_tracer
+from backend.retrieval.rerank_cache import RerankScoreCache, get_rerank_score_cache
 
 if TYPE_CHECKING:
-    pass
+    from opentelemetry.trace import Span
 
 tracer = get_tracer(__name__)
 
@@ -15,8 +18,53 @@ tracer = get_tracer(__name__)
 class RerankingService:
     """Service for reranking search results using BGE reranker."""
 
-    def __init__(self) -> None:
-        self.model = sentence_transformers.CrossEncoder("BAAI/bge-reranker-base")
+    score_cache: RerankScoreCache | None = None
+
+    def __init__(self, score_cache: RerankScoreCache | None = None) -> None:
+        self.model = self._load_model()
+        if score_cache is None and settings.RERANKER_SCORE_CACHE_ENABLED:
+            score_cache = get_rerank_score_cache()
+        self.score_cache = score_cache
+
+    @staticmethod
+    def _load_model() -> Any:
+        """
+        Build the cross-encoder selected by ``RERANKER_BACKEND``.
+
+        Both backends expose ``predict(pairs)`` returning one score per pair.
+        """
+        if settings.RERANKER_BACKEND == "onnx":
+            from backend.retrieval.onnx_reranker import OnnxCrossEncoder
+
+            return OnnxCrossEncoder.from_pretrained(settings.RERANKER_MODEL)
+
+        return sentence_transformers.CrossEncoder(
+            settings.RERANKER_MODEL, max_length=settings.RERANKER_MAX_LENGTH
+        )
+
+    def warmup(self) -> None:
+        """Run a throwaway inference so the first real request skips lazy init."""
+        with tracer.start_as_current_span("rag.rerank.warmup"):
+            self.model.predict([("warmup", "warmup")])
+
+    @staticmethod
+    def _rank(
+        search_results: list[dict[str, Any]],
+        scores: Sequence[float],
+        top_k: int | None,
+    ) -> list[dict[str, Any]]:
+        """Attach rerank scores, sort descending and apply ``top_k``."""
+        reranked_results = []
+        for result, score in zip(search_results, scores, strict=False):
+            result_with_score = result.copy()
+            result_with_score["rerank_score"] = float(score)
+            reranked_results.append(result_with_score)
+
+        reranked_results.sort(key=lambda x: x["rerank_score"], reverse=True)
+
+        if top_k is not None:
+            reranked_results = reranked_results[:top_k]
+        return reranked_results
 
     def rerank_results(
         self,
@@ -39,45 +87,188 @@ class RerankingService:
             ValueError: If query is None/empty or search_results is empty
         """
         with tracer.start_as_current_span("rag.rerank") as span:
-            if query is None or not query.strip():
-                raise ValueError("Query cannot be None or empty")
+            input_pairs = self._input_pairs(span, query, search_results, top_k)
+
+            # Get reranking scores, from the model only for uncached pairs
+            cached = self._cached_scores(span, input_pairs, search_results)
+            missing = [index for index, score in enumerate(cached) if score is None]
+            fresh = (
+                self.model.predict([input_pairs[i] for i in missing]) if missing else []
+            )
+            rerank_scores = self._merge_scores(
+                input_pairs, search_results, cached, fresh
+            )
+
+            return self._ranked(span, search_results, rerank_scores, top_k)
+
+    @staticmethod
+    def _input_pairs(
+        span: Span,
+        query: str | None,
+        search_results: list[dict[str, Any]],
+        top_k: int | None,
+    ) -> list[tuple[str, str]]:
+        """
+        Validate a rerank request and build its cross-encoder input pairs.
+
+        Raises:
+            ValueError: If query is None/empty or search_results is empty
+        """
+        if query is None or not query.strip():
+            raise ValueError("Query cannot be None or empty")
+
+        if not search_results:
+            raise ValueError("Search results cannot be empty")
+
+        span.set_attribute("query.length", len(query))
+        span.set_attribute("input.count", len(search_results))
+        span.set_attribute("top_k", top_k if top_k is not None else len(search_results))
+
+        # Prepare input pairs for the cross-encoder
+        return [(query, result["content"]) for result in search_results]
+
+    def _cached_scores(
+        self,
+        span: Span,
+        input_pairs: list[tuple[str, str]],
+        search_results: list[dict[str, Any]],
+    ) -> list[float | None]:
+        """
+        Look up cached scores of ``input_pairs`` and record the hit ratio.
+
+        Returns:
+            The cached score of each pair, or None where the model must score it
+        """
+        if self.score_cache is None:
+            return [None] * len(input_pairs)
+
+        cached = self.score_cache.get_many(
+            self._score_entries(input_pairs, search_results)
+        )
+        hits = sum(score is not None for score in cached)
+        span.set_attribute("score_cache.hits", hits)
+        span.set_attribute(
+            "score_cache.hit_ratio", hits / len(cached) if cached else 0.0
+        )
+        return cached
+
+    def _merge_scores(
+        self,
+        input_pairs: list[tuple[str, str]],
+        search_results: list[dict[str, Any]],
+        cached: list[float | None],
+        fresh: Sequence[float],
+    ) -> list[float]:
+        """Fill the gaps in ``cached`` with ``fresh`` model scores and cache them."""
+        missing = [index for index, score in enumerate(cached) if score is None]
+        scores = list(cached)
+        for index, score in zip(missing, fresh, strict=True):
+            scores[index] = float(score)
 
-            if not search_results:
-                raise ValueError("Search results cannot be empty")
+        if self.score_cache is not None and missing:
+            entries = self._score_entries(input_pairs, search_results)
+            self.score_cache.set_many(
+                [entries[index] for index in missing],
+                [float(fresh_score) for fresh_score in fresh],
+            )
+        return cast(list[float], scores)
+
+    @staticmethod
+    def _score_entries(
+        input_pairs: list[tuple[str, str]], search_results: list[dict[str, Any]]
+    ) -> list[tuple[str, Any, str]]:
+        return [
+            (query, result.get("context_item_id"), content)
+            for (query, content), result in zip(
+                input_pairs, search_results, strict=True
+            )
+        ]
+
+    def _ranked(
+        self,
+        span: Span,
+        search_results: list[dict[str, Any]],
+        rerank_scores: Sequence[float],
+        top_k: int | None,
+    ) -> list[dict[str, Any]]:
+        """Rank ``search_results`` by their scores and record the outcome."""
+        reranked_results = self._rank(search_results, rerank_scores, top_k)
 
-            span.set_attribute("query.length", len(query))
-            span.set_attribute("input.count", len(search_results))
+        span.set_attribute("output.count", len(reranked_results))
+        if reranked_results:
             span.set_attribute(
-                "top_k", top_k if top_k is not None else len(search_results)
+                "score.max", max(r["rerank_score"] for r in reranked_results)
+            )
+            span.set_attribute(
+                "score.min", min(r["rerank_score"] for r in reranked_results)
             )
 
-            # Prepare input pairs for the cross-encoder
-            input_pairs = [(query, result["content"]) for result in search_results]
+        return reranked_results
 
-            # Get reranking scores
-            rerank_scores = self.model.predict(input_pairs)
+    def rerank_batch(
+        self,
+        queries: list[str],
+        search_results_list: list[list[dict[str, Any]]],
+        top_k: int | None = None,
+    ) -> list[list[dict[str, Any]]]:
+        """
+        Rerank results for several queries with a single cross-encoder call.
 
-            # Add rerank scores to results and sort
-            reranked_results = []
-            for i, result in enumerate(search_results):
-                result_with_score = result.copy()
-                result_with_score["rerank_score"] = float(rerank_scores[i])
-                reranked_results.append(result_with_score)
+        Scoring every (query, chunk) pair in one ``predict`` call lets the model
+        fill full inference batches instead of many small ones.
 
-            # Sort by rerank score (descending)
-            reranked_results.sort(key=lambda x: x["rerank_score"], reverse=True)
+        Args:
+            queries: Query strings, one per result list
+            search_results_list: Search results to rerank for each query
+            top_k: Maximum number of results to return per query
 
-            # Apply top_k limitation if specified
-            if top_k is not None:
-                reranked_results = reranked_results[:top_k]
+        Returns:
+            Reranked results for each query, in input order
 
-            span.set_attribute("output.count", len(reranked_results))
-            if reranked_results:
-                span.set_attribute(
-                    "score.max", max(r["rerank_score"] for r in reranked_results)
-                )
-                span.set_attribute(
-                    "score.min", min(r["rerank_score"] for r in reranked_results)
+        Raises:
+            ValueError: If the inputs differ in length, or any query or result
+                list is empty
+        """
+        with tracer.start_as_current_span("rag.rerank.batch") as span:
+            if len(queries) != len(search_results_list):
+                raise ValueError("Queries and search results must have equal length")
+
+            for query, search_results in zip(queries, search_results_list, strict=True):
+                if not query or not query.strip():
+                    raise ValueError("Query cannot be None or empty")
+                if not search_results:
+                    raise ValueError("Search results cannot be empty")
+
+            input_pairs = [
+                (query, result["content"])
+                for query, search_results in zip(
+                    queries, search_results_list, strict=True
                 )
+                for result in search_results
+            ]
+            span.set_attribute("batch.size", len(queries))
+            span.set_attribute("input.count", len(input_pairs))
+
+            if not input_pairs:
+                return []
+
+            flat_results = [
+                result
+                for search_results in search_results_list
+                for result in search_results
+            ]
+            cached = self._cached_scores(span, input_pairs, flat_results)
+            missing = [index for index, score in enumerate(cached) if score is None]
+            fresh = (
+                self.model.predict([input_pairs[i] for i in missing]) if missing else []
+            )
+            rerank_scores = self._merge_scores(input_pairs, flat_results, cached, fresh)
+
+            reranked: list[list[dict[str, Any]]] = []
+            offset = 0
+            for search_results in search_results_list:
+                scores = rerank_scores[offset : offset + len(search_results)]
+                offset += len(search_results)
+                reranked.append(self._rank(search_results, scores, top_k))
 
-            return reranked_results
+            return reranked
@@ -0,0 +1,296 @@
+"""Semantic answer cache keyed by query-embedding similarity."""
+
+from __future__ import annotations
+
+import base64
+import json
+import logging
+import uuid
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+import redis.asyncio as redis
+
+from backend.observability import get_meter, get_tracer
+
+logger = logging.getLogger(__name__)
+tracer = get_tracer(__name__)
+meter = get_meter(__name__)
+
+SEMANTIC_CACHE_PREFIX = "rag_semantic"
+
+
+def index_key(
+    topic_ids: list[int], content_versions: Mapping[int, int] | None = None
+) -> str:
+    """
+    Redis list holding the question embeddings cached for one topic set.
+
+    The key embeds the topics' content versions, so answers generated from
+    older content are never looked up once a topic changes, even when a slow
+    request stores one after the change was invalidated.
+    """
+    unique_ids = sorted(set(topic_ids))
+    versions = content_versions or {}
+    return (
+        f"{SEMANTIC_CACHE_PREFIX}:{'_'.join(map(str, unique_ids))}"
+        f":v{'_'.join(str(versions.get(t, 0)) for t in unique_ids)}"
+    )
+
+
+def results_key(key: str) -> str:
+    """Redis list holding the answers for an index list, in the same order."""
+    return f"{key}:results"
+
+
+def version_key(key: str) -> str:
+    """Counter of entries ever pushed to an index list."""
+    return f"{key}:version"
+
+
+def topic_members_key(topic_id: int) -> str:
+    """Redis set of index keys that include ``topic_id``."""
+    return f"{SEMANTIC_CACHE_PREFIX}:topic:{topic_id}"
+
+
+def _encode_vector(vector: np.ndarray) -> str:
+    return base64.b64encode(vector.astype(np.float32).tobytes()).decode("ascii")
+
+
+def _decode_vector(data: str) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(data), dtype=np.float32)
+
+
+def _normalize(vector: np.ndarray) -> np.ndarray:
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+
+@dataclass
+class _TopicIndex:
+    """Per-worker copy of one topic set's cached query embeddings."""
+
+    version: int
+    matrix: np.ndarray
+    entries: list[dict[str, Any]] = field(default_factory=list)
+
+
+class SemanticAnswerCache:
+    """
+    Serve previously generated answers for paraphrased questions.
+
+    Each topic set has two Redis lists pushed and trimmed together: compact
+    entries (question embedding and search parameters) and the answers. A
+    counter of pushed entries versions them. Each worker keeps a normalized
+    embedding matrix of the entries, appends only the entries pushed since
+    the count it last saw, and fetches an answer only when its entry matches.
+    """
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        threshold: float = 0.95,
+        max_entries: int = 500,
+        ttl_seconds: int = 86400,
+    ) -> None:
+        self.redis_client = redis_client
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._indexes: dict[str, _TopicIndex] = {}
+
+        self._hits_counter = meter.create_counter(
+            name="rag.semantic_cache.hits",
+            description="Total number of semantic answer cache hits",
+        )
+        self._misses_counter = meter.create_counter(
+            name="rag.semantic_cache.misses",
+            description="Total number of semantic answer cache misses",
+        )
+
+    async def _read_entries(
+        self, key: str, start: int
+    ) -> tuple[int | None, list[bytes | str]]:
+        """Read the entry count and the entries from ``start`` in one snapshot."""
+        pipe = self.redis_client.pipeline(transaction=True)
+        pipe.get(version_key(key))
+        pipe.lrange(key, start, -1)
+        version, raw_entries = await pipe.execute()
+        return (int(version) if version is not None else None), raw_entries
+
+    async def _load_index(self, key: str) -> _TopicIndex | None:
+        version = await self.redis_client.get(version_key(key))
+        if version is None:
+            self._indexes.pop(key, None)
+            return None
+
+        index = self._indexes.get(key)
+        current = int(version)
+        if index is not None and index.version == current:
+            return index
+
+        # Entries are only ever appended, so a worker that saw ``index.version``
+        # entries needs just the newer ones. A list that was recreated or grew
+        # past its bound since is reloaded whole.
+        loaded: int | None = None
+        raw_entries: list[bytes | str] = []
+        if index is not None and 0 < current - index.version <= self.max_entries:
+            loaded, raw_entries = await self._read_entries(key, index.version - current)
+        if loaded != current:
+            index = None
+            loaded, raw_entries = await self._read_entries(key, 0)
+        if loaded is None:
+            self._indexes.pop(key, None)
+            return None
+
+        entries = list(index.entries) if index is not None else []
+        vectors = list(index.matrix) if index is not None else []
+        first_position = loaded - len(raw_entries) + 1
+        for offset, raw in enumerate(raw_entries):
+            entry = json.loads(raw)
+            vectors.append(_decode_vector(entry.pop("embedding")))
+            entry["position"] = first_position + offset
+            entries.append(entry)
+
+        # Rows from before an embedding model change are dropped.
+        if vectors:
+            dim = vectors[-1].shape[0]
+            kept = [i for i, vector in enumerate(vectors) if vector.shape[0] == dim]
+            kept = kept[-self.max_entries :]
+            entries = [entries[i] for i in kept]
+            vectors = [vectors[i] for i in kept]
+        matrix = np.vstack(vectors) if vectors else np.empty((0, 0), dtype=np.float32)
+        index = _TopicIndex(version=loaded, matrix=matrix, entries=entries)
+        self._indexes[key] = index
+        return index
+
+    async def _load_result(
+        self, key: str, index: _TopicIndex, entry: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        """Fetch one entry's answer, or None if it was trimmed since."""
+        raw = await self.redis_client.lindex(
+            results_key(key), entry["position"] - index.version - 1
+        )
+        if raw is None:
+            return None
+        stored = json.loads(raw)
+        if stored["id"] != entry["id"]:
+            return None
+        return dict(stored["result"])
+
+    async def lookup(
+        self,
+        topic_ids: list[int],
+        query_embedding: list[float],
+        limit: int,
+        rerank_top_k: int,
+        content_versions: Mapping[int, int] | None = None,
+    ) -> dict[str, Any] | None:
+        """
+        Return a cached answer whose question is similar enough to this one.
+
+        Args:
+            topic_ids: Topic set the question was asked against
+            query_embedding: Embedding of the incoming question
+            limit: Search limit the answer must have been produced with
+            rerank_top_k: Rerank cut-off the answer must have been produced with
+            content_versions: Current content version of each topic; answers
+                stored at other versions are not considered
+
+        Returns:
+            Cached result dictionary, or None on a miss
+        """
+        with tracer.start_as_current_span("rag.semantic_cache.lookup") as span:
+            key = index_key(topic_ids, content_versions)
+            try:
+                index = await self._load_index(key)
+            except Exception as e:
+                logger.warning("Semantic cache lookup failed: %s", e)
+                index = None
+
+            query = _normalize(np.asarray(query_embedding, dtype=np.float32))
+            if (
+                index is None
+                or not index.entries
+                or index.matrix.shape[1] != query.shape[0]
+            ):
+                span.set_attribute("semantic_cache.hit", False)
+                self._misses_counter.add(1)
+                return None
+
+            similarities = index.matrix @ query
+            eligible = np.array(
+                [
+                    entry["limit"] == limit and entry["rerank_top_k"] == rerank_top_k
+                    for entry in index.entries
+                ]
+            )
+            similarities = np.where(eligible, similarities, -1.0)
+            best = int(np.argmax(similarities))
+            best_score = float(similarities[best])
+            span.set_attribute("semantic_cache.similarity", best_score)
+
+            result = None
+            if best_score >= self.threshold:
+                try:
+                    result = await self._load_result(key, index, index.entries[best])
+                except Exception as e:
+                    logger.warning("Semantic cache lookup failed: %s", e)
+
+            span.set_attribute("semantic_cache.hit", result is not None)
+            if result is None:
+                self._misses_counter.add(1)
+                return None
+
+            self._hits_counter.add(1)
+            return result
+
+    async def store(
+        self,
+        topic_ids: list[int],
+        query: str,
+        query_embedding: list[float],
+        limit: int,
+        rerank_top_k: int,
+        result: dict[str, Any],
+        content_versions: Mapping[int, int] | None = None,
+    ) -> None:
+        """
+        Record an answered question so paraphrases can reuse it.
+
+        ``content_versions`` must be the versions read before the answer's
+        content was retrieved, so an answer computed across an edit is filed
+        under the versions it was generated from.
+        """
+        key = index_key(topic_ids, content_versions)
+        vector = _normalize(np.asarray(query_embedding, dtype=np.float32))
+        entry_id = uuid.uuid4().hex
+        entry = {
+            "id": entry_id,
+            "query": query,
+            "embedding": _encode_vector(vector),
+            "limit": limit,
+            "rerank_top_k": rerank_top_k,
+        }
+
+        # One transaction keeps the two lists aligned with the entry count.
+        try:
+            pipe = self.redis_client.pipeline(transaction=True)
+            for list_key, value in (
+                (key, entry),
+                (results_key(key), {"id": entry_id, "result": result}),
+            ):
+                pipe.rpush(list_key, json.dumps(value))
+                pipe.ltrim(list_key, -self.max_entries, -1)
+                pipe.expire(list_key, self.ttl_seconds)
+            pipe.incr(version_key(key))
+            pipe.expire(version_key(key), self.ttl_seconds)
+            for topic_id in set(topic_ids):
+                members = topic_members_key(topic_id)
+                pipe.sadd(members, key)
+                pipe.expire(members, self.ttl_seconds)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning("Semantic cache store failed: %s", e)
@@ -0,0 +1,125 @@
+"""Token counting and token-budgeted context packing for chat prompts."""
+
+from __future__ import annotations
+
+import logging
+from functools import lru_cache
+from typing import Any
+
+import tiktoken
+
+from backend.config import settings
+from backend.observability import get_tracer
+from backend.retrieval.lexical import retrieval_score
+
+logger = logging.getLogger(__name__)
+tracer = get_tracer(__name__)
+
+_FALLBACK_ENCODING = "o200k_base"
+
+# "[Source N] " prefix plus the separating newlines added by _prepare_context
+SOURCE_FRAMING_TOKENS = 8
+
+
+@lru_cache(maxsize=8)
+def _get_encoding(model: str) -> tiktoken.Encoding | None:
+    """Load the tokenizer for ``model``, or None when it cannot be loaded."""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        pass
+    except Exception as e:
+        logger.warning("Failed to load tokenizer for %s: %s", model, str(e))
+        return None
+
+    try:
+        return tiktoken.get_encoding(_FALLBACK_ENCODING)
+    except Exception as e:
+        logger.warning("Failed to load tokenizer %s: %s", _FALLBACK_ENCODING, str(e))
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate a token count without a tokenizer.
+
+    ASCII text averages about four characters per token, while Hangul and
+    other non-Latin scripts are closer to one token per character.
+    """
+    non_ascii = sum(1 for char in text if ord(char) > 127)
+    return (len(text) - non_ascii + 3) // 4 + non_ascii
+
+
+def count_tokens(text: str, model: str | None = None) -> int:
+    """
+    Count the tokens ``text`` occupies for ``model``.
+
+    Args:
+        text: Text to count
+        model: OpenAI model name; defaults to the configured chat model
+
+    Returns:
+        Exact token count, or an estimate when the tokenizer is unavailable
+    """
+    if not text:
+        return 0
+
+    encoding = _get_encoding(model or settings.OPENAI_CHAT_MODEL)
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def chunk_token_count(title: str, content: str, model: str | None = None) -> int:
+    """Count the tokens a context chunk contributes to a prompt, excluding framing."""
+    return count_tokens(f"{title}\n{content}", model)
+
+
+def pack_context(
+    results: list[dict[str, Any]], token_budget: int, model: str | None = None
+) -> list[dict[str, Any]]:
+    """
+    Select the highest-scoring results that fit within a token budget.
+
+    Results are considered in score order and skipped when they would overflow
+    the budget, so a smaller lower-ranked chunk can still fill remaining space.
+    The top result is always kept so an oversized chunk never empties the
+    context. Token counts stored at ingestion time (``token_count``) are used
+    when present.
+
+    Args:
+        results: Reranked search results
+        token_budget: Maximum number of tokens the packed context may use
+        model: OpenAI model whose tokenizer is used for missing counts
+
+    Returns:
+        Selected results, ordered by descending score
+    """
+    with tracer.start_as_current_span("rag.context_packing") as span:
+        ranked = sorted(
+            results,
+            key=lambda r: r.get("rerank_score", retrieval_score(r)),
+            reverse=True,
+        )
+
+        packed: list[dict[str, Any]] = []
+        used_tokens = 0
+        for result in ranked:
+            tokens = result.get("token_count")
+            if tokens is None:
+                tokens = chunk_token_count(
+                    result.get("title", ""), result.get("content", ""), model
+                )
+            tokens += SOURCE_FRAMING_TOKENS
+
+            if packed and used_tokens + tokens > token_budget:
+                continue
+            packed.append(result)
+            used_tokens += tokens
+
+        span.set_attribute("context.budget_tokens", token_budget)
+        span.set_attribute("context.used_tokens", used_tokens)
+        span.set_attribute("context.candidates", len(results))
+        span.set_attribute("context.packed", len(packed))
+
+        return packed
@@ -0,0 +1,266 @@
+"""
+Shared cache of each topic's context IDs.
+
+Resolving topics to context IDs is one SQL query per uncached search. The
+mapping is cached in two tiers:
+
+- a Redis set per topic, shared by every worker and dropped explicitly by
+  ``invalidate_topic_caches`` whenever a topic's associations change.
+  Invalidation also bumps a per-topic generation counter, and a set loaded
+  from the database is only written back if the generation read before the
+  load is still current, so a load racing an edit cannot cache the old set;
+- a small in-process LRU in front of it, so hot topics skip the Redis
+  round-trip too. Invalidation clears this worker's LRU immediately; other
+  workers' entries expire after ``RAG_TOPIC_CONTEXT_LOCAL_TTL_SECONDS``.
+
+Redis errors degrade to the database lookup and are never raised.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from backend.config import settings
+from backend.observability import get_meter
+
+logger = logging.getLogger(__name__)
+meter = get_meter(__name__)
+
+TOPIC_CONTEXTS_PREFIX = "rag_topic_contexts"
+# Member present in every cached set, so a topic with no contexts is cached
+# as a non-empty set and an absent key always means a miss
+_CACHED_MARKER = "-"
+
+
+def topic_contexts_key(topic_id: int) -> str:
+    """Redis set holding one topic's context IDs."""
+    return f"{TOPIC_CONTEXTS_PREFIX}:{topic_id}"
+
+
+def topic_generation_key(topic_id: int) -> str:
+    """Counter bumped each time one topic's cached context IDs are invalidated."""
+    return f"{TOPIC_CONTEXTS_PREFIX}:{topic_id}:generation"
+
+
+# Replace the set only if the generation is still the one read before loading
+# it from the database (compare-and-set). A missing counter reads as "".
+_STORE_SCRIPT = """
+if (redis.call("get", KEYS[2]) or "") ~= ARGV[1] then
+    return 0
+end
+redis.call("del", KEYS[1])
+redis.call("sadd", KEYS[1], unpack(ARGV, 3))
+redis.call("expire", KEYS[1], ARGV[2])
+return 1
+"""
+
+
+class TopicContextCache:
+    """Two-tier topic-to-context-set cache (in-process LRU over Redis sets)."""
+
+    def __init__(
+        self,
+        redis_client: Any | None = None,
+        ttl_seconds: int | None = None,
+        local_ttl_seconds: float | None = None,
+        max_local_entries: int | None = None,
+    ) -> None:
+        self._redis_client = redis_client
+        self.ttl_seconds = (
+            settings.RAG_TOPIC_CONTEXT_CACHE_TTL_SECONDS
+            if ttl_seconds is None
+            else ttl_seconds
+        )
+        self.local_ttl_seconds = (
+            settings.RAG_TOPIC_CONTEXT_LOCAL_TTL_SECONDS
+            if local_ttl_seconds is None
+            else local_ttl_seconds
+        )
+        self.max_local_entries = (
+            settings.RAG_TOPIC_CONTEXT_LOCAL_MAX_ENTRIES
+            if max_local_entries is None
+            else max_local_entries
+        )
+        self._local: OrderedDict[int, tuple[float, frozenset[int]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._hits_counter = meter.create_counter(
+            name="rag.topic_context_cache.hits",
+            description="Topic-to-context lookups served from cache, by tier",
+        )
+        self._misses_counter = meter.create_counter(
+            name="rag.topic_context_cache.misses",
+            description="Topic-to-context lookups that fell through to the database",
+        )
+
+    @property
+    def redis_client(self) -> Any:
+        if self._redis_client is None:
+            from backend.dependencies.redis import get_sync_redis_client
+
+            self._redis_client = get_sync_redis_client()
+        return self._redis_client
+
+    def resolve(
+        self,
+        topic_ids: Iterable[int],
+        loader: Callable[[list[int]], dict[int, set[int]]],
+    ) -> list[int]:
+        """
+        Return the union of the context IDs of ``topic_ids``.
+
+        Args:
+            topic_ids: Topics to resolve
+            loader: Reads the context IDs of the given topics from the
+                database; called once with every topic missing from both tiers
+
+        Returns:
+            Sorted context IDs
+        """
+        unique_ids = sorted(set(topic_ids))
+        found = self._get_local(unique_ids)
+        self._hits_counter.add(len(found), {"tier": "local"})
+
+        remote_ids = [topic_id for topic_id in unique_ids if topic_id not in found]
+        generations: dict[int, str] = {}
+        if remote_ids:
+            remote, generations = self._get_remote(remote_ids)
+            self._hits_counter.add(len(remote), {"tier": "redis"})
+            self._set_local(remote)
+            found.update(remote)
+
+        missing = [topic_id for topic_id in unique_ids if topic_id not in found]
+        if missing:
+            self._misses_counter.add(len(missing))
+            loaded = loader(missing)
+            fresh = {
+                topic_id: frozenset(loaded.get(topic_id, ())) for topic_id in missing
+            }
+            stale = self._set_remote(fresh, generations)
+            self._set_local({t: ids for t, ids in fresh.items() if t not in stale})
+            found.update(fresh)
+
+        return sorted(set().union(*found.values()))
+
+    def invalidate(self, topic_ids: Iterable[int]) -> None:
+        """
+        Drop ``topic_ids`` from both tiers and bump their generations.
+
+        Raises:
+            redis.RedisError: If the Redis keys cannot be updated
+        """
+        unique_ids = sorted(set(topic_ids))
+        with self._lock:
+            for topic_id in unique_ids:
+                self._local.pop(topic_id, None)
+        if unique_ids:
+            pipe = self.redis_client.pipeline(transaction=True)
+            for topic_id in unique_ids:
+                pipe.incr(topic_generation_key(topic_id))
+            pipe.delete(*map(topic_contexts_key, unique_ids))
+            pipe.execute()
+
+    def _get_local(self, topic_ids: list[int]) -> dict[int, frozenset[int]]:
+        now = time.monotonic()
+        found: dict[int, frozenset[int]] = {}
+        with self._lock:
+            for topic_id in topic_ids:
+                entry = self._local.get(topic_id)
+                if entry is None:
+                    continue
+                expires_at, context_ids = entry
+                if expires_at <= now:
+                    del self._local[topic_id]
+                    continue
+                self._local.move_to_end(topic_id)
+                found[topic_id] = context_ids
+        return found
+
+    def _set_local(self, entries: dict[int, frozenset[int]]) -> None:
+        if self.max_local_entries <= 0:
+            return
+        expires_at = time.monotonic() + self.local_ttl_seconds
+        with self._lock:
+            for topic_id, context_ids in entries.items():
+                self._local[topic_id] = (expires_at, context_ids)
+                self._local.move_to_end(topic_id)
+            while len(self._local) > self.max_local_entries:
+                self._local.popitem(last=False)
+
+    def _get_remote(
+        self, topic_ids: list[int]
+    ) -> tuple[dict[int, frozenset[int]], dict[int, str]]:
+        """Read cached sets, plus the current generation of every topic."""
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for topic_id in topic_ids:
+                pipe.smembers(topic_contexts_key(topic_id))
+                pipe.get(topic_generation_key(topic_id))
+            replies = pipe.execute()
+        except Exception as e:
+            logger.warning("Topic context cache read failed for %s: %s", topic_ids, e)
+            return {}, {}
+
+        members, generations = replies[::2], replies[1::2]
+        found = {
+            topic_id: frozenset(int(m) for m in values if m != _CACHED_MARKER)
+            for topic_id, values in zip(topic_ids, members, strict=True)
+            if values
+        }
+        return found, {
+            topic_id: generation or ""
+            for topic_id, generation in zip(topic_ids, generations, strict=True)
+        }
+
+    def _set_remote(
+        self, entries: dict[int, frozenset[int]], generations: dict[int, str]
+    ) -> set[int]:
+        """
+        Cache loaded sets whose generation has not moved since they were read.
+
+        Returns:
+            Topics invalidated while loading, whose sets were not cached
+        """
+        topic_ids = [topic_id for topic_id in entries if topic_id in generations]
+        if not topic_ids:
+            return set()
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for topic_id in topic_ids:
+                pipe.eval(
+                    _STORE_SCRIPT,
+                    2,
+                    topic_contexts_key(topic_id),
+                    topic_generation_key(topic_id),
+                    generations[topic_id],
+                    self.ttl_seconds,
+                    _CACHED_MARKER,
+                    *entries[topic_id],
+                )
+            stored = pipe.execute()
+        except Exception as e:
+            logger.warning(
+                "Topic context cache write failed for %s: %s", sorted(entries), e
+            )
+            return set()
+
+        return {
+            topic_id for topic_id, ok in zip(topic_ids, stored, strict=True) if not ok
+        }
+
+
+_cache: TopicContextCache | None = None
+
+
+def get_topic_context_cache() -> TopicContextCache:
+    """Return the process-wide topic context cache, creating it lazily."""
+    global _cache
+
+    if _cache is None:
+        _cache = TopicContextCache()
+    return _cache
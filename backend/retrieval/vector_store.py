@@ -0,0 +1,227 @@
+"""
+Vector store interface shared by the Qdrant and in-process NumPy backends.
+
+``VECTOR_STORE_BACKEND`` selects the implementation ``get_vector_store``
+returns. Both store one point per context item, with the payload built by
+``VectorStore.store_embedding``, and return search results as the same
+dictionaries. With ``RAG_HYBRID_SEARCH`` both also index each point's text
+for BM25 and fuse the lexical and vector rankings (see
+``backend.retrieval.lexical``).
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Any
+
+from sqlalchemy import select
+
+from backend.config import settings
+from backend.models import ContextItem
+from backend.models.associations import topic_context_association
+from backend.models.base import SessionLocal
+from backend.retrieval.tokens import chunk_token_count
+from backend.retrieval.topic_context_cache import get_topic_context_cache
+
+
+class VectorStore(ABC):
+    """Storage and filtered similarity search for context item embeddings."""
+
+    collection_name: str
+    vector_size: int
+
+    @abstractmethod
+    def create_collection(self) -> bool:
+        """
+        Create the collection if it does not exist yet.
+
+        Returns:
+            True if successful or already exists
+        """
+
+    @abstractmethod
+    def search_similar(
+        self,
+        query_embedding: list[float],
+        topic_ids: list[int],
+        limit: int = 5,
+        context_ids: list[int] | None = None,
+        query_text: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Search for similar context items by embedding.
+
+        Args:
+            query_embedding: Query vector
+            topic_ids: List of topic IDs to filter by
+            limit: Maximum number of results to return
+            context_ids: Context IDs already resolved for ``topic_ids``. When
+                given, or when ``QDRANT_TOPIC_PAYLOAD_FILTER`` is off, the
+                search filters on these (looked up when omitted) instead of
+                the points' ``topic_ids`` payload
+            query_text: Query text; with ``RAG_HYBRID_SEARCH`` its BM25
+                matches are fused with the vector matches
+
+        Returns:
+            List of search results with scores and metadata
+
+        Raises:
+            ValueError: If query_embedding is empty or topic_ids is empty
+        """
+
+    @abstractmethod
+    def search_similar_batch(
+        self,
+        query_embeddings: list[list[float]],
+        topic_ids_list: list[list[int]],
+        limit: int = 5,
+        query_texts: list[str] | None = None,
+    ) -> list[list[dict[str, Any]]]:
+        """
+        Search for several query embeddings at once.
+
+        Args:
+            query_embeddings: Query vectors
+            topic_ids_list: Topic IDs to filter by, one list per query vector
+            limit: Maximum number of results to return per query
+            query_texts: Query texts for hybrid search, one per query vector
+
+        Returns:
+            Search results for each query, in input order
+
+        Raises:
+            ValueError: If the inputs differ in length, or any embedding or
+                topic ID list is empty
+        """
+
+    @abstractmethod
+    def set_context_topics(
+        self, context_topics: dict[int, list[int]], batch_size: int = 256
+    ) -> None:
+        """
+        Rewrite the ``topic_ids`` payload of every point of the given contexts.
+
+        Args:
+            context_topics: Topic IDs for each context ID; an empty list hides
+                the context's points from every topic search
+            batch_size: Contexts updated per request to the store
+        """
+
+    @abstractmethod
+    def delete_embeddings(self, context_item_ids: list[int]) -> None:
+        """Delete the points of ``context_item_ids``; unknown IDs are ignored."""
+
+    @abstractmethod
+    def delete_context_embeddings(self, context_ids: list[int]) -> None:
+        """Delete every point belonging to ``context_ids``."""
+
+    @abstractmethod
+    def _upsert(
+        self, context_item_id: int, embedding: list[float], payload: dict[str, Any]
+    ) -> str:
+        """Insert or replace one point and return the store's operation ID."""
+
+    def store_embedding(
+        self,
+        context_item_id: int,
+        embedding: list[float],
+        metadata: dict[str, Any] | None = None,
+    ) -> str:
+        """
+        Store an embedding for a context item.
+
+        Args:
+            context_item_id: ID of the ContextItem
+            embedding: Vector embedding to store
+            metadata: Additional metadata to store with the vector
+
+        Returns:
+            Operation ID from the store
+
+        Raises:
+            ValueError: If context item doesn't exist or embedding is empty
+        """
+        if not embedding:
+            raise ValueError("Embedding cannot be empty")
+
+        # Verify context item exists
+        with SessionLocal() as session:
+            context_item = session.get(ContextItem, context_item_id)
+            if context_item is None:
+                raise ValueError(
+                    f"ContextItem with ID {context_item_id} does not exist"
+                )
+
+            context = context_item.context
+            payload = {
+                "context_item_id": context_item_id,
+                "title": context_item.title,
+                "content": context_item.content,
+                "context_id": context_item.context_id,
+                "topic_ids": sorted(t.id for t in context.topics) if context else [],
+                "context_type": context.context_type if context else "",
+                "token_count": chunk_token_count(
+                    context_item.title, context_item.content
+                ),
+            }
+
+        if metadata:
+            payload.update(metadata)
+
+        return self._upsert(context_item_id, embedding, payload)
+
+    def get_context_ids_for_topics(self, topic_ids: list[int]) -> list[int]:
+        """
+        Get context IDs for given topics through the shared topic context cache.
+
+        Args:
+            topic_ids: List of topic IDs
+
+        Returns:
+            List of context IDs
+        """
+        return get_topic_context_cache().resolve(topic_ids, self._load_topic_contexts)
+
+    @staticmethod
+    def _load_topic_contexts(topic_ids: list[int]) -> dict[int, set[int]]:
+        """Read the context IDs of ``topic_ids`` from the database."""
+        stmt = select(
+            topic_context_association.c.topic_id,
+            topic_context_association.c.context_id,
+        ).where(topic_context_association.c.topic_id.in_(topic_ids))
+
+        topic_contexts: dict[int, set[int]] = {}
+        with SessionLocal() as session:
+            for topic_id, context_id in session.execute(stmt):
+                if context_id:
+                    topic_contexts.setdefault(topic_id, set()).add(context_id)
+        return topic_contexts
+
+    def _filter_context_ids(
+        self, topic_ids: list[int], context_ids: list[int] | None
+    ) -> list[int] | None:
+        """
+        Context IDs a search for ``topic_ids`` is restricted to.
+
+        Returns:
+            None when the search should filter on the points' indexed
+            ``topic_ids`` payload instead; otherwise ``context_ids``, resolved
+            in SQL when not supplied
+        """
+        if context_ids is None and settings.QDRANT_TOPIC_PAYLOAD_FILTER:
+            return None
+        if context_ids is None:
+            context_ids = self.get_context_ids_for_topics(topic_ids)
+        return context_ids
+
+
+def get_vector_store() -> VectorStore:
+    """Build the vector store selected by ``VECTOR_STORE_BACKEND``."""
+    if settings.VECTOR_STORE_BACKEND == "numpy":
+        from backend.retrieval.numpy_store import NumpyVectorStore
+
+        return NumpyVectorStore()
+
+    from backend.retrieval.qdrant import QdrantService
+
+    return QdrantService()
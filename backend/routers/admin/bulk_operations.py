@@ -19,6 +19,8 @@ from backend.schemas.admin import (
     BulkUpdateSystemPromptRequest,
     BulkUpdateSystemPromptResponse,
 )
+from backend.services.cache_invalidation import invalidate_topic_caches
+from backend.services.topic_payloads import sync_context_topics
 
 router = APIRouter(prefix="/bulk", tags=["admin-bulk"])
 
@@ -57,6 +59,9 @@ async def bulk_assign_context_to_topic(
 
     db.commit()
 
+    invalidate_topic_caches([topic.id])
+    sync_context_topics(db, (context.id for context in contexts))
+
     return BulkAssignContextResponse(assigned_count=len(contexts), topic_id=topic.id)
 
 
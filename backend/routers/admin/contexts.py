@@ -23,6 +23,11 @@ from backend.schemas.admin import (
     ProcessingStatusResponse,
 )
 from backend.schemas.context import ContextItemOut
+from backend.services.cache_invalidation import invalidate_topic_caches
+from backend.services.topic_payloads import (
+    delete_context_points,
+    sync_context_topics,
+)
 from backend.tasks.embeddings import regenerate_embedding_task
 
 router = APIRouter(prefix="/contexts", tags=["Admin - Contexts"])
@@ -179,6 +184,8 @@ async def update_context(
             status_code=status.HTTP_404_NOT_FOUND, detail="Context not found"
         )
 
+    affected_topic_ids = {topic.id for topic in ctx.topics}
+
     if context_data.name is not None:
         ctx.name = context_data.name
     if context_data.description is not None:
@@ -193,6 +200,12 @@ async def update_context(
     db.commit()
     db.refresh(ctx)
 
+    if context_data.original_content is not None or context_data.topic_ids is not None:
+        affected_topic_ids.update(topic.id for topic in ctx.topics)
+        invalidate_topic_caches(affected_topic_ids)
+    if context_data.topic_ids is not None:
+        sync_context_topics(db, [ctx.id])
+
     actual_chunk_count = (
         db.query(ContextItem).filter(ContextItem.context_id == ctx.id).count()
     )
@@ -223,9 +236,14 @@ async def delete_context(
             status_code=status.HTTP_404_NOT_FOUND, detail="Context not found"
         )
 
+    affected_topic_ids = [topic.id for topic in ctx.topics]
+
     db.delete(ctx)
     db.commit()
 
+    invalidate_topic_caches(affected_topic_ids)
+    delete_context_points([id])
+
 
 @router.get("/{id}/items", response_model=list[ContextItemOut])
 async def get_context_items(
@@ -276,6 +294,8 @@ async def add_faq_qa(
     db.commit()
     db.refresh(qa_item)
 
+    invalidate_topic_caches(topic.id for topic in ctx.topics)
+
     return qa_item
 
 
@@ -314,6 +334,7 @@ async def update_context_item(
     db.refresh(item)
 
     if update_data.content is not None:
+        invalidate_topic_caches(topic.id for topic in ctx.topics)
         regenerate_embedding_task.delay(item.id)
 
     return item
@@ -20,6 +20,8 @@ from backend.schemas.admin import (
     AdminTopicUpdate,
     TopicListResponse,
 )
+from backend.services.cache_invalidation import invalidate_topic_caches
+from backend.services.topic_payloads import sync_context_topics
 
 router = APIRouter(prefix="/topics", tags=["Admin - Topics"])
 
@@ -147,6 +149,10 @@ async def create_topic(
     db.commit()
     db.refresh(topic)
 
+    if topic_data.context_ids:
+        invalidate_topic_caches([topic.id])
+        sync_context_topics(db, (context.id for context in topic.contexts))
+
     context_ids = list(
         db.scalars(
             select(topic_context_association.c.context_id).where(
@@ -206,7 +212,9 @@ async def update_topic(
         topic.system_prompt = topic_data.system_prompt
 
     # Update context associations
+    affected_context_ids: set[int] = set()
     if topic_data.context_ids is not None:
+        affected_context_ids.update(context.id for context in topic.contexts)
         contexts = (
             db.query(Context).filter(Context.id.in_(topic_data.context_ids)).all()
         )
@@ -215,6 +223,11 @@ async def update_topic(
     db.commit()
     db.refresh(topic)
 
+    if topic_data.context_ids is not None:
+        invalidate_topic_caches([topic.id])
+        affected_context_ids.update(context.id for context in topic.contexts)
+        sync_context_topics(db, affected_context_ids)
+
     context_ids = list(
         db.scalars(
             select(topic_context_association.c.context_id).where(
@@ -249,5 +262,10 @@ async def delete_topic(
             status_code=status.HTTP_404_NOT_FOUND, detail="Topic not found"
         )
 
+    affected_context_ids = [context.id for context in topic.contexts]
+
     db.delete(topic)
     db.commit()
+
+    invalidate_topic_caches([id])
+    sync_context_topics(db, affected_context_ids)
@@ -20,6 +20,8 @@ from backend.schemas.context import (
     ContextUpdate,
     FAQQACreate,
 )
+from backend.services.cache_invalidation import invalidate_topic_caches
+from backend.services.topic_payloads import delete_context_points
 
 logger = logging.getLogger(__name__)
 
@@ -281,6 +283,10 @@ def update_context_full(
 
     db.commit()
     db.refresh(context)
+
+    if data.original_content is not None:
+        invalidate_topic_caches(topic.id for topic in context.topics)
+
     return context
 
 
@@ -310,6 +316,10 @@ def update_context_partial(
 
     db.commit()
     db.refresh(context)
+
+    if data.original_content is not None:
+        invalidate_topic_caches(topic.id for topic in context.topics)
+
     return context
 
 
@@ -329,9 +339,14 @@ def delete_context(
     if not context:
         raise HTTPException(status_code=404, detail="Context not found")
 
+    affected_topic_ids = [topic.id for topic in context.topics]
+
     db.delete(context)
     db.commit()
 
+    invalidate_topic_caches(affected_topic_ids)
+    delete_context_points([context_id])
+
 
 @router.get("/contexts/{context_id}/items", response_model=list[ContextItemOut])
 def get_context_items(
@@ -390,6 +405,8 @@ def add_faq_qa(
     db.commit()
     db.refresh(qa_item)
 
+    invalidate_topic_caches(topic.id for topic in context.topics)
+
     return qa_item
 
 
@@ -428,6 +445,7 @@ def update_context_item(
     if data.content is not None:
         from backend.tasks.embeddings import regenerate_embedding_task
 
+        invalidate_topic_caches(topic.id for topic in context.topics)
         regenerate_embedding_task.delay(item.id)
 
     return item
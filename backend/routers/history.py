@@ -13,6 +13,7 @@ from backend.schemas.history import (
     QuestionHistoryCreate,
     QuestionHistoryOut,
 )
+from backend.services.session_memory import record_session_turn
 
 router = APIRouter()
 
@@ -43,6 +44,9 @@ def create_history(
     db.add(history)
     db.commit()
     db.refresh(history)
+    record_session_turn(
+        history.session_id, history.question, history.answer, history.id
+    )
     return history
 
 
@@ -3,49 +3,39 @@ FastAPI router for RAG question-answer endpoints.
 """
 
 import logging
-from typing import Annotated
+from typing import Annotated, Any
 
-import redis.asyncio as redis
 from fastapi import APIRouter, Depends, HTTPException, status
 
-from backend.dependencies.redis import get_redis
-from backend.schemas.rag import AnswerResponse, QuestionRequest
+from backend.dependencies.rag import get_rag_service
+from backend.schemas.rag import (
+    AnswerResponse,
+    BatchAnswerItem,
+    BatchAnswerResponse,
+    BatchQuestionRequest,
+    Citation,
+    QuestionRequest,
+)
 from backend.services.rag_service import AsyncRAGService
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
-async def get_rag_service(
-    redis_client: Annotated[redis.Redis, Depends(get_redis)],
-) -> AsyncRAGService:
-    """
-    Get RAG service instance with dependencies injected.
-
-    Args:
-        redis_client: Redis client for caching
-
-    Returns:
-        AsyncRAGService instance
-    """
-    import os
-
-    openai_api_key = os.getenv("OPENAI_API_KEY")
-    if not openai_api_key:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="OpenAI API key not configured",
+def _build_citations(sources: list[dict[str, Any]]) -> list[Citation]:
+    """Format RAG sources as citations with content previews."""
+    return [
+        Citation(
+            title=source["title"],
+            content=source["content"][:200] + "..."
+            if len(source["content"]) > 200
+            else source["content"],
+            score=source["score"],
+            context_type=source["context_type"],
+            context_item_id=source["context_item_id"],
         )
-
-    return AsyncRAGService(
-        redis_client=redis_client,
-        openai_api_key=openai_api_key,
-        openai_chat_model=os.getenv("OPENAI_CHAT_MODEL", "gpt-4o-mini"),
-        openai_chat_temperature=float(os.getenv("OPENAI_CHAT_TEMPERATURE", "0.3")),
-        openai_chat_max_tokens=int(os.getenv("OPENAI_CHAT_MAX_TOKENS", "1000")),
-        rag_search_limit=int(os.getenv("RAG_SEARCH_LIMIT", "10")),
-        rag_rerank_top_k=int(os.getenv("RAG_RERANK_TOP_K", "5")),
-    )
+        for source in sources
+    ]
 
 
 @router.post("/rag/ask", response_model=AnswerResponse)
@@ -64,7 +54,8 @@ async def ask_question(
         Answer with citations and topic_id
 
     Raises:
-        HTTPException: 400 for validation errors, 503 for service errors, 500 for internal errors
+        HTTPException: 400 for validation errors, 503 for service errors,
+            504 when the request deadline is exceeded, 500 for internal errors
     """
     try:
         result = await rag_service.query(
@@ -72,25 +63,9 @@ async def ask_question(
             topic_ids=[request.topic_id],
         )
 
-        # Format citations from sources
-        from backend.schemas.rag import Citation
-
-        citations = [
-            Citation(
-                title=source["title"],
-                content=source["content"][:200] + "..."
-                if len(source["content"]) > 200
-                else source["content"],
-                score=source["score"],
-                context_type=source["context_type"],
-                context_item_id=source["context_item_id"],
-            )
-            for source in result["sources"]
-        ]
-
         return AnswerResponse(
             answer=result["answer"],
-            citations=citations,
+            citations=_build_citations(result["sources"]),
             topic_id=request.topic_id,
         )
 
@@ -102,6 +77,14 @@ async def ask_question(
             detail="Invalid request parameters.",
         ) from e
 
+    except TimeoutError as e:
+        # A required stage could not finish within the request deadline
+        logger.error("RAG deadline exceeded: %s", str(e))
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="The question took too long to answer. Please try again.",
+        ) from e
+
     except ConnectionError as e:
         # Handle external service connection errors
         logger.error("RAG connection error: %s", str(e))
@@ -117,3 +100,68 @@ async def ask_question(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An error occurred while processing your question. Please try again.",
         ) from e
+
+
+@router.post("/rag/ask/batch", response_model=BatchAnswerResponse)
+async def ask_questions_batch(
+    request: BatchQuestionRequest,
+    rag_service: Annotated[AsyncRAGService, Depends(get_rag_service)],
+) -> BatchAnswerResponse:
+    """
+    Answer many questions in one request for evaluations and bulk pre-answering.
+
+    Embedding, vector search and reranking are batched across questions, and
+    answers are generated concurrently. A question that fails is reported in
+    its own ``error`` field without failing the rest of the batch.
+
+    Args:
+        request: Questions with their topic IDs
+        rag_service: RAG service instance
+
+    Returns:
+        One answer or error per question, in request order
+
+    Raises:
+        HTTPException: 503 for service errors, 500 for internal errors
+    """
+    try:
+        outcomes = await rag_service.query_batch(
+            [(item.question, [item.topic_id]) for item in request.questions]
+        )
+    except ConnectionError as e:
+        logger.error("RAG batch connection error: %s", str(e))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Unable to connect to external services. Please try again later.",
+        ) from e
+    except Exception as e:
+        logger.error("RAG batch pipeline error: %s", str(e), exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred while processing your questions. Please try again.",
+        ) from e
+
+    results = []
+    for item, outcome in zip(request.questions, outcomes, strict=True):
+        if isinstance(outcome, Exception):
+            if isinstance(outcome, ValueError):
+                error = "Invalid request parameters."
+            else:
+                logger.warning("RAG batch item failed: %s", str(outcome))
+                error = "An error occurred while processing this question."
+            results.append(
+                BatchAnswerItem(
+                    question=item.question, topic_id=item.topic_id, error=error
+                )
+            )
+        else:
+            results.append(
+                BatchAnswerItem(
+                    question=item.question,
+                    topic_id=item.topic_id,
+                    answer=outcome["answer"],
+                    citations=_build_citations(outcome["sources"]),
+                )
+            )
+
+    return BatchAnswerResponse(results=results)
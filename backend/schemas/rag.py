@@ -22,6 +22,17 @@ class QuestionRequest(BaseModel):
     question: str = Field(..., min_length=1, description="Question cannot be empty")
 
 
+class BatchQuestionRequest(BaseModel):
+    """Request schema for answering many questions in one call."""
+
+    questions: list[QuestionRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=100,
+        description="Questions to answer, at most 100 per request",
+    )
+
+
 class StreamQuestionRequest(BaseModel):
     """Request schema for streaming question."""
 
@@ -38,3 +49,19 @@ class AnswerResponse(BaseModel):
     answer: str
     citations: list[Citation]
     topic_id: int
+
+
+class BatchAnswerItem(BaseModel):
+    """Answer, or error, for one question of a batch request."""
+
+    question: str
+    topic_id: int
+    answer: str | None = None
+    citations: list[Citation] = Field(default_factory=list)
+    error: str | None = None
+
+
+class BatchAnswerResponse(BaseModel):
+    """Response schema for batch RAG answers, in request order."""
+
+    results: list[BatchAnswerItem]
@@ -0,0 +1,57 @@
+"""
+Invalidate cached RAG answers when topic content changes.
+
+Each affected topic's content version is bumped, which moves answer cache
+lookups to fresh keys, and the topic's semantic cache indexes and cached
+context IDs are dropped.
+
+Admin endpoints and ingestion tasks run synchronously, so invalidation uses a
+short-timeout synchronous Redis client and never raises: a Redis outage must
+not block content edits.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterable
+
+from backend.dependencies.redis import get_sync_redis_client
+from backend.retrieval.content_version import bump_content_versions
+from backend.retrieval.semantic_cache import (
+    results_key,
+    topic_members_key,
+    version_key,
+)
+from backend.retrieval.topic_context_cache import get_topic_context_cache
+
+logger = logging.getLogger(__name__)
+
+
+def invalidate_topic_caches(topic_ids: Iterable[int]) -> None:
+    """
+    Bump the content version of ``topic_ids``, drop semantic answer caches
+    for every topic set touching them, and drop their cached context IDs.
+
+    Args:
+        topic_ids: Topics whose contexts, items or embeddings changed
+    """
+    unique_ids = sorted(set(topic_ids))
+    if not unique_ids:
+        return
+
+    try:
+        get_topic_context_cache().invalidate(unique_ids)
+    except Exception as e:
+        logger.warning("Failed to invalidate topic contexts for %s: %s", unique_ids, e)
+
+    try:
+        client = get_sync_redis_client()
+        bump_content_versions(client, unique_ids)
+        for topic_id in unique_ids:
+            members = topic_members_key(topic_id)
+            keys = [members]
+            for key in client.smembers(members):
+                keys.extend([key, results_key(key), version_key(key)])
+            client.delete(*keys)
+    except Exception as e:
+        logger.warning("Failed to invalidate caches for topics %s: %s", unique_ids, e)
@@ -0,0 +1,69 @@
+"""
+Per-request latency budgets for the RAG pipeline.
+
+A ``Deadline`` is created when a request enters the pipeline and passed to
+each stage. Stages bound their waits by the remaining budget and record any
+degradation they chose (skipping rerank, fewer candidates, shorter answers) so
+the answer can be cached for less time and the decision is visible in traces.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Awaitable
+from dataclasses import dataclass, field
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a required pipeline stage cannot finish within the budget."""
+
+    def __init__(self, stage: str) -> None:
+        super().__init__(f"Deadline exceeded during {stage}")
+        self.stage = stage
+
+
+@dataclass
+class Deadline:
+    """Absolute monotonic deadline for one request, plus degradations taken."""
+
+    expires_at: float
+    degradations: list[str] = field(default_factory=list)
+
+    @classmethod
+    def after(cls, seconds: float) -> Deadline:
+        """Create a deadline ``seconds`` from now."""
+        return cls(expires_at=time.monotonic() + seconds)
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline, never negative."""
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    @property
+    def degraded(self) -> bool:
+        """Whether any stage traded quality for latency."""
+        return bool(self.degradations)
+
+    async def run[T](
+        self, stage: str, awaitable: Awaitable[T], reserve: float = 0.0
+    ) -> T:
+        """
+        Await ``awaitable`` for at most the remaining budget minus ``reserve``.
+
+        Args:
+            stage: Stage name used in the timeout error
+            awaitable: Work to bound
+            reserve: Seconds to leave for later stages
+
+        Returns:
+            The awaitable's result
+
+        Raises:
+            DeadlineExceeded: If the stage does not finish in time
+        """
+        try:
+            return await asyncio.wait_for(
+                awaitable, timeout=max(self.remaining() - reserve, 0.0)
+            )
+        except TimeoutError as e:
+            raise DeadlineExceeded(stage) from e
@@ -197,12 +197,12 @@ def generate_context_item_embedding(db: Session, context_item_id: int) -> bool:
 
     try:
         from backend.retrieval.embeddings import EmbeddingService
-        from backend.retrieval.qdrant import QdrantService
+        from backend.retrieval.vector_store import get_vector_store
 
         embedding_service = EmbeddingService()
-        qdrant_service = QdrantService()
+        vector_store = get_vector_store()
 
-        qdrant_service.create_collection()
+        vector_store.create_collection()
 
         embedding = embedding_service.generate_embedding(context_item.content)
 
@@ -219,7 +219,7 @@ def generate_context_item_embedding(db: Session, context_item_id: int) -> bool:
             else {}
         )
 
-        qdrant_service.store_embedding(
+        vector_store.store_embedding(
             context_item_id=context_item.id,
             embedding=embedding,
             metadata={
@@ -228,6 +228,12 @@ def generate_context_item_embedding(db: Session, context_item_id: int) -> bool:
             },
         )
 
+        from backend.services.cache_invalidation import invalidate_topic_caches
+
+        context = context_item.context
+        if context is not None:
+            invalidate_topic_caches(topic.id for topic in context.topics)
+
         logger.info(
             f"Successfully generated embedding for ContextItem {context_item_id}"
         )
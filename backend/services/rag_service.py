@@ -8,28 +8,54 @@ from __future__ import annotations
 
 import asyncio
 import hashlib
+import inspect
 import json
 import logging
 import time
-from collections.abc import AsyncGenerator
-from typing import Any
+from collections.abc import AsyncGenerator, Awaitable, Callable, Coroutine
+from typing import Any, cast
 
 import redis.asyncio as redis
-from openai import AsyncOpenAI
-from sqlalchemy.orm import Session
+from opentelemetry import trace
+from opentelemetry.trace import Span
 
+from backend.config import settings
+from backend.dependencies.openai_client import create_async_openai_client
 from backend.models.base import get_db
 from backend.models.history import QuestionHistory
 from backend.observability import get_meter, get_tracer
-from backend.retrieval.embeddings import EmbeddingService
+from backend.retrieval.codec import decode_answer, encode_answer
+from backend.retrieval.content_version import load_content_versions
+from backend.retrieval.embeddings import AsyncEmbeddingService, EmbeddingService
 from backend.retrieval.monitoring import OpenAIUsageMonitor
-from backend.retrieval.qdrant import QdrantService
+from backend.retrieval.qdrant import AsyncQdrantService
+from backend.retrieval.rerank_policy import RerankPlan, apply_score_floor, plan_rerank
+from backend.retrieval.rerank_scheduler import RerankScheduler
 from backend.retrieval.reranking import RerankingService
+from backend.retrieval.semantic_cache import SemanticAnswerCache
+from backend.retrieval.tokens import count_tokens, pack_context
+from backend.retrieval.vector_store import VectorStore, get_vector_store
+from backend.services.deadline import Deadline, DeadlineExceeded
+from backend.services.session_memory import SessionHistory, SessionMemory
+from backend.services.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 tracer = get_tracer(__name__)
 meter = get_meter(__name__)
 
+SYSTEM_PROMPT = (
+    "You are a helpful assistant that provides accurate answers based on the "
+    "given context."
+)
+ANSWER_INSTRUCTIONS = (
+    "Please provide a comprehensive answer based on the context above. If the "
+    "context doesn't contain enough information to fully answer the question, "
+    "acknowledge this in your response. Include relevant details from the sources "
+    "where appropriate."
+)
+# Role markers, section headings and the preamble line around the prompt parts
+PROMPT_FRAMING_TOKENS = 48
+
 
 class AsyncRAGService:
     """Async RAG query pipeline service."""
@@ -43,14 +69,32 @@ class AsyncRAGService:
         openai_chat_max_tokens: int = 1000,
         rag_search_limit: int = 10,
         rag_rerank_top_k: int = 5,
+        embedding_service: EmbeddingService | AsyncEmbeddingService | None = None,
+        qdrant_service: VectorStore | AsyncQdrantService | None = None,
+        reranking_service: RerankingService | None = None,
+        semantic_cache: SemanticAnswerCache | None = None,
+        rerank_scheduler: RerankScheduler | None = None,
     ) -> None:
         self.redis_client = redis_client
-        self.embedding_service = EmbeddingService()
-        self.qdrant_service = QdrantService()
-        self.qdrant_service.create_collection()
-        self.reranking_service = RerankingService()
-        self.chat_client = AsyncOpenAI(api_key=openai_api_key)
+        self.embedding_service = embedding_service or EmbeddingService()
+        if qdrant_service is None:
+            qdrant_service = get_vector_store()
+            qdrant_service.create_collection()
+        self.qdrant_service = qdrant_service
+        self.reranking_service = reranking_service or RerankingService()
+        if rerank_scheduler is None and settings.RERANKER_MICROBATCH_ENABLED:
+            rerank_scheduler = RerankScheduler(self.reranking_service)
+        self.rerank_scheduler = rerank_scheduler
+        self.chat_client = create_async_openai_client(openai_api_key)
         self.monitor = OpenAIUsageMonitor()
+        if semantic_cache is None and settings.RAG_SEMANTIC_CACHE_ENABLED:
+            semantic_cache = SemanticAnswerCache(
+                redis_client,
+                threshold=settings.RAG_SEMANTIC_CACHE_THRESHOLD,
+                max_entries=settings.RAG_SEMANTIC_CACHE_MAX_ENTRIES,
+                ttl_seconds=settings.RAG_SEMANTIC_CACHE_TTL_SECONDS,
+            )
+        self.semantic_cache = semantic_cache
 
         self.openai_chat_model = openai_chat_model
         self.openai_chat_temperature = openai_chat_temperature
@@ -75,31 +119,166 @@ class AsyncRAGService:
             name="rag.openai.tokens",
             description="Total number of OpenAI tokens used",
         )
+        self._stale_served_counter = meter.create_counter(
+            name="rag.query.cache.stale_served",
+            description="Cached answers served stale while a refresh runs",
+        )
+        self._degraded_counter = meter.create_counter(
+            name="rag.query.degraded",
+            description="Pipeline stages degraded to stay within the request deadline",
+        )
+        self._rerank_skipped_counter = meter.create_counter(
+            name="rag.rerank.skipped",
+            description="Reranks skipped because the vector scores already decide the order",
+        )
+        self._rerank_pruned_counter = meter.create_counter(
+            name="rag.rerank.pruned",
+            description="Candidates dropped before reranking by the adaptive policy",
+        )
+        self._stream_replays_counter = meter.create_counter(
+            name="rag.stream.cache.replays",
+            description="Streaming answers replayed from the answer cache",
+        )
+
+        self.session_memory = SessionMemory(
+            redis_client,
+            self.chat_client,
+            openai_chat_model,
+            max_turns=settings.RAG_SESSION_HISTORY_TURNS,
+            ttl_seconds=settings.RAG_SESSION_MEMORY_TTL_SECONDS,
+            summary_max_tokens=settings.RAG_SESSION_SUMMARY_MAX_TOKENS,
+            monitor=self.monitor,
+        )
+
+        self._single_flight = SingleFlight(
+            redis_client, lease_seconds=settings.RAG_SINGLEFLIGHT_LEASE_SECONDS
+        )
+        self._refresh_tasks: dict[str, asyncio.Task[None]] = {}
 
     def _get_query_cache_key(
-        self, query: str, topic_ids: list[int], limit: int, rerank_top_k: int
+        self,
+        query: str,
+        topic_ids: list[int],
+        limit: int,
+        rerank_top_k: int,
+        conversation_history: str = "",
+        content_versions: dict[int, int] | None = None,
     ) -> str:
-        """Generate a cache key for a query combination."""
-        cache_data = {
+        """
+        Generate a cache key for a query combination.
+
+        Questions asked without conversation history share keys between the
+        streaming and non-streaming endpoints; history-dependent answers are
+        keyed by a digest of the history they were generated with. The content
+        version of each topic is part of the key, so editing a topic's content
+        makes its earlier answers unreachable.
+        """
+        unique_topic_ids = sorted(set(topic_ids))
+        versions = content_versions or {}
+        cache_data: dict[str, Any] = {
             "query": query.strip().lower(),
             "topic_ids": sorted(topic_ids),
             "limit": limit,
             "rerank_top_k": rerank_top_k,
+            "content_versions": [versions.get(t, 0) for t in unique_topic_ids],
         }
+        if conversation_history:
+            cache_data["history"] = hashlib.sha256(
+                conversation_history.encode()
+            ).hexdigest()
         cache_string = json.dumps(cache_data, sort_keys=True)
         cache_hash = hashlib.md5(cache_string.encode()).hexdigest()
         return f"rag_query:{cache_hash}"
 
-    async def _get_cached_result(self, cache_key: str) -> dict[str, Any] | None:
-        """Get cached query result."""
+    async def _get_cached_entry(
+        self, cache_key: str
+    ) -> tuple[dict[str, Any], bool] | None:
+        """Get cached query result and whether it is past its freshness window."""
         cached = await self.redis_client.get(cache_key)
-        if cached:
-            return json.loads(cached)
-        return None
+        if not cached:
+            return None
+
+        payload = decode_answer(cached)
+        if payload is None:
+            return None
+        if (
+            isinstance(payload, dict)
+            and "fresh_until" in payload
+            and "result" in payload
+        ):
+            return payload["result"], time.time() >= payload["fresh_until"]
+
+        # Entries written before stale-while-revalidate are plain results.
+        return payload, False
+
+    async def _get_cached_result(self, cache_key: str) -> dict[str, Any] | None:
+        """Get cached query result, fresh or stale."""
+        entry = await self._get_cached_entry(cache_key)
+        return entry[0] if entry is not None else None
 
-    async def _cache_result(self, cache_key: str, result: dict[str, Any]) -> None:
-        """Cache query result for 15 minutes."""
-        await self.redis_client.set(cache_key, json.dumps(result), ex=900)
+    async def _cache_result(
+        self, cache_key: str, result: dict[str, Any], ttl: int | None = None
+    ) -> None:
+        """Cache query result, keeping it servable as stale after ``ttl`` expires."""
+        fresh_ttl = ttl if ttl is not None else settings.RAG_CACHE_TTL_SECONDS
+        envelope = {"result": result, "fresh_until": time.time() + fresh_ttl}
+        await self.redis_client.set(
+            cache_key,
+            encode_answer(envelope),
+            ex=fresh_ttl + settings.RAG_CACHE_STALE_TTL_SECONDS,
+        )
+
+    def _schedule_refresh(
+        self,
+        cache_key: str,
+        query: str,
+        topic_ids: list[int],
+        limit: int,
+        rerank_top_k: int,
+    ) -> None:
+        """Start one background refresh for a stale cache entry."""
+        if cache_key in self._refresh_tasks:
+            return
+
+        task = asyncio.create_task(
+            self._refresh_cached_result(
+                cache_key, query, topic_ids, limit, rerank_top_k
+            )
+        )
+        self._refresh_tasks[cache_key] = task
+        task.add_done_callback(lambda _: self._refresh_tasks.pop(cache_key, None))
+
+    async def _refresh_cached_result(
+        self,
+        cache_key: str,
+        query: str,
+        topic_ids: list[int],
+        limit: int,
+        rerank_top_k: int,
+    ) -> None:
+        """Re-run the pipeline for a stale entry unless another worker already is."""
+        token = await self._single_flight.try_acquire(cache_key)
+        if token is None:
+            return
+
+        try:
+            with tracer.start_as_current_span("rag.query.refresh") as span:
+                content_versions = await load_content_versions(
+                    self.redis_client, topic_ids
+                )
+                await self._run_query_pipeline(
+                    span,
+                    cache_key,
+                    query,
+                    topic_ids,
+                    limit,
+                    rerank_top_k,
+                    content_versions=content_versions,
+                )
+        except Exception as e:
+            logger.warning("Background refresh of %s failed: %s", cache_key, e)
+        finally:
+            await self._single_flight.release(cache_key, token)
 
     async def query(
         self,
@@ -111,6 +290,10 @@ class AsyncRAGService:
         """
         Execute a complete RAG query pipeline with caching.
 
+        Stale cache entries are served immediately while a single background
+        refresh repopulates them, and concurrent misses for the same key share
+        one pipeline execution.
+
         Args:
             query: User's question
             topic_ids: List of topic IDs to search within
@@ -144,96 +327,654 @@ class AsyncRAGService:
                 span.set_attribute("rerank.top_k", rerank_top_k)
 
                 # Check cache first
+                content_versions = await load_content_versions(
+                    self.redis_client, topic_ids
+                )
                 cache_key = self._get_query_cache_key(
-                    query, topic_ids, limit, rerank_top_k
+                    query,
+                    topic_ids,
+                    limit,
+                    rerank_top_k,
+                    content_versions=content_versions,
                 )
-                cached_result = await self._get_cached_result(cache_key)
-                if cached_result is not None:
+                cached_entry = await self._get_cached_entry(cache_key)
+                if cached_entry is not None:
+                    cached_result, is_stale = cached_entry
                     span.set_attribute("cache.hit", True)
+                    span.set_attribute("cache.stale", is_stale)
+                    if is_stale:
+                        self._stale_served_counter.add(1)
+                        self._schedule_refresh(
+                            cache_key, query, topic_ids, limit, rerank_top_k
+                        )
                     return cached_result
 
                 span.set_attribute("cache.hit", False)
 
-                # Step 1: Generate embedding for the query (blocking, but fast)
-                query_embedding = await asyncio.to_thread(
-                    self.embedding_service.generate_embedding, query
+                question = query
+                deadline = self._new_deadline()
+                return await self._single_flight.run(
+                    cache_key,
+                    compute=lambda: self._run_query_pipeline(
+                        span,
+                        cache_key,
+                        question,
+                        topic_ids,
+                        limit,
+                        rerank_top_k,
+                        deadline,
+                        content_versions,
+                    ),
+                    lookup=lambda: self._get_cached_result(cache_key),
                 )
 
-                # Step 2: Search for similar context items in Qdrant (SQLAlchemy-backed lookups)
-                search_results = await asyncio.to_thread(
-                    self.qdrant_service.search_similar,
-                    query_embedding=query_embedding,
-                    topic_ids=topic_ids,
-                    limit=limit,
-                )
+            except Exception:
+                self._query_errors_counter.add(1, {"stage": "query"})
+                raise
+            finally:
+                duration = time.perf_counter() - start_time
+                self._query_duration_histogram.record(duration)
 
-                self._vector_search_results_histogram.record(len(search_results))
+    async def _run_query_pipeline(
+        self,
+        span: Span,
+        cache_key: str,
+        query: str,
+        topic_ids: list[int],
+        limit: int,
+        rerank_top_k: int,
+        deadline: Deadline | None = None,
+        content_versions: dict[int, int] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Run embedding, search, rerank and generation, then cache the result.
 
-                # If no results found, return empty response
-                if not search_results:
-                    span.set_attribute("results.count", 0)
-                    result = {
-                        "answer": "I couldn't find any relevant information for your question in the selected topics.",
-                        "sources": [],
-                        "context_items": [],
-                    }
-                    # Cache empty results for shorter duration (5 minutes)
-                    await self.redis_client.set(cache_key, json.dumps(result), ex=300)
-                    return result
-
-                # Step 3: Rerank results using BGE reranker (blocking, ML model)
-                reranked_results = await asyncio.to_thread(
-                    self.reranking_service.rerank_results,
-                    query=query,
-                    search_results=search_results,
-                    top_k=rerank_top_k,
-                )
+        With a ``deadline``, every stage is bounded by the remaining budget and
+        may degrade (see ``_search``, ``_rerank`` and ``_generation_max_tokens``)
+        instead of overrunning it. ``content_versions`` are the topic versions
+        the cache key was built from; semantic cache entries are scoped to them.
+        """
+        # Step 1: Generate embedding for the query (blocking, but fast)
+        query_embedding = await self._within(
+            deadline,
+            "embedding",
+            self._embed(query),
+        )
 
-                span.set_attribute("results.count", len(reranked_results))
+        # Paraphrases of an already answered question skip rerank and the LLM
+        if self.semantic_cache is not None:
+            semantic_result = await self.semantic_cache.lookup(
+                topic_ids, query_embedding, limit, rerank_top_k, content_versions
+            )
+            span.set_attribute("semantic_cache.hit", semantic_result is not None)
+            if semantic_result is not None:
+                await self._cache_result(cache_key, semantic_result)
+                return semantic_result
+
+        # Step 2: Search for similar context items in Qdrant (SQLAlchemy-backed lookups)
+        search_results = await self._search(
+            query_embedding, topic_ids, limit, rerank_top_k, deadline, query_text=query
+        )
 
-                # Step 4: Prepare context for the LLM
-                context_text = self._prepare_context(reranked_results)
+        # If no results found, return empty response
+        if not search_results:
+            span.set_attribute("results.count", 0)
+            return await self._cache_empty_result(cache_key)
 
-                # Step 5: Generate answer using OpenAI
-                answer, usage = await self._generate_answer(query, context_text)
+        # Step 3: Rerank results using BGE reranker (blocking, ML model)
+        reranked_results = await self._rerank(
+            query, search_results, rerank_top_k, deadline
+        )
 
-                if usage:
-                    self._openai_tokens_counter.add(
-                        usage.get("prompt_tokens", 0), {"type": "prompt"}
-                    )
-                    self._openai_tokens_counter.add(
-                        usage.get("completion_tokens", 0), {"type": "completion"}
-                    )
+        span.set_attribute("results.count", len(reranked_results))
+
+        return await self._answer_and_cache(
+            cache_key,
+            query,
+            topic_ids,
+            query_embedding,
+            limit,
+            rerank_top_k,
+            reranked_results,
+            deadline,
+            content_versions,
+        )
 
-                # Step 6: Format response
-                sources = [
-                    {
-                        "title": result["title"],
-                        "content": result["content"],
-                        "score": result.get("rerank_score", result.get("score", 0.0)),
-                        "context_type": result.get("context_type", ""),
-                        "context_item_id": result["context_item_id"],
-                    }
-                    for result in reranked_results
-                ]
+    def _new_deadline(self) -> Deadline | None:
+        """Start the latency budget for a request, or None when disabled."""
+        if settings.RAG_REQUEST_TIMEOUT_SECONDS <= 0:
+            return None
+        return Deadline.after(settings.RAG_REQUEST_TIMEOUT_SECONDS)
 
-                final_result: dict[str, Any] = {
-                    "answer": answer,
-                    "sources": sources,
-                    "context_items": reranked_results,
-                }
+    async def _within[T](
+        self,
+        deadline: Deadline | None,
+        stage: str,
+        awaitable: Awaitable[T],
+        reserve: float = 0.0,
+    ) -> T:
+        """Await a stage, bounded by the deadline when there is one."""
+        if deadline is None:
+            return await awaitable
+        return await deadline.run(stage, awaitable, reserve=reserve)
+
+    def _degrade(self, deadline: Deadline, mode: str) -> None:
+        """Record that a stage traded answer quality for latency."""
+        deadline.degradations.append(mode)
+        self._degraded_counter.add(1, {"mode": mode})
+        span = trace.get_current_span()
+        span.set_attribute("deadline.degraded", list(deadline.degradations))
+        span.set_attribute("deadline.remaining_ms", int(deadline.remaining() * 1000))
+
+    async def _embed(self, text: str) -> list[float]:
+        """Embed ``text`` natively when the service is async, else in a thread."""
+        generate = self.embedding_service.generate_embedding
+        if inspect.iscoroutinefunction(generate):
+            return await generate(text)
+        # Coroutine functions returned above, so this one is synchronous
+        generate_sync = cast(Callable[[str], list[float]], generate)
+        return await asyncio.to_thread(generate_sync, text)
+
+    async def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """Embed ``texts`` in one request, natively when the service is async."""
+        generate = self.embedding_service.generate_embeddings_batch
+        if inspect.iscoroutinefunction(generate):
+            return await generate(texts)
+        generate_sync = cast(Callable[[list[str]], list[list[float]]], generate)
+        return await asyncio.to_thread(generate_sync, texts)
+
+    async def _search_vectors(
+        self, search_kwargs: dict[str, Any]
+    ) -> list[dict[str, Any]]:
+        """Search Qdrant natively when the service is async, else in a thread."""
+        store = self.qdrant_service
+        if isinstance(store, AsyncQdrantService):
+            return await store.search_similar(**search_kwargs)
+        return await asyncio.to_thread(store.search_similar, **search_kwargs)
+
+    async def _search_vectors_batch(
+        self,
+        query_embeddings: list[list[float]],
+        topic_ids_list: list[list[int]],
+        limit: int,
+        query_texts: list[str] | None = None,
+    ) -> list[list[dict[str, Any]]]:
+        """Batch-search Qdrant natively when the service is async."""
+        store = self.qdrant_service
+        kwargs: dict[str, Any] = {}
+        if settings.RAG_HYBRID_SEARCH and query_texts is not None:
+            kwargs["query_texts"] = query_texts
+        if isinstance(store, AsyncQdrantService):
+            return await store.search_similar_batch(
+                query_embeddings, topic_ids_list, limit, **kwargs
+            )
+        return await asyncio.to_thread(
+            store.search_similar_batch,
+            query_embeddings,
+            topic_ids_list,
+            limit,
+            **kwargs,
+        )
+
+    def _rerank_affordable(self, deadline: Deadline | None) -> bool:
+        """Whether the budget leaves room to rerank and still generate an answer."""
+        return deadline is None or deadline.remaining() >= (
+            settings.RAG_DEADLINE_RERANK_MIN_SECONDS
+            + settings.RAG_DEADLINE_GENERATION_RESERVE_SECONDS
+        )
+
+    async def _search(
+        self,
+        query_embedding: list[float],
+        topic_ids: list[int],
+        limit: int,
+        rerank_top_k: int,
+        deadline: Deadline | None,
+        context_ids: list[int] | None = None,
+        query_text: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Search Qdrant within the deadline.
+
+        When reranking will not be affordable, only ``rerank_top_k`` candidates
+        are fetched since vector order decides the final results anyway.
+        ``query_text`` is only sent to the store with ``RAG_HYBRID_SEARCH``.
+        """
+        if deadline is not None and limit > rerank_top_k:
+            if not self._rerank_affordable(deadline):
+                limit = rerank_top_k
+                self._degrade(deadline, "reduced_limit")
+
+        search_kwargs: dict[str, Any] = {
+            "query_embedding": query_embedding,
+            "topic_ids": topic_ids,
+            "limit": limit,
+        }
+        if context_ids is not None:
+            search_kwargs["context_ids"] = context_ids
+        if settings.RAG_HYBRID_SEARCH and query_text:
+            search_kwargs["query_text"] = query_text
+
+        search_results = await self._within(
+            deadline,
+            "vector_search",
+            self._search_vectors(search_kwargs),
+        )
+        self._vector_search_results_histogram.record(len(search_results))
+        return self._apply_score_floor(search_results)
+
+    def _apply_score_floor(
+        self, search_results: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """Drop candidates below ``RAG_RERANK_SCORE_FLOOR`` before reranking."""
+        if not settings.RAG_ADAPTIVE_RERANK_ENABLED:
+            return search_results
+
+        kept = apply_score_floor(search_results)
+        if len(kept) < len(search_results):
+            self._rerank_pruned_counter.add(
+                len(search_results) - len(kept), {"reason": "score_floor"}
+            )
+        return kept
+
+    def _plan_rerank(self, search_results: list[dict[str, Any]]) -> RerankPlan:
+        """Apply the adaptive rerank policy and record its decision."""
+        if not settings.RAG_ADAPTIVE_RERANK_ENABLED:
+            return RerankPlan(candidates=search_results)
+
+        plan = plan_rerank(search_results)
+        span = trace.get_current_span()
+        span.set_attribute("rerank.policy", plan.skip_reason or "rerank")
+        span.set_attribute("rerank.candidates", len(plan.candidates))
+        if plan.pruned:
+            self._rerank_pruned_counter.add(plan.pruned, {"reason": "score_gap"})
+        if plan.skip_reason is not None:
+            self._rerank_skipped_counter.add(1, {"reason": plan.skip_reason})
+        return plan
+
+    async def _rerank(
+        self,
+        query: str,
+        search_results: list[dict[str, Any]],
+        rerank_top_k: int,
+        deadline: Deadline | None,
+    ) -> list[dict[str, Any]]:
+        """
+        Rerank search results, falling back to vector order when reranking is
+        pointless or unaffordable.
+
+        The adaptive policy (``_plan_rerank``) skips the cross-encoder when one
+        candidate dominates and prunes candidates below a large score gap.
+        Under deadline pressure reranking is skipped when the remaining budget
+        is below ``RAG_DEADLINE_RERANK_MIN_SECONDS`` plus the generation
+        reserve, and abandoned if it would eat into the generation reserve.
+        With a ``rerank_scheduler`` the cross-encoder call is shared with
+        concurrent requests.
+        """
+        plan = self._plan_rerank(search_results)
+        search_results = plan.candidates
+        if plan.skip:
+            return search_results[:rerank_top_k]
+
+        rerank: Coroutine[Any, Any, list[dict[str, Any]]]
+        if self.rerank_scheduler is not None:
+            rerank = self.rerank_scheduler.rerank_results(
+                query=query, search_results=search_results, top_k=rerank_top_k
+            )
+        else:
+            rerank = asyncio.to_thread(
+                self.reranking_service.rerank_results,
+                query=query,
+                search_results=search_results,
+                top_k=rerank_top_k,
+            )
+        if deadline is None:
+            return await rerank
+
+        if not self._rerank_affordable(deadline):
+            rerank.close()
+            self._degrade(deadline, "rerank_skipped")
+            return search_results[:rerank_top_k]
+
+        try:
+            return await deadline.run(
+                "rerank",
+                rerank,
+                reserve=settings.RAG_DEADLINE_GENERATION_RESERVE_SECONDS,
+            )
+        except DeadlineExceeded:
+            self._degrade(deadline, "rerank_timeout")
+            return search_results[:rerank_top_k]
+
+    def _generation_max_tokens(self, deadline: Deadline | None) -> int:
+        """Cap the completion length to what the remaining budget can stream."""
+        if deadline is None:
+            return self.openai_chat_max_tokens
+
+        affordable = int(
+            deadline.remaining() * settings.RAG_DEADLINE_GENERATION_TOKENS_PER_SECOND
+        )
+        if affordable >= self.openai_chat_max_tokens:
+            return self.openai_chat_max_tokens
+
+        self._degrade(deadline, "max_tokens_capped")
+        return max(affordable, settings.RAG_DEADLINE_MIN_COMPLETION_TOKENS)
+
+    async def _cache_empty_result(self, cache_key: str) -> dict[str, Any]:
+        """Cache the no-results answer for a shorter duration and return it."""
+        result: dict[str, Any] = {
+            "answer": "I couldn't find any relevant information for your question in the selected topics.",
+            "sources": [],
+            "context_items": [],
+        }
+        await self._cache_result(
+            cache_key, result, ttl=settings.RAG_CACHE_EMPTY_TTL_SECONDS
+        )
+        return result
+
+    async def _answer_and_cache(
+        self,
+        cache_key: str,
+        query: str,
+        topic_ids: list[int],
+        query_embedding: list[float],
+        limit: int,
+        rerank_top_k: int,
+        reranked_results: list[dict[str, Any]],
+        deadline: Deadline | None = None,
+        content_versions: dict[int, int] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Generate an answer from reranked results, then cache the result.
+
+        Answers produced in a degraded mode are cached only briefly and kept
+        out of the semantic cache, so full-quality answers replace them soon.
+        """
+        # Step 4: Pack the best chunks into the prompt token budget
+        context_items = self._pack_context(reranked_results, query)
+        context_text = self._prepare_context(context_items)
+
+        # Step 5: Generate answer using OpenAI
+        max_tokens = self._generation_max_tokens(deadline)
+        answer, usage = await self._within(
+            deadline,
+            "generation",
+            self._generate_answer(query, context_text, max_tokens=max_tokens),
+        )
+
+        if usage:
+            self._openai_tokens_counter.add(
+                usage.get("prompt_tokens", 0), {"type": "prompt"}
+            )
+            self._openai_tokens_counter.add(
+                usage.get("completion_tokens", 0), {"type": "completion"}
+            )
+
+        # Step 6: Format response
+        sources = self._format_sources(context_items)
+
+        final_result: dict[str, Any] = {
+            "answer": answer,
+            "sources": sources,
+            "context_items": context_items,
+        }
+
+        # Cache the result
+        if deadline is not None and deadline.degraded:
+            await self._cache_result(
+                cache_key, final_result, ttl=settings.RAG_CACHE_EMPTY_TTL_SECONDS
+            )
+            return final_result
+
+        await self._cache_result(cache_key, final_result)
+        if self.semantic_cache is not None:
+            await self.semantic_cache.store(
+                topic_ids,
+                query,
+                query_embedding,
+                limit,
+                rerank_top_k,
+                final_result,
+                content_versions,
+            )
+
+        return final_result
+
+    async def query_batch(
+        self,
+        questions: list[tuple[str, list[int]]],
+        limit: int | None = None,
+        rerank_top_k: int | None = None,
+    ) -> list[dict[str, Any] | Exception]:
+        """
+        Answer many questions, batching each pipeline stage across them.
 
-                # Cache the result
-                await self._cache_result(cache_key, final_result)
+        Cache misses are embedded in one ``generate_embeddings_batch`` call,
+        searched in one Qdrant batch request and reranked in one cross-encoder
+        call; answer generation runs concurrently up to
+        ``RAG_BATCH_LLM_CONCURRENCY``. Stale cache entries are recomputed so bulk
+        pre-answer jobs leave the cache fresh.
 
-                return final_result
+        Args:
+            questions: (question, topic_ids) pairs
+            limit: Maximum number of initial search results per question
+            rerank_top_k: Maximum number of results after reranking
+
+        Returns:
+            One result per question, in input order; questions that failed
+            validation or answer generation hold the raised exception instead
+        """
+        start_time = time.perf_counter()
+        with tracer.start_as_current_span("rag.query_batch") as span:
+            try:
+                limit = limit if limit is not None else self.rag_search_limit
+                rerank_top_k = (
+                    rerank_top_k if rerank_top_k is not None else self.rag_rerank_top_k
+                )
+                span.set_attribute("batch.size", len(questions))
+
+                results: list[dict[str, Any] | Exception | None] = [None] * len(
+                    questions
+                )
+                content_versions = await load_content_versions(
+                    self.redis_client,
+                    (topic_id for _, topic_ids in questions for topic_id in topic_ids),
+                )
+                # Identical questions in one batch are answered once
+                pending: dict[str, list[int]] = {}
+                for index, (query, topic_ids) in enumerate(questions):
+                    if not query or not query.strip():
+                        results[index] = ValueError("Query cannot be None or empty")
+                    elif not topic_ids:
+                        results[index] = ValueError("Topic IDs cannot be empty")
+                    else:
+                        cache_key = self._get_query_cache_key(
+                            query,
+                            topic_ids,
+                            limit,
+                            rerank_top_k,
+                            content_versions=content_versions,
+                        )
+                        pending.setdefault(cache_key, []).append(index)
+
+                cache_keys = list(pending)
+                entries = await asyncio.gather(
+                    *(self._get_cached_entry(key) for key in cache_keys)
+                )
+                misses: list[tuple[str, str, list[int]]] = []
+                for cache_key, entry in zip(cache_keys, entries, strict=True):
+                    if entry is not None and not entry[1]:
+                        for index in pending[cache_key]:
+                            results[index] = entry[0]
+                    else:
+                        query, topic_ids = questions[pending[cache_key][0]]
+                        misses.append((cache_key, query, topic_ids))
+
+                span.set_attribute("cache.hits", len(cache_keys) - len(misses))
+
+                if misses:
+                    outcomes = await self._run_batch_pipeline(
+                        misses, limit, rerank_top_k, content_versions
+                    )
+                    for (cache_key, _, _), outcome in zip(
+                        misses, outcomes, strict=True
+                    ):
+                        for index in pending[cache_key]:
+                            results[index] = outcome
+
+                failures = sum(isinstance(r, Exception) for r in results)
+                span.set_attribute("batch.failures", failures)
+                if failures:
+                    self._query_errors_counter.add(failures, {"stage": "batch"})
+
+                # Every slot is filled: validation error, cache hit or outcome
+                return cast(list[dict[str, Any] | Exception], results)
 
             except Exception:
-                self._query_errors_counter.add(1, {"stage": "query"})
+                self._query_errors_counter.add(1, {"stage": "batch"})
                 raise
             finally:
                 duration = time.perf_counter() - start_time
-                self._query_duration_histogram.record(duration)
+                self._query_duration_histogram.record(duration, {"mode": "batch"})
+
+    async def _run_batch_pipeline(
+        self,
+        misses: list[tuple[str, str, list[int]]],
+        limit: int,
+        rerank_top_k: int,
+        content_versions: dict[int, int] | None = None,
+    ) -> list[dict[str, Any] | Exception]:
+        """Run each pipeline stage once for all cache misses in a batch."""
+        outcomes: list[dict[str, Any] | Exception | None] = [None] * len(misses)
+
+        embeddings = await self._embed_batch([query for _, query, _ in misses])
+
+        if self.semantic_cache is not None:
+            semantic_results = await asyncio.gather(
+                *(
+                    self.semantic_cache.lookup(
+                        topic_ids, embedding, limit, rerank_top_k, content_versions
+                    )
+                    for (_, _, topic_ids), embedding in zip(
+                        misses, embeddings, strict=True
+                    )
+                )
+            )
+            for index, semantic_result in enumerate(semantic_results):
+                if semantic_result is not None:
+                    await self._cache_result(misses[index][0], semantic_result)
+                    outcomes[index] = semantic_result
+
+        to_search = [index for index, outcome in enumerate(outcomes) if outcome is None]
+        if not to_search:
+            return cast(list[dict[str, Any] | Exception], outcomes)
+
+        search_batches = await self._search_vectors_batch(
+            [embeddings[index] for index in to_search],
+            [misses[index][2] for index in to_search],
+            limit,
+            query_texts=[misses[index][1] for index in to_search],
+        )
+
+        candidates_by_index: dict[int, list[dict[str, Any]]] = {}
+        for index, search_results in zip(to_search, search_batches, strict=True):
+            self._vector_search_results_histogram.record(len(search_results))
+            search_results = self._apply_score_floor(search_results)
+            if search_results:
+                candidates_by_index[index] = search_results
+            else:
+                outcomes[index] = await self._cache_empty_result(misses[index][0])
+
+        if candidates_by_index:
+            reranked_by_index: dict[int, list[dict[str, Any]]] = {}
+            to_rerank: list[int] = []
+            for index, search_results in candidates_by_index.items():
+                plan = self._plan_rerank(search_results)
+                if plan.skip:
+                    reranked_by_index[index] = plan.candidates[:rerank_top_k]
+                else:
+                    candidates_by_index[index] = plan.candidates
+                    to_rerank.append(index)
+
+            if to_rerank:
+                reranked_batches = await asyncio.to_thread(
+                    self.reranking_service.rerank_batch,
+                    [misses[index][1] for index in to_rerank],
+                    [candidates_by_index[index] for index in to_rerank],
+                    rerank_top_k,
+                )
+                reranked_by_index.update(zip(to_rerank, reranked_batches, strict=True))
+
+            semaphore = asyncio.Semaphore(settings.RAG_BATCH_LLM_CONCURRENCY)
+
+            async def answer(
+                index: int, reranked_results: list[dict[str, Any]]
+            ) -> dict[str, Any]:
+                cache_key, query, topic_ids = misses[index]
+                async with semaphore:
+                    return await self._answer_and_cache(
+                        cache_key,
+                        query,
+                        topic_ids,
+                        embeddings[index],
+                        limit,
+                        rerank_top_k,
+                        reranked_results,
+                        content_versions=content_versions,
+                    )
+
+            answers = await asyncio.gather(
+                *(
+                    answer(index, reranked_results)
+                    for index, reranked_results in reranked_by_index.items()
+                ),
+                return_exceptions=True,
+            )
+            for index, outcome in zip(reranked_by_index, answers, strict=True):
+                if isinstance(outcome, BaseException) and not isinstance(
+                    outcome, Exception
+                ):
+                    raise outcome
+                outcomes[index] = outcome
+
+        return cast(list[dict[str, Any] | Exception], outcomes)
+
+    @staticmethod
+    def _format_sources(reranked_results: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Format reranked results as citation dictionaries."""
+        return [
+            {
+                "title": result["title"],
+                "content": result["content"],
+                "score": result.get("rerank_score", result.get("score", 0.0)),
+                "context_type": result.get("context_type", ""),
+                "context_item_id": result["context_item_id"],
+            }
+            for result in reranked_results
+        ]
+
+    def _pack_context(
+        self,
+        reranked_results: list[dict[str, Any]],
+        query: str,
+        conversation_history: str = "",
+    ) -> list[dict[str, Any]]:
+        """
+        Select the reranked chunks that fit the prompt token budget.
+
+        The budget is what remains of ``RAG_PROMPT_TOKEN_BUDGET`` after reserving
+        the completion, the fixed instructions, the question and the history.
+        """
+        reserved = (
+            self.openai_chat_max_tokens
+            + count_tokens(SYSTEM_PROMPT, self.openai_chat_model)
+            + count_tokens(ANSWER_INSTRUCTIONS, self.openai_chat_model)
+            + count_tokens(query, self.openai_chat_model)
+            + count_tokens(conversation_history, self.openai_chat_model)
+            + PROMPT_FRAMING_TOKENS
+        )
+        budget = max(settings.RAG_PROMPT_TOKEN_BUDGET - reserved, 0)
+        return pack_context(reranked_results, budget, self.openai_chat_model)
 
     def _prepare_context(self, search_results: list[dict[str, Any]]) -> str:
         """Prepare context text from search results for the LLM."""
@@ -249,7 +990,7 @@ class AsyncRAGService:
         return "\n".join(context_parts)
 
     async def _generate_answer(
-        self, query: str, context: str
+        self, query: str, context: str, max_tokens: int | None = None
     ) -> tuple[str, dict[str, int]]:
         """Generate an answer using OpenAI API."""
         with tracer.start_as_current_span("rag.llm_generation") as span:
@@ -267,7 +1008,7 @@ Context:
 
 Question: {query}
 
-Please provide a comprehensive answer based on the context above. If the context doesn't contain enough information to fully answer the question, acknowledge this in your response. Include relevant details from the sources where appropriate."""
+{ANSWER_INSTRUCTIONS}"""
 
             span.set_attribute("model.name", self.openai_chat_model)
             span.set_attribute("prompt.length", len(prompt))
@@ -280,12 +1021,12 @@ Please provide a comprehensive answer based on the context above. If the context
                 messages=[
                     {
                         "role": "system",
-                        "content": "You are a helpful assistant that provides accurate answers based on the given context.",
+                        "content": SYSTEM_PROMPT,
                     },
                     {"role": "user", "content": prompt},
                 ],
                 temperature=self.openai_chat_temperature,
-                max_tokens=self.openai_chat_max_tokens,
+                max_tokens=max_tokens or self.openai_chat_max_tokens,
             )
 
             # Track usage metrics
@@ -309,8 +1050,10 @@ Please provide a comprehensive answer based on the context above. If the context
                     prompt_tokens, completion_tokens, self.openai_chat_model
                 )
             else:
-                # Estimate tokens if usage not available
-                prompt_tokens = len(prompt) // 4
+                # Count tokens locally if usage not available
+                prompt_tokens = count_tokens(
+                    SYSTEM_PROMPT, self.openai_chat_model
+                ) + count_tokens(prompt, self.openai_chat_model)
                 completion_tokens = 100
                 span.set_attribute("tokens.prompt", prompt_tokens)
                 span.set_attribute("tokens.completion", completion_tokens)
@@ -334,38 +1077,56 @@ Please provide a comprehensive answer based on the context above. If the context
 
             return answer, usage_info
 
-    async def _get_conversation_history(
-        self, session_id: str, current_question: str, db: Session
-    ) -> str:
-        """Retrieve and format conversation history for the current session."""
+    def _load_recent_turns(self, session_id: str) -> list[dict[str, str]]:
+        """Read the session's most recent turns from the database, oldest first."""
+        db = next(get_db())
         try:
-            histories = await asyncio.to_thread(
-                lambda: db.query(QuestionHistory)
+            histories = (
+                db.query(QuestionHistory)
                 .filter(QuestionHistory.session_id == session_id)
-                .order_by(QuestionHistory.created_at.asc())
+                .order_by(QuestionHistory.created_at.desc())
+                .limit(self.session_memory.max_turns)
                 .all()
             )
+            return [
+                {
+                    "id": str(history.id),
+                    "question": history.question,
+                    "answer": history.answer,
+                }
+                for history in reversed(histories)
+            ]
+        finally:
+            db.close()
 
-            if not histories:
-                return ""
-
-            # Format conversation history, excluding the current question if it's already in history
-            conversation_parts = []
-            for history in histories:
-                # Skip if this is the current question being asked
-                if history.question.strip().lower() == current_question.strip().lower():
-                    continue
-
-                conversation_parts.append(f"User: {history.question}")
-                conversation_parts.append(f"Assistant: {history.answer}")
+    async def _load_conversation_history(
+        self, session_id: str, current_question: str
+    ) -> str:
+        """
+        Load the formatted conversation history for a session.
 
-            return (
-                "\n\n".join(conversation_parts) + "\n\n" if conversation_parts else ""
-            )
+        The Redis session window is used when present; otherwise the last few
+        turns are read from the database (by the indexed ``session_id``) and
+        seeded into Redis for the following questions.
+        """
+        try:
+            history = await self.session_memory.load(session_id)
+            if history is None:
+                turns = await self.session_memory.seed(
+                    session_id,
+                    lambda: asyncio.to_thread(self._load_recent_turns, session_id),
+                )
+                history = SessionHistory(turns=turns)
+            return history.format(current_question)
         except Exception as e:
             logger.warning("Failed to retrieve conversation history: %s", str(e))
             return ""
 
+    async def _run_stage[T](self, name: str, stage: Awaitable[T]) -> T:
+        """Await one pipeline stage inside its own timing span."""
+        with tracer.start_as_current_span(f"rag.stage.{name}"):
+            return await stage
+
     async def query_stream(
         self,
         query: str,
@@ -392,58 +1153,135 @@ Please provide a comprehensive answer based on the context above. If the context
             return
 
         try:
+            deadline = self._new_deadline()
             limit = limit if limit is not None else self.rag_search_limit
             rerank_top_k = (
                 rerank_top_k if rerank_top_k is not None else self.rag_rerank_top_k
             )
 
-            # Get conversation history if session_id is provided
+            # Stage graph: history, embedding and topic-to-context resolution
+            # are independent. The cache key depends on history.
+            # History-keyed entries rarely hit because history grows every
+            # turn, so session requests start all three stages at once.
+            # Sessionless requests check the cache before paying for an
+            # embedding. Context resolution is skipped when Qdrant filters on
+            # the topic_ids payload.
+            async def resolve_contexts() -> list[int] | None:
+                if settings.QDRANT_TOPIC_PAYLOAD_FILTER:
+                    return None
+                return await self._run_stage(
+                    "context_resolution",
+                    asyncio.to_thread(
+                        self.qdrant_service.get_context_ids_for_topics, topic_ids
+                    ),
+                )
+
+            def retrieval_stages() -> list[Awaitable[Any]]:
+                return [
+                    self._run_stage(
+                        "embedding",
+                        self._within(deadline, "embedding", self._embed(query)),
+                    ),
+                    resolve_contexts(),
+                ]
+
             conversation_history = ""
             if session_id:
-                db = next(get_db())
-                try:
-                    conversation_history = await self._get_conversation_history(
-                        session_id, query, db
-                    )
-                finally:
-                    db.close()
+                (
+                    conversation_history,
+                    query_embedding,
+                    context_ids,
+                ) = await asyncio.gather(
+                    self._run_stage(
+                        "history",
+                        self._load_conversation_history(session_id, query),
+                    ),
+                    *retrieval_stages(),
+                )
 
-            query_embedding = await asyncio.to_thread(
-                self.embedding_service.generate_embedding, query
+            content_versions = await load_content_versions(self.redis_client, topic_ids)
+            cache_key = self._get_query_cache_key(
+                query,
+                topic_ids,
+                limit,
+                rerank_top_k,
+                conversation_history,
+                content_versions=content_versions,
             )
-
-            search_results = await asyncio.to_thread(
-                self.qdrant_service.search_similar,
-                query_embedding=query_embedding,
-                topic_ids=topic_ids,
-                limit=limit,
+            cached_entry = await self._get_cached_entry(cache_key)
+            if cached_entry is not None:
+                cached_result, is_stale = cached_entry
+                if not is_stale or not conversation_history:
+                    if is_stale:
+                        self._stale_served_counter.add(1)
+                        self._schedule_refresh(
+                            cache_key, query, topic_ids, limit, rerank_top_k
+                        )
+                    async for event in self._replay_cached_result(cached_result):
+                        yield event
+                    return
+
+            if not session_id:
+                query_embedding, context_ids = await asyncio.gather(*retrieval_stages())
+
+            if self.semantic_cache is not None and not conversation_history:
+                semantic_result = await self.semantic_cache.lookup(
+                    topic_ids, query_embedding, limit, rerank_top_k, content_versions
+                )
+                if semantic_result is not None:
+                    await self._cache_result(cache_key, semantic_result)
+                    async for event in self._replay_cached_result(semantic_result):
+                        yield event
+                    return
+
+            search_results = await self._search(
+                query_embedding,
+                topic_ids,
+                limit,
+                rerank_top_k,
+                deadline,
+                context_ids=context_ids,
+                query_text=query,
             )
 
             if not search_results:
+                empty_answer = (
+                    "I couldn't find any relevant information for your question."
+                )
                 yield json.dumps(
                     {
                         "type": "answer_chunk",
-                        "content": "I couldn't find any relevant information for your question.",
+                        "content": empty_answer,
                         "chunk_index": 0,
                     }
                 )
                 yield json.dumps({"type": "citations", "citations": []})
                 yield json.dumps({"type": "done"})
+                await self._cache_result(
+                    cache_key,
+                    {"answer": empty_answer, "sources": [], "context_items": []},
+                    ttl=settings.RAG_CACHE_EMPTY_TTL_SECONDS,
+                )
                 return
 
-            reranked_results = await asyncio.to_thread(
-                self.reranking_service.rerank_results,
-                query=query,
-                search_results=search_results,
-                top_k=rerank_top_k,
+            reranked_results = await self._rerank(
+                query, search_results, rerank_top_k, deadline
             )
 
-            context_text = self._prepare_context(reranked_results)
+            context_items = self._pack_context(
+                reranked_results, query, conversation_history
+            )
+            context_text = self._prepare_context(context_items)
 
+            answer_parts: list[str] = []
             chunk_index = 0
             async for chunk in self._generate_answer_stream(
-                query, context_text, conversation_history
+                query,
+                context_text,
+                conversation_history,
+                max_tokens=self._generation_max_tokens(deadline),
             ):
+                answer_parts.append(chunk)
                 yield json.dumps(
                     {
                         "type": "answer_chunk",
@@ -453,19 +1291,34 @@ Please provide a comprehensive answer based on the context above. If the context
                 )
                 chunk_index += 1
 
-            citations = [
-                {
-                    "title": result["title"],
-                    "content": result["content"],
-                    "score": result.get("rerank_score", result.get("score", 0.0)),
-                    "context_type": result.get("context_type", ""),
-                    "context_item_id": result["context_item_id"],
-                }
-                for result in reranked_results
-            ]
+            citations = self._format_sources(context_items)
             yield json.dumps({"type": "citations", "citations": citations})
             yield json.dumps({"type": "done"})
 
+            # Only streams that ran to completion are cached for replay
+            final_result: dict[str, Any] = {
+                "answer": "".join(answer_parts),
+                "sources": citations,
+                "context_items": context_items,
+            }
+            if deadline is not None and deadline.degraded:
+                await self._cache_result(
+                    cache_key, final_result, ttl=settings.RAG_CACHE_EMPTY_TTL_SECONDS
+                )
+                return
+
+            await self._cache_result(cache_key, final_result)
+            if self.semantic_cache is not None and not conversation_history:
+                await self.semantic_cache.store(
+                    topic_ids,
+                    query,
+                    query_embedding,
+                    limit,
+                    rerank_top_k,
+                    final_result,
+                    content_versions,
+                )
+
         except Exception as e:
             logger.error("RAG streaming error: %s", str(e), exc_info=True)
             yield json.dumps(
@@ -475,8 +1328,30 @@ Please provide a comprehensive answer based on the context above. If the context
                 }
             )
 
+    async def _replay_cached_result(
+        self, result: dict[str, Any]
+    ) -> AsyncGenerator[str]:
+        """Replay a cached answer as streaming events without delays."""
+        self._stream_replays_counter.add(1)
+        answer = result.get("answer", "")
+        chunk_size = settings.RAG_STREAM_REPLAY_CHUNK_SIZE
+        for chunk_index, start in enumerate(range(0, max(len(answer), 1), chunk_size)):
+            yield json.dumps(
+                {
+                    "type": "answer_chunk",
+                    "content": answer[start : start + chunk_size],
+                    "chunk_index": chunk_index,
+                }
+            )
+        yield json.dumps({"type": "citations", "citations": result.get("sources", [])})
+        yield json.dumps({"type": "done"})
+
     async def _generate_answer_stream(
-        self, query: str, context: str, conversation_history: str = ""
+        self,
+        query: str,
+        context: str,
+        conversation_history: str = "",
+        max_tokens: int | None = None,
     ) -> AsyncGenerator[str]:
         """Generate streaming answer using OpenAI API."""
         if not context:
@@ -495,7 +1370,7 @@ Please provide a comprehensive answer based on the context above. If the context
             [
                 f"\nContext:\n{context}",
                 f"\nQuestion: {query}",
-                "\nPlease provide a comprehensive answer based on the context above. If the context doesn't contain enough information to fully answer the question, acknowledge this in your response. Include relevant details from the sources where appropriate.",
+                f"\n{ANSWER_INSTRUCTIONS}",
             ]
         )
 
@@ -508,12 +1383,12 @@ Please provide a comprehensive answer based on the context above. If the context
             messages=[
                 {
                     "role": "system",
-                    "content": "You are a helpful assistant that provides accurate answers based on the given context.",
+                    "content": SYSTEM_PROMPT,
                 },
                 {"role": "user", "content": prompt},
             ],
             temperature=self.openai_chat_temperature,
-            max_tokens=self.openai_chat_max_tokens,
+            max_tokens=max_tokens or self.openai_chat_max_tokens,
             stream=True,
         )
 
@@ -0,0 +1,110 @@
+"""
+Process-wide registry for long-lived RAG services.
+
+Models and network clients are expensive to construct, so each worker builds
+them once (during the FastAPI lifespan or on first use) and shares them across
+requests.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import cast
+
+from backend.config import settings
+from backend.dependencies.openai_client import close_openai_http_client
+from backend.dependencies.qdrant import close_async_qdrant_client
+from backend.dependencies.redis import close_redis_pool, get_redis_client
+from backend.retrieval.embeddings import AsyncEmbeddingService
+from backend.retrieval.qdrant import AsyncQdrantService, QdrantService
+from backend.retrieval.reranking import RerankingService
+from backend.retrieval.vector_store import VectorStore, get_vector_store
+from backend.services.rag_service import AsyncRAGService
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceRegistry:
+    """Holds the per-worker singleton AsyncRAGService and its dependencies."""
+
+    def __init__(self) -> None:
+        self._rag_service: AsyncRAGService | None = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def rag_service(self) -> AsyncRAGService | None:
+        """Return the already-built service, if any."""
+        return self._rag_service
+
+    def _build_rag_service(self) -> AsyncRAGService:
+        """Construct the RAG service and warm up its models (blocking)."""
+        if not settings.OPENAI_API_KEY:
+            raise RuntimeError("OpenAI API key not configured")
+
+        vector_store = get_vector_store()
+        vector_store.create_collection()
+        search_service: VectorStore | AsyncQdrantService = vector_store
+        if settings.VECTOR_STORE_BACKEND == "qdrant" and settings.QDRANT_ASYNC_SEARCH:
+            search_service = AsyncQdrantService(
+                sync_service=cast(QdrantService, vector_store)
+            )
+
+        reranking_service = RerankingService()
+        if settings.RAG_WARMUP_ON_STARTUP:
+            reranking_service.warmup()
+
+        return AsyncRAGService(
+            redis_client=get_redis_client(),
+            openai_api_key=settings.OPENAI_API_KEY,
+            openai_chat_model=settings.OPENAI_CHAT_MODEL,
+            openai_chat_temperature=settings.OPENAI_CHAT_TEMPERATURE,
+            openai_chat_max_tokens=settings.OPENAI_CHAT_MAX_TOKENS,
+            rag_search_limit=settings.RAG_SEARCH_LIMIT,
+            rag_rerank_top_k=settings.RAG_RERANK_TOP_K,
+            embedding_service=AsyncEmbeddingService(),
+            qdrant_service=search_service,
+            reranking_service=reranking_service,
+        )
+
+    async def get_rag_service(self) -> AsyncRAGService:
+        """Return the shared RAG service, building it on first use."""
+        if self._rag_service is None:
+            async with self._lock:
+                if self._rag_service is None:
+                    self._rag_service = await asyncio.to_thread(self._build_rag_service)
+        return self._rag_service
+
+    async def startup(self) -> None:
+        """Eagerly build services so the first request does not pay for it."""
+        if not settings.OPENAI_API_KEY:
+            logger.info("OpenAI API key not configured; skipping RAG warm-up")
+            return
+
+        try:
+            await self.get_rag_service()
+            logger.info("RAG services initialized")
+        except Exception as e:
+            # Dependencies may still be starting; fall back to lazy init.
+            logger.warning("RAG service warm-up failed: %s", e)
+
+    async def shutdown(self) -> None:
+        """Release network clients held by the shared services."""
+        if self._rag_service is not None:
+            try:
+                await self._rag_service.chat_client.close()
+            except Exception as e:
+                logger.warning("Failed to close OpenAI client: %s", e)
+            self._rag_service = None
+
+        await close_openai_http_client()
+
+        try:
+            await close_async_qdrant_client()
+        except Exception as e:
+            logger.warning("Failed to close Qdrant client: %s", e)
+
+        await close_redis_pool()
+
+
+registry = ServiceRegistry()
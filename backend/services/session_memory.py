@@ -0,0 +1,347 @@
+"""
+Bounded per-session conversation memory backed by Redis.
+
+Each session keeps its most recent turns in a Redis list, appended when a
+history record is written. Turns beyond the configured window are folded into
+a rolling summary in the background, so prompt history stays a constant size
+no matter how long the session runs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+import redis.asyncio as redis
+from openai import AsyncOpenAI
+
+from backend.config import settings
+from backend.dependencies.redis import get_sync_redis_client
+from backend.observability import get_meter, get_tracer
+from backend.retrieval.monitoring import OpenAIUsageMonitor
+
+logger = logging.getLogger(__name__)
+tracer = get_tracer(__name__)
+meter = get_meter(__name__)
+
+SESSION_MEMORY_PREFIX = "rag_session"
+
+_SUMMARY_SYSTEM_PROMPT = (
+    "You maintain a running summary of a conversation between a user and an "
+    "assistant. Merge the new turns into the existing summary. Keep facts, names, "
+    "dates and open questions the user may refer back to, and drop pleasantries. "
+    "Answer in the language of the conversation."
+)
+
+
+def turns_key(session_id: str) -> str:
+    """Redis list of the session's most recent turns."""
+    return f"{SESSION_MEMORY_PREFIX}:{session_id}:turns"
+
+
+def summary_key(session_id: str) -> str:
+    """Rolling summary of turns folded out of the recent window."""
+    return f"{SESSION_MEMORY_PREFIX}:{session_id}:summary"
+
+
+def _fold_lock_key(session_id: str) -> str:
+    return f"{SESSION_MEMORY_PREFIX}:{session_id}:fold"
+
+
+# Create the window holding only a seeding marker, unless it already exists.
+_CLAIM_SCRIPT = """
+if redis.call("exists", KEYS[1]) == 1 then
+    return 0
+end
+redis.call("rpush", KEYS[1], ARGV[1])
+redis.call("expire", KEYS[1], ARGV[2])
+return 1
+"""
+
+# Swap our seeding marker for the database turns, skipping turns that were
+# already appended behind the marker while the database was read.
+_SEED_SCRIPT = """
+if redis.call("lindex", KEYS[1], 0) ~= ARGV[1] then
+    return 0
+end
+redis.call("lpop", KEYS[1])
+for i = #ARGV, 3, -1 do
+    if not redis.call("lpos", KEYS[1], ARGV[i]) then
+        redis.call("lpush", KEYS[1], ARGV[i])
+    end
+end
+redis.call("expire", KEYS[1], ARGV[2])
+return 1
+"""
+
+# Delete the fold lease only if we still own it (compare-and-delete).
+_RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+_SEEDING_FIELD = "seeding"
+# Bounds how long a seeder that dies mid-seed can leave its marker behind.
+_SEED_CLAIM_SECONDS = 60
+
+
+def _encode_turn(turn: dict[str, str]) -> str:
+    """Encode a turn; turns with a history ID encode identically everywhere."""
+    data = {"question": turn["question"], "answer": turn["answer"]}
+    if "id" in turn:
+        data = {"id": turn["id"], **data}
+    return json.dumps(data, ensure_ascii=False)
+
+
+def record_session_turn(
+    session_id: str, question: str, answer: str, history_id: int | None = None
+) -> None:
+    """
+    Append a turn to the session's Redis window.
+
+    Runs in the synchronous history endpoint and never raises. The turn is only
+    pushed onto an existing window (RPUSHX); sessions without one are seeded from
+    the database on their next question, which already includes this turn. A
+    window being seeded already exists, so turns committed meanwhile are kept.
+
+    Args:
+        session_id: Conversation session identifier
+        question: Question the user asked
+        answer: Answer that was shown to the user
+        history_id: ID of the history record, used to recognise the turn when
+            a concurrent seed also read it from the database
+    """
+    turn = {"question": question, "answer": answer}
+    if history_id is not None:
+        turn["id"] = str(history_id)
+    try:
+        client = get_sync_redis_client()
+        key = turns_key(session_id)
+        if client.rpushx(key, _encode_turn(turn)):
+            ttl = settings.RAG_SESSION_MEMORY_TTL_SECONDS
+            client.expire(key, ttl)
+            client.expire(summary_key(session_id), ttl)
+    except Exception as e:
+        logger.warning("Failed to record turn for session %s: %s", session_id, e)
+
+
+@dataclass
+class SessionHistory:
+    """Conversation context for one session: rolling summary plus recent turns."""
+
+    summary: str = ""
+    turns: list[dict[str, str]] = field(default_factory=list)
+
+    def format(self, current_question: str = "") -> str:
+        """Render the history for a prompt, skipping a repeat of the current question."""
+        parts: list[str] = []
+        if self.summary:
+            parts.append(f"Summary of earlier conversation: {self.summary}")
+
+        current = current_question.strip().lower()
+        for turn in self.turns:
+            if turn["question"].strip().lower() == current:
+                continue
+            parts.append(f"User: {turn['question']}")
+            parts.append(f"Assistant: {turn['answer']}")
+
+        return "\n\n".join(parts) + "\n\n" if parts else ""
+
+
+class SessionMemory:
+    """
+    Read and compact per-session conversation memory.
+
+    ``load`` returns at most ``max_turns`` recent turns plus the cached summary
+    in two Redis round-trips. When the window has overflowed, the oldest turns
+    are summarized by the chat model in a background task guarded by a short
+    Redis lease, so at most one worker folds a session at a time.
+    """
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        chat_client: AsyncOpenAI,
+        chat_model: str,
+        max_turns: int = 6,
+        ttl_seconds: int = 86400,
+        summary_max_tokens: int = 256,
+        monitor: OpenAIUsageMonitor | None = None,
+    ) -> None:
+        self.redis_client = redis_client
+        self.chat_client = chat_client
+        self.chat_model = chat_model
+        self.max_turns = max_turns
+        self.ttl_seconds = ttl_seconds
+        self.summary_max_tokens = summary_max_tokens
+        self.monitor = monitor
+        self._fold_tasks: dict[str, asyncio.Task[None]] = {}
+
+        self._folds_counter = meter.create_counter(
+            name="rag.session_memory.folds",
+            description="Session history windows folded into the rolling summary",
+        )
+
+    async def load(self, session_id: str) -> SessionHistory | None:
+        """
+        Load the session's summary and recent turns.
+
+        Returns:
+            The session history, or None when Redis holds no window for the
+            session (new session, expired window, window still being seeded
+            or Redis unavailable)
+        """
+        try:
+            raw_turns = await self.redis_client.lrange(turns_key(session_id), 0, -1)
+            if not raw_turns:
+                return None
+            summary = await self.redis_client.get(summary_key(session_id))
+        except Exception as e:
+            logger.warning("Failed to load session memory %s: %s", session_id, e)
+            return None
+
+        turns = [json.loads(raw) for raw in raw_turns]
+        if _SEEDING_FIELD in turns[0]:
+            return None
+        if len(turns) > self.max_turns:
+            self._schedule_fold(session_id)
+            turns = turns[-self.max_turns :]
+
+        return SessionHistory(summary=summary or "", turns=turns)
+
+    async def seed(
+        self,
+        session_id: str,
+        load_turns: Callable[[], Awaitable[list[dict[str, str]]]],
+    ) -> list[dict[str, str]]:
+        """
+        Populate a missing window with turns recovered from the database.
+
+        The window is first claimed with a seeding marker, only if absent, so
+        concurrent seeds do not duplicate turns and turns recorded while the
+        database is read are appended behind the marker instead of dropped.
+        The marker is then swapped for the loaded turns in one script.
+
+        Args:
+            session_id: Conversation session identifier
+            load_turns: Reads the session's recent turns, oldest first
+
+        Returns:
+            The turns returned by ``load_turns``
+        """
+        key = turns_key(session_id)
+        marker = json.dumps({_SEEDING_FIELD: uuid.uuid4().hex})
+        try:
+            claimed = await self.redis_client.eval(
+                _CLAIM_SCRIPT, 1, key, marker, _SEED_CLAIM_SECONDS
+            )
+        except Exception as e:
+            logger.warning("Failed to claim session memory %s: %s", session_id, e)
+            claimed = 0
+
+        turns: list[dict[str, str]] = []
+        try:
+            turns = await load_turns()
+            return turns
+        finally:
+            # Swap the marker even when loading failed, so it never lingers
+            if claimed:
+                try:
+                    await self.redis_client.eval(
+                        _SEED_SCRIPT,
+                        1,
+                        key,
+                        marker,
+                        self.ttl_seconds,
+                        *(_encode_turn(turn) for turn in turns),
+                    )
+                except Exception as e:
+                    logger.warning(
+                        "Failed to seed session memory %s: %s", session_id, e
+                    )
+
+    def _schedule_fold(self, session_id: str) -> None:
+        if session_id in self._fold_tasks:
+            return
+        task = asyncio.create_task(self._fold(session_id))
+        self._fold_tasks[session_id] = task
+        task.add_done_callback(lambda _: self._fold_tasks.pop(session_id, None))
+
+    async def _fold(self, session_id: str) -> None:
+        """Summarize turns that fell out of the window and trim them from the list."""
+        lock_key = _fold_lock_key(session_id)
+        token = uuid.uuid4().hex
+        try:
+            if not await self.redis_client.set(lock_key, token, nx=True, ex=60):
+                return
+        except Exception as e:
+            logger.warning("Failed to lock session memory %s: %s", session_id, e)
+            return
+
+        try:
+            with tracer.start_as_current_span("rag.session_memory.fold") as span:
+                key = turns_key(session_id)
+                raw_turns = await self.redis_client.lrange(key, 0, -1)
+                overflow = len(raw_turns) - self.max_turns
+                if overflow <= 0:
+                    return
+
+                summary = await self.redis_client.get(summary_key(session_id)) or ""
+                folded = [json.loads(raw) for raw in raw_turns[:overflow]]
+                span.set_attribute("session_memory.folded_turns", len(folded))
+
+                new_summary = await self._summarize(summary, folded)
+
+                await self.redis_client.set(
+                    summary_key(session_id), new_summary, ex=self.ttl_seconds
+                )
+                # Trim by count so turns appended during summarization survive
+                await self.redis_client.ltrim(key, overflow, -1)
+                self._folds_counter.add(1)
+        except Exception as e:
+            logger.warning("Failed to fold session memory %s: %s", session_id, e)
+        finally:
+            try:
+                await self.redis_client.eval(_RELEASE_SCRIPT, 1, lock_key, token)
+            except Exception:
+                pass
+
+    async def _summarize(self, summary: str, turns: list[dict[str, Any]]) -> str:
+        """Merge ``turns`` into ``summary`` with the chat model."""
+        transcript = "\n\n".join(
+            f"User: {turn['question']}\nAssistant: {turn['answer']}" for turn in turns
+        )
+        prompt = (
+            f"Existing summary:\n{summary or '(none)'}\n\n"
+            f"New turns:\n{transcript}\n\nUpdated summary:"
+        )
+
+        if self.monitor is not None:
+            self.monitor.track_request_timestamp("chat_completions")
+
+        response = await self.chat_client.chat.completions.create(
+            model=self.chat_model,
+            messages=[
+                {"role": "system", "content": _SUMMARY_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+            temperature=0.0,
+            max_tokens=self.summary_max_tokens,
+        )
+
+        usage = response.usage
+        if self.monitor is not None and usage is not None:
+            self.monitor.track_chat_completion_usage(
+                int(usage.prompt_tokens),
+                int(usage.completion_tokens),
+                self.chat_model,
+            )
+
+        return (response.choices[0].message.content or summary).strip()
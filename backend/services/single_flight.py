@@ -0,0 +1,130 @@
+"""
+Single-flight request coalescing for expensive async computations.
+
+Concurrent callers asking for the same key share one execution: callers in the
+same worker await a shared task, while callers in other workers wait on a
+short Redis lease and then read the result the leader wrote to the cache.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import redis.asyncio as redis
+
+from backend.observability import get_meter
+
+logger = logging.getLogger(__name__)
+meter = get_meter(__name__)
+
+# Delete the lease only if we still own it (compare-and-delete).
+_RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """Coalesce concurrent computations of the same key within and across workers."""
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        lease_seconds: float = 30.0,
+        poll_interval: float = 0.05,
+    ) -> None:
+        self.redis_client = redis_client
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self._inflight: dict[str, asyncio.Task[Any]] = {}
+
+        self._coalesced_counter = meter.create_counter(
+            name="rag.singleflight.coalesced",
+            description="Requests served by another request's pipeline execution",
+        )
+
+    @staticmethod
+    def _lock_key(key: str) -> str:
+        return f"{key}:lock"
+
+    async def try_acquire(self, key: str) -> str | None:
+        """Try to take the cross-worker lease for ``key``; return its token."""
+        token = uuid.uuid4().hex
+        try:
+            acquired = await self.redis_client.set(
+                self._lock_key(key),
+                token,
+                nx=True,
+                px=int(self.lease_seconds * 1000),
+            )
+        except Exception as e:
+            # Without Redis we still coalesce locally; act as the leader.
+            logger.warning("Single-flight lease unavailable: %s", e)
+            return token
+        return token if acquired else None
+
+    async def release(self, key: str, token: str) -> None:
+        """Release the lease for ``key`` if ``token`` still owns it."""
+        try:
+            await self.redis_client.eval(_RELEASE_SCRIPT, 1, self._lock_key(key), token)
+        except Exception as e:
+            logger.warning("Failed to release single-flight lease: %s", e)
+
+    async def run[T](
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[T]],
+        lookup: Callable[[], Awaitable[T | None]],
+    ) -> T:
+        """
+        Return ``compute()`` for ``key``, sharing one execution between callers.
+
+        Args:
+            key: Coalescing key (normally the cache key)
+            compute: Executes the pipeline and populates the cache
+            lookup: Reads a result another worker may have cached
+
+        Returns:
+            The computed or cached result
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self._coalesced_counter.add(1, {"scope": "local"})
+            return await asyncio.shield(task)
+
+        task = asyncio.ensure_future(self._lead(key, compute, lookup))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _lead(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        lookup: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        token = await self.try_acquire(key)
+        if token is not None:
+            try:
+                return await compute()
+            finally:
+                await self.release(key, token)
+
+        # Another worker holds the lease; wait for its result to land.
+        deadline = time.monotonic() + self.lease_seconds
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            cached = await lookup()
+            if cached is not None:
+                self._coalesced_counter.add(1, {"scope": "remote"})
+                return cached
+
+        logger.warning("Single-flight lease for %s expired; computing locally", key)
+        return await compute()
@@ -0,0 +1,97 @@
+"""
+Keep the ``topic_ids`` payload of Qdrant points in sync with topic links.
+
+Vector search filters on each point's ``topic_ids`` payload, so every change
+to the topic-context association must rewrite the payload of the affected
+contexts' points, and deleting a context must delete its points.
+
+Admin endpoints call ``sync_context_topics`` or ``delete_context_points`` after
+committing, which never raise: a Qdrant outage must not block content edits.
+Points left stale by a failed sync are repaired by ``sync_topic_payloads_task``.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.models import Context
+from backend.models.associations import topic_context_association
+
+logger = logging.getLogger(__name__)
+
+
+def context_topic_map(
+    db: Session, context_ids: Iterable[int] | None = None
+) -> dict[int, list[int]]:
+    """
+    Look up the topics of each context.
+
+    Args:
+        db: Database session
+        context_ids: Contexts to look up; every context when None
+
+    Returns:
+        Topic IDs for each requested context, empty for contexts that have no
+        topics or no longer exist
+    """
+    association = select(
+        topic_context_association.c.context_id, topic_context_association.c.topic_id
+    )
+    if context_ids is None:
+        topics: dict[int, list[int]] = {
+            context_id: [] for context_id in db.scalars(select(Context.id))
+        }
+    else:
+        topics = {context_id: [] for context_id in context_ids}
+        association = association.where(
+            topic_context_association.c.context_id.in_(list(topics))
+        )
+
+    for context_id, topic_id in db.execute(association):
+        topics.setdefault(context_id, []).append(topic_id)
+    return topics
+
+
+def sync_context_topics(db: Session, context_ids: Iterable[int]) -> None:
+    """
+    Rewrite the ``topic_ids`` payload of the points of ``context_ids``.
+
+    Args:
+        db: Database session the association change was committed on
+        context_ids: Contexts whose topics changed or that were deleted
+    """
+    unique_ids = sorted(set(context_ids))
+    if not unique_ids:
+        return
+
+    try:
+        from backend.retrieval.vector_store import get_vector_store
+
+        get_vector_store().set_context_topics(context_topic_map(db, unique_ids))
+    except Exception as e:
+        logger.warning(
+            "Failed to sync topic payloads for contexts %s: %s", unique_ids, e
+        )
+
+
+def delete_context_points(context_ids: Iterable[int]) -> None:
+    """
+    Delete the vector store points of deleted contexts.
+
+    Args:
+        context_ids: Contexts that were deleted from the database
+    """
+    unique_ids = sorted(set(context_ids))
+    if not unique_ids:
+        return
+
+    try:
+        from backend.retrieval.vector_store import get_vector_store
+
+        get_vector_store().delete_context_embeddings(unique_ids)
+    except Exception as e:
+        logger.warning("Failed to delete points of contexts %s: %s", unique_ids, e)
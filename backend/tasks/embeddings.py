@@ -11,7 +11,7 @@ from backend.services.ingestion import generate_context_item_embedding
 logger = logging.getLogger(__name__)
 
 
-@celery_app.task(bind=True, max_retries=3, default_retry_delay=60)  # type: ignore[misc]
+@celery_app.task(bind=True, max_retries=3, default_retry_delay=60)
 def regenerate_embedding_task(self: Task, context_item_id: int) -> bool:
     with Session() as db:
         try:
@@ -25,3 +25,26 @@ def regenerate_embedding_task(self: Task, context_item_id: int) -> bool:
                 f"Failed to regenerate embedding for ContextItem {context_item_id} (attempt {self.request.retries + 1}): {exc}"
             )
             raise self.retry(exc=exc, countdown=60 * (2**self.request.retries)) from exc
+
+
+@celery_app.task
+def migrate_vector_collection_task() -> str:
+    """Apply the configured Qdrant collection profile to the live collection."""
+    from backend.retrieval.qdrant import QdrantService
+
+    outcome = QdrantService().migrate_collection()
+    logger.info(f"Qdrant collection migration finished: {outcome}")
+    return outcome
+
+
+@celery_app.task
+def sync_topic_payloads_task(context_ids: list[int] | None = None) -> int:
+    """Rewrite the topic_ids payload of vector points (all contexts by default)."""
+    from backend.retrieval.vector_store import get_vector_store
+    from backend.services.topic_payloads import context_topic_map
+
+    with Session() as db:
+        context_topics = context_topic_map(db, context_ids)
+    get_vector_store().set_context_topics(context_topics)
+    logger.info(f"Synced topic payloads for {len(context_topics)} contexts")
+    return len(context_topics)
@@ -233,10 +233,15 @@ def integration_db_with_golden_data(golden_dataset):
             "title": str(data["title"]),
             "content": str(data["content"]),
             "context_id": context.id,
+            "topic_ids": [topic_id_for_context],
             "context_type": "markdown",
         }
 
-        point = PointStruct(id=context_item_id, vector=embedding, payload=payload)
+        point = PointStruct(
+            id=context_item_id,
+            vector=qdrant_service._point_vector(embedding),
+            payload=payload,
+        )
         qdrant_service.client.upsert(
             collection_name=qdrant_service.collection_name, points=[point]
         )
@@ -274,3 +279,169 @@ def integration_db_with_golden_data(golden_dataset):
         db_session.rollback()
     finally:
         db_session.close()
+
+
+class _FakePipeline:
+    """Queues commands and runs them against FakeAsyncRedis on execute()."""
+
+    def __init__(self, redis):
+        self._redis = redis
+        self._commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self._commands.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self):
+        results = [
+            await getattr(self._redis, name)(*args, **kwargs)
+            for name, args, kwargs in self._commands
+        ]
+        self._commands = []
+        return results
+
+
+class FakeAsyncRedis:
+    """Minimal in-memory stand-in for redis.asyncio.Redis used in unit tests."""
+
+    def __init__(self):
+        self.store: dict[str, object] = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+    async def mget(self, keys):
+        return [self.store.get(key) for key in keys]
+
+    async def set(self, key, value, ex=None, px=None, nx=False):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+
+    async def setex(self, key, seconds, value):
+        self.store[key] = value
+        return True
+
+    async def delete(self, *keys):
+        removed = 0
+        for key in keys:
+            removed += int(self.store.pop(key, None) is not None)
+        return removed
+
+    async def expire(self, key, seconds):
+        return key in self.store
+
+    async def incr(self, key, amount=1):
+        value = int(self.store.get(key, 0)) + amount
+        self.store[key] = str(value)
+        return value
+
+    async def rpush(self, key, *values):
+        items = self.store.setdefault(key, [])
+        items.extend(values)
+        return len(items)
+
+    async def ltrim(self, key, start, end):
+        items = self.store.get(key, [])
+        stop = None if end == -1 else end + 1
+        self.store[key] = items[start:stop]
+        return True
+
+    async def lrange(self, key, start, end):
+        items = self.store.get(key, [])
+        stop = None if end == -1 else end + 1
+        return list(items[start:stop])
+
+    async def lindex(self, key, index):
+        items = self.store.get(key, [])
+        return items[index] if -len(items) <= index < len(items) else None
+
+    async def sadd(self, key, *members):
+        items = self.store.setdefault(key, set())
+        before = len(items)
+        items.update(members)
+        return len(items) - before
+
+    async def smembers(self, key):
+        return set(self.store.get(key, set()))
+
+    async def eval(self, script, numkeys, *args):
+        # Supports the session-memory claim/seed scripts and compare-and-delete.
+        key, argv = args[0], args[numkeys:]
+        if "lpos" in script:
+            items = self.store.get(key, [])
+            if not items or items[0] != argv[0]:
+                return 0
+            items.pop(0)
+            for value in reversed(argv[2:]):
+                if value not in items:
+                    items.insert(0, value)
+            if not items:
+                del self.store[key]
+            return 1
+        if "exists" in script:
+            if key in self.store:
+                return 0
+            self.store[key] = [argv[0]]
+            return 1
+        if self.store.get(key) == argv[0]:
+            del self.store[key]
+            return 1
+        return 0
+
+
+@pytest.fixture
+def fake_redis():
+    """Provide an in-memory async Redis double."""
+    return FakeAsyncRedis()
+
+
+@pytest.fixture
+def stub_rag_service(fake_redis, monkeypatch):
+    """AsyncRAGService wired to mocked retrieval services and in-memory Redis."""
+    from unittest.mock import AsyncMock, MagicMock
+
+    from backend.services.rag_service import AsyncRAGService
+
+    service = AsyncRAGService(
+        redis_client=fake_redis,
+        openai_api_key="test-key",
+        embedding_service=MagicMock(),
+        qdrant_service=MagicMock(),
+        reranking_service=MagicMock(),
+    )
+    service.embedding_service.generate_embedding.return_value = [0.1, 0.2, 0.3]
+    service.qdrant_service.search_similar.return_value = [
+        {
+            "context_item_id": 1,
+            "title": "Enrollment",
+            "content": "Enrollment closes on March 2.",
+            "score": 0.9,
+            "context_id": 1,
+            "context_type": "MARKDOWN",
+        },
+        {
+            "context_item_id": 2,
+            "title": "Enrollment deadlines",
+            "content": "Late enrollment requires approval.",
+            "score": 0.85,
+            "context_id": 1,
+            "context_type": "MARKDOWN",
+        },
+    ]
+    service.reranking_service.rerank_results.side_effect = (
+        lambda query, search_results, top_k=None: [
+            {**result, "rerank_score": 0.95} for result in search_results
+        ][:top_k]
+    )
+    service._generate_answer = AsyncMock(
+        return_value=("Enrollment closes on March 2.", {"prompt_tokens": 10})
+    )
+    return service
@@ -0,0 +1,118 @@
+"""Tests for the async embedding service and its Redis cache."""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from backend.retrieval.cache import AsyncEmbeddingCache, embedding_cache_key
+from backend.retrieval.embeddings import AsyncEmbeddingService
+
+
+def _response(*vectors):
+    return MagicMock(
+        data=[MagicMock(embedding=list(vector)) for vector in vectors],
+        usage=MagicMock(total_tokens=7),
+    )
+
+
+@pytest.fixture
+def openai_client():
+    client = MagicMock()
+    client.embeddings.create = AsyncMock()
+    return client
+
+
+@pytest.fixture
+def service(openai_client, fake_redis):
+    return AsyncEmbeddingService(
+        client=openai_client,
+        cache=AsyncEmbeddingCache(fake_redis, ttl_seconds=60, enabled=True),
+    )
+
+
+@pytest.mark.asyncio
+async def test_embedding_is_cached(service, openai_client):
+    openai_client.embeddings.create.return_value = _response([0.1, 0.2])
+
+    first = await service.generate_embedding("When is enrollment?")
+    second = await service.generate_embedding("When is enrollment?")
+
+    assert first == [0.1, 0.2]
+    assert second == pytest.approx(first)
+    openai_client.embeddings.create.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_batch_fetches_only_missing_texts(service, openai_client, fake_redis):
+    fake_redis.store[embedding_cache_key("cached", service.model)] = "[1.0, 0.0]"
+    openai_client.embeddings.create.return_value = _response([0.0, 1.0], [0.5, 0.5])
+
+    result = await service.generate_embeddings_batch(["a", "cached", "b"])
+
+    assert result == [[0.0, 1.0], [1.0, 0.0], [0.5, 0.5]]
+    assert openai_client.embeddings.create.await_args.kwargs["input"] == ["a", "b"]
+    assert await service.cache.get("b", service.model) == [0.5, 0.5]
+
+
+@pytest.mark.asyncio
+async def test_batch_uses_one_round_trip_each_way(service, openai_client, fake_redis):
+    fake_redis.mget = AsyncMock(wraps=fake_redis.mget)
+    fake_redis.get = AsyncMock(wraps=fake_redis.get)
+    openai_client.embeddings.create.return_value = _response([0.1], [0.2], [0.3])
+
+    await service.generate_embeddings_batch(["a", "b", "c"])
+
+    fake_redis.mget.assert_awaited_once()
+    fake_redis.get.assert_not_awaited()
+    assert await service.cache.get_many(["a", "b", "c"], service.model) == [
+        pytest.approx([0.1]),
+        pytest.approx([0.2]),
+        pytest.approx([0.3]),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_cache_errors_fall_back_to_api(openai_client):
+    redis_client = AsyncMock()
+    redis_client.get.side_effect = ConnectionError("redis down")
+    redis_client.setex.side_effect = ConnectionError("redis down")
+    service = AsyncEmbeddingService(
+        client=openai_client,
+        cache=AsyncEmbeddingCache(redis_client, enabled=True),
+    )
+    openai_client.embeddings.create.return_value = _response([0.3])
+
+    assert await service.generate_embedding("question") == [0.3]
+
+
+@pytest.mark.asyncio
+async def test_empty_text_rejected(service):
+    with pytest.raises(ValueError):
+        await service.generate_embedding("  ")
+
+
+@pytest.mark.asyncio
+async def test_rag_service_awaits_async_embeddings(stub_rag_service, monkeypatch):
+    """Async embedding services run on the event loop, not in a worker thread."""
+    stub_rag_service.embedding_service.generate_embedding = AsyncMock(
+        return_value=[0.1, 0.2, 0.3]
+    )
+    to_thread = AsyncMock(side_effect=AssertionError("ran in a thread"))
+
+    async def guarded_to_thread(func, *args, **kwargs):
+        if func is stub_rag_service.embedding_service.generate_embedding:
+            await to_thread()
+        return func(*args, **kwargs)
+
+    monkeypatch.setattr(
+        "backend.services.rag_service.asyncio.to_thread", guarded_to_thread
+    )
+
+    result = await stub_rag_service.query("When is enrollment?", [1])
+
+    stub_rag_service.embedding_service.generate_embedding.assert_awaited_once_with(
+        "When is enrollment?"
+    )
+    assert result["answer"] == "Enrollment closes on March 2."
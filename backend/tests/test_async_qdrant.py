@@ -0,0 +1,229 @@
+"""Tests and serialization benchmark for the async Qdrant search service."""
+
+from __future__ import annotations
+
+import json
+import random
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+import pytest_asyncio
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.conversions.conversion import RestToGrpc
+from qdrant_client.grpc import QueryBatchPoints
+from qdrant_client.models import PointStruct
+
+from backend.retrieval.qdrant import AsyncQdrantService, QdrantService
+from backend.services.rag_service import AsyncRAGService
+
+SETTINGS = "backend.retrieval.qdrant.settings"
+
+POINTS = [
+    (1, 10, [1], [1.0, 0.1]),
+    (2, 10, [1], [1.0, 0.2]),
+    (3, 20, [1, 2], [1.0, 0.3]),
+    (4, 30, [2], [1.0, 0.4]),
+]
+
+
+def _points(service: QdrantService) -> list[PointStruct]:
+    return [
+        PointStruct(
+            id=item_id,
+            vector=service._point_vector(vector),
+            payload={
+                "context_item_id": item_id,
+                "title": f"Item {item_id}",
+                "content": "content",
+                "context_id": context_id,
+                "topic_ids": topic_ids,
+                "context_type": "MARKDOWN",
+                "token_count": 3,
+            },
+        )
+        for item_id, context_id, topic_ids, vector in POINTS
+    ]
+
+
+@pytest_asyncio.fixture
+async def services(monkeypatch):
+    """The same points in a sync and an async in-memory Qdrant."""
+    monkeypatch.setattr(f"{SETTINGS}.OPENAI_EMBEDDING_DIM", 2)
+    monkeypatch.setattr(f"{SETTINGS}.OPENAI_EMBEDDING_REDUCED_DIM", 0)
+    monkeypatch.setattr(f"{SETTINGS}.QDRANT_QUANTIZATION", "none")
+    monkeypatch.setattr(f"{SETTINGS}.QDRANT_TOPIC_PAYLOAD_FILTER", True)
+    sync_service = QdrantService()
+    sync_service.client = QdrantClient(":memory:")
+    sync_service.create_collection()
+    sync_service.client.upsert(
+        collection_name=sync_service.collection_name,
+        points=_points(sync_service),
+    )
+
+    client = AsyncQdrantClient(":memory:")
+    await client.create_collection(
+        collection_name=sync_service.collection_name,
+        vectors_config=sync_service._vectors_config(),
+    )
+    await client.upsert(
+        collection_name=sync_service.collection_name,
+        points=_points(sync_service),
+    )
+    yield sync_service, AsyncQdrantService(client=client, sync_service=sync_service)
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_async_search_matches_sync_results(services):
+    sync_service, async_service = services
+
+    expected = sync_service.search_similar([1.0, 0.0], topic_ids=[2], limit=10)
+    results = await async_service.search_similar([1.0, 0.0], topic_ids=[2], limit=10)
+
+    assert results == expected
+    assert [r["context_item_id"] for r in results] == [3, 4]
+
+
+@pytest.mark.asyncio
+async def test_async_batch_search_matches_sync_results(services):
+    sync_service, async_service = services
+    embeddings = [[1.0, 0.0], [0.0, 1.0]]
+
+    expected = sync_service.search_similar_batch(embeddings, [[1], [2]], limit=2)
+    results = await async_service.search_similar_batch(embeddings, [[1], [2]], limit=2)
+
+    assert results == expected
+
+
+@pytest.mark.asyncio
+async def test_async_search_resolves_contexts_when_payload_filter_off(
+    services, monkeypatch
+):
+    _, async_service = services
+    monkeypatch.setattr(f"{SETTINGS}.QDRANT_TOPIC_PAYLOAD_FILTER", False)
+    resolve = MagicMock(return_value=[30])
+    async_service.sync_service.get_context_ids_for_topics = resolve
+
+    results = await async_service.search_similar([1.0, 0.0], topic_ids=[2])
+    batch = await async_service.search_similar_batch([[1.0, 0.0]], [[2]])
+
+    assert [r["context_item_id"] for r in results] == [4]
+    assert [[r["context_item_id"] for r in b] for b in batch] == [[4]]
+    assert resolve.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_async_search_without_contexts_skips_qdrant(services):
+    _, async_service = services
+    async_service.client = MagicMock(query_batch_points=AsyncMock())
+
+    assert await async_service.search_similar([1.0], [1], context_ids=[]) == []
+    async_service.client.query_batch_points.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_async_search_validates_inputs(services):
+    _, async_service = services
+
+    with pytest.raises(ValueError, match="Topic IDs"):
+        await async_service.search_similar([1.0, 0.0], topic_ids=[])
+    with pytest.raises(ValueError, match="equal length"):
+        await async_service.search_similar_batch([[1.0, 0.0]], [])
+
+
+@pytest.mark.asyncio
+async def test_rag_service_awaits_async_search_without_threads():
+    qdrant_service = MagicMock(spec=AsyncQdrantService)
+    qdrant_service.search_similar = AsyncMock(return_value=[])
+    qdrant_service.search_similar_batch = AsyncMock(return_value=[[]])
+    with patch("backend.services.rag_service.create_async_openai_client"):
+        service = AsyncRAGService(
+            redis_client=AsyncMock(),
+            openai_api_key="test-key",
+            embedding_service=MagicMock(),
+            qdrant_service=qdrant_service,
+            reranking_service=MagicMock(),
+            semantic_cache=None,
+        )
+
+    with patch(
+        "backend.services.rag_service.asyncio.to_thread", side_effect=AssertionError
+    ):
+        await service._search_vectors({"query_embedding": [1.0], "topic_ids": [1]})
+        await service._search_vectors_batch([[1.0]], [[1]], 5)
+
+    qdrant_service.search_similar.assert_awaited_once_with(
+        query_embedding=[1.0], topic_ids=[1]
+    )
+    qdrant_service.search_similar_batch.assert_awaited_once_with([[1.0]], [[1]], 5)
+
+
+BENCHMARK_DIM = 3072
+BENCHMARK_BATCH = 8
+BENCHMARK_ROUNDS = 20
+
+
+def _timed(fn, rounds: int = BENCHMARK_ROUNDS) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+@pytest.mark.performance
+def test_grpc_request_encoding_beats_rest_json(monkeypatch):
+    """
+    Compare the wire cost of a batch of 3072-dimension searches.
+
+    Encodes the request exactly as each transport does — JSON for REST,
+    protobuf for gRPC — and decodes it again as the server would; run with
+    ``-s`` to see the table.
+    """
+    monkeypatch.setattr(f"{SETTINGS}.OPENAI_EMBEDDING_DIM", BENCHMARK_DIM)
+    monkeypatch.setattr(f"{SETTINGS}.OPENAI_EMBEDDING_REDUCED_DIM", 0)
+    service = QdrantService()
+    rng = random.Random(0)
+    requests = [
+        service._search_request(
+            [rng.uniform(-1, 1) for _ in range(BENCHMARK_DIM)],
+            service._topic_filter([1, 2]),
+            limit=10,
+        )
+        for _ in range(BENCHMARK_BATCH)
+    ]
+
+    def rest_encode() -> bytes:
+        body = {"searches": [r.model_dump(exclude_none=True) for r in requests]}
+        return json.dumps(body).encode()
+
+    def grpc_encode() -> bytes:
+        return QueryBatchPoints(
+            collection_name=service.collection_name,
+            query_points=[
+                RestToGrpc.convert_query_request(r, service.collection_name)
+                for r in requests
+            ],
+        ).SerializeToString()
+
+    rest_body, grpc_body = rest_encode(), grpc_encode()
+    report = {
+        "rest/json": (
+            len(rest_body),
+            _timed(rest_encode),
+            _timed(lambda: json.loads(rest_body)),
+        ),
+        "grpc/protobuf": (
+            len(grpc_body),
+            _timed(grpc_encode),
+            _timed(lambda: QueryBatchPoints.FromString(grpc_body)),
+        ),
+    }
+
+    print(f"\n{'transport':<15}{'bytes':>10}{'encode ms':>12}{'decode ms':>12}")
+    for name, (size, encode_ms, decode_ms) in report.items():
+        print(f"{name:<15}{size:>10}{encode_ms:>12.2f}{decode_ms:>12.2f}")
+
+    decoded = QueryBatchPoints.FromString(grpc_body)
+    assert len(decoded.query_points) == BENCHMARK_BATCH
+    assert len(grpc_body) < len(rest_body) / 2
@@ -73,3 +73,12 @@ def test_regenerate_embedding_task_max_retries_exceeded(db_session):
 
         with pytest.raises(Exception, match="Max retries exceeded"):
             regenerate_embedding_task(context_item_id)
+
+
+def test_migrate_vector_collection_task_reports_outcome():
+    from backend.tasks.embeddings import migrate_vector_collection_task
+
+    with patch("backend.retrieval.qdrant.QdrantService") as mock_service:
+        mock_service.return_value.migrate_collection.return_value = "updated"
+
+        assert migrate_vector_collection_task() == "updated"
@@ -0,0 +1,127 @@
+"""Tests for the compact embedding and answer cache encodings."""
+
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pytest
+
+from backend.retrieval.codec import (
+    ANSWER_HEADER,
+    decode_answer,
+    decode_vector,
+    encode_answer,
+    encode_vector,
+)
+
+
+@pytest.fixture
+def embedding():
+    rng = np.random.default_rng(0)
+    return rng.normal(scale=0.05, size=3072).tolist()
+
+
+def _result(count: int = 5) -> dict:
+    items = [
+        {
+            "context_item_id": i,
+            "title": f"Item {i}",
+            "content": f"Chunk {i} about enrollment deadlines. " * 40,
+            "score": 0.9 - i * 0.01,
+            "rerank_score": 0.95 - i * 0.01,
+            "context_id": 1,
+            "context_type": "MARKDOWN",
+        }
+        for i in range(count)
+    ]
+    sources = [
+        {
+            "title": item["title"],
+            "content": item["content"],
+            "score": item["rerank_score"],
+            "context_type": item["context_type"],
+            "context_item_id": item["context_item_id"],
+        }
+        for item in items
+    ]
+    return {
+        "answer": "등록은 3월 2일에 마감됩니다.",
+        "sources": sources,
+        "context_items": items,
+    }
+
+
+def test_float32_vector_roundtrip_is_lossless_at_float32(embedding):
+    decoded = decode_vector(encode_vector(embedding, "float32"))
+
+    assert decoded == np.asarray(embedding, dtype=np.float32).tolist()
+
+
+def test_packed_vectors_are_much_smaller_than_json(embedding):
+    legacy = len(json.dumps(embedding))
+
+    assert legacy / len(encode_vector(embedding, "float32")) >= 4
+    assert legacy / len(encode_vector(embedding, "float16")) >= 8
+
+
+def test_float16_vector_keeps_cosine_similarity(embedding):
+    decoded = np.asarray(decode_vector(encode_vector(embedding, "float16")))
+    original = np.asarray(embedding)
+
+    cosine = decoded @ original / (np.linalg.norm(decoded) * np.linalg.norm(original))
+    assert cosine > 0.9999
+
+
+def test_legacy_json_vectors_still_decode():
+    assert decode_vector("[0.1, 0.2]") == [0.1, 0.2]
+    assert decode_vector(b"[0.1, 0.2]") == [0.1, 0.2]
+
+
+def test_unknown_vector_format_is_a_miss():
+    assert decode_vector(b"XX\x09\x01abcd") is None
+
+
+def test_unsupported_dtype_rejected():
+    with pytest.raises(ValueError):
+        encode_vector([0.1], "int8")
+
+
+def test_answer_roundtrip_restores_deduplicated_sources():
+    envelope = {"result": _result(), "fresh_until": 123.5}
+
+    encoded = encode_answer(envelope)
+
+    assert encoded.startswith(ANSWER_HEADER)
+    assert decode_answer(encoded) == envelope
+    assert len(encoded) * 4 < len(json.dumps(envelope))
+
+
+def test_sources_differing_from_items_are_kept_verbatim():
+    result = _result(2)
+    result["sources"][1]["content"] = "edited excerpt"
+
+    assert decode_answer(encode_answer(result)) == result
+
+
+def test_legacy_json_answers_still_decode():
+    legacy = {"result": {"answer": "a", "sources": []}, "fresh_until": 1.0}
+
+    assert decode_answer(json.dumps(legacy)) == legacy
+
+
+def test_unknown_answer_format_is_a_miss():
+    assert decode_answer("zz9:abc") is None
+
+
+@pytest.mark.asyncio
+async def test_cached_answers_are_stored_compact(stub_rag_service, fake_redis):
+    stub_rag_service.semantic_cache = None
+
+    first = await stub_rag_service.query("When is enrollment?", [1])
+    stored = [v for k, v in fake_redis.store.items() if k.startswith("rag_query:")]
+    second = await stub_rag_service.query("When is enrollment?", [1])
+
+    assert stored and stored[0].startswith(ANSWER_HEADER)
+    assert second == first
+    assert stub_rag_service._generate_answer.await_count == 1
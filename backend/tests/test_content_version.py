@@ -0,0 +1,100 @@
+"""Tests for per-topic content versions in answer cache keys."""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from backend.retrieval.content_version import (
+    bump_content_versions,
+    content_version_key,
+    load_content_versions,
+)
+
+
+@pytest.mark.asyncio
+async def test_missing_versions_default_to_zero(fake_redis):
+    fake_redis.store[content_version_key(2)] = "3"
+
+    versions = await load_content_versions(fake_redis, [2, 1, 2])
+
+    assert versions == {1: 0, 2: 3}
+
+
+@pytest.mark.asyncio
+async def test_version_lookup_survives_redis_errors():
+    client = AsyncMock()
+    client.mget.side_effect = ConnectionError("redis down")
+
+    assert await load_content_versions(client, [1]) == {1: 0}
+
+
+def test_bump_increments_each_topic_once():
+    client = MagicMock()
+    pipe = client.pipeline.return_value
+
+    bump_content_versions(client, [2, 1, 2])
+
+    assert [c.args[0] for c in pipe.incr.call_args_list] == [
+        content_version_key(1),
+        content_version_key(2),
+    ]
+    pipe.execute.assert_called_once()
+
+
+def test_invalidation_bumps_content_versions():
+    from backend.services import cache_invalidation
+
+    client = MagicMock()
+    client.smembers.return_value = set()
+
+    with patch.object(cache_invalidation, "get_sync_redis_client", return_value=client):
+        cache_invalidation.invalidate_topic_caches([3])
+
+    client.pipeline.return_value.incr.assert_called_once_with(content_version_key(3))
+
+
+@pytest.mark.asyncio
+async def test_content_write_misses_cached_answer(stub_rag_service, fake_redis):
+    """Bumping a topic's version must bypass answers cached before the write."""
+    stub_rag_service.semantic_cache = None
+
+    await stub_rag_service.query("When is enrollment?", [1, 2])
+    await stub_rag_service.query("When is enrollment?", [1, 2])
+    assert stub_rag_service._generate_answer.await_count == 1
+
+    await fake_redis.incr(content_version_key(2))
+    await stub_rag_service.query("When is enrollment?", [1, 2])
+
+    assert stub_rag_service._generate_answer.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_unrelated_topic_write_keeps_cached_answer(stub_rag_service, fake_redis):
+    stub_rag_service.semantic_cache = None
+
+    await stub_rag_service.query("When is enrollment?", [1])
+    await fake_redis.incr(content_version_key(2))
+    await stub_rag_service.query("When is enrollment?", [1])
+
+    assert stub_rag_service._generate_answer.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_answer_generated_across_an_edit_is_not_reused(
+    stub_rag_service, fake_redis
+):
+    """A semantic entry stored after an edit must stay at its old version."""
+
+    async def generate_during_edit(*args, **kwargs):
+        await fake_redis.incr(content_version_key(1))
+        return ("Enrollment closes on March 2.", {"prompt_tokens": 10})
+
+    stub_rag_service._generate_answer.side_effect = generate_during_edit
+    await stub_rag_service.query("When does enrollment close?", [1])
+
+    stub_rag_service._generate_answer.side_effect = None
+    await stub_rag_service.query("What is the enrollment deadline?", [1])
+
+    assert stub_rag_service._generate_answer.await_count == 2
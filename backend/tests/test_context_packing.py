@@ -0,0 +1,108 @@
+"""Tests for token counting and token-budgeted context packing."""
+
+from __future__ import annotations
+
+import pytest
+
+from backend.retrieval import tokens
+from backend.retrieval.tokens import (
+    SOURCE_FRAMING_TOKENS,
+    count_tokens,
+    estimate_tokens,
+    pack_context,
+)
+
+
+class _WhitespaceEncoding:
+    def encode(self, text, disallowed_special=()):
+        return text.split()
+
+
+@pytest.fixture
+def whitespace_tokenizer(monkeypatch):
+    monkeypatch.setattr(tokens, "_get_encoding", lambda model: _WhitespaceEncoding())
+
+
+def _result(item_id, score, token_count):
+    return {
+        "context_item_id": item_id,
+        "title": f"Item {item_id}",
+        "content": "content",
+        "rerank_score": score,
+        "token_count": token_count,
+    }
+
+
+def test_estimate_counts_hangul_per_character():
+    """The fallback estimate must not undercount Korean text by 4x."""
+    assert estimate_tokens("수강신청") == 4
+    assert estimate_tokens("abcdefgh") == 2
+
+
+def test_count_tokens_falls_back_without_tokenizer(monkeypatch):
+    monkeypatch.setattr(tokens, "_get_encoding", lambda model: None)
+
+    assert count_tokens("수강신청 마감일", "gpt-4o-mini") == estimate_tokens(
+        "수강신청 마감일"
+    )
+    assert count_tokens("", "gpt-4o-mini") == 0
+
+
+def test_count_tokens_uses_model_tokenizer(whitespace_tokenizer):
+    assert count_tokens("one two three", "gpt-4o-mini") == 3
+
+
+def test_pack_context_keeps_highest_scores_within_budget():
+    """Chunks are packed by score and skipped once they would overflow."""
+    results = [
+        _result(1, 0.5, 40),
+        _result(2, 0.9, 50),
+        _result(3, 0.7, 80),
+        _result(4, 0.1, 10),
+    ]
+    budget = 50 + 40 + 10 + 3 * SOURCE_FRAMING_TOKENS
+
+    packed = pack_context(results, budget)
+
+    assert [r["context_item_id"] for r in packed] == [2, 1, 4]
+
+
+def test_pack_context_always_keeps_top_result():
+    packed = pack_context([_result(1, 0.9, 5000), _result(2, 0.8, 10)], 100)
+
+    assert [r["context_item_id"] for r in packed] == [1]
+
+
+def test_pack_context_counts_chunks_without_stored_counts(whitespace_tokenizer):
+    result = {"title": "Title", "content": "a b c", "score": 0.5}
+    budget = 4 + SOURCE_FRAMING_TOKENS
+
+    assert pack_context([result, dict(result)], budget) == [result]
+
+
+@pytest.mark.asyncio
+async def test_prompt_budget_reserves_completion_and_history(
+    stub_rag_service, monkeypatch, whitespace_tokenizer
+):
+    """Long conversation history should crowd out lower-ranked chunks."""
+    monkeypatch.setattr(
+        "backend.services.rag_service.settings.RAG_PROMPT_TOKEN_BUDGET", 1400
+    )
+    results = [_result(1, 0.9, 100), _result(2, 0.8, 100)]
+
+    without_history = stub_rag_service._pack_context(results, "question")
+    with_history = stub_rag_service._pack_context(results, "question", "word " * 120)
+
+    assert len(without_history) == 2
+    assert len(with_history) == 1
+
+
+def test_pack_context_keeps_fused_order_of_unreranked_hybrid_results():
+    results = [
+        {"context_item_id": 1, "score": 0.9, "fused_score": 1 / 61, "token_count": 1},
+        {"context_item_id": 2, "score": 0.1, "fused_score": 1 / 31, "token_count": 1},
+    ]
+
+    packed = pack_context(results, 100)
+
+    assert [r["context_item_id"] for r in packed] == [2, 1]
@@ -0,0 +1,195 @@
+"""Tests for token-bounded, concurrent embedding sub-batches."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import openai
+import pytest
+
+from backend.retrieval.cache import AsyncEmbeddingCache
+from backend.retrieval.embeddings import (
+    AsyncEmbeddingService,
+    EmbeddingService,
+    plan_sub_batches,
+)
+
+SETTINGS = "backend.retrieval.embeddings.settings"
+
+
+def _connection_error() -> openai.APIConnectionError:
+    return openai.APIConnectionError(
+        request=httpx.Request("POST", "https://api.openai.com/v1/embeddings")
+    )
+
+
+def _embed_by_text(model, input):
+    """Fake embeddings.create: each text embeds to [len(text)]."""
+    return MagicMock(
+        data=[MagicMock(embedding=[float(len(text))]) for text in input],
+        usage=MagicMock(total_tokens=len(input)),
+    )
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(f"{SETTINGS}.OPENAI_EMBEDDING_BATCH_RETRY_BACKOFF_SECONDS", 0)
+
+
+def test_plan_respects_token_and_input_limits():
+    texts = ["word " * 20, "word " * 20, "word " * 20, "d", "e", "f"]
+
+    batches = plan_sub_batches(texts, "text-embedding-3-large", 30, 2)
+
+    assert batches == [[0], [1], [2, 3], [4, 5]]
+
+
+def test_oversized_text_gets_its_own_batch():
+    batches = plan_sub_batches(["x" * 400, "y"], "text-embedding-3-large", 10, 100)
+
+    assert batches == [[0], [1]]
+
+
+@pytest.fixture
+def async_service(fake_redis):
+    client = MagicMock()
+    client.embeddings.create = AsyncMock(side_effect=_embed_by_text)
+    return AsyncEmbeddingService(
+        client=client,
+        cache=AsyncEmbeddingCache(fake_redis, ttl_seconds=60, enabled=True),
+    )
+
+
+@pytest.mark.asyncio
+async def test_sub_batches_reassemble_in_order(async_service, monkeypatch):
+    monkeypatch.setattr(f"{SETTINGS}.OPENAI_EMBEDDING_BATCH_MAX_INPUTS", 2)
+    texts = ["a", "bb", "ccc", "dddd", "eeeee"]
+
+    result = await async_service.generate_embeddings_batch(texts)
+
+    assert result == [[1.0], [2.0], [3.0], [4.0], [5.0]]
+    assert async_service.client.embeddings.create.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_sub_batches_run_concurrently_within_limit(async_service, monkeypatch):
+    monkeypatch.setattr(f"{SETTINGS}.OPENAI_EMBEDDING_BATCH_MAX_INPUTS", 1)
+    monkeypatch.setattr(f"{SETTINGS}.OPENAI_EMBEDDING_BATCH_CONCURRENCY", 2)
+    in_flight = peak = 0
+
+    async def slow_create(model, input):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return _embed_by_text(model, input)
+
+    async_service.client.embeddings.create.side_effect = slow_create
+
+    await async_service.generate_embeddings_batch(["a", "b", "c", "d", "e"])
+
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_retry_repeats_only_the_failed_sub_batch(async_service, monkeypatch):
+    monkeypatch.setattr(f"{SETTINGS}.OPENAI_EMBEDDING_BATCH_MAX_INPUTS", 2)
+    failures = {"ccc": 1}
+
+    def flaky_create(model, input):
+        if failures.get(input[0], 0):
+            failures[input[0]] -= 1
+            raise _connection_error()
+        return _embed_by_text(model, input)
+
+    async_service.client.embeddings.create.side_effect = flaky_create
+
+    result = await async_service.generate_embeddings_batch(["a", "bb", "ccc", "dddd"])
+
+    assert result == [[1.0], [2.0], [3.0], [4.0]]
+    inputs = [
+        call.kwargs["input"]
+        for call in async_service.client.embeddings.create.await_args_list
+    ]
+    assert inputs.count(["a", "bb"]) == 1
+    assert inputs.count(["ccc", "dddd"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_exhausted_retries_keep_successful_sub_batches_cached(
+    async_service, monkeypatch
+):
+    monkeypatch.setattr(f"{SETTINGS}.OPENAI_EMBEDDING_BATCH_MAX_INPUTS", 1)
+    monkeypatch.setattr(f"{SETTINGS}.OPENAI_EMBEDDING_BATCH_MAX_RETRIES", 1)
+
+    def failing_create(model, input):
+        if input == ["bad"]:
+            raise _connection_error()
+        return _embed_by_text(model, input)
+
+    async_service.client.embeddings.create.side_effect = failing_create
+
+    with pytest.raises(openai.APIConnectionError):
+        await async_service.generate_embeddings_batch(["good", "bad"])
+
+    assert await async_service.cache.get("good", async_service.model) == [4.0]
+
+
+def test_sync_service_splits_and_orders(monkeypatch):
+    monkeypatch.setattr(f"{SETTINGS}.OPENAI_EMBEDDING_BATCH_MAX_INPUTS", 2)
+    with patch("backend.retrieval.embeddings.openai.OpenAI") as openai_cls:
+        service = EmbeddingService()
+    service.cache = MagicMock()
+    service.cache.enabled.return_value = False
+    create = openai_cls.return_value.embeddings.create
+    calls = {"n": 0}
+
+    def flaky_create(model, input):
+        calls["n"] += 1
+        if calls["n"] == 1:
+            raise _connection_error()
+        return _embed_by_text(model, input)
+
+    create.side_effect = flaky_create
+
+    result = service.generate_embeddings_batch(["a", "bb", "ccc", "dddd", "eeeee"])
+
+    assert result == [[1.0], [2.0], [3.0], [4.0], [5.0]]
+    assert create.call_count == 4
+
+
+def test_sync_client_leaves_retries_to_the_service(monkeypatch):
+    monkeypatch.setattr(f"{SETTINGS}.OPENAI_EMBEDDING_BATCH_MAX_RETRIES", 1)
+    with patch("backend.retrieval.embeddings.openai.OpenAI") as openai_cls:
+        service = EmbeddingService()
+    service.cache = MagicMock()
+    service.cache.enabled.return_value = False
+    create = openai_cls.return_value.embeddings.create
+    create.side_effect = [_connection_error(), _embed_by_text(None, ["abc"])]
+
+    assert service.generate_embedding("abc") == [3.0]
+    assert openai_cls.call_args.kwargs["max_retries"] == 0
+    assert create.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_async_single_embedding_retries_transient_errors(async_service):
+    async_service.client.embeddings.create.side_effect = [
+        _connection_error(),
+        _embed_by_text(None, ["abcd"]),
+    ]
+
+    assert await async_service.generate_embedding("abcd") == [4.0]
+    assert async_service.client.embeddings.create.await_count == 2
+
+
+def test_default_async_client_has_no_sdk_retries():
+    with patch(
+        "backend.dependencies.openai_client.create_async_openai_client"
+    ) as create_client:
+        AsyncEmbeddingService(cache=MagicMock())
+
+    create_client.assert_called_once_with(max_retries=0)
@@ -59,7 +59,7 @@ class TestEmbeddingCacheUnit:
 
     def test_cache_set_with_ttl(self) -> None:
         """Cache.set() should use SETEX with configured TTL."""
-        import json
+        from backend.retrieval.codec import decode_vector
 
         mock_redis = MagicMock()
 
@@ -77,7 +77,74 @@ class TestEmbeddingCacheUnit:
             key, ttl, value = call_args[0]
             assert key.startswith("embedding_cache:")
             assert ttl == 2592000
-            assert json.loads(value) == [0.1, 0.2, 0.3]
+            assert decode_vector(value) == pytest.approx([0.1, 0.2, 0.3])
+
+    def test_get_many_uses_single_mget(self) -> None:
+        """Batch lookups should cost one round-trip and keep input order."""
+        from backend.retrieval.codec import encode_vector
+
+        mock_redis = MagicMock()
+        mock_redis.mget.return_value = [encode_vector([0.5, 0.25]), None]
+
+        with patch("redis.Redis.from_url", return_value=mock_redis):
+            from backend.retrieval.cache import EmbeddingCache
+
+            cache = EmbeddingCache()
+            result = cache.get_many(["hit", "miss"], "test-model")
+
+        assert result == [[0.5, 0.25], None]
+        mock_redis.mget.assert_called_once()
+        mock_redis.get.assert_not_called()
+
+    def test_set_many_pipelines_setex(self) -> None:
+        """Batch writes should go through one non-transactional pipeline."""
+        mock_redis = MagicMock()
+        pipe = mock_redis.pipeline.return_value
+
+        with patch("redis.Redis.from_url", return_value=mock_redis):
+            from backend.retrieval.cache import EmbeddingCache
+
+            cache = EmbeddingCache()
+            cache.set_many(["a", "b"], "test-model", [[0.1], [0.2]])
+
+        mock_redis.pipeline.assert_called_once_with(transaction=False)
+        assert pipe.setex.call_count == 2
+        pipe.execute.assert_called_once()
+        mock_redis.setex.assert_not_called()
+
+    def test_get_many_degrades_on_error(self) -> None:
+        """A failing MGET should report every text as a miss."""
+        mock_redis = MagicMock()
+        mock_redis.mget.side_effect = ConnectionError("redis down")
+
+        with patch("redis.Redis.from_url", return_value=mock_redis):
+            from backend.retrieval.cache import EmbeddingCache
+
+            cache = EmbeddingCache()
+            assert cache.get_many(["a", "b"], "test-model") == [None, None]
+
+    def test_batch_embedding_uses_bulk_cache_calls(self) -> None:
+        """generate_embeddings_batch should only fetch and store cache misses."""
+        with patch("backend.retrieval.embeddings.openai.OpenAI") as openai_cls:
+            from backend.retrieval.embeddings import EmbeddingService
+
+            service = EmbeddingService()
+
+        service.cache = MagicMock()
+        service.cache.enabled.return_value = True
+        service.cache.get_many.return_value = [[1.0], None, None]
+        openai_cls.return_value.embeddings.create.return_value = MagicMock(
+            data=[MagicMock(embedding=[2.0]), MagicMock(embedding=[3.0])],
+            usage=MagicMock(total_tokens=4),
+        )
+
+        result = service.generate_embeddings_batch(["a", "b", "c"])
+
+        assert result == [[1.0], [2.0], [3.0]]
+        service.cache.get.assert_not_called()
+        service.cache.set_many.assert_called_once_with(
+            ["b", "c"], service.model, [[2.0], [3.0]]
+        )
 
 
 class TestEmbeddingCacheIntegration:
@@ -109,7 +176,7 @@ class TestEmbeddingCacheIntegration:
 
         # Cache hit
         result = cache.get(text, model)
-        assert result == embedding
+        assert result == pytest.approx(embedding)
 
     def test_cache_different_models_different_keys(self, cache) -> None:
         """Same text with different models should use different keys."""
@@ -120,8 +187,8 @@ class TestEmbeddingCacheIntegration:
         cache.set(text, "model-v1", embedding_v1)
         cache.set(text, "model-v2", embedding_v2)
 
-        assert cache.get(text, "model-v1") == embedding_v1
-        assert cache.get(text, "model-v2") == embedding_v2
+        assert cache.get(text, "model-v1") == pytest.approx(embedding_v1)
+        assert cache.get(text, "model-v2") == pytest.approx(embedding_v2)
 
     def test_cache_ttl_set_correctly(self, cache, redis_client) -> None:
         """Cache entries should have TTL set."""
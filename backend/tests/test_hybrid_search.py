@@ -0,0 +1,210 @@
+"""Tests for hybrid BM25 + vector retrieval with reciprocal rank fusion."""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from qdrant_client import QdrantClient
+
+from backend.config import settings
+from backend.retrieval import lexical
+from backend.retrieval.numpy_store import NumpyVectorStore
+from backend.retrieval.qdrant import LEXICAL_VECTOR, QdrantService
+from backend.services.rag_service import AsyncRAGService
+
+# (context_item_id, title, content, vector); the query vector is [1, 0]
+ITEMS = [
+    (1, "수강신청 안내", "수강신청 기간과 방법을 안내합니다.", [1.0, 0.0]),
+    (2, "학사 일정", "학기별 주요 학사 일정입니다.", [1.0, 0.3]),
+    (3, "장학금 신청", "교내 장학금 신청 서류 목록입니다.", [1.0, 0.6]),
+    (4, "CS-101 강의계획서", "CS-101 프로그래밍 기초의 평가 기준입니다.", [0.2, 1.0]),
+]
+QUERY = [1.0, 0.0]
+CODE_QUERY = "CS-101 평가 기준이 어떻게 되나요?"
+
+
+def _payload(item_id: int, title: str, content: str) -> dict:
+    return {
+        "context_item_id": item_id,
+        "title": title,
+        "content": content,
+        "context_id": 10,
+        "topic_ids": [1],
+        "context_type": "MARKDOWN",
+        "token_count": 20,
+    }
+
+
+def _ids(results) -> list[int]:
+    return [r["context_item_id"] for r in results]
+
+
+@pytest.fixture
+def hybrid_settings(monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_EMBEDDING_DIM", 2)
+    monkeypatch.setattr(settings, "OPENAI_EMBEDDING_REDUCED_DIM", 0)
+    monkeypatch.setattr(settings, "QDRANT_QUANTIZATION", "none")
+    monkeypatch.setattr(settings, "QDRANT_TOPIC_PAYLOAD_FILTER", True)
+    monkeypatch.setattr(settings, "RAG_HYBRID_SEARCH", True)
+
+
+@pytest.fixture
+def qdrant_store(hybrid_settings):
+    service = QdrantService()
+    service.client = QdrantClient(":memory:")
+    service.create_collection()
+    for item_id, title, content, vector in ITEMS:
+        service._upsert(item_id, vector, _payload(item_id, title, content))
+    return service
+
+
+@pytest.fixture
+def numpy_store(hybrid_settings, tmp_path):
+    store = NumpyVectorStore(tmp_path)
+    store.create_collection()
+    store.upsert_points(
+        [
+            (item_id, vector, _payload(item_id, title, content))
+            for item_id, title, content, vector in ITEMS
+        ]
+    )
+    return store
+
+
+def test_tokenize_keeps_codes_and_strips_korean_particles():
+    tokens = lexical.tokenize("CS-101 과목의 수강신청은 2024-13 양식으로")
+
+    assert {"cs-101", "cs", "101", "2024-13"} <= set(tokens)
+    assert "과목" in tokens
+    assert {"수강신청", "수강", "강신", "신청"} <= set(tokens)
+    assert "양식" in tokens
+
+
+def test_document_vector_saturates_repeated_terms():
+    once = lexical.document_vector("장학금")
+    many = lexical.document_vector("장학금 " * 20)
+
+    term = lexical.term_id("장학금")
+    assert many[term] > once[term]
+    assert many[term] < settings.RAG_LEXICAL_BM25_K1 + 1
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = lexical.reciprocal_rank_fusion([["a", "b", "c"], ["c", "a"]], k=60)
+
+    assert sorted(fused, key=lambda item: fused[item], reverse=True) == ["a", "c", "b"]
+    assert fused["b"] == pytest.approx(1 / 62)
+
+
+def test_fuse_results_keeps_dense_scores():
+    dense = [{"context_item_id": 1, "score": 0.9}, {"context_item_id": 2, "score": 0.8}]
+    lexical_results = [{"context_item_id": 3, "score": 0.1}, dense[1]]
+
+    fused = lexical.fuse_results(dense, lexical_results, limit=2)
+
+    assert _ids(fused) == [2, 1]
+    assert [r["score"] for r in fused] == [0.8, 0.9]
+    assert [r["fused_score"] for r in fused] == [
+        pytest.approx(1 / 62 + 1 / 62),
+        pytest.approx(1 / 61),
+    ]
+
+
+@pytest.mark.parametrize("store_fixture", ["qdrant_store", "numpy_store"])
+def test_exact_code_query_recovers_item_dense_search_misses(store_fixture, request):
+    store = request.getfixturevalue(store_fixture)
+
+    dense = store.search_similar(QUERY, [1], limit=2)
+    hybrid = store.search_similar(QUERY, [1], limit=2, query_text=CODE_QUERY)
+
+    assert _ids(dense) == [1, 2]
+    assert _ids(hybrid) == [1, 4]
+    assert hybrid[1]["score"] == pytest.approx(0.2 / (1.04**0.5), rel=1e-5)
+
+
+@pytest.mark.parametrize("store_fixture", ["qdrant_store", "numpy_store"])
+def test_batch_hybrid_search_matches_single_searches(store_fixture, request):
+    store = request.getfixturevalue(store_fixture)
+    texts = [CODE_QUERY, "장학금 서류"]
+
+    batch = store.search_similar_batch([QUERY, QUERY], [[1], [1]], 2, texts)
+
+    assert batch == [
+        store.search_similar(QUERY, [1], limit=2, query_text=text) for text in texts
+    ]
+    assert _ids(batch[1]) == [1, 3]
+
+
+def test_qdrant_skips_lexical_requests_without_terms(qdrant_store):
+    requests = qdrant_store._search_requests(
+        QUERY, qdrant_store._topic_filter([1]), 5, "?!"
+    )
+
+    assert len(requests) == 1
+
+
+def test_numpy_lexical_index_follows_updates_and_reloads(numpy_store, tmp_path):
+    numpy_store.delete_embeddings([4])
+    assert 4 not in _ids(numpy_store.search_similar(QUERY, [1], 2, None, CODE_QUERY))
+
+    numpy_store._upsert(5, [0.0, 1.0], _payload(5, "CS-101 공지", "휴강 안내"))
+    reader = NumpyVectorStore(tmp_path)
+
+    assert _ids(reader.search_similar(QUERY, [1], 2, None, CODE_QUERY)) == [1, 5]
+
+
+def test_migrate_copies_collection_to_add_lexical_vectors(monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_EMBEDDING_DIM", 2)
+    monkeypatch.setattr(settings, "OPENAI_EMBEDDING_REDUCED_DIM", 0)
+    monkeypatch.setattr(settings, "QDRANT_QUANTIZATION", "none")
+    monkeypatch.setattr(settings, "QDRANT_TOPIC_PAYLOAD_FILTER", True)
+    monkeypatch.setattr(settings, "RAG_HYBRID_SEARCH", False)
+    client = QdrantClient(":memory:")
+    dense_only = QdrantService()
+    dense_only.client = client
+    dense_only.create_collection()
+    for item_id, title, content, vector in ITEMS:
+        dense_only._upsert(item_id, vector, _payload(item_id, title, content))
+
+    monkeypatch.setattr(settings, "RAG_HYBRID_SEARCH", True)
+    hybrid = QdrantService()
+    hybrid.client = client
+
+    assert hybrid.migrate_collection() == "copied"
+    assert hybrid.migrate_collection() == "unchanged"
+    params = client.get_collection(hybrid.collection_name).config.params
+    assert set(params.sparse_vectors or {}) == {LEXICAL_VECTOR}
+    assert _ids(hybrid.search_similar(QUERY, [1], 2, query_text=CODE_QUERY)) == [1, 4]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("hybrid", [False, True])
+async def test_rag_service_sends_query_text_only_with_hybrid_search(
+    hybrid, monkeypatch
+):
+    monkeypatch.setattr(settings, "RAG_HYBRID_SEARCH", hybrid)
+    store = MagicMock()
+    store.search_similar.return_value = []
+    store.search_similar_batch.return_value = [[]]
+    with patch("backend.services.rag_service.create_async_openai_client"):
+        service = AsyncRAGService(
+            redis_client=AsyncMock(),
+            openai_api_key="test-key",
+            embedding_service=MagicMock(),
+            qdrant_service=store,
+            reranking_service=MagicMock(),
+            semantic_cache=None,
+        )
+
+    await service._search(QUERY, [1], 5, 3, None, query_text=CODE_QUERY)
+    await service._search_vectors_batch([QUERY], [[1]], 5, [CODE_QUERY])
+
+    search_kwargs = store.search_similar.call_args.kwargs
+    batch_kwargs = store.search_similar_batch.call_args.kwargs
+    if hybrid:
+        assert search_kwargs["query_text"] == CODE_QUERY
+        assert batch_kwargs == {"query_texts": [CODE_QUERY]}
+    else:
+        assert "query_text" not in search_kwargs
+        assert batch_kwargs == {}
@@ -0,0 +1,277 @@
+"""Tests and latency benchmark for the in-process NumPy vector store."""
+
+from __future__ import annotations
+
+import fcntl
+import math
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointStruct
+
+from backend.retrieval.numpy_store import NumpyVectorStore
+from backend.retrieval.qdrant import QdrantService
+from backend.retrieval.vector_store import get_vector_store
+
+SETTINGS = "backend.retrieval.numpy_store.settings"
+
+# (context_item_id, context_id, topic_ids, vector)
+POINTS = [
+    (1, 10, [1], [1.0, 0.0, 0.0]),
+    (2, 10, [1], [1.0, 1.0, 0.0]),
+    (3, 20, [1, 2], [0.0, 1.0, 0.0]),
+    (4, 30, [2], [0.0, 0.0, 1.0]),
+]
+
+
+def _payload(item_id: int, context_id: int, topic_ids: list[int]) -> dict:
+    return {
+        "context_item_id": item_id,
+        "title": f"Item {item_id}",
+        "content": "content",
+        "context_id": context_id,
+        "topic_ids": topic_ids,
+        "context_type": "MARKDOWN",
+        "token_count": 3,
+    }
+
+
+@pytest.fixture
+def make_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(f"{SETTINGS}.OPENAI_EMBEDDING_DIM", 3)
+    monkeypatch.setattr(f"{SETTINGS}.QDRANT_TOPIC_PAYLOAD_FILTER", True)
+
+    def build() -> NumpyVectorStore:
+        store = NumpyVectorStore(tmp_path)
+        store.create_collection()
+        return store
+
+    return build
+
+
+@pytest.fixture
+def store(make_store):
+    store = make_store()
+    for item_id, context_id, topic_ids, vector in POINTS:
+        store._upsert(item_id, vector, _payload(item_id, context_id, topic_ids))
+    return store
+
+
+def _ids(results) -> list[int]:
+    return [r["context_item_id"] for r in results]
+
+
+def test_search_ranks_by_cosine_within_topic(store):
+    results = store.search_similar([1.0, 0.2, 0.0], topic_ids=[1], limit=2)
+
+    assert _ids(results) == [1, 2]
+    assert results[0]["score"] == pytest.approx(1 / math.sqrt(1.04))
+    assert set(results[0]) == {
+        "context_item_id",
+        "score",
+        "title",
+        "content",
+        "context_id",
+        "context_type",
+        "token_count",
+    }
+
+
+def test_context_filter_used_when_payload_filter_disabled(store, monkeypatch):
+    monkeypatch.setattr(f"{SETTINGS}.QDRANT_TOPIC_PAYLOAD_FILTER", False)
+    store.get_context_ids_for_topics = MagicMock(return_value=[30])
+
+    results = store.search_similar([0.0, 1.0, 1.0], topic_ids=[2], limit=10)
+
+    assert _ids(results) == [4]
+    store.get_context_ids_for_topics.assert_called_once_with([2])
+
+
+def test_batch_search_matches_single_searches(store):
+    queries = [[1.0, 0.0, 0.0], [0.0, 0.0, 1.0], [0.0, 1.0, 0.0]]
+    topics = [[1], [2], [3]]
+
+    batch = store.search_similar_batch(queries, topics, limit=2)
+
+    assert batch == [
+        store.search_similar(query, topic_ids, limit=2)
+        for query, topic_ids in zip(queries, topics, strict=True)
+    ]
+    assert batch[2] == []
+
+
+def test_upsert_replaces_existing_point(store):
+    store._upsert(1, [0.0, 0.0, 1.0], _payload(1, 30, [2]))
+
+    assert len(store._rows) == len(POINTS)
+    assert sorted(_ids(store.search_similar([0.0, 0.0, 1.0], [2], limit=2))) == [1, 4]
+    assert 1 not in _ids(store.search_similar([1.0, 0.0, 0.0], [1], limit=10))
+
+
+def test_upsert_appends_instead_of_rewriting_loaded_rows(store, make_store):
+    """Another process's loaded rows must never change under its sidecar."""
+    reader = make_store()
+    reader.search_similar([1.0, 0.0, 0.0], [1], limit=1)
+    old_row = store._rows[1]
+    before = store._matrix[old_row].copy()
+
+    store._upsert(1, [0.0, 0.0, 1.0], _payload(1, 30, [2]))
+
+    assert store._rows[1] == len(POINTS)
+    np.testing.assert_array_equal(store._matrix[old_row], before)
+    np.testing.assert_array_equal(reader._matrix[old_row], before)
+
+
+def test_search_reloads_under_a_shared_lock(store, make_store):
+    reader = make_store()
+    store._upsert(5, [1.0, 0.0, 0.0], _payload(5, 10, [1]))
+
+    with patch("backend.retrieval.numpy_store.fcntl.flock", wraps=fcntl.flock) as flock:
+        assert 5 in _ids(reader.search_similar([1.0, 0.0, 0.0], [1], limit=10))
+        reader.search_similar([1.0, 0.0, 0.0], [1], limit=10)
+
+    operations = [c.args[1] for c in flock.call_args_list]
+    assert operations == [fcntl.LOCK_SH, fcntl.LOCK_UN]
+
+
+def test_deletes_by_item_and_by_context(store):
+    store.delete_embeddings([1, 999])
+    store.delete_context_embeddings([20])
+
+    assert _ids(store.search_similar([1.0, 1.0, 1.0], [1, 2], limit=10)) == [2, 4]
+
+
+def test_compaction_keeps_remaining_points(store):
+    store.delete_embeddings([1, 2, 3])
+
+    assert len(store._ids) == 1
+    assert _ids(store.search_similar([0.0, 0.0, 1.0], [2], limit=10)) == [4]
+
+
+def test_set_context_topics_moves_points_between_topics(store):
+    store.set_context_topics({10: [2], 20: []})
+
+    assert _ids(store.search_similar([1.0, 0.0, 0.0], [1], limit=10)) == []
+    assert _ids(store.search_similar([1.0, 0.0, 0.0], [2], limit=10)) == [1, 2, 4]
+
+
+def test_collection_persists_and_reloads_other_writers(store, make_store):
+    reader = make_store()
+    assert _ids(reader.search_similar([1.0, 0.0, 0.0], [1], limit=1)) == [1]
+
+    store._upsert(5, [1.0, 0.0, 0.0], _payload(5, 10, [1]))
+    store.delete_embeddings([1])
+
+    assert _ids(reader.search_similar([1.0, 0.0, 0.0], [1], limit=1)) == [5]
+
+
+def test_matrix_grows_past_initial_capacity(make_store, monkeypatch):
+    monkeypatch.setattr("backend.retrieval.numpy_store._INITIAL_CAPACITY", 2)
+    store = make_store()
+
+    for item_id in range(1, 6):
+        store._upsert(item_id, [1.0, item_id, 0.0], _payload(item_id, 1, [1]))
+
+    assert len(store._matrix) == 8
+    assert _ids(make_store().search_similar([0.0, 1.0, 0.0], [1], limit=2)) == [5, 4]
+
+
+def test_dimension_change_requires_reset(store, monkeypatch):
+    monkeypatch.setattr(f"{SETTINGS}.OPENAI_EMBEDDING_DIM", 4)
+    store = NumpyVectorStore(store.directory)
+
+    with pytest.raises(ValueError, match="reset"):
+        store.create_collection()
+
+    store.reset_collection()
+    assert store.search_similar([1.0, 0.0, 0.0, 0.0], [1]) == []
+
+
+def test_store_embedding_builds_payload_from_the_database(store):
+    context = SimpleNamespace(topics=[SimpleNamespace(id=2)], context_type="PDF")
+    item = SimpleNamespace(title="T", content="C", context_id=40, context=context)
+    session = MagicMock()
+    session.__enter__.return_value.get.return_value = item
+
+    with patch("backend.retrieval.vector_store.SessionLocal", return_value=session):
+        store.store_embedding(7, [0.0, 1.0, 1.0], metadata={"chunk_index": 3})
+
+    result = store.search_similar([0.0, 1.0, 1.0], [2], limit=1)[0]
+    assert result["context_item_id"] == 7
+    assert result["context_id"] == 40
+    assert store._payloads[store._rows[7]]["chunk_index"] == 3
+
+
+@pytest.mark.parametrize(
+    ("backend", "store_class"),
+    [("numpy", NumpyVectorStore), ("qdrant", QdrantService)],
+)
+def test_backend_selected_by_setting(backend, store_class, monkeypatch):
+    monkeypatch.setattr(
+        "backend.retrieval.vector_store.settings.VECTOR_STORE_BACKEND", backend
+    )
+
+    assert isinstance(get_vector_store(), store_class)
+
+
+BENCHMARK_POINTS = 5000
+BENCHMARK_DIM = 1536
+BENCHMARK_QUERIES = 50
+
+
+@pytest.mark.performance
+def test_numpy_store_matches_qdrant_and_reports_latency(tmp_path, monkeypatch):
+    """
+    Compare search latency with an in-memory Qdrant on the same random points.
+
+    Both are exact here, so the result IDs must agree; run with ``-s`` to see
+    the table.
+    """
+    for name, value in {
+        "OPENAI_EMBEDDING_DIM": BENCHMARK_DIM,
+        "OPENAI_EMBEDDING_REDUCED_DIM": 0,
+        "QDRANT_QUANTIZATION": "none",
+        "QDRANT_TOPIC_PAYLOAD_FILTER": True,
+    }.items():
+        monkeypatch.setattr(f"{SETTINGS}.{name}", value)
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((BENCHMARK_POINTS, BENCHMARK_DIM)).astype(np.float32)
+    queries = rng.standard_normal((BENCHMARK_QUERIES, BENCHMARK_DIM)).tolist()
+    topics = [[int(t)] for t in rng.integers(10, size=BENCHMARK_QUERIES)]
+
+    numpy_store = NumpyVectorStore(tmp_path)
+    numpy_store.create_collection()
+    qdrant = QdrantService()
+    qdrant.client = QdrantClient(":memory:")
+    qdrant.create_collection()
+    points = [
+        (item_id, vector.tolist(), _payload(item_id, item_id, [item_id % 10]))
+        for item_id, vector in enumerate(vectors, start=1)
+    ]
+    numpy_store.upsert_points(points)
+    qdrant.client.upsert(
+        collection_name=qdrant.collection_name,
+        points=[PointStruct(id=i, vector=v, payload=p) for i, v, p in points],
+    )
+
+    report = {}
+    for name, store in [("numpy", numpy_store), ("qdrant-local", qdrant)]:
+        start = time.perf_counter()
+        results = [
+            store.search_similar(query, topic_ids, limit=10)
+            for query, topic_ids in zip(queries, topics, strict=True)
+        ]
+        report[name] = ((time.perf_counter() - start) / len(queries) * 1000, results)
+
+    print(f"\n{'backend':<14}{'ms/query':>10}")
+    for name, (latency_ms, _) in report.items():
+        print(f"{name:<14}{latency_ms:>10.2f}")
+
+    assert [_ids(r) for r in report["numpy"][1]] == [
+        _ids(r) for r in report["qdrant-local"][1]
+    ]
@@ -204,6 +204,10 @@ def test_setup_observability_applies_sampling():
         DEBUG=False,
     )
 
-    with patch("backend.observability.ParentBasedTraceIdRatio") as mock_sampler_class:
+    # Keep the mocked sampler out of the process-wide tracer provider
+    with (
+        patch("backend.observability.ParentBasedTraceIdRatio") as mock_sampler_class,
+        patch("backend.observability.trace.set_tracer_provider"),
+    ):
         setup_observability(app, settings)
         mock_sampler_class.assert_called_once_with(0.1)
@@ -0,0 +1,188 @@
+"""Tests and benchmark for the ONNX Runtime int8 reranker backend."""
+
+from __future__ import annotations
+
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from backend.config import settings
+from backend.retrieval.onnx_reranker import OnnxCrossEncoder
+from backend.retrieval.reranking import RerankingService
+
+
+class FakeTokenizer:
+    """One token per character of query + passage, truncated like HF's."""
+
+    def __call__(self, queries, passages, truncation, max_length):
+        assert truncation is True
+        input_ids = [
+            list(range(1, min(len(q) + len(p), max_length) + 1))
+            for q, p in zip(queries, passages, strict=True)
+        ]
+        return {
+            "input_ids": input_ids,
+            "attention_mask": [[1] * len(ids) for ids in input_ids],
+        }
+
+    def pad(self, features, return_tensors):
+        assert return_tensors == "np"
+        width = max(len(f["input_ids"]) for f in features)
+        return {
+            name: np.array([f[name] + [0] * (width - len(f[name])) for f in features])
+            for name in features[0]
+        }
+
+
+class FakeSession:
+    """Returns each pair's unpadded length as its logit."""
+
+    def __init__(self):
+        self.batch_shapes = []
+
+    def get_inputs(self):
+        return [
+            SimpleNamespace(name="input_ids"),
+            SimpleNamespace(name="attention_mask"),
+        ]
+
+    def run(self, output_names, feeds):
+        assert all(value.dtype == np.int64 for value in feeds.values())
+        self.batch_shapes.append(feeds["input_ids"].shape)
+        return [feeds["attention_mask"].sum(axis=1, keepdims=True).astype(np.float32)]
+
+
+def _sigmoid(x):
+    return 1 / (1 + np.exp(-np.asarray(x, np.float64)))
+
+
+def test_predict_batches_by_length_and_returns_input_order():
+    session = FakeSession()
+    encoder = OnnxCrossEncoder(session, FakeTokenizer(), max_length=64, batch_size=2)
+    pairs = [("q", "x" * 9), ("q", "x"), ("q", "x" * 5), ("q", "x" * 2)]
+
+    scores = encoder.predict(pairs)
+
+    np.testing.assert_allclose(scores, _sigmoid([10, 2, 6, 3]), rtol=1e-6)
+    # Short pairs share a batch, so padding stays within each length bucket
+    assert session.batch_shapes == [(2, 3), (2, 10)]
+
+
+def test_predict_truncates_to_max_length():
+    session = FakeSession()
+    encoder = OnnxCrossEncoder(session, FakeTokenizer(), max_length=8, batch_size=4)
+
+    scores = encoder.predict([("query", "p" * 100)])
+
+    assert session.batch_shapes == [(1, 8)]
+    np.testing.assert_allclose(scores, _sigmoid([8]), rtol=1e-6)
+
+
+def test_predict_without_pairs_skips_the_session():
+    session = MagicMock()
+    session.get_inputs.return_value = []
+
+    assert OnnxCrossEncoder(session, FakeTokenizer()).predict([]).shape == (0,)
+    session.run.assert_not_called()
+
+
+def test_from_pretrained_requires_onnxruntime(monkeypatch):
+    monkeypatch.setattr("backend.retrieval.onnx_reranker.onnxruntime", None)
+
+    with pytest.raises(ImportError, match="onnxruntime"):
+        OnnxCrossEncoder.from_pretrained("BAAI/bge-reranker-base")
+
+
+def test_reranking_service_selects_onnx_backend(monkeypatch):
+    monkeypatch.setattr(settings, "RERANKER_BACKEND", "onnx")
+    with patch.object(OnnxCrossEncoder, "from_pretrained") as from_pretrained:
+        service = RerankingService()
+
+    from_pretrained.assert_called_once_with(settings.RERANKER_MODEL)
+    assert service.model is from_pretrained.return_value
+
+
+def test_reranking_service_truncates_torch_backend(monkeypatch):
+    monkeypatch.setattr(settings, "RERANKER_BACKEND", "torch")
+    monkeypatch.setattr(settings, "RERANKER_MAX_LENGTH", 256)
+    with patch(
+        "backend.retrieval.reranking.sentence_transformers.CrossEncoder"
+    ) as cross_encoder:
+        RerankingService()
+
+    cross_encoder.assert_called_once_with(settings.RERANKER_MODEL, max_length=256)
+
+
+BENCHMARK_QUERIES = 10
+BENCHMARK_PASSAGES = 20
+
+
+@pytest.mark.performance
+def test_onnx_int8_matches_torch_scores_and_reports_latency(tmp_path):
+    """
+    Compare the int8 ONNX backend with the PyTorch cross-encoder on CPU.
+
+    Needs onnxruntime and the reranker weights; run with ``-s`` to see the
+    table. Quantization may move scores slightly but must keep each query's
+    ranking nearly intact.
+    """
+    pytest.importorskip("onnxruntime")
+    import sentence_transformers
+
+    try:
+        torch_model = sentence_transformers.CrossEncoder(
+            settings.RERANKER_MODEL, max_length=settings.RERANKER_MAX_LENGTH
+        )
+        onnx_model = OnnxCrossEncoder.from_pretrained(
+            settings.RERANKER_MODEL, cache_dir=tmp_path
+        )
+    except OSError as exc:
+        pytest.skip(f"Reranker weights unavailable: {exc}")
+    if isinstance(torch_model, MagicMock):
+        pytest.skip("CrossEncoder is mocked in this environment")
+
+    rng = np.random.default_rng(0)
+    vocabulary = (
+        "수강신청 장학금 졸업요건 학점 기숙사 휴학 복학 성적 강의 시험 "
+        "course credit exam schedule form CS-101 2024 deadline office"
+    ).split()
+    queries = [
+        " ".join(rng.choice(vocabulary, 6)) + "?" for _ in range(BENCHMARK_QUERIES)
+    ]
+    passages = [
+        " ".join(rng.choice(vocabulary, int(rng.integers(20, 300))))
+        for _ in range(BENCHMARK_PASSAGES)
+    ]
+    batches = [[(query, passage) for passage in passages] for query in queries]
+
+    report = {}
+    for name, model in [("torch", torch_model), ("onnx-int8", onnx_model)]:
+        model.predict(batches[0])
+        start = time.perf_counter()
+        scores = [np.asarray(model.predict(batch)) for batch in batches]
+        report[name] = ((time.perf_counter() - start) / len(batches) * 1000, scores)
+
+    def ranks(values):
+        return np.argsort(np.argsort(values))
+
+    correlations = [
+        np.corrcoef(ranks(torch_scores), ranks(onnx_scores))[0, 1]
+        for torch_scores, onnx_scores in zip(
+            report["torch"][1], report["onnx-int8"][1], strict=True
+        )
+    ]
+    max_diff = max(
+        float(np.abs(t - o).max())
+        for t, o in zip(report["torch"][1], report["onnx-int8"][1], strict=True)
+    )
+
+    print(f"\n{'backend':<12}{'ms/query':>10}")
+    for name, (latency_ms, _) in report.items():
+        print(f"{name:<12}{latency_ms:>10.1f}")
+    print(f"spearman min {min(correlations):.3f}, max |score diff| {max_diff:.3f}")
+
+    assert min(correlations) > 0.9
+    assert max_diff < 0.1
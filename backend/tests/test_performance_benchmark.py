@@ -96,7 +96,7 @@ class TestRAGPerformance:
             time.sleep(0.15)
             return search_results
 
-        async def mock_answer_with_timing(query, context):
+        async def mock_answer_with_timing(query, context, max_tokens=None):
             await asyncio.sleep(0.5)
             return ("Test answer", {})
 
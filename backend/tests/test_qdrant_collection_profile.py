@@ -0,0 +1,254 @@
+"""Tests for Qdrant collection profiles, quantized search and migration."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.models import (
+    BinaryQuantization,
+    Datatype,
+    Disabled,
+    PointStruct,
+    ScalarQuantization,
+)
+
+from backend.retrieval.qdrant import (
+    DEFAULT_VECTOR,
+    FULL_VECTOR,
+    REDUCED_VECTOR,
+    QdrantService,
+)
+
+SETTINGS = "backend.retrieval.qdrant.settings"
+
+VECTORS = {1: [1.0, 0.0, 0.0, 0.0], 2: [1.0, 0.1, 1.0, 0.0]}
+QUERY = [1.0, 0.0, 1.0, 0.0]
+TOPIC_FILTER = QdrantService._topic_filter([1])
+
+
+@pytest.fixture
+def configure(monkeypatch):
+    """Set the collection profile; unset options keep plain float32 vectors."""
+
+    def apply(**overrides):
+        profile = {
+            "OPENAI_EMBEDDING_DIM": 4,
+            "OPENAI_EMBEDDING_REDUCED_DIM": 0,
+            "QDRANT_RESCORE_FULL_DIM": True,
+            "QDRANT_QUANTIZATION": "none",
+            "QDRANT_VECTOR_DATATYPE": "float32",
+            "QDRANT_VECTORS_ON_DISK": False,
+            "QDRANT_TOPIC_PAYLOAD_FILTER": True,
+            **overrides,
+        }
+        for name, value in profile.items():
+            monkeypatch.setattr(f"{SETTINGS}.{name}", value)
+
+    return apply
+
+
+@pytest.fixture
+def qdrant_client():
+    return QdrantClient(":memory:")
+
+
+@pytest.fixture
+def make_service(qdrant_client):
+    def build() -> QdrantService:
+        service = QdrantService()
+        service.client = qdrant_client
+        return service
+
+    return build
+
+
+def _store_all(service: QdrantService) -> None:
+    service.client.upsert(
+        collection_name=service.collection_name,
+        points=[
+            PointStruct(
+                id=item_id,
+                vector=service._point_vector(vector),
+                payload={
+                    "context_item_id": item_id,
+                    "context_id": 1,
+                    "topic_ids": [1],
+                },
+            )
+            for item_id, vector in VECTORS.items()
+        ],
+    )
+
+
+def _vectors(service: QdrantService):
+    return service.client.get_collection(service.collection_name).config.params.vectors
+
+
+def test_scalar_profile_keeps_quantized_vectors_in_ram(configure, make_service):
+    configure(
+        QDRANT_QUANTIZATION="scalar",
+        QDRANT_VECTOR_DATATYPE="float16",
+        QDRANT_VECTORS_ON_DISK=True,
+    )
+    service = make_service()
+    service.create_collection()
+
+    vectors = _vectors(service)
+
+    assert isinstance(vectors.quantization_config, ScalarQuantization)
+    assert vectors.quantization_config.scalar.always_ram is True
+    assert vectors.datatype == Datatype.FLOAT16
+    assert vectors.on_disk is True
+
+
+def test_binary_quantization_applies_to_searched_vector_only(configure, make_service):
+    configure(QDRANT_QUANTIZATION="binary", OPENAI_EMBEDDING_REDUCED_DIM=2)
+    service = make_service()
+    service.create_collection()
+
+    vectors = _vectors(service)
+
+    assert isinstance(vectors[REDUCED_VECTOR].quantization_config, BinaryQuantization)
+    assert vectors[FULL_VECTOR].quantization_config is None
+
+
+def test_quantized_search_passes_oversampling_and_rescore(
+    configure, make_service, monkeypatch
+):
+    configure(QDRANT_QUANTIZATION="scalar")
+    monkeypatch.setattr(f"{SETTINGS}.QDRANT_QUANTIZATION_OVERSAMPLING", 3.0)
+    monkeypatch.setattr(f"{SETTINGS}.QDRANT_QUANTIZATION_RESCORE", False)
+    service = make_service()
+
+    params = service._search_request(QUERY, TOPIC_FILTER, limit=5).params
+
+    assert params.quantization.oversampling == 3.0
+    assert params.quantization.rescore is False
+
+
+def test_quantization_params_go_on_reduced_prefetch(configure, make_service):
+    configure(QDRANT_QUANTIZATION="binary", OPENAI_EMBEDDING_REDUCED_DIM=2)
+    service = make_service()
+
+    request = service._search_request(QUERY, TOPIC_FILTER, limit=5)
+
+    assert request.params is None
+    assert request.prefetch.params.quantization.rescore is True
+
+
+def test_unquantized_search_sends_no_params(configure, make_service):
+    configure()
+    service = make_service()
+
+    assert service._search_request(QUERY, TOPIC_FILTER, limit=5).params is None
+
+
+def test_quantized_collection_search_round_trip(configure, make_service):
+    configure(QDRANT_QUANTIZATION="scalar", QDRANT_VECTOR_DATATYPE="float16")
+    service = make_service()
+    service.create_collection()
+    _store_all(service)
+
+    results = service.search_similar(QUERY, topic_ids=[1], limit=2)
+
+    assert [r["context_item_id"] for r in results] == [2, 1]
+
+
+def test_migrate_creates_missing_collection(configure, make_service):
+    configure()
+    service = make_service()
+
+    assert service.migrate_collection() == "created"
+    assert service.migrate_collection() == "unchanged"
+
+
+def test_migrate_updates_quantization_in_place(configure, make_service):
+    configure()
+    make_service().create_collection()
+    configure(QDRANT_QUANTIZATION="scalar", QDRANT_VECTORS_ON_DISK=True)
+    service = make_service()
+    service.client.update_collection = MagicMock()
+
+    assert service.migrate_collection() == "updated"
+
+    updates = service.client.update_collection.call_args.kwargs["vectors_config"]
+    assert set(updates) == {DEFAULT_VECTOR}
+    assert updates[DEFAULT_VECTOR].on_disk is True
+    assert isinstance(updates[DEFAULT_VECTOR].quantization_config, ScalarQuantization)
+
+
+def test_migrate_disables_removed_quantization(configure, make_service):
+    configure(QDRANT_QUANTIZATION="binary")
+    make_service().create_collection()
+    configure()
+    service = make_service()
+    service.client.update_collection = MagicMock()
+
+    service.migrate_collection()
+
+    updates = service.client.update_collection.call_args.kwargs["vectors_config"]
+    assert updates[DEFAULT_VECTOR].quantization_config == Disabled.DISABLED
+
+
+def test_migrate_copies_into_aliased_collection(configure, make_service):
+    configure()
+    original = make_service()
+    original.create_collection()
+    _store_all(original)
+
+    configure(OPENAI_EMBEDDING_REDUCED_DIM=2, QDRANT_VECTOR_DATATYPE="float16")
+    service = make_service()
+
+    assert service.migrate_collection() == "copied"
+
+    aliases = service.client.get_aliases().aliases
+    assert [a.alias_name for a in aliases] == [service.collection_name]
+    assert set(_vectors(service)) == {REDUCED_VECTOR, FULL_VECTOR}
+    results = service.search_similar(QUERY, topic_ids=[1], limit=1)
+    assert [r["context_item_id"] for r in results] == [2]
+
+
+def test_second_copy_swaps_alias_and_drops_previous_target(
+    configure, make_service, monkeypatch
+):
+    configure()
+    make_service().create_collection()
+    _store_all(make_service())
+    configure(OPENAI_EMBEDDING_REDUCED_DIM=2)
+    clock = iter([1000.0, 2000.0])
+    monkeypatch.setattr(
+        "backend.retrieval.qdrant.time", SimpleNamespace(time=lambda: next(clock))
+    )
+    make_service().migrate_collection()
+
+    configure(OPENAI_EMBEDDING_REDUCED_DIM=2, QDRANT_VECTOR_DATATYPE="float16")
+    service = make_service()
+
+    assert service.migrate_collection() == "copied"
+
+    collections = {c.name for c in service.client.get_collections().collections}
+    assert collections == {f"{service.collection_name}_2000"}
+    assert service.client.count(service.collection_name).count == len(VECTORS)
+
+
+def test_copy_without_full_vectors_requires_reindex(configure, make_service):
+    configure(OPENAI_EMBEDDING_REDUCED_DIM=2, QDRANT_RESCORE_FULL_DIM=False)
+    make_service().create_collection()
+    configure()
+    service = make_service()
+
+    with pytest.raises(ValueError, match="re-index"):
+        service.migrate_collection()
+
+
+def test_migrate_without_dense_vectors_requires_reindex(configure):
+    configure()
+    service = QdrantService()
+    service.client = MagicMock()
+    service.client.get_collection.return_value.config.params.vectors = None
+
+    with pytest.raises(ValueError, match="no dense vectors"):
+        service.migrate_collection()
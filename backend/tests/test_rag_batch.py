@@ -0,0 +1,105 @@
+"""Tests for batched question answering across pipeline stages."""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from backend.retrieval.reranking import RerankingService
+
+
+def _search_result(item_id, content="Enrollment closes on March 2."):
+    return {
+        "context_item_id": item_id,
+        "title": f"Item {item_id}",
+        "content": content,
+        "score": 0.9,
+        "context_id": 1,
+        "context_type": "MARKDOWN",
+    }
+
+
+@pytest.fixture
+def batch_service(stub_rag_service):
+    service = stub_rag_service
+    service.semantic_cache = None
+    service.embedding_service.generate_embeddings_batch.side_effect = lambda texts: [
+        [0.1, 0.2, float(i)] for i in range(len(texts))
+    ]
+    service.qdrant_service.search_similar_batch.side_effect = (
+        lambda embeddings, topic_ids_list, limit: [
+            [_search_result(1), _search_result(2)] if topic_ids != [9] else []
+            for topic_ids in topic_ids_list
+        ]
+    )
+    service.reranking_service.rerank_batch.side_effect = (
+        lambda queries, results_list, top_k=None: [
+            [{**r, "rerank_score": 0.95} for r in results] for results in results_list
+        ]
+    )
+    return service
+
+
+@pytest.mark.asyncio
+async def test_batch_runs_each_stage_once(batch_service):
+    """All cache misses share one embedding, search and rerank call."""
+    results = await batch_service.query_batch(
+        [("When?", [1]), ("Where?", [1]), ("Nothing here?", [9])]
+    )
+
+    batch_service.embedding_service.generate_embeddings_batch.assert_called_once_with(
+        ["When?", "Where?", "Nothing here?"]
+    )
+    assert batch_service.qdrant_service.search_similar_batch.call_count == 1
+    batch_service.reranking_service.rerank_batch.assert_called_once()
+    assert batch_service.reranking_service.rerank_batch.call_args.args[0] == [
+        "When?",
+        "Where?",
+    ]
+    assert batch_service._generate_answer.await_count == 2
+    assert results[0]["answer"] == "Enrollment closes on March 2."
+    assert results[2]["sources"] == []
+
+
+@pytest.mark.asyncio
+async def test_batch_deduplicates_and_reuses_cache(batch_service):
+    await batch_service.query_batch([("When?", [1]), ("when? ", [1])])
+    results = await batch_service.query_batch([("When?", [1]), ("", [1])])
+
+    assert batch_service._generate_answer.await_count == 1
+    assert results[0]["answer"] == "Enrollment closes on March 2."
+    assert isinstance(results[1], ValueError)
+
+
+@pytest.mark.asyncio
+async def test_batch_isolates_generation_failures(batch_service):
+    batch_service._generate_answer.side_effect = [
+        RuntimeError("LLM timeout"),
+        ("Second answer.", {}),
+    ]
+
+    results = await batch_service.query_batch([("When?", [1]), ("Where?", [1])])
+
+    assert sum(isinstance(r, RuntimeError) for r in results) == 1
+    assert any(isinstance(r, dict) and r["answer"] == "Second answer." for r in results)
+
+
+def test_rerank_batch_scores_all_pairs_in_one_predict():
+    service = RerankingService.__new__(RerankingService)
+    service.model = MagicMock()
+    service.model.predict.return_value = [0.1, 0.9, 0.5]
+
+    reranked = service.rerank_batch(
+        ["q1", "q2"],
+        [[_search_result(1, "a"), _search_result(2, "b")], [_search_result(3, "c")]],
+        top_k=1,
+    )
+
+    service.model.predict.assert_called_once_with(
+        [("q1", "a"), ("q1", "b"), ("q2", "c")]
+    )
+    assert [[r["context_item_id"] for r in results] for results in reranked] == [
+        [2],
+        [3],
+    ]
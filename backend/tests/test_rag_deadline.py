@@ -0,0 +1,101 @@
+"""Tests for per-request deadlines and degraded pipeline modes."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from backend.services.deadline import Deadline, DeadlineExceeded
+
+SETTINGS = "backend.services.rag_service.settings"
+
+
+@pytest.mark.asyncio
+async def test_deadline_run_raises_when_stage_overruns():
+    deadline = Deadline.after(0.05)
+
+    with pytest.raises(DeadlineExceeded) as exc_info:
+        await deadline.run("vector_search", asyncio.sleep(1))
+
+    assert exc_info.value.stage == "vector_search"
+    assert isinstance(exc_info.value, TimeoutError)
+
+
+@pytest.mark.asyncio
+async def test_ample_budget_runs_full_pipeline(stub_rag_service):
+    await stub_rag_service.query("When is enrollment?", [1])
+
+    stub_rag_service.reranking_service.rerank_results.assert_called_once()
+    assert (
+        stub_rag_service.qdrant_service.search_similar.call_args.kwargs["limit"] == 10
+    )
+    assert stub_rag_service._generate_answer.call_args.kwargs["max_tokens"] == 1000
+
+
+@pytest.mark.asyncio
+async def test_tight_budget_skips_rerank_and_caps_tokens(stub_rag_service, monkeypatch):
+    """Without room to rerank, vector order is used and answers get shorter."""
+    monkeypatch.setattr(f"{SETTINGS}.RAG_REQUEST_TIMEOUT_SECONDS", 2.0)
+    stub_rag_service.semantic_cache = None
+
+    result = await stub_rag_service.query("When is enrollment?", [1])
+
+    stub_rag_service.reranking_service.rerank_results.assert_not_called()
+    assert stub_rag_service.qdrant_service.search_similar.call_args.kwargs["limit"] == 5
+    assert stub_rag_service._generate_answer.call_args.kwargs["max_tokens"] < 1000
+    assert result["sources"][0]["score"] == 0.9
+
+
+@pytest.mark.asyncio
+async def test_slow_rerank_falls_back_to_vector_order(stub_rag_service, monkeypatch):
+    monkeypatch.setattr(f"{SETTINGS}.RAG_REQUEST_TIMEOUT_SECONDS", 10.0)
+    monkeypatch.setattr(f"{SETTINGS}.RAG_DEADLINE_RERANK_MIN_SECONDS", 0.0)
+    monkeypatch.setattr(f"{SETTINGS}.RAG_DEADLINE_GENERATION_RESERVE_SECONDS", 9.8)
+
+    def slow_rerank(query, search_results, top_k=None):
+        time.sleep(0.5)
+        return search_results
+
+    stub_rag_service.reranking_service.rerank_results.side_effect = slow_rerank
+
+    result = await stub_rag_service.query("When is enrollment?", [1])
+
+    assert result["sources"][0]["score"] == 0.9
+    assert result["answer"] == "Enrollment closes on March 2."
+
+
+@pytest.mark.asyncio
+async def test_required_stage_overrun_raises_timeout(stub_rag_service, monkeypatch):
+    monkeypatch.setattr(f"{SETTINGS}.RAG_REQUEST_TIMEOUT_SECONDS", 0.05)
+
+    async def slow_answer(query, context, max_tokens=None):
+        await asyncio.sleep(1)
+        return "late", {}
+
+    stub_rag_service._generate_answer = slow_answer
+
+    with pytest.raises(DeadlineExceeded):
+        await stub_rag_service.query("When is enrollment?", [1])
+
+
+@pytest.mark.asyncio
+async def test_stream_bounds_slow_embedding(stub_rag_service, monkeypatch):
+    monkeypatch.setattr(f"{SETTINGS}.RAG_REQUEST_TIMEOUT_SECONDS", 0.05)
+
+    async def slow_embedding(text):
+        await asyncio.sleep(1)
+        return [0.1, 0.2, 0.3]
+
+    stub_rag_service.embedding_service.generate_embedding = slow_embedding
+
+    start = time.perf_counter()
+    events = [
+        json.loads(event)
+        async for event in stub_rag_service.query_stream("When is enrollment?", [1])
+    ]
+
+    assert time.perf_counter() - start < 0.5
+    assert [event["type"] for event in events] == ["error"]
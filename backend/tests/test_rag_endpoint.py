@@ -2,12 +2,13 @@
 Tests for FastAPI RAG endpoint.
 """
 
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock
 
 import pytest
 from fastapi import status
 from fastapi.testclient import TestClient
 
+from backend.dependencies.rag import get_rag_service
 from backend.main import app
 
 client = TestClient(app)
@@ -15,29 +16,14 @@ client = TestClient(app)
 
 @pytest.fixture
 def mock_rag_service():
-    """Mock AsyncRAGService for testing."""
-    with patch("backend.routers.rag.AsyncRAGService") as mock_service_class:
-        mock_service = AsyncMock()
-        mock_service_class.return_value = mock_service
-        yield mock_service
+    """Mock the shared AsyncRAGService dependency for testing."""
+    mock_service = AsyncMock()
+    app.dependency_overrides[get_rag_service] = lambda: mock_service
+    yield mock_service
+    app.dependency_overrides.pop(get_rag_service, None)
 
 
-@pytest.fixture
-def mock_redis():
-    """Mock Redis dependency."""
-    with patch("backend.routers.rag.get_redis") as mock:
-        mock_redis_client = AsyncMock()
-        mock.return_value = mock_redis_client
-        yield mock_redis_client
-
-
-@pytest.fixture(autouse=True)
-def auto_set_openai_key(monkeypatch):
-    """Automatically set OPENAI_API_KEY for all tests in this module."""
-    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
-
-
-def test_ask_question_success(mock_rag_service, mock_redis):
+def test_ask_question_success(mock_rag_service):
     """Test successful question answering."""
     mock_rag_service.query.return_value = {
         "answer": "This is a test answer.",
@@ -69,7 +55,7 @@ def test_ask_question_success(mock_rag_service, mock_redis):
     assert data["citations"][0]["score"] == 0.95
 
 
-def test_ask_question_empty_question_fails(mock_rag_service, mock_redis):
+def test_ask_question_empty_question_fails(mock_rag_service):
     """Test that empty question returns 422 validation error."""
     response = client.post(
         "/api/rag/ask",
@@ -82,7 +68,7 @@ def test_ask_question_empty_question_fails(mock_rag_service, mock_redis):
     assert response.status_code == 422
 
 
-def test_ask_question_invalid_topic_id_fails(mock_rag_service, mock_redis):
+def test_ask_question_invalid_topic_id_fails(mock_rag_service):
     """Test that invalid topic_id returns 422 validation error."""
     response = client.post(
         "/api/rag/ask",
@@ -95,7 +81,7 @@ def test_ask_question_invalid_topic_id_fails(mock_rag_service, mock_redis):
     assert response.status_code == 422
 
 
-def test_ask_question_service_value_error(mock_rag_service, mock_redis):
+def test_ask_question_service_value_error(mock_rag_service):
     """Test that ValueError from service returns 400."""
     mock_rag_service.query.side_effect = ValueError("Invalid parameters")
 
@@ -111,7 +97,7 @@ def test_ask_question_service_value_error(mock_rag_service, mock_redis):
     assert "Invalid request parameters" in response.json()["detail"]
 
 
-def test_ask_question_service_connection_error(mock_rag_service, mock_redis):
+def test_ask_question_service_connection_error(mock_rag_service):
     """Test that ConnectionError from service returns 503."""
     mock_rag_service.query.side_effect = ConnectionError("Service unavailable")
 
@@ -127,7 +113,7 @@ def test_ask_question_service_connection_error(mock_rag_service, mock_redis):
     assert "Unable to connect" in response.json()["detail"]
 
 
-def test_ask_question_service_generic_error(mock_rag_service, mock_redis):
+def test_ask_question_service_generic_error(mock_rag_service):
     """Test that generic Exception from service returns 500."""
     mock_rag_service.query.side_effect = Exception("Unexpected error")
 
@@ -141,3 +127,72 @@ def test_ask_question_service_generic_error(mock_rag_service, mock_redis):
 
     assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
     assert "error occurred" in response.json()["detail"]
+
+
+def test_ask_question_without_openai_key_returns_503(monkeypatch):
+    """Missing OpenAI configuration should surface as 503."""
+    monkeypatch.setattr("backend.dependencies.rag.settings.OPENAI_API_KEY", None)
+
+    response = client.post(
+        "/api/rag/ask",
+        json={"topic_id": 1, "question": "Test question"},
+    )
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+
+def test_ask_batch_reports_per_question_results(mock_rag_service):
+    """Batch answers keep request order and isolate per-question failures."""
+    mock_rag_service.query_batch.return_value = [
+        {
+            "answer": "Batch answer.",
+            "sources": [
+                {
+                    "title": "Test Source",
+                    "content": "x" * 300,
+                    "score": 0.9,
+                    "context_type": "MARKDOWN",
+                    "context_item_id": 1,
+                }
+            ],
+        },
+        RuntimeError("LLM timeout"),
+    ]
+
+    response = client.post(
+        "/api/rag/ask/batch",
+        json={
+            "questions": [
+                {"topic_id": 1, "question": "First?"},
+                {"topic_id": 2, "question": "Second?"},
+            ]
+        },
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    mock_rag_service.query_batch.assert_awaited_once_with(
+        [("First?", [1]), ("Second?", [2])]
+    )
+    first, second = response.json()["results"]
+    assert first["answer"] == "Batch answer."
+    assert first["error"] is None
+    assert len(first["citations"][0]["content"]) == 203
+    assert second["topic_id"] == 2
+    assert second["answer"] is None
+    assert second["error"] == "An error occurred while processing this question."
+
+
+def test_ask_batch_rejects_empty_batch(mock_rag_service):
+    response = client.post("/api/rag/ask/batch", json={"questions": []})
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_ask_question_deadline_exceeded_returns_504(mock_rag_service):
+    from backend.services.deadline import DeadlineExceeded
+
+    mock_rag_service.query.side_effect = DeadlineExceeded("generation")
+
+    response = client.post("/api/rag/ask", json={"topic_id": 1, "question": "Slow?"})
+
+    assert response.status_code == status.HTTP_504_GATEWAY_TIMEOUT
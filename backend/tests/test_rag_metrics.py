@@ -37,7 +37,7 @@ def mock_redis():
 def async_rag_service(mock_redis, monkeypatch, setup_metrics):
     """Create AsyncRAGService with mocked dependencies."""
     monkeypatch.setenv("OPENAI_API_KEY", "test-key")
-    with patch("backend.services.rag_service.QdrantService"):
+    with patch("backend.services.rag_service.get_vector_store"):
         service = AsyncRAGService(
             redis_client=mock_redis,
             openai_api_key="test-key",
@@ -0,0 +1,125 @@
+"""Tests for single-flight coalescing and stale-while-revalidate query caching."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from backend.services.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_queries_run_pipeline_once(stub_rag_service):
+    """Concurrent cache misses for one key should share a single execution."""
+    gate = asyncio.Event()
+    calls = 0
+
+    async def slow_answer(query, context, max_tokens=None):
+        nonlocal calls
+        calls += 1
+        await gate.wait()
+        return "answer", {}
+
+    stub_rag_service._generate_answer = slow_answer
+
+    tasks = [
+        asyncio.create_task(stub_rag_service.query("When is enrollment?", [1]))
+        for _ in range(5)
+    ]
+    await asyncio.sleep(0.01)
+    gate.set()
+    results = await asyncio.gather(*tasks)
+
+    assert calls == 1
+    assert all(result["answer"] == "answer" for result in results)
+    assert stub_rag_service.embedding_service.generate_embedding.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_fresh_cache_hit_skips_pipeline(stub_rag_service):
+    """A fresh cached entry should be returned without running the pipeline."""
+    await stub_rag_service.query("When is enrollment?", [1])
+    await stub_rag_service.query("when is enrollment?  ", [1])
+
+    assert stub_rag_service._generate_answer.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_served_and_refreshed_in_background(
+    stub_rag_service, fake_redis
+):
+    """Expired entries are served stale while one refresh repopulates them."""
+    cache_key = stub_rag_service._get_query_cache_key("When is enrollment?", [1], 10, 5)
+    stale = {"answer": "old answer", "sources": [], "context_items": []}
+    fake_redis.store[cache_key] = json.dumps(
+        {"result": stale, "fresh_until": time.time() - 1}
+    )
+
+    first = await stub_rag_service.query("When is enrollment?", [1])
+    second = await stub_rag_service.query("When is enrollment?", [1])
+
+    assert first["answer"] == "old answer"
+    assert second["answer"] == "old answer"
+
+    await asyncio.gather(*stub_rag_service._refresh_tasks.values())
+    refreshed = await stub_rag_service._get_cached_result(cache_key)
+
+    assert refreshed is not None
+    assert refreshed["answer"] == "Enrollment closes on March 2."
+    assert stub_rag_service._generate_answer.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_legacy_cache_entries_still_readable(stub_rag_service, fake_redis):
+    """Plain results cached before the envelope format should be served."""
+    cache_key = stub_rag_service._get_query_cache_key("Legacy?", [1], 10, 5)
+    legacy = {"answer": "legacy", "sources": [], "context_items": []}
+    fake_redis.store[cache_key] = json.dumps(legacy)
+
+    result = await stub_rag_service.query("Legacy?", [1])
+
+    assert result == legacy
+    stub_rag_service._generate_answer.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_single_flight_waits_for_remote_leader(fake_redis):
+    """When another worker holds the lease, the result is read from the cache."""
+    flight = SingleFlight(fake_redis, lease_seconds=1.0, poll_interval=0.01)
+    await fake_redis.set("key:lock", "other-worker")
+
+    async def compute():
+        raise AssertionError("compute should not run while lease is held")
+
+    async def lookup():
+        return await fake_redis.get("key")
+
+    async def remote_leader():
+        await asyncio.sleep(0.03)
+        await fake_redis.set("key", "remote result")
+
+    leader = asyncio.create_task(remote_leader())
+    result = await flight.run("key", compute, lookup)
+    await leader
+
+    assert result == "remote result"
+
+
+@pytest.mark.asyncio
+async def test_single_flight_releases_lease_on_error(fake_redis):
+    """A failing leader must release its lease and propagate the error."""
+    flight = SingleFlight(fake_redis)
+
+    async def compute():
+        raise RuntimeError("boom")
+
+    async def lookup():
+        return None
+
+    with pytest.raises(RuntimeError):
+        await flight.run("key", compute, lookup)
+
+    assert "key:lock" not in fake_redis.store
@@ -0,0 +1,130 @@
+"""Tests for answer caching and replay in the streaming RAG pipeline."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+
+def _stream_answer(*chunks):
+    calls = []
+
+    async def generate(query, context, conversation_history="", max_tokens=None):
+        calls.append(query)
+        for chunk in chunks:
+            yield chunk
+
+    return generate, calls
+
+
+async def _collect(stream):
+    return [json.loads(event) async for event in stream]
+
+
+@pytest.mark.asyncio
+async def test_completed_stream_is_replayed_from_cache(stub_rag_service):
+    """A second identical streaming request should not hit the LLM."""
+    generate, calls = _stream_answer("Enrollment ", "closes on March 2.")
+    stub_rag_service._generate_answer_stream = generate
+
+    first = await _collect(stub_rag_service.query_stream("When is enrollment?", [1]))
+    second = await _collect(stub_rag_service.query_stream("When is enrollment?", [1]))
+
+    assert len(calls) == 1
+    replayed = "".join(e["content"] for e in second if e["type"] == "answer_chunk")
+    assert replayed == "Enrollment closes on March 2."
+    assert [e["type"] for e in second][-2:] == ["citations", "done"]
+    assert second[-2]["citations"] == first[-2]["citations"]
+    assert stub_rag_service.embedding_service.generate_embedding.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_replays_answers_cached_by_query(stub_rag_service):
+    """Non-streaming answers share cache keys with history-free streams."""
+    await stub_rag_service.query("When is enrollment?", [1])
+    generate, calls = _stream_answer("unused")
+    stub_rag_service._generate_answer_stream = generate
+
+    events = await _collect(stub_rag_service.query_stream("When is enrollment?", [1]))
+
+    assert calls == []
+    assert events[0]["content"] == "Enrollment closes on March 2."
+
+
+@pytest.mark.asyncio
+async def test_failed_stream_is_not_cached(stub_rag_service, fake_redis):
+    """Streams that error out must not leave a partial answer in the cache."""
+
+    async def failing(query, context, conversation_history="", max_tokens=None):
+        yield "partial"
+        raise RuntimeError("LLM disconnected")
+
+    stub_rag_service._generate_answer_stream = failing
+
+    events = await _collect(stub_rag_service.query_stream("When is enrollment?", [1]))
+
+    assert events[-1]["type"] == "error"
+    cache_key = stub_rag_service._get_query_cache_key("When is enrollment?", [1], 10, 5)
+    assert cache_key not in fake_redis.store
+
+
+def test_history_changes_cache_key(stub_rag_service):
+    """Answers that depend on conversation history get their own key."""
+    base = stub_rag_service._get_query_cache_key("Q?", [1], 10, 5)
+
+    assert stub_rag_service._get_query_cache_key("Q?", [1], 10, 5, "") == base
+    assert stub_rag_service._get_query_cache_key("Q?", [1], 10, 5, "Q: hi") != base
+
+
+@pytest.mark.asyncio
+async def test_history_and_embedding_stages_overlap(stub_rag_service, monkeypatch):
+    """History loading must not wait for the embedding stage, or vice versa."""
+    monkeypatch.setattr(
+        "backend.services.rag_service.settings.QDRANT_TOPIC_PAYLOAD_FILTER", False
+    )
+    loop = asyncio.get_running_loop()
+    embedding_started = asyncio.Event()
+
+    def embed(query):
+        loop.call_soon_threadsafe(embedding_started.set)
+        return [0.1, 0.2, 0.3]
+
+    async def load_history(session_id, current_question):
+        await asyncio.wait_for(embedding_started.wait(), timeout=1)
+        return ""
+
+    stub_rag_service.embedding_service.generate_embedding.side_effect = embed
+    stub_rag_service._load_conversation_history = load_history
+    stub_rag_service.qdrant_service.get_context_ids_for_topics.return_value = [7]
+    generate, _ = _stream_answer("Enrollment closes on March 2.")
+    stub_rag_service._generate_answer_stream = generate
+
+    events = await _collect(
+        stub_rag_service.query_stream("When is enrollment?", [1], session_id="s1")
+    )
+
+    assert events[-1]["type"] == "done"
+    search_kwargs = stub_rag_service.qdrant_service.search_similar.call_args.kwargs
+    assert search_kwargs["context_ids"] == [7]
+
+
+@pytest.mark.asyncio
+async def test_topic_payload_filter_skips_context_resolution(
+    stub_rag_service, monkeypatch
+):
+    monkeypatch.setattr(
+        "backend.services.rag_service.settings.QDRANT_TOPIC_PAYLOAD_FILTER", True
+    )
+    generate, _ = _stream_answer("Enrollment closes on March 2.")
+    stub_rag_service._generate_answer_stream = generate
+
+    events = await _collect(
+        stub_rag_service.query_stream("When is enrollment?", [1], session_id="s1")
+    )
+
+    assert events[-1]["type"] == "done"
+    stub_rag_service.qdrant_service.get_context_ids_for_topics.assert_not_called()
+    search_kwargs = stub_rag_service.qdrant_service.search_similar.call_args.kwargs
+    assert "context_ids" not in search_kwargs
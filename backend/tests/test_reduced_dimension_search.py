@@ -0,0 +1,227 @@
+"""Tests and golden-dataset benchmark for reduced-dimension vector search."""
+
+from __future__ import annotations
+
+import json
+import math
+import time
+from pathlib import Path
+
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointStruct, Prefetch
+
+from backend.config import settings
+from backend.retrieval.embeddings import reduce_embedding
+from backend.retrieval.qdrant import FULL_VECTOR, REDUCED_VECTOR, QdrantService
+
+SETTINGS = "backend.retrieval.qdrant.settings"
+
+# The first two dimensions favour item 1; all four favour item 2.
+VECTORS = {1: [1.0, 0.0, 0.0, 0.0], 2: [1.0, 0.1, 1.0, 0.0]}
+QUERY = [1.0, 0.0, 1.0, 0.0]
+
+
+def _in_memory_service(
+    monkeypatch,
+    dim: int,
+    reduced_dim: int,
+    rescore: bool = True,
+) -> QdrantService:
+    monkeypatch.setattr(f"{SETTINGS}.OPENAI_EMBEDDING_DIM", dim)
+    monkeypatch.setattr(f"{SETTINGS}.OPENAI_EMBEDDING_REDUCED_DIM", reduced_dim)
+    monkeypatch.setattr(f"{SETTINGS}.QDRANT_RESCORE_FULL_DIM", rescore)
+    monkeypatch.setattr(f"{SETTINGS}.QDRANT_TOPIC_PAYLOAD_FILTER", True)
+
+    service = QdrantService()
+    service.client = QdrantClient(":memory:")
+    service.create_collection()
+    return service
+
+
+def _store(service: QdrantService, item_id: int, embedding, topic_id: int = 1):
+    service.client.upsert(
+        collection_name=service.collection_name,
+        points=[
+            PointStruct(
+                id=item_id,
+                vector=service._point_vector(embedding),
+                payload={
+                    "context_item_id": item_id,
+                    "context_id": item_id,
+                    "topic_ids": [topic_id],
+                },
+            )
+        ],
+    )
+
+
+def _ids(results) -> list[int]:
+    return [r["context_item_id"] for r in results]
+
+
+def test_reduce_embedding_truncates_and_renormalizes():
+    reduced = reduce_embedding([3.0, 4.0, 12.0], 2)
+
+    assert reduced == pytest.approx([0.6, 0.8])
+
+
+@pytest.mark.parametrize("dimensions", [0, 4])
+def test_reduce_embedding_rejects_invalid_sizes(dimensions):
+    with pytest.raises(ValueError):
+        reduce_embedding([0.1, 0.2, 0.3], dimensions)
+
+
+def test_full_vectors_stored_unindexed_on_disk(monkeypatch):
+    service = _in_memory_service(monkeypatch, dim=4, reduced_dim=2)
+
+    vectors = service.client.get_collection(
+        service.collection_name
+    ).config.params.vectors
+
+    assert isinstance(vectors, dict)
+    full = vectors[FULL_VECTOR]
+    assert vectors[REDUCED_VECTOR].size == 2
+    assert full.size == 4
+    assert full.on_disk is True
+    assert full.hnsw_config is not None
+    assert full.hnsw_config.m == 0
+
+
+def test_reduced_dimension_disabled_keeps_single_vector(monkeypatch):
+    service = _in_memory_service(monkeypatch, dim=4, reduced_dim=0)
+    for item_id, vector in VECTORS.items():
+        _store(service, item_id, vector)
+
+    results = service.search_similar(QUERY, topic_ids=[1], limit=2)
+
+    assert service._point_vector(QUERY) == QUERY
+    assert _ids(results) == [2, 1]
+
+
+def test_reduced_search_without_rescore_ranks_by_prefix(monkeypatch):
+    service = _in_memory_service(monkeypatch, dim=4, reduced_dim=2, rescore=False)
+    for item_id, vector in VECTORS.items():
+        _store(service, item_id, vector)
+
+    results = service.search_similar(QUERY, topic_ids=[1], limit=2)
+
+    assert _ids(results) == [1, 2]
+    assert set(service._point_vector(QUERY)) == {REDUCED_VECTOR}
+
+
+def test_rescore_restores_full_dimension_order(monkeypatch):
+    service = _in_memory_service(monkeypatch, dim=4, reduced_dim=2)
+    for item_id, vector in VECTORS.items():
+        _store(service, item_id, vector)
+
+    results = service.search_similar(QUERY, topic_ids=[1], limit=1)
+
+    assert _ids(results) == [2]
+    full_cosine = 2 / (math.sqrt(2.01) * math.sqrt(2))
+    assert results[0]["score"] == pytest.approx(full_cosine)
+
+
+def test_rescore_oversamples_reduced_candidates(monkeypatch):
+    monkeypatch.setattr(f"{SETTINGS}.QDRANT_RESCORE_OVERSAMPLING", 2.5)
+    service = _in_memory_service(monkeypatch, dim=4, reduced_dim=2)
+
+    request = service._search_request(QUERY, service._topic_filter([1]), limit=5)
+
+    assert isinstance(request.prefetch, Prefetch)
+    assert request.prefetch.limit == 13
+    assert request.prefetch.using == REDUCED_VECTOR
+    assert request.using == FULL_VECTOR
+    assert request.limit == 5
+
+
+def test_reduced_batch_search_filters_per_query(monkeypatch):
+    service = _in_memory_service(monkeypatch, dim=4, reduced_dim=2)
+    _store(service, 1, VECTORS[1], topic_id=1)
+    _store(service, 2, VECTORS[2], topic_id=2)
+
+    results = service.search_similar_batch([QUERY, QUERY], [[1], [2]], limit=5)
+
+    assert [_ids(r) for r in results] == [[1], [2]]
+
+
+def test_reduced_dim_not_smaller_than_full_is_ignored(monkeypatch):
+    service = _in_memory_service(monkeypatch, dim=4, reduced_dim=4)
+
+    assert service.reduced_vector_size == 0
+    assert service._point_vector(QUERY) == QUERY
+
+
+BENCHMARK_CONFIGS = [
+    ("full", 0, False),
+    ("512", 512, False),
+    ("512+rescore", 512, True),
+    ("256", 256, False),
+    ("256+rescore", 256, True),
+]
+RECALL_AT = 5
+
+
+@pytest.fixture(scope="module")
+def golden_embeddings(golden_dataset):
+    """Embed the golden contexts and questions once for every configuration."""
+    if not settings.OPENAI_API_KEY:
+        pytest.skip("OpenAI API key not configured for the embedding benchmark")
+
+    from backend.retrieval.embeddings import EmbeddingService
+
+    fixture_path = Path(__file__).parent / "fixtures" / "fake_contexts_data.json"
+    with open(fixture_path) as f:
+        contexts = {int(k): v for k, v in json.load(f).items()}
+
+    service = EmbeddingService()
+    context_vectors = service.generate_embeddings_batch(
+        [c["content"] for c in contexts.values()]
+    )
+    question_vectors = service.generate_embeddings_batch(
+        [entry["question"] for entry in golden_dataset]
+    )
+    return contexts, dict(zip(contexts, context_vectors, strict=True)), question_vectors
+
+
+@pytest.mark.performance
+@pytest.mark.golden
+@pytest.mark.integration
+def test_reduced_dimension_recall_latency_tradeoff(
+    monkeypatch, golden_dataset, golden_embeddings
+):
+    """
+    Report recall@5 and search latency per dimension on the golden dataset.
+
+    Uses an in-memory Qdrant so the numbers compare configurations rather
+    than measure a deployment; run with ``-s`` to see the table.
+    """
+    contexts, context_vectors, question_vectors = golden_embeddings
+    dim = len(next(iter(context_vectors.values())))
+
+    report: dict[str, tuple[float, float]] = {}
+    for name, reduced_dim, rescore in BENCHMARK_CONFIGS:
+        service = _in_memory_service(monkeypatch, dim, reduced_dim, rescore)
+        for item_id, vector in context_vectors.items():
+            _store(service, item_id, vector, topic_id=contexts[item_id]["topic_id"])
+
+        hits = expected = 0
+        elapsed = 0.0
+        for entry, vector in zip(golden_dataset, question_vectors, strict=True):
+            start = time.perf_counter()
+            results = service.search_similar(
+                vector, topic_ids=[entry["topic_id"]], limit=RECALL_AT
+            )
+            elapsed += time.perf_counter() - start
+            hits += len(set(_ids(results)) & set(entry["expected_context_ids"]))
+            expected += len(entry["expected_context_ids"])
+
+        report[name] = (hits / expected, elapsed / len(golden_dataset) * 1000)
+
+    print(f"\n{'config':<14}{'recall@5':>10}{'ms/query':>10}")
+    for name, (recall, latency_ms) in report.items():
+        print(f"{name:<14}{recall:>10.2f}{latency_ms:>10.2f}")
+
+    full_recall = report["full"][0]
+    assert report["512+rescore"][0] >= full_recall - 0.1
+    assert report["256+rescore"][0] >= full_recall - 0.1
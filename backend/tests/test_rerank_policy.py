@@ -0,0 +1,122 @@
+"""Tests for the adaptive rerank policy."""
+
+from __future__ import annotations
+
+import pytest
+
+from backend.retrieval.rerank_policy import apply_score_floor, plan_rerank
+
+SETTINGS = "backend.services.rag_service.settings"
+
+
+def _result(item_id: int, score: float) -> dict:
+    return {
+        "context_item_id": item_id,
+        "title": f"Item {item_id}",
+        "content": f"Content {item_id}",
+        "score": score,
+        "context_id": 1,
+        "context_type": "MARKDOWN",
+    }
+
+
+def _fused(item_id: int, score: float, fused_score: float) -> dict:
+    return {**_result(item_id, score), "fused_score": fused_score}
+
+
+def test_score_floor_drops_weak_candidates():
+    kept = apply_score_floor([_result(1, 0.8), _result(2, 0.1)], floor=0.15)
+
+    assert [r["context_item_id"] for r in kept] == [1]
+
+
+def test_single_candidate_skips_rerank():
+    plan = plan_rerank([_result(1, 0.8)])
+
+    assert plan.skip
+    assert plan.skip_reason == "single"
+
+
+def test_dominant_top_score_skips_rerank():
+    plan = plan_rerank(
+        [_result(1, 0.5), _result(2, 0.9), _result(3, 0.45)],
+        gap_threshold=0.5,
+        dominance_margin=0.2,
+    )
+
+    assert plan.skip_reason == "dominant"
+    assert [r["context_item_id"] for r in plan.candidates] == [2, 1, 3]
+
+
+def test_large_gap_prunes_tail():
+    plan = plan_rerank(
+        [_result(1, 0.9), _result(2, 0.85), _result(3, 0.5), _result(4, 0.45)],
+        gap_threshold=0.1,
+        dominance_margin=0.2,
+    )
+
+    assert not plan.skip
+    assert plan.pruned == 2
+    assert [r["context_item_id"] for r in plan.candidates] == [1, 2]
+
+
+def test_close_scores_rerank_everything():
+    results = [_result(i, 0.9 - i * 0.02) for i in range(5)]
+
+    plan = plan_rerank(results, gap_threshold=0.1, dominance_margin=0.2)
+
+    assert not plan.skip
+    assert plan.pruned == 0
+    assert len(plan.candidates) == 5
+
+
+def test_lexical_only_hybrid_hit_survives_the_policy():
+    # Item 2 matched an exact term: low cosine score, second by fused rank
+    results = [_fused(1, 0.9, 1 / 61), _fused(2, 0.05, 1 / 62), _fused(3, 0.6, 1 / 63)]
+
+    kept = apply_score_floor(results, floor=0.15)
+    plan = plan_rerank(kept, gap_threshold=0.1, dominance_margin=0.2)
+
+    assert not plan.skip
+    assert plan.pruned == 0
+    assert [r["context_item_id"] for r in plan.candidates] == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_hybrid_results_reach_the_cross_encoder_in_fused_order(
+    stub_rag_service,
+):
+    stub_rag_service.qdrant_service.search_similar.return_value = [
+        _fused(1, 0.95, 1 / 61),
+        _fused(2, 0.05, 1 / 62),
+    ]
+
+    await stub_rag_service.query("What is form 2024-13?", [1])
+
+    reranked = stub_rag_service.reranking_service.rerank_results.call_args
+    assert [r["context_item_id"] for r in reranked.kwargs["search_results"]] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_dominant_result_bypasses_cross_encoder(stub_rag_service):
+    stub_rag_service.qdrant_service.search_similar.return_value = [
+        _result(1, 0.95),
+        _result(2, 0.6),
+        _result(3, 0.05),
+    ]
+
+    result = await stub_rag_service.query("When is enrollment?", [1])
+
+    stub_rag_service.reranking_service.rerank_results.assert_not_called()
+    # The floor drops item 3; vector order is kept for the rest
+    assert [s["context_item_id"] for s in result["sources"]] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_disabled_policy_always_reranks(stub_rag_service, monkeypatch):
+    monkeypatch.setattr(f"{SETTINGS}.RAG_ADAPTIVE_RERANK_ENABLED", False)
+    stub_rag_service.qdrant_service.search_similar.return_value = [_result(1, 0.95)]
+
+    await stub_rag_service.query("When is enrollment?", [1])
+
+    stub_rag_service.reranking_service.rerank_results.assert_called_once()
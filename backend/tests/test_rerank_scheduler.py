@@ -0,0 +1,203 @@
+"""Tests and throughput benchmark for cross-request reranker micro-batching."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from backend.retrieval.rerank_scheduler import RerankScheduler
+from backend.retrieval.reranking import RerankingService
+from backend.services.rag_service import AsyncRAGService
+
+
+class FakeModel:
+    """Scores each pair by passage length; optionally costs time per call."""
+
+    def __init__(self, call_seconds: float = 0.0, pair_seconds: float = 0.0):
+        self.calls: list[list[tuple[str, str]]] = []
+        self.call_seconds = call_seconds
+        self.pair_seconds = pair_seconds
+        self._lock = threading.Lock()
+
+    def predict(self, pairs):
+        # One model instance runs one forward pass at a time, like a CPU-bound
+        # cross-encoder saturating its cores
+        with self._lock:
+            self.calls.append(list(pairs))
+            time.sleep(self.call_seconds + self.pair_seconds * len(pairs))
+            return [float(len(passage)) for _, passage in pairs]
+
+
+def _service(model: FakeModel) -> RerankingService:
+    service = RerankingService.__new__(RerankingService)
+    service.model = model
+    return service
+
+
+def _results(*contents: str) -> list[dict]:
+    return [
+        {"context_item_id": index, "content": content, "score": 0.5}
+        for index, content in enumerate(contents, start=1)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_forward_pass():
+    model = FakeModel()
+    scheduler = RerankScheduler(_service(model), max_pairs=64, max_wait_ms=20)
+
+    reranked = await asyncio.gather(
+        scheduler.rerank_results("q1", _results("a", "ccc"), top_k=1),
+        scheduler.rerank_results("q2", _results("bb", "d", "eeee")),
+    )
+
+    assert model.calls == [
+        [("q1", "a"), ("q1", "ccc"), ("q2", "bb"), ("q2", "d"), ("q2", "eeee")]
+    ]
+    assert [r["context_item_id"] for r in reranked[0]] == [2]
+    assert [r["rerank_score"] for r in reranked[1]] == [4.0, 2.0, 1.0]
+
+
+@pytest.mark.asyncio
+async def test_full_batch_dispatches_without_waiting_for_the_window():
+    model = FakeModel()
+    scheduler = RerankScheduler(_service(model), max_pairs=3, max_wait_ms=10_000)
+
+    scores = await asyncio.wait_for(
+        asyncio.gather(
+            scheduler.score([("q1", "a"), ("q1", "b")]),
+            scheduler.score([("q2", "cc")]),
+        ),
+        timeout=5,
+    )
+
+    assert scores == [[1.0, 1.0], [2.0]]
+    assert [len(call) for call in model.calls] == [3]
+
+
+@pytest.mark.asyncio
+async def test_requests_overflowing_a_batch_form_the_next_one():
+    model = FakeModel()
+    scheduler = RerankScheduler(_service(model), max_pairs=3, max_wait_ms=5)
+
+    scores = await asyncio.gather(
+        scheduler.score([("q1", "a"), ("q1", "b")]),
+        scheduler.score([("q2", "cc"), ("q2", "d")]),
+    )
+
+    assert scores == [[1.0, 1.0], [2.0, 1.0]]
+    assert [len(call) for call in model.calls] == [2, 2]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_requests_are_dropped_from_the_batch():
+    model = FakeModel()
+    scheduler = RerankScheduler(_service(model), max_pairs=64, max_wait_ms=50)
+
+    cancelled = asyncio.create_task(scheduler.score([("q1", "a")]))
+    kept = asyncio.create_task(scheduler.score([("q2", "bb")]))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+
+    assert await kept == [2.0]
+    assert model.calls == [[("q2", "bb")]]
+
+
+@pytest.mark.asyncio
+async def test_model_errors_reach_every_request_in_the_batch():
+    service = _service(MagicMock())
+    service.model.predict.side_effect = RuntimeError("model failed")
+    scheduler = RerankScheduler(service, max_pairs=64, max_wait_ms=5)
+
+    results = await asyncio.gather(
+        scheduler.score([("q1", "a")]),
+        scheduler.score([("q2", "b")]),
+        return_exceptions=True,
+    )
+
+    assert [str(r) for r in results] == ["model failed", "model failed"]
+    assert await scheduler.score([]) == []
+
+
+@pytest.mark.asyncio
+async def test_rerank_results_validates_like_the_reranking_service():
+    scheduler = RerankScheduler(_service(FakeModel()))
+
+    with pytest.raises(ValueError, match="Query"):
+        await scheduler.rerank_results(" ", _results("a"))
+    with pytest.raises(ValueError, match="Search results"):
+        await scheduler.rerank_results("q", [])
+
+
+@pytest.mark.asyncio
+async def test_rag_service_reranks_through_the_scheduler():
+    scheduler = MagicMock(spec=RerankScheduler)
+    scheduler.rerank_results = AsyncMock(return_value=["reranked"])
+    reranking_service = MagicMock()
+    with patch("backend.services.rag_service.create_async_openai_client"):
+        service = AsyncRAGService(
+            redis_client=AsyncMock(),
+            openai_api_key="test-key",
+            embedding_service=MagicMock(),
+            qdrant_service=MagicMock(),
+            reranking_service=reranking_service,
+            semantic_cache=None,
+            rerank_scheduler=scheduler,
+        )
+
+    candidates = _results("a", "b")
+    with patch.object(
+        service,
+        "_plan_rerank",
+        return_value=MagicMock(skip=False, candidates=candidates),
+    ):
+        reranked = await service._rerank("q", candidates, 1, None)
+
+    assert reranked == ["reranked"]
+    scheduler.rerank_results.assert_awaited_once_with(
+        query="q", search_results=candidates, top_k=1
+    )
+    reranking_service.rerank_results.assert_not_called()
+
+
+BENCHMARK_REQUESTS = 32
+BENCHMARK_CANDIDATES = 10
+
+
+@pytest.mark.performance
+@pytest.mark.asyncio
+async def test_microbatching_raises_throughput_under_concurrency():
+    """
+    Compare per-request threads with the scheduler on a model with a fixed
+    per-call overhead, as a cross-encoder has; run with ``-s`` for the table.
+    """
+    requests = [
+        (f"question {i}", _results(*("passage" for _ in range(BENCHMARK_CANDIDATES))))
+        for i in range(BENCHMARK_REQUESTS)
+    ]
+
+    async def run(rerank) -> float:
+        start = time.perf_counter()
+        await asyncio.gather(*(rerank(query, results) for query, results in requests))
+        return time.perf_counter() - start
+
+    per_request_model = FakeModel(call_seconds=0.01, pair_seconds=0.0002)
+    per_request_service = _service(per_request_model)
+    per_request = await run(
+        lambda q, r: asyncio.to_thread(per_request_service.rerank_results, q, r)
+    )
+
+    batched_model = FakeModel(call_seconds=0.01, pair_seconds=0.0002)
+    scheduler = RerankScheduler(_service(batched_model), max_pairs=64, max_wait_ms=5)
+    batched = await run(scheduler.rerank_results)
+
+    print(f"\n{'mode':<14}{'calls':>7}{'seconds':>10}")
+    print(f"{'per-request':<14}{len(per_request_model.calls):>7}{per_request:>10.3f}")
+    print(f"{'micro-batch':<14}{len(batched_model.calls):>7}{batched:>10.3f}")
+
+    assert len(batched_model.calls) < len(per_request_model.calls) / 4
+    assert batched < per_request
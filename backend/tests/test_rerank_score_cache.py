@@ -0,0 +1,188 @@
+"""Tests for the reranker score cache."""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock, call, patch
+
+import pytest
+
+from backend.retrieval.rerank_cache import RerankScoreCache, rerank_score_key
+from backend.retrieval.rerank_scheduler import RerankScheduler
+from backend.retrieval.reranking import RerankingService
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self._redis = redis
+        self._commands = []
+
+    def set(self, key, value, ex=None):
+        self._commands.append((key, value, ex))
+        return self
+
+    def execute(self):
+        for key, value, ex in self._commands:
+            self._redis.set(key, value, ex=ex)
+        self._commands = []
+
+
+class FakeSyncRedis:
+    """In-memory stand-in for the synchronous, decoding Redis client."""
+
+    def __init__(self):
+        self.values: dict[str, str] = {}
+        self.ttls: dict[str, int] = {}
+        self.mget_calls = 0
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+        self.ttls[key] = ex
+
+    def mget(self, keys):
+        self.mget_calls += 1
+        return [self.values.get(key) for key in keys]
+
+
+def _results(*items: tuple[int, str]) -> list[dict]:
+    return [
+        {"context_item_id": item_id, "content": content, "score": 0.5}
+        for item_id, content in items
+    ]
+
+
+def _reranking_service(cache: RerankScoreCache) -> RerankingService:
+    service = RerankingService.__new__(RerankingService)
+    service.model = MagicMock()
+    service.model.predict.side_effect = lambda pairs: [
+        float(len(passage)) for _, passage in pairs
+    ]
+    service.score_cache = cache
+    return service
+
+
+def test_key_normalises_the_query_and_tracks_content():
+    key = rerank_score_key("  What is  the Deadline? ", 7, "chunk")
+
+    assert key == rerank_score_key("what is the deadline?", 7, "chunk")
+    assert key != rerank_score_key("what is the deadline?", 7, "edited chunk")
+    assert key != rerank_score_key("what is the deadline?", 8, "chunk")
+    assert key != rerank_score_key("what was the deadline?", 7, "chunk")
+
+
+def test_key_tracks_the_truncation_length(monkeypatch):
+    key = rerank_score_key("q", 7, "chunk")
+
+    monkeypatch.setattr(
+        "backend.retrieval.rerank_cache.settings.RERANKER_MAX_LENGTH", 256
+    )
+
+    assert rerank_score_key("q", 7, "chunk") != key
+
+
+def test_scores_are_shared_through_redis_with_a_ttl():
+    redis = FakeSyncRedis()
+    writer = RerankScoreCache(redis, ttl_seconds=60)
+    writer.set_many([("q", 1, "a"), ("q", 2, "b")], [0.25, 0.75])
+
+    reader = RerankScoreCache(redis)
+
+    assert reader.get_many([("q", 2, "b"), ("q", 3, "c")]) == [0.75, None]
+    assert set(redis.ttls.values()) == {60}
+    # Redis hits are promoted into the local tier
+    assert reader.get_many([("q", 2, "b")]) == [0.75]
+    assert redis.mget_calls == 1
+
+
+def test_local_tier_evicts_least_recently_used():
+    redis = FakeSyncRedis()
+    cache = RerankScoreCache(redis, max_local_entries=2)
+    cache.set_many([("q", 1, "a"), ("q", 2, "b")], [0.1, 0.2])
+    cache.get_many([("q", 1, "a")])
+    cache.set_many([("q", 3, "c")], [0.3])
+
+    redis.values.clear()
+
+    assert cache.get_many([("q", 1, "a"), ("q", 2, "b"), ("q", 3, "c")]) == [
+        0.1,
+        None,
+        0.3,
+    ]
+
+
+def test_redis_errors_degrade_to_misses():
+    redis = MagicMock()
+    redis.mget.side_effect = ConnectionError("down")
+    redis.pipeline.side_effect = ConnectionError("down")
+    cache = RerankScoreCache(redis, max_local_entries=0)
+
+    cache.set_many([("q", 1, "a")], [0.5])
+
+    assert cache.get_many([("q", 1, "a")]) == [None]
+
+
+def test_rerank_only_sends_uncached_pairs_to_the_model():
+    service = _reranking_service(RerankScoreCache(FakeSyncRedis()))
+    service.rerank_results("When?", _results((1, "a"), (2, "bb")))
+
+    with patch("backend.retrieval.reranking.tracer") as tracer:
+        reranked = service.rerank_results(
+            "  when? ", _results((1, "a"), (2, "bb"), (3, "ccc"), (4, "dddd"))
+        )
+
+    assert service.model.predict.call_args_list[-1] == call(
+        [("  when? ", "ccc"), ("  when? ", "dddd")]
+    )
+    assert [r["context_item_id"] for r in reranked] == [4, 3, 2, 1]
+    assert [r["rerank_score"] for r in reranked] == [4.0, 3.0, 2.0, 1.0]
+    span = tracer.start_as_current_span.return_value.__enter__.return_value
+    span.set_attribute.assert_any_call("score_cache.hits", 2)
+    span.set_attribute.assert_any_call("score_cache.hit_ratio", 0.5)
+
+
+def test_fully_cached_rerank_skips_the_model():
+    service = _reranking_service(RerankScoreCache(FakeSyncRedis()))
+    results = _results((1, "a"), (2, "bb"))
+    first = service.rerank_results("q", results)
+
+    assert service.rerank_results("q", results) == first
+    service.model.predict.assert_called_once()
+
+
+def test_edited_chunk_is_scored_again():
+    service = _reranking_service(RerankScoreCache(FakeSyncRedis()))
+    service.rerank_results("q", _results((1, "old")))
+
+    reranked = service.rerank_results("q", _results((1, "edited")))
+
+    assert reranked[0]["rerank_score"] == 6.0
+    assert service.model.predict.call_count == 2
+
+
+def test_rerank_batch_combines_uncached_pairs_into_one_call():
+    service = _reranking_service(RerankScoreCache(FakeSyncRedis()))
+    service.rerank_results("q1", _results((1, "a")))
+
+    reranked = service.rerank_batch(
+        ["q1", "q2"], [_results((1, "a"), (2, "bb")), _results((1, "a"))]
+    )
+
+    assert service.model.predict.call_args_list[-1] == call([("q1", "bb"), ("q2", "a")])
+    assert [[r["rerank_score"] for r in results] for results in reranked] == [
+        [2.0, 1.0],
+        [1.0],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_batches_only_uncached_pairs():
+    service = _reranking_service(RerankScoreCache(FakeSyncRedis()))
+    scheduler = RerankScheduler(service, max_wait_ms=1)
+    await scheduler.rerank_results("q", _results((1, "a")))
+
+    reranked = await scheduler.rerank_results("q", _results((1, "a"), (2, "bb")))
+
+    assert service.model.predict.call_args_list[-1] == call([("q", "bb")])
+    assert [r["context_item_id"] for r in reranked] == [2, 1]
@@ -0,0 +1,198 @@
+"""Tests for the semantic answer cache."""
+
+from __future__ import annotations
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from backend.retrieval.semantic_cache import (
+    SemanticAnswerCache,
+    index_key,
+    results_key,
+    topic_members_key,
+    version_key,
+)
+
+RESULT = {
+    "answer": "Enrollment closes on March 2.",
+    "sources": [{"title": "Enrollment", "context_item_id": 1}],
+    "context_items": [],
+}
+
+
+@pytest.fixture
+def cache(fake_redis):
+    return SemanticAnswerCache(fake_redis, threshold=0.9)
+
+
+@pytest.mark.asyncio
+async def test_similar_question_hits(cache):
+    """A paraphrase above the threshold should reuse the stored answer."""
+    await cache.store(
+        [1], "When does enrollment close?", [1.0, 0.0, 0.1], 10, 5, RESULT
+    )
+
+    result = await cache.lookup([1], [0.98, 0.05, 0.1], 10, 5)
+
+    assert result == RESULT
+
+
+@pytest.mark.asyncio
+async def test_dissimilar_question_misses(cache):
+    """Questions below the threshold should not be answered from cache."""
+    await cache.store(
+        [1], "When does enrollment close?", [1.0, 0.0, 0.0], 10, 5, RESULT
+    )
+
+    assert await cache.lookup([1], [0.0, 1.0, 0.0], 10, 5) is None
+
+
+@pytest.mark.asyncio
+async def test_lookup_is_scoped_to_topic_set_and_parameters(cache):
+    """Entries only match the same topic set and search parameters."""
+    await cache.store([1, 2], "q", [1.0, 0.0], 10, 5, RESULT)
+
+    assert await cache.lookup([2, 1], [1.0, 0.0], 10, 5) == RESULT
+    assert await cache.lookup([1], [1.0, 0.0], 10, 5) is None
+    assert await cache.lookup([1, 2], [1.0, 0.0], 20, 5) is None
+
+
+@pytest.mark.asyncio
+async def test_lookup_is_scoped_to_content_versions(cache):
+    """Answers stored at older topic versions must not be served."""
+    await cache.store([1, 2], "q", [1.0, 0.0], 10, 5, RESULT, {1: 3, 2: 0})
+
+    assert await cache.lookup([1, 2], [1.0, 0.0], 10, 5, {1: 3, 2: 0}) == RESULT
+    assert await cache.lookup([1, 2], [1.0, 0.0], 10, 5, {1: 4, 2: 0}) is None
+
+
+@pytest.mark.asyncio
+async def test_store_trims_to_max_entries(fake_redis):
+    """The per-topic index should stay bounded."""
+    cache = SemanticAnswerCache(fake_redis, max_entries=2)
+    for i in range(3):
+        await cache.store([1], f"q{i}", [1.0, float(i)], 10, 5, RESULT)
+
+    assert len(fake_redis.store[index_key([1])]) == 2
+    assert len(fake_redis.store[results_key(index_key([1]))]) == 2
+
+
+@pytest.mark.asyncio
+async def test_index_entries_stay_compact(cache, fake_redis):
+    """Answers live in their own list so workers only load embeddings."""
+    await cache.store([1], "q", [1.0, 0.0], 10, 5, RESULT)
+
+    (raw_entry,) = fake_redis.store[index_key([1])]
+    assert "result" not in json.loads(raw_entry)
+
+
+@pytest.mark.asyncio
+async def test_worker_appends_only_new_entries(cache, fake_redis):
+    """A worker should fetch just the entries stored since its last load."""
+    await cache.store([1], "q0", [1.0, 0.0], 10, 5, RESULT)
+    assert await cache.lookup([1], [1.0, 0.0], 10, 5) == RESULT
+
+    other = {**RESULT, "answer": "Tuition is due on March 9."}
+    await cache.store([1], "q1", [0.0, 1.0], 10, 5, other)
+    with patch.object(fake_redis, "lrange", wraps=fake_redis.lrange) as lrange:
+        assert await cache.lookup([1], [0.0, 1.0], 10, 5) == other
+
+    lrange.assert_awaited_once_with(index_key([1]), -1, -1)
+
+
+@pytest.mark.asyncio
+async def test_trimmed_answer_is_a_miss(fake_redis):
+    """An entry trimmed after a worker loaded it must not serve another answer."""
+    cache = SemanticAnswerCache(fake_redis, threshold=0.9, max_entries=1)
+    await cache.store([1], "q0", [1.0, 0.0], 10, 5, RESULT)
+    await cache.lookup([1], [1.0, 0.0], 10, 5)
+    index = cache._indexes[index_key([1])]
+
+    other = {**RESULT, "answer": "Tuition is due on March 9."}
+    await cache.store([1], "q1", [0.0, 1.0], 10, 5, other)
+
+    assert await cache._load_result(index_key([1]), index, index.entries[0]) is None
+
+
+@pytest.mark.asyncio
+async def test_store_failure_is_swallowed(fake_redis):
+    """A Redis failure while building the store transaction must not raise."""
+    cache = SemanticAnswerCache(fake_redis)
+    with patch.object(fake_redis, "pipeline", side_effect=ConnectionError):
+        await cache.store([1], "q", [1.0, 0.0], 10, 5, RESULT)
+
+
+@pytest.mark.asyncio
+async def test_worker_index_reloads_after_invalidation(cache, fake_redis):
+    """Deleting the version key must drop a worker's in-memory index."""
+    await cache.store([1], "q", [1.0, 0.0], 10, 5, RESULT)
+    assert await cache.lookup([1], [1.0, 0.0], 10, 5) == RESULT
+
+    del fake_redis.store[version_key(index_key([1]))]
+
+    assert await cache.lookup([1], [1.0, 0.0], 10, 5) is None
+
+
+@pytest.mark.asyncio
+async def test_paraphrase_skips_rerank_and_llm(stub_rag_service):
+    """A semantic hit should bypass search, reranking and generation."""
+    await stub_rag_service.query("When does enrollment close?", [1])
+    await stub_rag_service.query("What is the enrollment deadline?", [1])
+
+    assert stub_rag_service._generate_answer.await_count == 1
+    assert stub_rag_service.reranking_service.rerank_results.call_count == 1
+    assert stub_rag_service.embedding_service.generate_embedding.call_count == 2
+
+
+def test_invalidate_topic_caches_deletes_topic_indexes():
+    """Invalidation removes every index that includes the topic."""
+    from backend.services import cache_invalidation
+
+    client = MagicMock()
+    client.smembers.return_value = {index_key([1, 2])}
+
+    with patch.object(cache_invalidation, "get_sync_redis_client", return_value=client):
+        cache_invalidation.invalidate_topic_caches([1, 1])
+
+    client.delete.assert_called_once_with(
+        topic_members_key(1),
+        index_key([1, 2]),
+        results_key(index_key([1, 2])),
+        version_key(index_key([1, 2])),
+    )
+
+
+def test_invalidate_topic_caches_swallows_redis_errors():
+    """A Redis outage must not break content edits."""
+    from backend.services import cache_invalidation
+
+    client = MagicMock()
+    client.smembers.side_effect = ConnectionError("redis down")
+
+    with patch.object(cache_invalidation, "get_sync_redis_client", return_value=client):
+        cache_invalidation.invalidate_topic_caches([1])
+
+
+def test_bulk_assign_invalidates_topic_cache(client, admin_headers, db_session):
+    """Reassigning contexts should invalidate the topic's cached answers."""
+    from backend.models.context import Context
+    from backend.models.topic import Topic
+
+    topic = Topic(name="Topic", description="d", system_prompt="p")
+    context = Context(name="C", description="d", context_type="MARKDOWN")
+    db_session.add_all([topic, context])
+    db_session.commit()
+
+    with patch(
+        "backend.routers.admin.bulk_operations.invalidate_topic_caches"
+    ) as invalidate:
+        response = client.post(
+            "/api/admin/bulk/assign-context-to-topic",
+            json={"topic_id": topic.id, "context_ids": [context.id]},
+            headers=admin_headers,
+        )
+
+    assert response.status_code == 200
+    invalidate.assert_called_once_with([topic.id])
@@ -0,0 +1,134 @@
+"""Tests for the process-wide RAG service registry."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from backend.services.registry import ServiceRegistry
+
+
+@pytest.fixture
+def patched_services(monkeypatch):
+    """Patch heavy service constructors used by the registry."""
+    monkeypatch.setattr("backend.services.registry.settings.OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(
+        "backend.services.registry.settings.RAG_WARMUP_ON_STARTUP", True
+    )
+
+    with (
+        patch("backend.services.registry.AsyncEmbeddingService") as embedding_cls,
+        patch("backend.retrieval.qdrant.QdrantService") as qdrant_cls,
+        patch("backend.services.registry.AsyncQdrantService") as async_qdrant_cls,
+        patch("backend.services.registry.RerankingService") as reranking_cls,
+    ):
+        yield {
+            "embedding": embedding_cls,
+            "qdrant": qdrant_cls,
+            "async_qdrant": async_qdrant_cls,
+            "reranking": reranking_cls,
+        }
+
+
+@pytest.mark.asyncio
+async def test_registry_builds_service_once(patched_services) -> None:
+    """Concurrent callers should share a single service instance."""
+    registry = ServiceRegistry()
+
+    services = await asyncio.gather(*(registry.get_rag_service() for _ in range(5)))
+
+    assert all(service is services[0] for service in services)
+    patched_services["qdrant"].assert_called_once()
+    patched_services["qdrant"].return_value.create_collection.assert_called_once()
+    patched_services["reranking"].assert_called_once()
+    patched_services["embedding"].assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_registry_searches_through_async_qdrant(
+    patched_services, monkeypatch
+) -> None:
+    """Searches should go through the async client unless disabled."""
+    monkeypatch.setattr("backend.services.registry.settings.QDRANT_ASYNC_SEARCH", True)
+    service = await ServiceRegistry().get_rag_service()
+
+    patched_services["async_qdrant"].assert_called_once_with(
+        sync_service=patched_services["qdrant"].return_value
+    )
+    assert service.qdrant_service is patched_services["async_qdrant"].return_value
+
+    monkeypatch.setattr("backend.services.registry.settings.QDRANT_ASYNC_SEARCH", False)
+    service = await ServiceRegistry().get_rag_service()
+
+    assert service.qdrant_service is patched_services["qdrant"].return_value
+
+
+@pytest.mark.asyncio
+async def test_registry_warms_up_reranker(patched_services) -> None:
+    """Startup should run a warm-up inference on the reranker."""
+    registry = ServiceRegistry()
+
+    await registry.startup()
+
+    assert registry.rag_service is not None
+    patched_services["reranking"].return_value.warmup.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_registry_startup_skips_without_api_key(monkeypatch) -> None:
+    """Startup should be a no-op when OpenAI is not configured."""
+    monkeypatch.setattr("backend.services.registry.settings.OPENAI_API_KEY", None)
+    registry = ServiceRegistry()
+
+    await registry.startup()
+
+    assert registry.rag_service is None
+
+
+@pytest.mark.asyncio
+async def test_registry_startup_tolerates_failures(patched_services) -> None:
+    """A dependency outage at startup should defer init to the first request."""
+    patched_services[
+        "qdrant"
+    ].return_value.create_collection.side_effect = ConnectionError("qdrant down")
+    registry = ServiceRegistry()
+
+    await registry.startup()
+
+    assert registry.rag_service is None
+
+
+@pytest.mark.asyncio
+async def test_registry_shutdown_closes_clients(patched_services) -> None:
+    """Shutdown should close the chat client and drop the singleton."""
+    registry = ServiceRegistry()
+    service = await registry.get_rag_service()
+    service.chat_client = MagicMock(close=AsyncMock())
+
+    with (
+        patch(
+            "backend.services.registry.close_redis_pool", new=AsyncMock()
+        ) as close_pool,
+        patch(
+            "backend.services.registry.close_async_qdrant_client", new=AsyncMock()
+        ) as close_qdrant,
+    ):
+        await registry.shutdown()
+
+    service.chat_client.close.assert_awaited_once()
+    close_pool.assert_awaited_once()
+    close_qdrant.assert_awaited_once()
+    assert registry.rag_service is None
+
+
+def test_redis_clients_share_one_pool() -> None:
+    """Per-request Redis clients should reuse the process-wide pool."""
+    from backend.dependencies.redis import get_redis_client, get_redis_pool
+
+    first = get_redis_client()
+    second = get_redis_client()
+
+    assert first.connection_pool is second.connection_pool
+    assert first.connection_pool is get_redis_pool()
@@ -0,0 +1,183 @@
+"""Tests for Redis-backed bounded session memory."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from backend.services import session_memory
+from backend.services.session_memory import (
+    SessionHistory,
+    SessionMemory,
+    _encode_turn,
+    _fold_lock_key,
+    summary_key,
+    turns_key,
+)
+
+
+def _turn(i):
+    return {"question": f"Q{i}", "answer": f"A{i}"}
+
+
+def _loader(*turns):
+    return AsyncMock(return_value=list(turns))
+
+
+def _window(fake_redis, session_id="s1"):
+    return [json.loads(raw) for raw in fake_redis.store[turns_key(session_id)]]
+
+
+@pytest.fixture
+def chat_client():
+    client = MagicMock()
+    client.chat.completions.create = AsyncMock(
+        return_value=SimpleNamespace(
+            choices=[
+                SimpleNamespace(message=SimpleNamespace(content="User asked Q0."))
+            ],
+            usage=None,
+        )
+    )
+    return client
+
+
+@pytest.fixture
+def memory(fake_redis, chat_client):
+    return SessionMemory(fake_redis, chat_client, "gpt-4o-mini", max_turns=2)
+
+
+@pytest.mark.asyncio
+async def test_load_returns_none_without_window(memory):
+    assert await memory.load("s1") is None
+
+
+@pytest.mark.asyncio
+async def test_seeded_turns_are_loaded(memory):
+    await memory.seed("s1", _loader(_turn(0), _turn(1)))
+
+    history = await memory.load("s1")
+
+    assert history == SessionHistory(summary="", turns=[_turn(0), _turn(1)])
+
+
+@pytest.mark.asyncio
+async def test_overflow_is_folded_into_summary(memory, fake_redis, chat_client):
+    """Turns beyond the window are summarized once and trimmed from the list."""
+    await memory.seed("s1", _loader(_turn(0), _turn(1), _turn(2)))
+
+    history = await memory.load("s1")
+    assert [t["question"] for t in history.turns] == ["Q1", "Q2"]
+
+    await asyncio.gather(*memory._fold_tasks.values())
+
+    assert fake_redis.store[summary_key("s1")] == "User asked Q0."
+    assert [json.loads(t)["question"] for t in fake_redis.store[turns_key("s1")]] == [
+        "Q1",
+        "Q2",
+    ]
+    assert chat_client.chat.completions.create.await_count == 1
+
+    history = await memory.load("s1")
+    assert history.summary == "User asked Q0."
+    assert memory._fold_tasks == {}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_seeds_write_turns_once(memory, fake_redis):
+    await asyncio.gather(
+        memory.seed("s1", _loader(_turn(0), _turn(1))),
+        memory.seed("s1", _loader(_turn(0), _turn(1))),
+    )
+
+    assert _window(fake_redis) == [_turn(0), _turn(1)]
+
+
+@pytest.mark.asyncio
+async def test_turns_recorded_while_seeding_are_kept(memory, fake_redis):
+    """Turns pushed during the database read survive the seed exactly once."""
+    read_turn = {"id": "2", **_turn(2)}
+    late_turn = {"id": "3", **_turn(3)}
+
+    async def load_turns():
+        assert await memory.load("s1") is None
+        for turn in (read_turn, late_turn):
+            await fake_redis.rpush(turns_key("s1"), _encode_turn(turn))
+        return [{"id": "1", **_turn(1)}, read_turn]
+
+    await memory.seed("s1", load_turns)
+
+    assert [t["question"] for t in _window(fake_redis)] == ["Q1", "Q2", "Q3"]
+
+
+@pytest.mark.asyncio
+async def test_failed_database_read_releases_the_seed_claim(memory, fake_redis):
+    with pytest.raises(ConnectionError):
+        await memory.seed("s1", AsyncMock(side_effect=ConnectionError("db down")))
+
+    assert turns_key("s1") not in fake_redis.store
+
+
+@pytest.mark.asyncio
+async def test_fold_keeps_a_lease_taken_over_by_another_worker(
+    memory, fake_redis, chat_client
+):
+    """A fold that outlives its lease must not release the next holder's lease."""
+    await memory.seed("s1", _loader(_turn(0), _turn(1), _turn(2)))
+    response = chat_client.chat.completions.create.return_value
+
+    async def summarize_slowly(**kwargs):
+        fake_redis.store[_fold_lock_key("s1")] = "other-worker"
+        return response
+
+    chat_client.chat.completions.create.side_effect = summarize_slowly
+
+    await memory._fold("s1")
+
+    assert fake_redis.store[_fold_lock_key("s1")] == "other-worker"
+
+
+def test_format_includes_summary_and_skips_current_question():
+    history = SessionHistory(summary="Earlier stuff.", turns=[_turn(1), _turn(2)])
+
+    formatted = history.format("q2 ")
+
+    assert formatted == (
+        "Summary of earlier conversation: Earlier stuff.\n\nUser: Q1\n\nAssistant: A1\n\n"
+    )
+    assert SessionHistory().format("anything") == ""
+
+
+@pytest.mark.asyncio
+async def test_rag_service_seeds_window_from_database(stub_rag_service, fake_redis):
+    """Sessions without a Redis window read recent turns from the DB once."""
+    stub_rag_service._load_recent_turns = MagicMock(return_value=[_turn(0)])
+
+    first = await stub_rag_service._load_conversation_history("s1", "Next?")
+    second = await stub_rag_service._load_conversation_history("s1", "Next?")
+
+    assert first == second == "User: Q0\n\nAssistant: A0\n\n"
+    stub_rag_service._load_recent_turns.assert_called_once_with("s1")
+
+
+def test_record_session_turn_appends_to_existing_window_only():
+    client = MagicMock()
+    client.rpushx.return_value = 0
+
+    with patch.object(session_memory, "get_sync_redis_client", return_value=client):
+        session_memory.record_session_turn("s1", "Q", "A")
+
+    client.rpushx.assert_called_once()
+    client.expire.assert_not_called()
+
+
+def test_record_session_turn_swallows_redis_errors():
+    client = MagicMock()
+    client.rpushx.side_effect = ConnectionError("redis down")
+
+    with patch.object(session_memory, "get_sync_redis_client", return_value=client):
+        session_memory.record_session_turn("s1", "Q", "A")
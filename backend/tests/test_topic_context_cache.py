@@ -0,0 +1,244 @@
+"""Tests for the shared topic-to-context cache."""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from backend.retrieval.topic_context_cache import (
+    TopicContextCache,
+    topic_contexts_key,
+    topic_generation_key,
+)
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self._redis = redis
+        self._commands = []
+
+    def __getattr__(self, name):
+        def queue(*args):
+            self._commands.append((name, args))
+            return self
+
+        return queue
+
+    def execute(self):
+        results = [getattr(self._redis, name)(*args) for name, args in self._commands]
+        self._commands = []
+        return results
+
+
+class FakeSyncRedis:
+    """In-memory stand-in for the synchronous, decoding Redis client."""
+
+    def __init__(self):
+        self.sets: dict[str, set[str]] = {}
+        self.values: dict[str, str] = {}
+        self.pipelines = 0
+
+    def pipeline(self, transaction=True):
+        self.pipelines += 1
+        return _FakePipeline(self)
+
+    def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+    def sadd(self, key, *members):
+        self.sets.setdefault(key, set()).update(str(m) for m in members)
+        return len(members)
+
+    def expire(self, key, seconds):
+        return key in self.sets
+
+    def delete(self, *keys):
+        return sum(self.sets.pop(key, None) is not None for key in keys)
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def incr(self, key):
+        self.values[key] = str(int(self.values.get(key, 0)) + 1)
+        return int(self.values[key])
+
+    def eval(self, script, numkeys, key, generation_key, generation, ttl, *members):
+        # Only the generation compare-and-set store script is supported.
+        if self.values.get(generation_key, "") != generation:
+            return 0
+        self.delete(key)
+        self.sadd(key, *members)
+        return 1
+
+
+TOPIC_CONTEXTS = {1: {10, 11}, 2: {11, 12}}
+
+
+@pytest.fixture
+def redis():
+    return FakeSyncRedis()
+
+
+@pytest.fixture
+def loader():
+    return MagicMock(
+        side_effect=lambda topic_ids: {
+            t: TOPIC_CONTEXTS[t] for t in topic_ids if t in TOPIC_CONTEXTS
+        }
+    )
+
+
+def _cache(redis, **kwargs) -> TopicContextCache:
+    options = {"ttl_seconds": 60, "local_ttl_seconds": 30, "max_local_entries": 8}
+    return TopicContextCache(redis, **{**options, **kwargs})
+
+
+def test_miss_loads_once_then_serves_from_local_tier(redis, loader):
+    cache = _cache(redis)
+
+    assert cache.resolve([1, 2], loader) == [10, 11, 12]
+    pipelines = redis.pipelines
+    assert cache.resolve([2, 1], loader) == [10, 11, 12]
+
+    loader.assert_called_once_with([1, 2])
+    assert redis.pipelines == pipelines
+
+
+def test_redis_tier_is_shared_between_workers(redis, loader):
+    _cache(redis).resolve([1], loader)
+
+    assert _cache(redis).resolve([1], loader) == [10, 11]
+    loader.assert_called_once()
+
+
+def test_topic_without_contexts_is_cached(redis, loader):
+    cache = _cache(redis)
+
+    assert cache.resolve([99], loader) == []
+    assert _cache(redis).resolve([99], loader) == []
+
+    loader.assert_called_once_with([99])
+    assert redis.sets[topic_contexts_key(99)] == {"-"}
+
+
+def test_only_missing_topics_are_loaded(redis, loader):
+    cache = _cache(redis)
+    cache.resolve([1], loader)
+
+    cache.resolve([1, 2], loader)
+
+    assert loader.call_args_list[-1].args == ([2],)
+
+
+def test_invalidate_drops_both_tiers(redis, loader):
+    cache = _cache(redis)
+    cache.resolve([1, 2], loader)
+
+    cache.invalidate([1])
+    cache.resolve([1, 2], loader)
+
+    assert loader.call_args_list[-1].args == ([1],)
+
+
+def test_load_racing_an_invalidation_is_not_cached(redis):
+    """A set read before an edit must not be written back after it."""
+    cache = _cache(redis)
+
+    def load_during_edit(topic_ids):
+        cache.invalidate(topic_ids)
+        return {1: {10}}
+
+    assert cache.resolve([1], load_during_edit) == [10]
+
+    assert topic_contexts_key(1) not in redis.sets
+    assert redis.values[topic_generation_key(1)] == "1"
+    loader = MagicMock(return_value={1: {10, 13}})
+    assert cache.resolve([1], loader) == [10, 13]
+    assert redis.sets[topic_contexts_key(1)] == {"-", "10", "13"}
+
+
+def test_local_entries_expire_to_redis(redis, loader, monkeypatch):
+    cache = _cache(redis, local_ttl_seconds=5)
+    clock = [100.0]
+    monkeypatch.setattr(
+        "backend.retrieval.topic_context_cache.time.monotonic", lambda: clock[0]
+    )
+    cache.resolve([1], loader)
+    redis.sets[topic_contexts_key(1)].add("13")
+
+    clock[0] += 10
+
+    assert cache.resolve([1], loader) == [10, 11, 13]
+    loader.assert_called_once()
+
+
+def test_local_tier_evicts_least_recently_used(redis, loader):
+    cache = _cache(redis, max_local_entries=1)
+    cache.resolve([1], loader)
+    cache.resolve([2], loader)
+    pipelines = redis.pipelines
+
+    cache.resolve([1], loader)
+
+    assert redis.pipelines == pipelines + 1
+    assert loader.call_count == 2
+
+
+def test_redis_errors_fall_back_to_loader():
+    broken = MagicMock()
+    broken.pipeline.side_effect = ConnectionError("redis down")
+    cache = TopicContextCache(broken, max_local_entries=0)
+    loader = MagicMock(return_value={1: {10}})
+
+    assert cache.resolve([1], loader) == [10]
+    assert cache.resolve([1], loader) == [10]
+    assert loader.call_count == 2
+
+
+def test_hits_and_misses_are_counted_by_tier(redis, loader):
+    cache = _cache(redis)
+    cache._hits_counter = MagicMock()
+    cache._misses_counter = MagicMock()
+
+    cache.resolve([1], loader)
+    other_worker = _cache(redis)
+    other_worker._hits_counter = cache._hits_counter
+    other_worker.resolve([1], loader)
+    cache.resolve([1], loader)
+
+    cache._misses_counter.add.assert_called_once_with(1)
+    hits = [
+        (c.args[0], c.args[1]["tier"])
+        for c in cache._hits_counter.add.call_args_list
+        if c.args[0]
+    ]
+    assert hits == [(1, "redis"), (1, "local")]
+
+
+def test_qdrant_services_share_the_cache(redis, monkeypatch):
+    from backend.retrieval.qdrant import QdrantService
+
+    cache = _cache(redis)
+    monkeypatch.setattr(
+        "backend.retrieval.vector_store.get_topic_context_cache", lambda: cache
+    )
+    load = MagicMock(return_value={1: {10}})
+    monkeypatch.setattr(QdrantService, "_load_topic_contexts", staticmethod(load))
+
+    assert QdrantService().get_context_ids_for_topics([1]) == [10]
+    assert QdrantService().get_context_ids_for_topics([1]) == [10]
+    load.assert_called_once()
+
+
+def test_topic_invalidation_drops_cached_contexts():
+    from backend.services import cache_invalidation
+
+    cache = MagicMock()
+    with (
+        patch.object(cache_invalidation, "get_topic_context_cache", return_value=cache),
+        patch.object(cache_invalidation, "get_sync_redis_client"),
+    ):
+        cache_invalidation.invalidate_topic_caches([2, 1, 2])
+
+    cache.invalidate.assert_called_once_with([1, 2])
@@ -0,0 +1,225 @@
+"""Tests for topic-filtered vector search and topic payload syncing."""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointStruct
+
+from backend.main import app
+from backend.models.context import Context
+from backend.models.topic import Topic
+from backend.retrieval.qdrant import INDEXED_PAYLOAD_FIELDS, QdrantService
+from backend.services.topic_payloads import (
+    context_topic_map,
+    delete_context_points,
+    sync_context_topics,
+)
+
+SETTINGS = "backend.retrieval.qdrant.settings"
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(f"{SETTINGS}.OPENAI_EMBEDDING_DIM", 2)
+    monkeypatch.setattr(f"{SETTINGS}.OPENAI_EMBEDDING_REDUCED_DIM", 0)
+    monkeypatch.setattr(f"{SETTINGS}.QDRANT_QUANTIZATION", "none")
+    monkeypatch.setattr(f"{SETTINGS}.QDRANT_TOPIC_PAYLOAD_FILTER", True)
+    service = QdrantService()
+    service.client = QdrantClient(":memory:")
+    service.create_collection()
+    service.client.upsert(
+        collection_name=service.collection_name,
+        points=[
+            PointStruct(
+                id=item_id,
+                vector=[1.0, item_id / 10],
+                payload={
+                    "context_item_id": item_id,
+                    "context_id": context_id,
+                    "topic_ids": topic_ids,
+                },
+            )
+            for item_id, context_id, topic_ids in [
+                (1, 10, [1]),
+                (2, 10, [1]),
+                (3, 20, [1, 2]),
+                (4, 30, [2]),
+            ]
+        ],
+    )
+    return service
+
+
+def _ids(results) -> list[int]:
+    return sorted(r["context_item_id"] for r in results)
+
+
+def test_search_filters_on_topic_payload_without_sql(service):
+    service.get_context_ids_for_topics = MagicMock(side_effect=AssertionError("SQL"))
+
+    results = service.search_similar([1.0, 0.0], topic_ids=[2], limit=10)
+
+    assert _ids(results) == [3, 4]
+
+
+def test_batch_search_filters_on_topic_payload(service):
+    service.get_context_ids_for_topics = MagicMock(side_effect=AssertionError("SQL"))
+
+    results = service.search_similar_batch(
+        [[1.0, 0.0], [1.0, 0.0]], [[1], [2]], limit=10
+    )
+
+    assert [_ids(r) for r in results] == [[1, 2, 3], [3, 4]]
+
+
+def test_context_filter_used_when_payload_filter_disabled(service, monkeypatch):
+    monkeypatch.setattr(f"{SETTINGS}.QDRANT_TOPIC_PAYLOAD_FILTER", False)
+    service.get_context_ids_for_topics = MagicMock(return_value=[30])
+
+    results = service.search_similar([1.0, 0.0], topic_ids=[2], limit=10)
+
+    assert _ids(results) == [4]
+    service.get_context_ids_for_topics.assert_called_once_with([2])
+
+
+def test_payload_indexes_created_with_collection(monkeypatch):
+    service = QdrantService()
+    service.client = MagicMock()
+
+    service.create_collection()
+
+    indexed = {
+        call.kwargs["field_name"]
+        for call in service.client.create_payload_index.call_args_list
+    }
+    assert indexed == set(INDEXED_PAYLOAD_FIELDS)
+
+
+def test_payload_indexes_added_to_existing_collection(monkeypatch):
+    monkeypatch.setattr(f"{SETTINGS}.QDRANT_TOPIC_PAYLOAD_FILTER", True)
+    service = QdrantService()
+    service.client = MagicMock()
+    service.client.create_collection.side_effect = Exception("already exists")
+
+    assert service.create_collection() is True
+
+    indexed = {
+        call.kwargs["field_name"]
+        for call in service.client.create_payload_index.call_args_list
+    }
+    assert indexed == set(INDEXED_PAYLOAD_FIELDS)
+
+
+def test_existing_collection_left_unindexed_without_payload_filter(monkeypatch):
+    monkeypatch.setattr(f"{SETTINGS}.QDRANT_TOPIC_PAYLOAD_FILTER", False)
+    service = QdrantService()
+    service.client = MagicMock()
+    service.client.create_collection.side_effect = Exception("already exists")
+
+    assert service.create_collection() is True
+
+    service.client.create_payload_index.assert_not_called()
+
+
+def test_refused_payload_index_does_not_fail_startup(monkeypatch):
+    monkeypatch.setattr(f"{SETTINGS}.QDRANT_TOPIC_PAYLOAD_FILTER", True)
+    service = QdrantService()
+    service.client = MagicMock()
+    service.client.create_collection.side_effect = Exception("already exists")
+    service.client.create_payload_index.side_effect = Exception("bad request")
+
+    assert service.create_collection() is True
+    assert service.client.create_payload_index.call_count == len(INDEXED_PAYLOAD_FIELDS)
+
+
+def test_set_context_topics_rewrites_every_point_of_a_context(service):
+    service.set_context_topics({10: [2], 20: []})
+
+    assert _ids(service.search_similar([1.0, 0.0], topic_ids=[1], limit=10)) == []
+    assert _ids(service.search_similar([1.0, 0.0], topic_ids=[2], limit=10)) == [
+        1,
+        2,
+        4,
+    ]
+
+
+def test_deletes_remove_points_by_item_and_context(service):
+    service.delete_embeddings([1])
+    service.delete_context_embeddings([30])
+
+    assert _ids(service.search_similar([1.0, 0.0], topic_ids=[1, 2], limit=10)) == [
+        2,
+        3,
+    ]
+
+
+def test_context_topic_map_reads_associations(db_session):
+    topic_a = Topic(name="A", description="", system_prompt="")
+    topic_b = Topic(name="B", description="", system_prompt="")
+    linked = Context(name="Linked", description="", context_type="MARKDOWN")
+    unlinked = Context(name="Unlinked", description="", context_type="MARKDOWN")
+    linked.topics = [topic_a, topic_b]
+    db_session.add_all([topic_a, topic_b, linked, unlinked])
+    db_session.commit()
+
+    mapping = context_topic_map(db_session, [linked.id, unlinked.id, 9999])
+
+    assert sorted(mapping[linked.id]) == sorted([topic_a.id, topic_b.id])
+    assert mapping[unlinked.id] == []
+    assert mapping[9999] == []
+    assert set(context_topic_map(db_session)) == {linked.id, unlinked.id}
+
+
+def test_sync_context_topics_never_raises(db_session):
+    with patch("backend.retrieval.qdrant.QdrantService") as qdrant_service:
+        qdrant_service.return_value.set_context_topics.side_effect = ConnectionError
+
+        sync_context_topics(db_session, [1])
+
+
+def test_delete_context_points_never_raises():
+    with patch("backend.retrieval.vector_store.get_vector_store") as get_store:
+        get_store.return_value.delete_context_embeddings.side_effect = ConnectionError
+
+        delete_context_points([2, 1, 2])
+
+    get_store.return_value.delete_context_embeddings.assert_called_once_with([1, 2])
+
+
+def test_topic_update_syncs_old_and_new_contexts(admin_headers, db_session):
+    topic = Topic(name="Topic", description="Desc", system_prompt="Prompt")
+    old = Context(name="Old", description="", context_type="MARKDOWN")
+    new = Context(name="New", description="", context_type="MARKDOWN")
+    topic.contexts = [old]
+    db_session.add_all([topic, old, new])
+    db_session.commit()
+
+    with patch("backend.routers.admin.topics.sync_context_topics") as sync:
+        response = client.put(
+            f"/api/admin/topics/{topic.id}",
+            headers=admin_headers,
+            json={"context_ids": [new.id]},
+        )
+
+    assert response.status_code == 200
+    assert set(sync.call_args.args[1]) == {old.id, new.id}
+
+
+def test_context_delete_removes_its_points(admin_headers, db_session):
+    context = Context(name="Gone", description="", context_type="MARKDOWN")
+    db_session.add(context)
+    db_session.commit()
+
+    with patch("backend.routers.admin.contexts.delete_context_points") as delete:
+        response = client.delete(
+            f"/api/admin/contexts/{context.id}", headers=admin_headers
+        )
+
+    assert response.status_code == 204
+    delete.assert_called_once_with([context.id])